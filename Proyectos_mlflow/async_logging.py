@@ -0,0 +1,268 @@
+"""
+Buffered, asynchronous logging of params and metrics to MLflow.
+
+mlflow.log_metric and mlflow.log_param are synchronous: every call is a
+round trip to the tracking backend (a commit in the local mydb.sqlite), so a
+loop that logs per-epoch or per-trial metrics waits on the backend at every
+step. BufferedMlflowLogger keeps the same calls but only appends to an
+in-memory buffer. A background thread sends the buffer with
+MlflowClient.log_batch when it reaches max_batch_size entries or every
+flush_interval seconds, whichever comes first. Timestamps are taken when the
+value is logged, not when it is sent.
+
+Everything logged is sent before the logger closes: at the end of its with
+block (also when the block raises), on close(), or at interpreter exit if an
+unhandled exception skips both. Values whose log_batch request fails go back
+to the front of the buffer and the background thread retries them with
+exponential backoff, so a tracking server that is briefly down loses
+nothing. After max_retries consecutive failures the error is also raised by
+the next call in the caller's thread, and the values stay buffered.
+
+Usage:
+
+    with mlflow.start_run() as run, BufferedMlflowLogger(run.info.run_id) as logger:
+        for epoch in range(epochs):
+            logger.log_metric("loss", loss, step=epoch)
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+import mlflow
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+logger = logging.getLogger(__name__)
+
+# Limits of a single log_batch request (mlflow.utils.validation)
+MAX_PARAMS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+
+# Upper bound of the wait between retries of a failed send
+MAX_BACKOFF = 30.0
+
+
+class BufferedMlflowLogger:
+    """
+    Drop-in replacement of mlflow.log_param(s) and mlflow.log_metric(s) for
+    one run that buffers the values and sends them in batches from a
+    background thread.
+    """
+
+    def __init__(self, run_id: str = None, client: MlflowClient = None,
+                 max_batch_size: int = MAX_ENTITIES_PER_BATCH, flush_interval: float = 1.0,
+                 max_pending: int = 100_000, max_retries: int = 3):
+        """
+        :param run_id: Run where the values are logged. If None, the active run.
+        :param client: MlflowClient used to send the batches. If None, one for
+                       the current tracking URI.
+        :param max_batch_size: Buffered entries that trigger a flush.
+        :param flush_interval: Maximum seconds a value waits in the buffer.
+        :param max_pending: Buffered entries above which the logging calls
+                            block until the background thread catches up, so
+                            memory stays bounded with a slow backend.
+        :param max_retries: Consecutive failed sends after which the error
+                            is raised in the caller's thread. The background
+                            thread keeps retrying after that.
+        """
+        if run_id is None:
+            active_run = mlflow.active_run()
+            if active_run is None:
+                raise ValueError("No run_id given and there is no active run")
+            run_id = active_run.info.run_id
+
+        self.run_id = run_id
+        self.client = client if client is not None else MlflowClient()
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, max_batch_size)
+        self.max_retries = max(max_retries, 1)
+        self.batches_sent = 0
+
+        self._condition = threading.Condition()
+        # Held while a batch is taken from the buffer and sent, so flush()
+        # also waits for a batch that the background thread is sending
+        self._send_lock = threading.Lock()
+        self._metrics = []
+        self._params = {}
+        self._error = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="mlflow-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "BufferedMlflowLogger":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self.close()
+        except Exception:  # pylint: disable=broad-except
+            if exc_type is None:
+                raise
+            # Do not hide the exception that ended the block
+            logger.exception("Could not flush the buffered MLflow values")
+
+    def _pending(self) -> int:
+        return len(self._metrics) + len(self._params)
+
+    def _raise_error(self) -> None:
+        """
+        Raises, once, the error of the last failed background flush.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _add(self, metrics: list = (), params: dict = None) -> None:
+        """
+        Appends entries to the buffer and wakes the background thread when a
+        batch is full.
+        """
+        with self._condition:
+            self._raise_error()
+            if self._closed:
+                raise RuntimeError("The logger is closed")
+            while self._pending() >= self.max_pending and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError("The logger was closed while waiting for the buffer")
+            self._metrics.extend(metrics)
+            if params:
+                self._params.update(params)
+            if self._pending() >= self.max_batch_size:
+                self._condition.notify_all()
+
+    def log_metric(self, key: str, value: float, step: int = None) -> None:
+        """
+        Same as mlflow.log_metric.
+        """
+        self._add([Metric(key, float(value), int(time.time() * 1000), step or 0)])
+
+    def log_metrics(self, metrics: dict, step: int = None) -> None:
+        """
+        Same as mlflow.log_metrics.
+        """
+        timestamp = int(time.time() * 1000)
+        self._add([Metric(key, float(value), timestamp, step or 0)
+                   for key, value in metrics.items()])
+
+    def log_param(self, key: str, value) -> None:
+        """
+        Same as mlflow.log_param.
+        """
+        self._add(params={key: str(value)})
+
+    def log_params(self, params: dict) -> None:
+        """
+        Same as mlflow.log_params.
+        """
+        self._add(params={key: str(value) for key, value in params.items()})
+
+    def _send(self) -> None:
+        """
+        Takes everything in the buffer and sends it with as few log_batch
+        requests as the batch limits allow. If a request fails, what was not
+        sent goes back to the front of the buffer before the error is
+        raised. Must hold _send_lock.
+        """
+        with self._condition:
+            metrics, self._metrics = self._metrics, []
+            params, self._params = [Param(key, value) for key, value in self._params.items()], {}
+            self._condition.notify_all()
+
+        size = max(1, min(self.max_batch_size, MAX_ENTITIES_PER_BATCH))
+        start_metric = start_param = 0
+        try:
+            while start_metric < len(metrics) or start_param < len(params):
+                batch_params = params[start_param:start_param + min(size, MAX_PARAMS_PER_BATCH)]
+                batch_metrics = metrics[start_metric:start_metric + size - len(batch_params)]
+                self.client.log_batch(self.run_id, metrics=batch_metrics, params=batch_params)
+                self.batches_sent += 1
+                start_param += len(batch_params)
+                start_metric += len(batch_metrics)
+        except BaseException:
+            with self._condition:
+                self._metrics[:0] = metrics[start_metric:]
+                # A value logged again after the buffer was taken is newer
+                self._params = {**{param.key: param.value for param in params[start_param:]},
+                                **self._params}
+            raise
+
+    def _run(self) -> None:
+        """
+        Background thread: sends the buffer when a batch is full or
+        flush_interval has passed, until the logger is closed.
+        """
+        failures = 0
+        while True:
+            with self._condition:
+                if failures:
+                    # Backoff before retrying the values of the failed send
+                    self._condition.wait_for(lambda: self._closed,
+                                             timeout=self._backoff(failures))
+                else:
+                    self._condition.wait_for(
+                        lambda: self._closed or self._pending() >= self.max_batch_size,
+                        timeout=self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                with self._send_lock:
+                    self._send()
+                failures = 0
+            except Exception as error:  # pylint: disable=broad-except
+                failures += 1
+                if failures < self.max_retries:
+                    logger.warning("Could not send the buffered MLflow values (attempt %d), "
+                                   "retrying: %s", failures, error)
+                    continue
+                logger.exception("Could not send the buffered MLflow values after %d "
+                                 "attempts", failures)
+                if failures == self.max_retries:
+                    with self._condition:
+                        self._error = error
+
+    def _backoff(self, failures: int) -> float:
+        """
+        Seconds to wait before retrying after `failures` consecutive failures.
+        """
+        return min(self.flush_interval * 2 ** (failures - 1), MAX_BACKOFF)
+
+    def flush(self) -> None:
+        """
+        Sends everything logged so far and waits until it is stored. A
+        failed send is retried up to max_retries attempts with backoff; if
+        all fail, the error is raised and the values stay buffered.
+        """
+        with self._send_lock:
+            for failures in range(1, self.max_retries + 1):
+                try:
+                    self._send()
+                    break
+                except Exception as error:  # pylint: disable=broad-except
+                    if failures == self.max_retries:
+                        raise
+                    logger.warning("Could not send the buffered MLflow values (attempt %d), "
+                                   "retrying: %s", failures, error)
+                    time.sleep(self._backoff(failures))
+        with self._condition:
+            self._raise_error()
+
+    def close(self) -> None:
+        """
+        Stops the background thread and sends what is left in the buffer.
+        Calling it more than once does nothing.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        atexit.unregister(self.close)
+        self._thread.join()
+        self.flush()
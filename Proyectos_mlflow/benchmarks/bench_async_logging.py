@@ -0,0 +1,116 @@
+"""
+Benchmark of BufferedMlflowLogger against direct mlflow.log_metric calls.
+
+Logs the same per-step metrics into a fresh sqlite backend store (the same
+kind of store as mlflow_demo/mydb.sqlite) in two runs: one with a
+mlflow.log_metric call per value and one through BufferedMlflowLogger.
+Reports the time the training loop spends logging per 10k metrics, the time
+until everything is stored (including the final flush), the log_batch
+requests sent, and checks that both runs stored the same metric history.
+
+Usage:
+
+    Proyectos_mlflow/benchmarks> python bench_async_logging.py --metrics 10000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import mlflow
+from mlflow.tracking import MlflowClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from async_logging import BufferedMlflowLogger  # pylint: disable=C0413
+
+KEYS = ("loss", "val_loss", "accuracy", "val_accuracy")
+
+
+def values(n_metrics: int):
+    """
+    Yields (key, value, step) tuples like a training loop that logs all the
+    KEYS once per epoch.
+    """
+    for i in range(n_metrics):
+        step, key = divmod(i, len(KEYS))
+        yield KEYS[key], 1.0 / (step + 1 + key), step
+
+
+def direct(n_metrics: int) -> dict:
+    """
+    One synchronous mlflow.log_metric call per value.
+    """
+    with mlflow.start_run(run_name="direct") as run:
+        start = time.perf_counter()
+        for key, value, step in values(n_metrics):
+            mlflow.log_metric(key, value, step=step)
+        elapsed = time.perf_counter() - start
+
+    return {"run_id": run.info.run_id, "loop": elapsed, "total": elapsed,
+            "requests": n_metrics}
+
+
+def buffered(n_metrics: int, batch_size: int, flush_interval: float) -> dict:
+    """
+    Same values through BufferedMlflowLogger; total includes the final flush.
+    """
+    with mlflow.start_run(run_name="buffered") as run:
+        start = time.perf_counter()
+        with BufferedMlflowLogger(run.info.run_id, max_batch_size=batch_size,
+                                  flush_interval=flush_interval) as logger:
+            for key, value, step in values(n_metrics):
+                logger.log_metric(key, value, step=step)
+            loop = time.perf_counter() - start
+        total = time.perf_counter() - start
+
+    return {"run_id": run.info.run_id, "loop": loop, "total": total,
+            "requests": logger.batches_sent}
+
+
+def history(client: MlflowClient, run_id: str) -> dict:
+    """
+    Returns the stored (step, value) pairs of every key of a run.
+    """
+    return {key: sorted((metric.step, metric.value)
+                        for metric in client.get_metric_history(run_id, key))
+            for key in KEYS}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--metrics", type=int, default=10_000, help="Metric values to log")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Buffered entries that trigger a flush")
+    parser.add_argument("--flush-interval", type=float, default=1.0,
+                        help="Maximum seconds a value waits in the buffer")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.getLogger("alembic").setLevel(logging.WARNING)
+    logging.getLogger("mlflow").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(directory, 'mydb.sqlite')}")
+        mlflow.set_experiment("bench_async_logging")
+
+        results = {"direct": direct(args.metrics),
+                   "buffered": buffered(args.metrics, args.batch_size, args.flush_interval)}
+
+        client = MlflowClient()
+        same = history(client, results["direct"]["run_id"]) == \
+            history(client, results["buffered"]["run_id"])
+
+        scale = 10_000 / args.metrics
+        print(f"{args.metrics} metrics into a sqlite backend store")
+        print(f"{'logger':<10} {'loop [s/10k]':>13} {'total [s/10k]':>14} {'requests':>9}")
+        for name, result in results.items():
+            print(f"{name:<10} {result['loop'] * scale:>13.3f} {result['total'] * scale:>14.3f} "
+                  f"{result['requests']:>9}")
+        print(f"loop speedup: {results['direct']['loop'] / results['buffered']['loop']:.0f}x, "
+              f"end-to-end speedup: "
+              f"{results['direct']['total'] / results['buffered']['total']:.1f}x")
+        print(f"same stored history: {same}")
@@ -0,0 +1,94 @@
+"""
+Benchmark of CustomModelPredictor scoring paths.
+
+Fits a StandardScaler + LGBMClassifier on synthetic data with the shape of
+the wine-quality dataset, checks that predict_batch returns the same
+predictions as predict for NumPy, pyarrow and DataFrame inputs, and reports
+rows per second of both paths as the batch size varies.
+
+Usage:
+
+    Proyectos_mlflow/benchmarks> python bench_batch_scoring.py --threads 1 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from custom_model import CustomModelPredictor  # pylint: disable=C0413
+
+FEATURES = ["fixed acidity", "volatile acidity", "citric acid", "residual sugar",
+            "chlorides", "free sulfur dioxide", "total sulfur dioxide", "density",
+            "pH", "sulphates", "alcohol"]
+
+
+def make_data(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns a synthetic DataFrame with the wine-quality features and a
+    binary target.
+    """
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(loc=np.arange(len(FEATURES)), scale=1.0 + np.arange(len(FEATURES)),
+                                   size=(n_rows, len(FEATURES))), columns=FEATURES)
+    data["quality"] = (data["alcohol"] + rng.normal(scale=5.0, size=n_rows) > 10).astype(int)
+
+    return data
+
+
+def rows_per_second(function, n_rows: int, min_time: float = 0.2) -> float:
+    """
+    Calls function repeatedly for at least min_time seconds and returns the
+    rows scored per second.
+    """
+    function()
+    calls, start = 0, time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls * n_rows / elapsed
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 10, 100, 1000, 10000, 100000],
+                        help="Batch sizes")
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, os.cpu_count()}),
+                        help="LightGBM threads per call for predict_batch")
+    args = parser.parse_args()
+
+    train = make_data(20000)
+    predictor = CustomModelPredictor(var_features=FEATURES, target="quality",
+                                     model_params={"n_estimators": 200, "num_leaves": 31,
+                                                   "verbose": -1})
+    predictor.preprocessor.fit(train[FEATURES])
+    predictor.model.fit(predictor.preprocessor.transform(train[FEATURES]), train["quality"])
+    assert isinstance(predictor.model, lgb.LGBMClassifier)
+
+    data = make_data(max(args.batches), seed=1)[FEATURES]
+    matrix = data.to_numpy()
+    table = pa.Table.from_pandas(data, preserve_index=False)
+
+    expected = predictor.predict(context=None, X=data)[0].to_numpy()
+    for name, batch_input in (("numpy", matrix), ("arrow", table), ("pandas", data)):
+        np.testing.assert_array_equal(predictor.predict_batch(batch_input), expected, err_msg=name)
+
+    header = f"{'batch':>8} {'predict rows/s':>15}"
+    header += "".join(f" {f'batch {t} thr rows/s':>20}" for t in args.threads)
+    print(header)
+    for batch in args.batches:
+        frame, rows = data.iloc[:batch], matrix[:batch]
+        line = f"{batch:>8} {rows_per_second(lambda: predictor.predict(None, frame), batch):>15,.0f}"
+        for threads in args.threads:
+            speed = rows_per_second(lambda: predictor.predict_batch(rows, num_threads=threads), batch)
+            line += f" {speed:>20,.0f}"
+        print(line)
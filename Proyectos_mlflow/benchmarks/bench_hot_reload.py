@@ -0,0 +1,133 @@
+"""
+Benchmark of ModelManager hot reload.
+
+Copies the demo registry (mlflow_demo/mydb.sqlite) to a temporary file and
+serves models:/ElasticnetWineModel/Staging from several client threads. While
+the clients run, another version is promoted to Staging in the copy; the
+watcher loads and warms it in the background and swaps it in. Reports the
+latency of the requests before, during and after the reload, the number of
+failed requests, and the latency of a first request that has to load the
+model on demand, which is what the warm pool avoids.
+
+Usage:
+
+    Proyectos_mlflow/benchmarks> python bench_hot_reload.py --clients 4 --version 2
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench_batch_scoring import FEATURES, make_data  # pylint: disable=C0413
+from model_manager import DEFAULT_ARTIFACT_ROOT, DEFAULT_DB_PATH  # pylint: disable=C0413
+from model_manager import LocalRegistry, ModelManager  # pylint: disable=C0413
+
+MODEL = "ElasticnetWineModel"
+URI = f"models:/{MODEL}/Staging"
+
+
+def promote(db_path: str, version: int) -> None:
+    """
+    Moves a version to Staging and the previous Staging versions to Archived.
+    """
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("UPDATE model_versions SET current_stage = 'Archived' "
+                           "WHERE name = ? AND current_stage = 'Staging'", (MODEL,))
+        connection.execute("UPDATE model_versions SET current_stage = 'Staging' "
+                           "WHERE name = ? AND version = ?", (MODEL, version))
+
+
+def client(manager: ModelManager, data, stop: threading.Event, log: list) -> None:
+    """
+    Sends one-row requests until stop is set and records (start, seconds,
+    prediction, error) for each.
+    """
+    i = 0
+    while not stop.is_set():
+        row = data.iloc[[i % len(data)]]
+        start = time.perf_counter()
+        try:
+            prediction, error = float(manager.predict(URI, row)[0]), None
+        except Exception as exc:  # pylint: disable=broad-except
+            prediction, error = None, exc
+        log.append((start, time.perf_counter() - start, prediction, error))
+        i += 1
+
+
+def percentiles(latencies: list) -> str:
+    """
+    Formats p50, p99 and max latency in milliseconds.
+    """
+    if not latencies:
+        return "-"
+    values = np.array(latencies) * 1e3
+
+    return (f"n={len(values):>6} p50={np.percentile(values, 50):7.3f} "
+            f"p99={np.percentile(values, 99):7.3f} max={values.max():7.3f} ms")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=4, help="Client threads")
+    parser.add_argument("--version", type=int, default=2, help="Version promoted to Staging")
+    parser.add_argument("--seconds", type=float, default=3.0,
+                        help="Seconds of traffic before and after the promotion")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    data = make_data(1000)[FEATURES]
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "mydb.sqlite")
+        shutil.copy(DEFAULT_DB_PATH, db_path)
+        registry = LocalRegistry(db_path, DEFAULT_ARTIFACT_ROOT)
+        target = registry.resolve(f"models:/{MODEL}/{args.version}")
+
+        cold = ModelManager(registry, warmup_input=None)
+        start = time.perf_counter()
+        cold.loader(target["path"]).predict(data.iloc[[0]])
+        print(f"cold first request (load + predict): {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+        manager = ModelManager(registry, poll_interval=0.1)
+        manager.get(URI)
+        logs = [[] for _ in range(args.clients)]
+        stop = threading.Event()
+        with manager:
+            threads = [threading.Thread(target=client, args=(manager, data, stop, log))
+                       for log in logs]
+            for thread in threads:
+                thread.start()
+
+            time.sleep(args.seconds)
+            promoted = time.perf_counter()
+            promote(db_path, args.version)
+            while manager.stats["swaps"] == 0 and time.perf_counter() - promoted < 60:
+                time.sleep(0.01)
+            swapped = time.perf_counter()
+            time.sleep(args.seconds)
+
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        requests = sorted(entry for log in logs for entry in log)
+        errors = sum(entry[3] is not None for entry in requests)
+        expected = float(manager.loader(target["path"]).predict(data.iloc[[0]])[0])
+        print(f"promotion detected and swapped after {(swapped - promoted) * 1e3:.0f} ms "
+              f"(includes load and warm-up of version {args.version})")
+        print(f"before  {percentiles([e[1] for e in requests if e[0] < promoted])}")
+        print(f"reload  {percentiles([e[1] for e in requests if promoted <= e[0] < swapped])}")
+        print(f"after   {percentiles([e[1] for e in requests if e[0] >= swapped])}")
+        print(f"failed requests: {errors}")
+        print(f"new version serving after swap: "
+              f"{manager.predict(URI, data.iloc[[0]])[0] == expected}")
+        print(f"stats: {manager.stats}")
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 import pickle
+import threading
 import cloudpickle
 import mlflow
 from mlflow.models import infer_signature
@@ -8,6 +10,12 @@ from sklearn.model_selection import train_test_split
 import lightgbm as lgb
 from sklearn.metrics import accuracy_score
 
+from async_logging import BufferedMlflowLogger
+
+# Rows per block in predict_batch: the scaler's subtract and divide run on the
+# same block while it is still in cache, so the input is read only once
+BATCH_BLOCK_ROWS = 8192
+
 
 class CustomModelPredictor(mlflow.pyfunc.PythonModel):
     """
@@ -23,6 +31,16 @@ class CustomModelPredictor(mlflow.pyfunc.PythonModel):
         self.target = target
         self.preprocessor = StandardScaler()
         self.model = lgb.LGBMClassifier(**model_params)
+        self._local = None
+
+    def __getstate__(self) -> dict:
+        """
+        Leaves the per-thread scoring buffers out of the pickled model.
+        """
+        state = self.__dict__.copy()
+        state["_local"] = None
+
+        return state
 
     def load_context(self, context) -> None:
         """
@@ -41,18 +59,23 @@ class CustomModelPredictor(mlflow.pyfunc.PythonModel):
 
         return None
 
-    def fit(self, X_train, y_train) -> None:
+    def fit(self, X_train, y_train, tracker=None) -> None:
         """
         This method will take a pandas DataFrame, fit the model, save that as a
         serialized pickle object and return the signature of the model
 
         :param data: the inputted DataFrame with the features of the model
         :type data: pd.DataFrame
+        :param tracker: object with log_metric where the metrics are logged,
+                        usually a BufferedMlflowLogger. If None, each metric
+                        is logged with a direct mlflow.log_metric call
 
         :return: signature of the model
         :rtype: ModelSignature
         """
 
+        tracker = tracker if tracker is not None else mlflow
+
         y = data.loc[:, self.target]
         X = data.drop(self.target, axis=1)
         X = X.loc[:, self.var_features]
@@ -76,13 +99,13 @@ class CustomModelPredictor(mlflow.pyfunc.PythonModel):
         # Train metrics
         y_train_pred = self.model.predict(X_train_transformed)
         train_accuracy = accuracy_score(y_train_pred, y_train)
-        mlflow.log_metric("train_accuracy", train_accuracy)
+        tracker.log_metric("train_accuracy", train_accuracy)
 
         # Validation metrics
         X_val_transformed = self.preprocessor.transform(X_val)
         y_val_pred = self.model.predict(X_val_transformed)
         val_accuracy = accuracy_score(y_val_pred, y_val)
-        mlflow.log_metric("val_accuracy", val_accuracy)
+        tracker.log_metric("val_accuracy", val_accuracy)
 
         # Dumping the fitted objects
         with open("/path/to/fitted_model.pkl", "wb") as f:
@@ -110,9 +133,139 @@ class CustomModelPredictor(mlflow.pyfunc.PythonModel):
         predictions = self.model.predict(X_transformed)
         
         return pd.DataFrame(predictions)
-    
+
+    def _buffer(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        """
+        Returns a view of a preallocated buffer with the requested shape,
+        growing the buffer only when a bigger batch arrives. Buffers are
+        per thread, so threads scoring on the same predictor do not
+        overwrite each other's data.
+
+        :param name: name of the buffer
+        :param shape: shape of the requested view; the first axis is the rows
+        :param dtype: dtype of the buffer
+
+        :return: view of the buffer
+        :rtype: np.ndarray
+        """
+        local = getattr(self, "_local", None)
+        if local is None:
+            local = self._local = threading.local()
+        buffers = getattr(local, "buffers", None)
+        if buffers is None:
+            buffers = local.buffers = {}
+
+        buffer = buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.shape[1:] != shape[1:] \
+                or buffer.shape[0] < shape[0]:
+            buffer = buffers[name] = np.empty(shape, dtype=dtype)
+
+        return buffer[:shape[0]]
+
+    def _scale_into(self, X, buffer: np.ndarray) -> None:
+        """
+        Applies the fitted StandardScaler to X and writes the result in
+        buffer. It performs the same (X - mean_) / scale_ operations as
+        StandardScaler.transform, block by block, without intermediate copies.
+
+        :param X: 2D NumPy array or pyarrow Table/RecordBatch with the features
+        :param buffer: output array of shape (n_rows, n_features)
+        """
+        mean = self.preprocessor.mean_ if self.preprocessor.with_mean else None
+        scale = self.preprocessor.scale_ if self.preprocessor.with_std else None
+
+        if isinstance(X, np.ndarray):
+            for start in range(0, X.shape[0], BATCH_BLOCK_ROWS):
+                block = buffer[start:start + BATCH_BLOCK_ROWS]
+                rows = X[start:start + BATCH_BLOCK_ROWS]
+                if mean is not None:
+                    np.subtract(rows, mean, out=block)
+                else:
+                    block[...] = rows
+                if scale is not None:
+                    np.divide(block, scale, out=block)
+            return
+
+        # pyarrow Table/RecordBatch: one column at a time, in the fitted order
+        for j, name in enumerate(self._feature_names(X)):
+            column = X.column(name).to_numpy()
+            if mean is not None:
+                np.subtract(column, mean[j], out=buffer[:, j])
+            else:
+                buffer[:, j] = column
+            if scale is not None:
+                np.divide(buffer[:, j], scale[j], out=buffer[:, j])
+
+    def _feature_names(self, X) -> list:
+        """
+        Returns the column names to read from a DataFrame or pyarrow input.
+
+        :param X: DataFrame or pyarrow Table/RecordBatch
+
+        :return: feature names in the order used to fit the preprocessor
+        :rtype: list
+        """
+        names = getattr(self.preprocessor, "feature_names_in_", None)
+        if names is None:
+            names = self.var_features if self.var_features else X.column_names
+
+        return list(names)
+
+    def predict_batch(self, X, num_threads: int = None, out: np.ndarray = None) -> np.ndarray:
+        """
+        Batched scoring path. Takes a NumPy array (columns in the fitted
+        order), a pyarrow Table/RecordBatch or a DataFrame, scales it into a
+        reused per-thread buffer and predicts with the LightGBM booster
+        directly. The predictions are the same as predict().
+
+        :param X: the inputted features
+        :param num_threads: threads used by LightGBM for this call. If None,
+                            the model's own setting is used
+        :param out: array where the predictions are written. If None, a
+                    new array is returned
+
+        :return: predictions of the model
+        :rtype: np.ndarray
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X.loc[:, self._feature_names(X)].to_numpy()
+
+        if isinstance(X, np.ndarray):
+            n_rows = X.shape[0]
+            dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+        else:
+            n_rows = X.num_rows
+            dtype = np.float64
+
+        X_transformed = self._buffer("input",
+                                     (n_rows, self.preprocessor.n_features_in_), dtype)
+        self._scale_into(X, X_transformed)
+
+        kwargs = {} if num_threads is None else {"num_threads": num_threads}
+
+        if isinstance(self.model, lgb.LGBMClassifier):
+            # Same decision as LGBMClassifier.predict: argmax of predict_proba
+            proba = self.model.booster_.predict(X_transformed, **kwargs)
+            class_index = self._buffer("index", (n_rows,), np.intp)
+            if proba.ndim == 1:
+                np.greater(proba, 1.0 - proba, out=class_index, casting="unsafe")
+            else:
+                np.argmax(proba, axis=1, out=class_index)
+            return np.take(self.model.classes_, class_index, out=out)
+
+        if isinstance(self.model, lgb.LGBMModel):
+            predictions = self.model.booster_.predict(X_transformed, **kwargs)
+        else:
+            predictions = self.model.predict(X_transformed)
+
+        if out is None:
+            return predictions
+        out[...] = predictions
+
+        return out
+
 if __name__ == "__main__":
-    with mlflow.start_run() as run:
+    with mlflow.start_run() as run, BufferedMlflowLogger(run.info.run_id) as tracker:
         # Load object and train model
         CMP = CustomModelPredictor(
             var_features=var_features,
@@ -126,7 +279,7 @@ if __name__ == "__main__":
 
 
         # Train the model
-        signature = CMP.fit(data=train_data)
+        signature = CMP.fit(data=train_data, tracker=tracker)
 
         # Log the model
         # conda_env = "conda.yaml"
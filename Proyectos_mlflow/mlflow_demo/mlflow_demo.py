@@ -13,6 +13,9 @@ import mlflow.sklearn
 
 import logging
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from async_logging import BufferedMlflowLogger
+
 mlflow.set_tracking_uri("http://127.0.0.1:5000/")
 mlflow.set_experiment("Wine_prediction_experiment")
 
@@ -52,7 +55,7 @@ if __name__ == "__main__":
     alpha = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
     l1_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
 
-    with mlflow.start_run():
+    with mlflow.start_run() as run, BufferedMlflowLogger(run.info.run_id) as tracker:
         lr = ElasticNet(alpha=alpha, l1_ratio=l1_ratio, random_state=42)
         lr.fit(train_x, train_y)
 
@@ -65,11 +68,9 @@ if __name__ == "__main__":
         print("  MAE: %s" % mae)
         print("  R2: %s" % r2)
 
-        mlflow.log_param("alpha", alpha)
-        mlflow.log_param("l1_ratio", l1_ratio)
-        mlflow.log_metric("rmse", rmse)
-        mlflow.log_metric("r2", r2)
-        mlflow.log_metric("mae", mae)
+        # Sent together in a single log_batch request
+        tracker.log_params({"alpha": alpha, "l1_ratio": l1_ratio})
+        tracker.log_metrics({"rmse": rmse, "r2": r2, "mae": mae})
 
         tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
 
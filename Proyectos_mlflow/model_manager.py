@@ -0,0 +1,397 @@
+"""
+Warm pool and hot reload of MLflow models.
+
+ModelManager keeps an LRU pool of loaded pyfunc models. Models are requested
+with the usual MLflow URIs:
+
+    runs:/<run_id>/model           a fixed run
+    models:/<name>/<version>       a fixed registry version
+    models:/<name>/<stage>         the latest version in a stage (Production, ...)
+    models:/<name>/latest          the latest version
+    models:/<name>@<alias>         the version an alias points to
+
+Stage, latest and alias URIs are moving references: a watcher thread polls
+the local registry (the sqlite backend store, read directly so no tracking
+server is needed) and, when a reference moves to another version, loads and
+warms the new model in the background and then swaps the reference. Requests
+never wait for a reload: until the swap they are served by the previous
+model, and requests already running keep the model they started with.
+
+Usage:
+
+    manager = ModelManager(LocalRegistry("mlflow_demo/mydb.sqlite", "mlflow_demo/mlartifacts"))
+    with manager:
+        manager.predict("models:/ElasticnetWineModel/Staging", data)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import mlflow.pyfunc
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(CURRENT_DIRECTORY, "mlflow_demo", "mydb.sqlite")
+DEFAULT_ARTIFACT_ROOT = os.path.join(CURRENT_DIRECTORY, "mlflow_demo", "mlartifacts")
+
+STAGES = ("none", "staging", "production", "archived")
+
+
+class LocalRegistry:
+    """
+    Resolves model URIs against a local MLflow sqlite backend store and the
+    directory served as mlflow-artifacts:/ by the tracking server.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, artifact_root: str = DEFAULT_ARTIFACT_ROOT):
+        """
+        :param db_path: Path of the sqlite backend store (mydb.sqlite).
+        :param artifact_root: Directory behind mlflow-artifacts:/ (mlartifacts).
+        """
+        self.db_path = db_path
+        self.artifact_root = artifact_root
+
+    @staticmethod
+    def is_moving(uri: str) -> bool:
+        """
+        Returns True for URIs whose target can change: stages, latest and aliases.
+        """
+        if uri.startswith("models:/"):
+            reference = uri[len("models:/"):]
+            return "@" in reference or not reference.rsplit("/", 1)[-1].isdigit()
+
+        return False
+
+    def local_path(self, source: str) -> str:
+        """
+        Maps an artifact URI to a local path.
+
+        :param source: mlflow-artifacts:/, file:// or plain path.
+
+        :return: Local directory of the artifact.
+        :rtype: str
+        """
+        if source.startswith("mlflow-artifacts:"):
+            return os.path.join(self.artifact_root, source[len("mlflow-artifacts:"):].lstrip("/"))
+        if source.startswith("file://"):
+            return source[len("file://"):]
+
+        return source
+
+    def version(self) -> int:
+        """
+        Returns a value that changes when the registry may have changed (the
+        modification time of the store), so the watcher can skip queries.
+        """
+        return os.stat(self.db_path).st_mtime_ns
+
+    def resolve(self, uri: str) -> dict:
+        """
+        Resolves a model URI.
+
+        :param uri: runs:/ or models:/ URI.
+
+        :return: Dictionary with path, run_id and version (None for runs:/).
+        :rtype: dict
+        """
+        with sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True) as connection:
+            if uri.startswith("runs:/"):
+                run_id, _, artifact_path = uri[len("runs:/"):].partition("/")
+                row = connection.execute("SELECT artifact_uri FROM runs WHERE run_uuid = ?",
+                                         (run_id,)).fetchone()
+                if row is None:
+                    raise LookupError(f"Run not found: {run_id}")
+                return {"path": os.path.join(self.local_path(row[0]), artifact_path),
+                        "run_id": run_id, "version": None}
+
+            if not uri.startswith("models:/"):
+                raise ValueError(f"Unsupported model URI: {uri}")
+
+            reference = uri[len("models:/"):]
+            if "@" in reference:
+                name, alias = reference.split("@", 1)
+                query = ("SELECT v.version, v.run_id, v.source FROM registered_model_aliases a "
+                         "JOIN model_versions v ON v.name = a.name AND v.version = a.version "
+                         "WHERE a.name = ? AND a.alias = ?")
+                params = (name, alias)
+            else:
+                name, selector = reference.rsplit("/", 1)
+                base = ("SELECT version, run_id, source FROM model_versions "
+                        "WHERE name = ? AND current_stage != 'Deleted_Internal'")
+                if selector.isdigit():
+                    query, params = base + " AND version = ?", (name, int(selector))
+                elif selector.lower() == "latest":
+                    query, params = base + " ORDER BY version DESC LIMIT 1", (name,)
+                elif selector.lower() in STAGES:
+                    query = base + " AND lower(current_stage) = ? ORDER BY version DESC LIMIT 1"
+                    params = (name, selector.lower())
+                else:
+                    raise ValueError(f"Unknown version or stage in {uri}")
+
+            row = connection.execute(query, params).fetchone()
+
+        if row is None:
+            raise LookupError(f"No model version for {uri}")
+
+        return {"path": self.local_path(row[2]), "run_id": row[1], "version": int(row[0])}
+
+
+class ModelManager:
+    """
+    LRU pool of loaded pyfunc models with pre-warming and hot reload of
+    moving references (stages, latest and aliases).
+    """
+
+    def __init__(self, registry: LocalRegistry, capacity: int = 4, poll_interval: float = 2.0,
+                 warmup_input=None, loader=mlflow.pyfunc.load_model):
+        """
+        :param registry: LocalRegistry used to resolve URIs.
+        :param capacity: Maximum number of loaded models. The current targets of
+                         moving references, and their new targets while they
+                         are being warmed for a swap, are never evicted.
+        :param poll_interval: Seconds between registry checks of the watcher.
+        :param warmup_input: Input for the warm-up prediction. If None it is
+                             built from the model signature or the feature
+                             names of the underlying estimator.
+        :param loader: Function that loads a model from a local path.
+        """
+        self.registry = registry
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self.warmup_input = warmup_input
+        self.loader = loader
+
+        self._pool = OrderedDict()
+        self._loading = {}
+        self._references = {}
+        # New targets of moving references being warmed, pinned until the swap
+        self._swapping = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._registry_version = None
+        self._failed = set()
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "swaps": 0,
+                      "reload_errors": 0}
+
+    def __enter__(self) -> "ModelManager":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Starts the watcher thread.
+        """
+        if self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-manager-watcher",
+                                             daemon=True)
+            self._watcher.start()
+
+    def stop(self) -> None:
+        """
+        Stops the watcher thread.
+        """
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Model registry check failed")
+
+    def sample_input(self, model):
+        """
+        Builds the input of the warm-up prediction: warmup_input if given,
+        else a row of zeros with the columns of the signature or of the
+        feature names of the estimator. Returns None if neither is known.
+        """
+        if self.warmup_input is not None:
+            return self.warmup_input
+
+        schema = model.metadata.get_input_schema()
+        if schema is not None and schema.has_input_names():
+            columns = schema.input_names()
+        else:
+            columns = getattr(getattr(model, "_model_impl", None), "feature_names_in_", None)
+        if columns is None:
+            return None
+
+        return pd.DataFrame(np.zeros((1, len(columns))), columns=list(columns))
+
+    def load(self, path: str) -> dict:
+        """
+        Loads a model and runs a warm-up prediction, so that the first real
+        request does not pay for lazy initialisation.
+
+        :param path: Local path of the model.
+
+        :return: Pool entry with the model and its load and warm-up times.
+        :rtype: dict
+        """
+        start = time.perf_counter()
+        model = self.loader(path)
+        loaded = time.perf_counter()
+
+        sample = self.sample_input(model)
+        if sample is not None:
+            model.predict(sample)
+
+        return {"model": model, "path": path, "load_seconds": loaded - start,
+                "warmup_seconds": time.perf_counter() - loaded}
+
+    def _acquire(self, path: str) -> dict:
+        """
+        Returns the pool entry of a path, loading it if needed. Concurrent
+        requests for a model being loaded wait for the same load.
+        """
+        with self._lock:
+            entry = self._pool.get(path)
+            if entry is not None:
+                self._pool.move_to_end(path)
+                self.stats["hits"] += 1
+                return entry
+            self.stats["misses"] += 1
+            future = self._loading.get(path)
+            owner = future is None
+            if owner:
+                future = self._loading[path] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            entry = self.load(path)
+        except BaseException as error:
+            with self._lock:
+                del self._loading[path]
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            self._pool[path] = entry
+            del self._loading[path]
+            self.stats["loads"] += 1
+            self._evict()
+        future.set_result(entry)
+
+        return entry
+
+    def _evict(self) -> None:
+        """
+        Drops least recently used models above capacity. Called with the lock held.
+        """
+        pinned = {path for uri, path in self._references.items()
+                  if self.registry.is_moving(uri)} | self._swapping
+        for path in list(self._pool):
+            if len(self._pool) <= self.capacity:
+                break
+            if path not in pinned:
+                del self._pool[path]
+                self.stats["evictions"] += 1
+
+    def get(self, uri: str):
+        """
+        Returns the loaded model of a URI.
+
+        :param uri: runs:/ or models:/ URI.
+
+        :return: pyfunc model.
+        """
+        with self._lock:
+            path = self._references.get(uri)
+
+        if path is None:
+            path = self.registry.resolve(uri)["path"]
+            entry = self._acquire(path)
+            with self._lock:
+                # The watcher may have already moved the reference
+                path = self._references.setdefault(uri, path)
+            if path == entry["path"]:
+                return entry["model"]
+
+        return self._acquire(path)["model"]
+
+    def predict(self, uri: str, data):
+        """
+        Predicts with the current model of a URI.
+
+        :param uri: runs:/ or models:/ URI.
+        :param data: Model input.
+        """
+        return self.get(uri).predict(data)
+
+    def refresh(self) -> list:
+        """
+        Checks the registry once. Each moving reference whose target changed
+        is loaded and warmed without holding the pool lock and then swapped.
+        If the new version fails to load (for example, its artifacts are still
+        being uploaded), the previous one keeps serving and the registry is
+        checked again on the next call.
+
+        :return: List of (uri, previous path, new path) swapped.
+        :rtype: list
+        """
+        registry_version = self.registry.version()
+        if registry_version == self._registry_version:
+            return []
+        self._registry_version = registry_version
+
+        with self._lock:
+            moving = {uri: path for uri, path in self._references.items()
+                      if self.registry.is_moving(uri)}
+
+        swapped = []
+        for uri, previous in moving.items():
+            path = None
+            try:
+                path = self.registry.resolve(uri)["path"]
+                if path == previous:
+                    continue
+                # The new model must not be evicted between loading and the swap
+                with self._lock:
+                    self._swapping.add(path)
+                self._acquire(path)
+            except Exception:  # pylint: disable=broad-except
+                with self._lock:
+                    self._swapping.discard(path)
+                    self.stats["reload_errors"] += 1
+                self._registry_version = None
+                if path not in self._failed:
+                    self._failed.add(path)
+                    logger.exception("Could not reload %s, keeping %s", uri, previous)
+                continue
+
+            with self._lock:
+                self._references[uri] = path
+                self._swapping.discard(path)
+                self.stats["swaps"] += 1
+                self._evict()
+            logger.info("Swapped %s: %s -> %s", uri, previous, path)
+            swapped.append((uri, previous, path))
+
+        return swapped
+
+    def pool(self) -> list:
+        """
+        Returns the loaded models from least to most recently used, with
+        their load and warm-up times.
+        """
+        with self._lock:
+            return [{key: value for key, value in entry.items() if key != "model"}
+                    for entry in self._pool.values()]
@@ -0,0 +1,8 @@
+"""
+Common pytest setup: puts Proyectos_mlflow/ on the import path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
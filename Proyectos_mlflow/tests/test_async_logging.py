@@ -0,0 +1,85 @@
+"""
+Tests of BufferedMlflowLogger: values whose log_batch request fails are kept
+and sent again, and a persistent failure is raised in the caller's thread.
+"""
+
+import threading
+
+import pytest
+
+from async_logging import BufferedMlflowLogger
+
+
+class FlakyClient:
+    """
+    Stand-in for MlflowClient.log_batch that fails the first `failures`
+    requests and stores the metrics and params of the others.
+    """
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+        self.metrics = []
+        self.params = {}
+        self.lock = threading.Lock()
+
+    def log_batch(self, run_id, metrics=(), params=()):
+        with self.lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise ConnectionError("tracking server unavailable")
+            self.metrics.extend((metric.key, metric.value, metric.step) for metric in metrics)
+            self.params.update((param.key, param.value) for param in params)
+
+
+def test_values_are_sent_in_batches():
+    client = FlakyClient()
+
+    with BufferedMlflowLogger("run", client=client, max_batch_size=10) as logger:
+        logger.log_params({"alpha": 0.1, "folds": 5})
+        for step in range(25):
+            logger.log_metric("loss", 1.0 / (step + 1), step=step)
+
+    assert client.params == {"alpha": "0.1", "folds": "5"}
+    assert [step for _, _, step in client.metrics] == list(range(25))
+
+
+def test_failed_send_is_retried_without_losing_values():
+    client = FlakyClient(failures=2)
+
+    with BufferedMlflowLogger("run", client=client, max_batch_size=5, flush_interval=0.01,
+                              max_retries=5) as logger:
+        logger.log_param("alpha", 0.1)
+        for step in range(20):
+            logger.log_metric("loss", float(step), step=step)
+
+    assert client.params == {"alpha": "0.1"}
+    assert sorted(step for _, _, step in client.metrics) == list(range(20))
+
+
+def test_failed_flush_keeps_the_values():
+    client = FlakyClient(failures=1)
+    logger = BufferedMlflowLogger("run", client=client, max_batch_size=1000, flush_interval=60,
+                                  max_retries=1)
+    logger.log_metrics({"rmse": 1.5, "mae": 1.0}, step=0)
+
+    with pytest.raises(ConnectionError):
+        logger.flush()
+    logger.close()
+
+    assert sorted(key for key, _, _ in client.metrics) == ["mae", "rmse"]
+
+
+def test_persistent_failure_is_raised_in_the_caller():
+    client = FlakyClient(failures=10**6)
+    logger = BufferedMlflowLogger("run", client=client, max_batch_size=1, flush_interval=0.001,
+                                  max_retries=2)
+    logger.log_metric("loss", 1.0)
+
+    with pytest.raises(ConnectionError):
+        for _ in range(10**4):
+            logger.log_metric("loss", 1.0)
+            threading.Event().wait(0.001)
+
+    with pytest.raises(ConnectionError):
+        logger.close()
@@ -0,0 +1,101 @@
+"""
+Tests of CustomModelPredictor.predict_batch: it returns the same predictions
+as predict() for NumPy, float32, pyarrow and DataFrame inputs, and its
+results are not overwritten by later calls or by other threads.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from bench_batch_scoring import FEATURES, make_data  # noqa: E402
+from custom_model import CustomModelPredictor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def predictor() -> CustomModelPredictor:
+    """
+    Classifier fitted on synthetic wine-quality data.
+    """
+    train = make_data(5_000, seed=0)
+    predictor = CustomModelPredictor(
+        var_features=FEATURES, target="quality",
+        model_params={"n_estimators": 50, "num_leaves": 15, "verbose": -1},
+    )
+    predictor.preprocessor.fit(train[FEATURES])
+    predictor.model.fit(predictor.preprocessor.transform(train[FEATURES]), train["quality"])
+    return predictor
+
+
+@pytest.fixture(scope="module")
+def data():
+    return make_data(3_000, seed=1)[FEATURES]
+
+
+def expected(predictor, frame) -> np.ndarray:
+    return predictor.predict(context=None, X=frame)[0].to_numpy()
+
+
+@pytest.mark.parametrize("kind", ["pandas", "numpy", "float32", "arrow_table", "arrow_batch"])
+def test_predict_batch_equals_predict(predictor, data, kind):
+    if kind == "pandas":
+        batch_input, reference = data, data
+    elif kind == "numpy":
+        batch_input, reference = data.to_numpy(), data
+    elif kind == "float32":
+        # predict() scales the float32 frame in float32 as well
+        reference = data.astype(np.float32)
+        batch_input = reference.to_numpy()
+    elif kind == "arrow_table":
+        batch_input, reference = pa.Table.from_pandas(data, preserve_index=False), data
+    else:
+        batch_input = pa.RecordBatch.from_pandas(data, preserve_index=False)
+        reference = data
+
+    np.testing.assert_array_equal(predictor.predict_batch(batch_input),
+                                  expected(predictor, reference))
+
+
+def test_result_not_overwritten_by_next_call(predictor, data):
+    first = predictor.predict_batch(data.to_numpy())
+    kept = first.copy()
+
+    predictor.predict_batch(data.iloc[::-1].to_numpy())
+
+    np.testing.assert_array_equal(first, kept)
+
+
+def test_out_argument(predictor, data):
+    out = np.empty(len(data), dtype=predictor.model.classes_.dtype)
+
+    result = predictor.predict_batch(data.to_numpy(), out=out)
+
+    assert result is out
+    np.testing.assert_array_equal(out, expected(predictor, data))
+
+
+def test_concurrent_threads(predictor, data):
+    inputs = [data.iloc[i::4].to_numpy() for i in range(4)]
+    references = [expected(predictor, data.iloc[i::4]) for i in range(4)]
+    errors = []
+
+    def score(i):
+        for _ in range(20):
+            if not np.array_equal(predictor.predict_batch(inputs[i], num_threads=1),
+                                  references[i]):
+                errors.append(i)
+
+    threads = [threading.Thread(target=score, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
@@ -0,0 +1,157 @@
+"""
+Tests of ModelManager with a stub loader and a temporary copy of the demo
+registry (mlflow_demo/mydb.sqlite): LRU eviction, pinning of moving
+references, warm-up, hot swap on a stage change and keeping the previous
+model when the new version fails to load.
+"""
+
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from model_manager import LocalRegistry, ModelManager
+
+DEMO_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mlflow_demo",
+                       "mydb.sqlite")
+NAME = "ElasticnetWineModel"
+STAGING = f"models:/{NAME}/Staging"
+WARMUP = [[0.0]]
+
+
+class StubModel:
+    """
+    Loaded model that records the inputs it predicts on.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.inputs = []
+
+    def predict(self, data):
+        self.inputs.append(data)
+        return self.path
+
+
+class StubLoader:
+    """
+    Loader that builds StubModel instances and fails for the paths in `failing`.
+    """
+
+    def __init__(self):
+        self.loaded = []
+        self.failing = set()
+
+    def __call__(self, path: str) -> StubModel:
+        if path in self.failing:
+            raise OSError(f"artifacts not available: {path}")
+        self.loaded.append(path)
+        return StubModel(path)
+
+
+@pytest.fixture
+def registry(tmp_path) -> LocalRegistry:
+    """
+    Copy of the demo registry, with Staging at version 1.
+    """
+    db_path = tmp_path / "mydb.sqlite"
+    shutil.copy(DEMO_DB, db_path)
+    return LocalRegistry(str(db_path), str(tmp_path / "mlartifacts"))
+
+
+@pytest.fixture
+def loader() -> StubLoader:
+    return StubLoader()
+
+
+def path_of(registry: LocalRegistry, version: int) -> str:
+    return registry.resolve(f"models:/{NAME}/{version}")["path"]
+
+
+def move_stage(registry: LocalRegistry, version: int, stage: str = "Staging") -> None:
+    """
+    Moves a stage to a version and bumps the modification time of the store.
+    """
+    with sqlite3.connect(registry.db_path) as connection:
+        connection.execute("UPDATE model_versions SET current_stage = 'None' "
+                           "WHERE name = ? AND current_stage = ?", (NAME, stage))
+        connection.execute("UPDATE model_versions SET current_stage = ? "
+                           "WHERE name = ? AND version = ?", (stage, NAME, version))
+    modified = os.stat(registry.db_path).st_mtime_ns + 1_000_000
+    os.utime(registry.db_path, ns=(modified, modified))
+
+
+def manager_for(registry, loader, capacity: int) -> ModelManager:
+    return ModelManager(registry, capacity=capacity, warmup_input=WARMUP, loader=loader)
+
+
+def test_lru_eviction_order(registry, loader):
+    manager = manager_for(registry, loader, capacity=2)
+
+    manager.get(f"models:/{NAME}/2")
+    manager.get(f"models:/{NAME}/3")
+    manager.get(f"models:/{NAME}/2")
+    manager.get(f"models:/{NAME}/4")
+
+    assert [entry["path"] for entry in manager.pool()] == [path_of(registry, 2),
+                                                           path_of(registry, 4)]
+    assert manager.stats["evictions"] == 1
+    assert manager.stats["hits"] == 1
+
+
+def test_moving_reference_is_pinned(registry, loader):
+    manager = manager_for(registry, loader, capacity=1)
+
+    manager.get(STAGING)
+    manager.get(f"models:/{NAME}/3")
+    manager.get(f"models:/{NAME}/4")
+
+    assert [entry["path"] for entry in manager.pool()] == [path_of(registry, 1)]
+    assert manager.get(STAGING).path == path_of(registry, 1)
+    assert loader.loaded.count(path_of(registry, 1)) == 1
+
+
+def test_warmup_prediction(registry, loader):
+    manager = manager_for(registry, loader, capacity=2)
+
+    model = manager.get(STAGING)
+
+    assert model.inputs == [WARMUP]
+    assert manager.pool()[0]["warmup_seconds"] >= 0.0
+
+
+def test_swap_on_stage_change(registry, loader):
+    manager = manager_for(registry, loader, capacity=1)
+    manager.get(STAGING)
+    manager.refresh()
+
+    move_stage(registry, 2)
+    swapped = manager.refresh()
+
+    assert swapped == [(STAGING, path_of(registry, 1), path_of(registry, 2))]
+    # The new model is warmed and kept in the pool, so the next request does
+    # not load it again
+    assert [entry["path"] for entry in manager.pool()] == [path_of(registry, 2)]
+    model = manager.get(STAGING)
+    assert model.path == path_of(registry, 2)
+    assert model.inputs == [WARMUP]
+    assert loader.loaded == [path_of(registry, 1), path_of(registry, 2)]
+
+
+def test_failed_load_keeps_previous_model(registry, loader):
+    manager = manager_for(registry, loader, capacity=2)
+    manager.get(STAGING)
+    manager.refresh()
+    loader.failing.add(path_of(registry, 2))
+
+    move_stage(registry, 2)
+
+    assert manager.refresh() == []
+    assert manager.stats["reload_errors"] == 1
+    assert manager.get(STAGING).path == path_of(registry, 1)
+
+    # The registry is checked again on the next call, once the artifacts are there
+    loader.failing.clear()
+    assert [path for _, _, path in manager.refresh()] == [path_of(registry, 2)]
+    assert manager.get(STAGING).path == path_of(registry, 2)
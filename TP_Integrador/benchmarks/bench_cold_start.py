@@ -0,0 +1,137 @@
+"""
+bench_cold_start.py
+
+DESCRIPCIÓN: Mide el arranque en frío de un trabajo de predicción chico
+(../Notebook/example.json), cada corrida en un proceso nuevo:
+
+- pandas: FeatureEngineeringPipeline.transform() y el modelo de
+  model.pkl, como lo hacían feature_engineering.py y predict.py.
+- score.py: la CLI con importaciones diferidas y el modelo compilado en
+  json, en Python puro.
+- score.py (NumPy): la misma CLI con --umbral-numpy 0.
+
+Informa la mediana del tiempo total del proceso y, con
+python -X importtime, el tiempo de importación (suma de la columna self),
+la cantidad de módulos importados, si se importaron NumPy, pandas o
+sklearn y las importaciones de primer nivel más costosas.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SRC_DIRECTORY = os.path.join(CURRENT_DIRECTORY, "..", "src")
+EXAMPLE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "Notebook", "example.json")
+SCORE_PATH = os.path.join(SRC_DIRECTORY, "score.py")
+
+SCRIPT_PANDAS = """
+import json, sys, warnings
+sys.path.insert(0, {src!r})
+import pandas as pd
+from feature_engineering import FeatureEngineeringPipeline
+from predict import MakePredictionPipeline
+warnings.filterwarnings('ignore')
+feature_pipeline = FeatureEngineeringPipeline(None, None, state_path={estado!r})
+feature_pipeline.load_state()
+prediction_pipeline = MakePredictionPipeline(None, None, model_path={modelo!r})
+prediction_pipeline.load_model()
+with open({entrada!r}, 'r', encoding='utf-8') as f_json:
+    df_raw = pd.DataFrame([json.load(f_json)])
+print(prediction_pipeline.make_predictions(feature_pipeline.transform(df_raw))
+      ['Item_Outlet_Sales'].tolist())
+"""
+
+# Módulos pesados que se informan si el proceso los importó
+PESADOS = ('numpy', 'pandas', 'sklearn')
+
+
+def comandos() -> dict:
+    """
+    Devuelve el comando de cada forma de predecir, sin el intérprete.
+    """
+    from score import COMPILED_PATH, MODEL_PATH, STATE_PATH  # pylint: disable=C0415
+
+    return {'pandas': ['-c', SCRIPT_PANDAS.format(src=SRC_DIRECTORY, estado=STATE_PATH,
+                                                  modelo=MODEL_PATH, entrada=EXAMPLE_PATH)],
+            'score.py': [SCORE_PATH, EXAMPLE_PATH, '--compilado', COMPILED_PATH],
+            'score.py (NumPy)': [SCORE_PATH, EXAMPLE_PATH, '--compilado', COMPILED_PATH,
+                                 '--umbral-numpy', '0']}
+
+
+def parse_importtime(salida: str) -> dict:
+    """
+    Resume la salida de -X importtime: tiempo total (suma de self), módulos,
+    módulos pesados y costo acumulado de cada importación de primer nivel.
+    """
+    total, modulos, primer_nivel = 0, set(), {}
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        total += int(propio)
+        modulos.add(nombre.strip())
+        if not nombre[1:].startswith(' '):
+            primer_nivel[nombre.strip()] = int(acumulado)
+
+    return {'import_ms': total / 1e3, 'modulos': len(modulos),
+            'pesados': [nombre for nombre in PESADOS if nombre in modulos],
+            'primer_nivel': primer_nivel}
+
+
+def medir(argumentos: list, repeticiones: int) -> dict:
+    """
+    Ejecuta el comando en procesos nuevos: sin -X importtime para el tiempo
+    total y con -X importtime para el detalle de las importaciones.
+    """
+    tiempos, importaciones = [], []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable] + argumentos, check=True, capture_output=True)
+        tiempos.append(time.perf_counter() - inicio)
+
+        salida = subprocess.run([sys.executable, '-X', 'importtime'] + argumentos, check=True,
+                                capture_output=True, text=True).stderr
+        importaciones.append(parse_importtime(salida))
+
+    resultado = dict(importaciones[-1])
+    resultado['import_ms'] = statistics.median(r['import_ms'] for r in importaciones)
+    resultado['proceso_ms'] = statistics.median(tiempos) * 1e3
+
+    return resultado
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeticiones', type=int, default=10,
+                        help='Cantidad de procesos por forma de predecir')
+    parser.add_argument('--top', type=int, default=5,
+                        help='Importaciones de primer nivel más costosas a mostrar')
+    args = parser.parse_args()
+
+    sys.path.insert(0, SRC_DIRECTORY)
+    formas = comandos()
+
+    # Compila el modelo antes de medir, para medir el arranque con el compilado al día
+    subprocess.run([sys.executable] + formas['score.py'], check=True, capture_output=True)
+
+    resultados = {nombre: medir(argumentos, args.repeticiones)
+                  for nombre, argumentos in formas.items()}
+
+    print(f"{'forma':<18} {'proceso [ms]':>13} {'import [ms]':>12} {'módulos':>8}  pesados")
+    for nombre, r in resultados.items():
+        print(f"{nombre:<18} {r['proceso_ms']:>13.1f} {r['import_ms']:>12.1f} "
+              f"{r['modulos']:>8}  {', '.join(r['pesados']) or '-'}")
+
+    for nombre, r in resultados.items():
+        costosas = sorted(r['primer_nivel'].items(), key=lambda item: -item[1])[:args.top]
+        print(f"\n{nombre}: importaciones más costosas (acumulado)")
+        for modulo, microsegundos in costosas:
+            print(f"  {modulo:<40} {microsegundos / 1e3:>8.1f} ms")
@@ -0,0 +1,61 @@
+"""
+bench_compiled_model.py
+
+DESCRIPCIÓN: Compara el tiempo de predecir sobre registros crudos con
+FeatureEngineeringPipeline.transform() + MakePredictionPipeline.make_predictions()
+contra el CompiledLinearModel, para distintos tamaños de lote, y verifica
+que ambas predicciones coincidan.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import numpy as np
+
+from datos_sinteticos import generar_bigmart
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from server import MODEL_PATH, STATE_PATH, ScoringService  # pylint: disable=C0413
+
+
+def medir(funcion, registros: list, repeticiones: int) -> float:
+    """
+    Devuelve el mejor tiempo por llamada, en microsegundos.
+    """
+    tiempos = timeit.repeat(lambda: funcion(registros), number=repeticiones, repeat=5)
+
+    return min(tiempos) / repeticiones * 1e6
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lotes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                        help='Tamaños de lote')
+    args = parser.parse_args()
+
+    pipeline = ScoringService(MODEL_PATH, STATE_PATH)
+    pipeline.load()
+    compilado = ScoringService(MODEL_PATH, STATE_PATH, compiled=True)
+    compilado.load()
+
+    registros = json.loads(generar_bigmart(max(args.lotes), con_target=False)
+                           .to_json(orient='records'))
+
+    print(f"{'lote':>8} {'pipeline [us]':>14} {'compilado [us]':>15} {'speedup':>9}")
+    for lote in args.lotes:
+        muestra = registros[:lote]
+        esperado = np.array(pipeline.predict_records(muestra), dtype=float)
+        obtenido = compilado.compiled_model.predict_records(muestra)
+        np.testing.assert_allclose(obtenido, esperado, rtol=1e-9)
+
+        repeticiones = max(1, 2000 // lote)
+        t_pipeline = medir(pipeline.predict_records, muestra, repeticiones)
+        t_compilado = medir(compilado.compiled_model.predict_records, muestra, repeticiones)
+        print(f"{lote:>8} {t_pipeline:>14.1f} {t_compilado:>15.1f} "
+              f"{t_pipeline / t_compilado:>8.1f}x")
@@ -0,0 +1,94 @@
+"""
+bench_cross_validation.py
+
+DESCRIPCIÓN: Mide la validación cruzada de CrossValidator
+(cross_validation.py) sobre datos sintéticos de BigMart transformados.
+Para LinearRegression compara, con distinta cantidad de folds, el
+reentrenamiento de sklearn en cada fold (cross_validate) contra las
+estadísticas suficientes por bloque, y verifica que las métricas
+coincidan. Para un árbol de decisión compara el entrenamiento de los
+folds en un proceso y en varios.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, cross_validate
+from sklearn.tree import DecisionTreeRegressor
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from cross_validation import SEMILLA, TARGET, CrossValidator  # pylint: disable=C0413
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from server import STATE_PATH  # pylint: disable=C0413
+
+
+def medir(funcion, repeticiones: int) -> tuple:
+    """
+    Devuelve el menor tiempo, en segundos, y el resultado de la función.
+    """
+    mejor, resultado = float('inf'), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    return mejor, resultado
+
+
+def sklearn_cv(df_prepared, folds: int) -> np.ndarray:
+    """
+    RMSE de cada fold reentrenando LinearRegression con cross_validate.
+    """
+    resultado = cross_validate(LinearRegression(), df_prepared.drop(columns=[TARGET]),
+                               df_prepared[TARGET],
+                               cv=KFold(folds, shuffle=True, random_state=SEMILLA),
+                               scoring='neg_root_mean_squared_error')
+
+    return -resultado['test_score']
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                        help='Cantidad de registros sintéticos')
+    parser.add_argument('--folds', type=int, nargs='+', default=[5, 10, 20],
+                        help='Cantidades de folds a medir con LinearRegression')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Procesos para los folds del árbol de decisión')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Ejecuciones de cada medición; se toma la mejor')
+    args = parser.parse_args()
+
+    feature_pipeline = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH)
+    feature_pipeline.load_state()
+    df_prepared = feature_pipeline.transform(generar_bigmart(args.filas))
+
+    print(f"LinearRegression, {len(df_prepared)} registros")
+    print(f"{'folds':>6} {'sklearn [s]':>12} {'estadísticas [s]':>17} {'aceleración':>12}")
+    for folds in args.folds:
+        tiempo_sklearn, rmse_sklearn = medir(lambda folds=folds: sklearn_cv(df_prepared, folds),
+                                             args.repeticiones)
+        cv = CrossValidator(folds)
+        tiempo_cv, resultados = medir(lambda cv=cv: cv.run(df_prepared), args.repeticiones)
+        np.testing.assert_allclose([fold['rmse'] for fold in resultados['por_fold']],
+                                   rmse_sklearn, rtol=1e-9)
+        print(f"{folds:>6} {tiempo_sklearn:>12.3f} {tiempo_cv:>17.3f} "
+              f"{tiempo_sklearn / tiempo_cv:>11.1f}x")
+
+    arbol = DecisionTreeRegressor(max_depth=8, random_state=SEMILLA)
+    print(f"\nDecisionTreeRegressor, 5 folds, {os.cpu_count()} CPUs")
+    print(f"{'procesos':>9} {'tiempo [s]':>11}")
+    for workers in sorted({1, args.workers}):
+        cv = CrossValidator(5, n_workers=workers)
+        tiempo, _ = medir(lambda cv=cv: cv.run(df_prepared, arbol), args.repeticiones)
+        print(f"{workers:>9} {tiempo:>11.3f}")
@@ -0,0 +1,134 @@
+"""
+bench_dtypes.py
+
+DESCRIPCIÓN: Compara la lectura y la transformación de un archivo
+sintético de BigMart con los tipos por defecto de pandas y con los tipos
+compactos de ESQUEMA_BIGMART (storage.py). Cada combinación se mide en un
+proceso nuevo, para que el pico de memoria residente (ru_maxrss) de una
+no afecte a la siguiente. También verifica que los datos transformados
+con ambos esquemas coincidan con la precisión de float32.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from storage import ESQUEMA_BIGMART, read_frame  # pylint: disable=C0413
+
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+
+# Registros generados por bloque al escribir el archivo sintético
+BLOQUE = 1_000_000
+
+
+def escribir_sinteticos(path: str, n_filas: int) -> None:
+    """
+    Escribe el archivo sintético por bloques, sin tener todos los registros
+    en memoria.
+    """
+    for i, inicio in enumerate(range(0, n_filas, BLOQUE)):
+        generar_bigmart(min(BLOQUE, n_filas - inicio), semilla=i).to_csv(
+            path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+
+def medir(path: str, compacto: bool, modo: str) -> dict:
+    """
+    Lee y transforma el archivo en el proceso actual.
+
+    :param path: Archivo de entrada.
+    :param compacto: Si es True se lee con ESQUEMA_BIGMART.
+    :param modo: 'transform' (estado de train) o 'data_transformation'.
+
+    :return: Tiempos, memoria de los datos crudos y pico de memoria residente.
+    :rtype: dict
+    """
+    pipeline = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH, compacto=compacto)
+    pipeline.load_state()
+
+    inicio = time.perf_counter()
+    df_raw = read_frame(path, dtypes=pipeline.dtypes)
+    lectura = time.perf_counter() - inicio
+    memoria_crudos = df_raw.memory_usage(deep=True).sum() / 2**20
+
+    inicio = time.perf_counter()
+    if modo == 'transform':
+        df_transformed = pipeline.transform(df_raw)
+    else:
+        df_transformed = pipeline.data_transformation(df_raw)
+    transformacion = time.perf_counter() - inicio
+
+    return {'lectura_s': lectura,
+            'transformacion_s': transformacion,
+            'crudos_mb': memoria_crudos,
+            'transformados_mb': df_transformed.memory_usage(deep=True).sum() / 2**20,
+            # ru_maxrss está en KB en Linux
+            'pico_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10}
+
+
+def verificar(path: str, n_filas: int) -> None:
+    """
+    Verifica sobre los primeros registros que ambos esquemas producen los
+    mismos datos transformados, salvo la precisión de float32.
+    """
+    df_pandas = pd.read_csv(path, nrows=n_filas)
+    df_compacto = pd.read_csv(path, nrows=n_filas, dtype=ESQUEMA_BIGMART)
+    for compacto in (False, True):
+        pipeline = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH,
+                                              compacto=compacto)
+        pipeline.load_state()
+        for transformar in (pipeline.transform, pipeline.data_transformation):
+            pd.testing.assert_frame_equal(transformar(df_compacto), transformar(df_pandas),
+                                          check_dtype=False, rtol=1e-6)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=10_000_000,
+                        help='Cantidad de registros sintéticos')
+    parser.add_argument('--modos', type=str, nargs='+',
+                        default=['transform', 'data_transformation'],
+                        choices=['transform', 'data_transformation'],
+                        help='Transformaciones a medir')
+    parser.add_argument('--medir', type=str, default=None,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--compacto', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir is not None:
+        # Proceso hijo: una única medición, en json por la salida estándar
+        print(json.dumps(medir(args.medir, args.compacto, args.modos[0])))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, 'bigmart.csv')
+        escribir_sinteticos(archivo, args.filas)
+        verificar(archivo, min(args.filas, 200_000))
+
+        print(f"{args.filas} registros, {os.path.getsize(archivo) / 2**20:.0f} MB en csv")
+        print(f"{'modo':<20} {'esquema':<9} {'lectura [s]':>12} {'transf. [s]':>12} "
+              f"{'crudos [MB]':>12} {'transf. [MB]':>13} {'pico RSS [MB]':>14}")
+        for modo in args.modos:
+            for compacto in (False, True):
+                comando = [sys.executable, os.path.abspath(__file__), '--medir', archivo,
+                           '--modos', modo] + (['--compacto'] if compacto else [])
+                salida = subprocess.run(comando, check=True, capture_output=True, text=True)
+                resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+                print(f"{modo:<20} {'compacto' if compacto else 'pandas':<9} "
+                      f"{resultado['lectura_s']:>12.2f} {resultado['transformacion_s']:>12.2f} "
+                      f"{resultado['crudos_mb']:>12.0f} {resultado['transformados_mb']:>13.0f} "
+                      f"{resultado['pico_rss_mb']:>14.0f}")
@@ -0,0 +1,162 @@
+"""
+bench_duckdb.py
+
+DESCRIPCIÓN: Compara los motores de FeatureEngineeringPipeline sobre un
+archivo sintético de BigMart: pandas (lectura completa), pandas por
+bloques (run_streaming) y duckdb (duckdb_engine.py), en csv y en
+Parquet. Cada combinación se mide en un proceso nuevo, para que el pico
+de memoria residente de una no afecte a la siguiente. Antes
+de medir verifica que ambos motores generen el mismo estado y los mismos
+datos transformados.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from duckdb_engine import DuckDBEngine  # pylint: disable=C0413
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from storage import FrameWriter  # pylint: disable=C0413
+
+# Registros generados por bloque al escribir el archivo sintético
+BLOQUE = 1_000_000
+
+# Combinaciones medidas: (motor, modo)
+MEDICIONES = [('pandas', 'fit'), ('duckdb', 'fit'),
+              ('pandas', 'transform'), ('pandas-bloques', 'transform'), ('duckdb', 'transform'),
+              ('pandas', 'data_transformation'), ('duckdb', 'data_transformation')]
+
+
+def escribir_sinteticos(path: str, n_filas: int) -> None:
+    """
+    Escribe el archivo sintético por bloques, sin tener todos los registros
+    en memoria.
+    """
+    with FrameWriter(path) as writer:
+        for i, inicio in enumerate(range(0, n_filas, BLOQUE)):
+            writer.write(generar_bigmart(min(BLOQUE, n_filas - inicio), semilla=i))
+
+
+def pico_rss_mb() -> float:
+    """
+    Devuelve el pico de memoria residente del proceso en MB. En Linux se lee
+    VmHWM, que a diferencia de ru_maxrss no hereda el pico del proceso padre.
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as status:
+            for linea in status:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 2**10
+    except OSError:
+        pass
+
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def medir(entrada: str, motor: str, modo: str, memory_limit: str = None) -> dict:
+    """
+    Transforma el archivo y escribe el resultado en el proceso actual.
+
+    :param entrada: Archivo de entrada.
+    :param motor: 'pandas', 'pandas-bloques' o 'duckdb'.
+    :param modo: 'fit' (aprende el estado y transforma), 'transform' o
+                 'data_transformation'.
+    :param memory_limit: Límite de memoria de DuckDB.
+
+    :return: Tiempo total y pico de memoria residente.
+    :rtype: dict
+    """
+    directorio = os.path.dirname(entrada)
+    salida = os.path.join(directorio, f"salida_{motor}_{modo}{os.path.splitext(entrada)[1]}")
+    state_path = None if modo == 'data_transformation' else \
+        os.path.join(directorio, f"estado_{motor.split('-')[0]}.json")
+
+    pipeline = FeatureEngineeringPipeline(entrada, salida, state_path=state_path,
+                                          motor='duckdb' if motor == 'duckdb' else 'pandas')
+    if motor == 'duckdb':
+        pipeline.engine = DuckDBEngine(memory_limit=memory_limit)
+
+    inicio = time.perf_counter()
+    if motor == 'pandas-bloques':
+        pipeline.run_streaming(BLOQUE // 4)
+    else:
+        pipeline.run(fit=modo == 'fit')
+
+    return {'segundos': time.perf_counter() - inicio, 'pico_rss_mb': pico_rss_mb()}
+
+
+def verificar(n_filas: int) -> None:
+    """
+    Verifica sobre un archivo chico que ambos motores aprendan el mismo
+    estado y generen los mismos datos transformados.
+    """
+    df_raw = generar_bigmart(n_filas, semilla=1)
+    df_raw.loc[df_raw.sample(frac=0.2, random_state=0).index, 'Item_Weight'] = None
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, 'bigmart.csv')
+        df_raw.to_csv(entrada, index=False)
+        df_raw = pd.read_csv(entrada)
+
+        engine = DuckDBEngine()
+        pipeline = FeatureEngineeringPipeline(None, None)
+        state = pipeline.fit(df_raw)
+        assert engine.fit(entrada) == state, 'El estado de duckdb no coincide'
+        pd.testing.assert_frame_equal(engine.transform(entrada, state),
+                                      pipeline.transform(df_raw).reset_index(drop=True))
+        pd.testing.assert_frame_equal(engine.data_transformation(entrada),
+                                      pipeline.data_transformation(df_raw)
+                                      .reset_index(drop=True))
+        engine.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=10_000_000,
+                        help='Cantidad de registros sintéticos')
+    parser.add_argument('--formatos', type=str, nargs='+', default=['csv', 'parquet'],
+                        choices=['csv', 'parquet'], help='Formatos de entrada a medir')
+    parser.add_argument('--memory-limit', type=str, default=None,
+                        help='Límite de memoria de DuckDB (por ejemplo 256MB); por encima '
+                        'las agregaciones usan archivos temporales')
+    parser.add_argument('--medir', type=str, nargs=3, default=None,
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir is not None:
+        # Proceso hijo: una única medición, en json por la salida estándar
+        print(json.dumps(medir(*args.medir, memory_limit=args.memory_limit)))
+        sys.exit(0)
+
+    verificar(min(args.filas, 200_000))
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for formato in args.formatos:
+            archivo = os.path.join(directorio, f'bigmart.{formato}')
+            escribir_sinteticos(archivo, args.filas)
+            print(f"{args.filas} registros, {os.path.getsize(archivo) / 2**20:.0f} MB en {formato}")
+            print(f"{'modo':<20} {'motor':<15} {'tiempo [s]':>11} {'pico RSS [MB]':>14}")
+            for motor, modo in MEDICIONES:
+                comando = [sys.executable, os.path.abspath(__file__), '--medir', archivo,
+                           motor, modo]
+                if args.memory_limit is not None:
+                    comando += ['--memory-limit', args.memory_limit]
+                salida = subprocess.run(comando, check=True, capture_output=True, text=True)
+                resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+                print(f"{modo:<20} {motor:<15} {resultado['segundos']:>11.2f} "
+                      f"{resultado['pico_rss_mb']:>14.0f}")
+            os.remove(archivo)
@@ -0,0 +1,85 @@
+"""
+bench_imputacion.py
+
+DESCRIPCIÓN: Compara el tiempo de la imputación de 'Item_Weight' con el
+recorrido producto por producto original y con la imputación por groupby
+de FeatureEngineeringPipeline, sobre datos sintéticos de BigMart de
+distintos tamaños.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+
+from datos_sinteticos import generar_bigmart
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+
+
+def imputacion_por_producto(df: pd.DataFrame) -> pd.Series:
+    """
+    Imputación original: recorre cada producto con faltantes y vuelve a
+    filtrar el DataFrame completo para calcular su moda.
+    """
+    df = df.copy()
+    productos = list(df[df['Item_Weight'].isnull()]['Item_Identifier'].unique())
+
+    for producto in productos:
+        if len(df[(df['Item_Identifier'] == producto)
+                  & (~df['Item_Weight'].isnull())]) > 0:
+            moda = (df[df['Item_Identifier'] == producto][['Item_Weight']]).mode().iloc[0, 0]
+            df.loc[df['Item_Identifier'] == producto, 'Item_Weight'] = moda
+
+    return df['Item_Weight']
+
+
+def imputacion_por_groupby(df: pd.DataFrame) -> pd.Series:
+    """
+    Imputación de FeatureEngineeringPipeline: una moda por producto
+    calculada con groupby y propagada por clave.
+    """
+    productos = df.loc[df['Item_Weight'].isnull(), 'Item_Identifier'].unique()
+
+    return FeatureEngineeringPipeline(None, None).imputar_moda_por_clave(
+        df, columna='Item_Weight', clave='Item_Identifier', claves=productos)
+
+
+def medir(funcion, df: pd.DataFrame):
+    """
+    Devuelve el resultado de la función y los segundos que tardó.
+    """
+    inicio = time.perf_counter()
+    resultado = funcion(df)
+
+    return resultado, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, nargs='+',
+                        default=[10_000, 1_000_000, 10_000_000],
+                        help='Tamaños de los datos sintéticos')
+    parser.add_argument('--max-filas-original', type=int, default=1_000_000,
+                        help='Tamaño máximo en el que se mide la imputación original')
+    args = parser.parse_args()
+
+    print(f"{'filas':>12} {'original [s]':>14} {'groupby [s]':>14} {'speedup':>10}")
+    for n_filas in args.filas:
+        df_sintetico = generar_bigmart(n_filas, con_target=False)
+
+        nuevo, t_nuevo = medir(imputacion_por_groupby, df_sintetico)
+
+        if n_filas <= args.max_filas_original:
+            original, t_original = medir(imputacion_por_producto, df_sintetico)
+            pd.testing.assert_series_equal(original, nuevo)
+            print(f"{n_filas:>12} {t_original:>14.3f} {t_nuevo:>14.3f} "
+                  f"{t_original / t_nuevo:>9.1f}x")
+        else:
+            print(f"{n_filas:>12} {'-':>14} {t_nuevo:>14.3f} {'-':>10}")
@@ -0,0 +1,98 @@
+"""
+bench_micro_batching.py
+
+DESCRIPCIÓN: Prueba de carga del MicroBatcher. Simula clientes
+concurrentes que piden la predicción de un único registro y compara el
+throughput y la latencia de predecir cada pedido por separado contra
+agruparlos con el MicroBatcher.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from micro_batching import MicroBatcher  # pylint: disable=C0413
+from server import MODEL_PATH, STATE_PATH, ScoringService  # pylint: disable=C0413
+
+TEST_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Test_BigMart.csv")
+
+
+async def cliente(predecir, registros: list, latencias: list) -> None:
+    """
+    Envía los registros de a uno, esperando cada respuesta antes de
+    enviar el siguiente, y guarda la latencia de cada pedido.
+    """
+    for registro in registros:
+        inicio = time.perf_counter()
+        await predecir([registro])
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def prueba_de_carga(predecir, registros: list, clientes: int) -> tuple:
+    """
+    Reparte los registros entre los clientes concurrentes y devuelve
+    las latencias y la duración total de la prueba.
+    """
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*[cliente(predecir, registros[i::clientes], latencias)
+                           for i in range(clientes)])
+
+    return np.array(latencias), time.perf_counter() - inicio
+
+
+async def main(args) -> None:
+    """
+    Ejecuta la prueba de carga por pedido y con micro-batching.
+    """
+    service = ScoringService(MODEL_PATH, STATE_PATH)
+    service.load()
+
+    registros = json.loads(pd.read_csv(TEST_PATH).to_json(orient='records'))
+    registros = [registros[i % len(registros)] for i in range(args.pedidos)]
+
+    # Por pedido: cada pedido se predice por separado en un único hilo de predicción
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+
+    async def por_pedido(records):
+        return await loop.run_in_executor(executor, service.predict_records, records)
+
+    batcher = MicroBatcher(service.predict_records, max_batch_size=args.max_batch_size,
+                           max_wait_ms=args.max_wait_ms)
+    await batcher.start()
+
+    print(f"{'modo':<16} {'pedidos/s':>10} {'p50 [ms]':>10} {'p99 [ms]':>10} {'lote medio':>11}")
+    for nombre, predecir in [('por pedido', por_pedido), ('micro-batching', batcher.submit)]:
+        latencias, duracion = await prueba_de_carga(predecir, registros, args.clientes)
+        lote_medio = batcher.metrics()['mean_batch_size'] if predecir == batcher.submit else 1
+        print(f"{nombre:<16} {len(latencias) / duracion:>10.0f} "
+              f"{np.percentile(latencias, 50):>10.2f} {np.percentile(latencias, 99):>10.2f} "
+              f"{lote_medio:>11.1f}")
+
+    await batcher.stop()
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pedidos', type=int, default=5000, help='Cantidad total de pedidos')
+    parser.add_argument('--clientes', type=int, default=64, help='Clientes concurrentes')
+    parser.add_argument('--max-batch-size', type=int, default=64,
+                        help='Cantidad máxima de registros por lote')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='Tiempo máximo de espera para completar un lote')
+
+    asyncio.run(main(parser.parse_args()))
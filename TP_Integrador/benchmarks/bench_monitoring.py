@@ -0,0 +1,102 @@
+"""
+bench_monitoring.py
+
+DESCRIPCIÓN: Mide el costo del monitoreo de deriva (monitoring.py) sobre
+la transformación y la predicción de datos sintéticos de BigMart, por
+bloques de distinto tamaño, y compara el PSI con muestreo contra el PSI
+exacto. También verifica que una deriva simulada en Item_MRP y en
+Item_Visibility se detecte.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from monitoring import DriftMonitor  # pylint: disable=C0413
+from predict import MakePredictionPipeline  # pylint: disable=C0413
+from server import MODEL_PATH, STATE_PATH  # pylint: disable=C0413
+
+PROFILE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "training_profile.json")
+
+
+def medir(bloques: list, feature_pipeline, prediction_pipeline, monitor, repeticiones: int):
+    """
+    Devuelve el menor tiempo, en segundos, de transformar y predecir todos
+    los bloques, y por separado el de monitorearlos.
+    """
+    mejor_scoring, mejor_monitor = float('inf'), float('inf')
+    for _ in range(repeticiones):
+        scoring = monitoreo = 0.0
+        monitor.reset()
+        for bloque in bloques:
+            inicio = time.perf_counter()
+            df_preds = prediction_pipeline.make_predictions(feature_pipeline.transform(bloque))
+            medio = time.perf_counter()
+            monitor.update(df_preds, len(bloque))
+            scoring += medio - inicio
+            monitoreo += time.perf_counter() - medio
+        mejor_scoring = min(mejor_scoring, scoring)
+        mejor_monitor = min(mejor_monitor, monitoreo)
+
+    return mejor_scoring, mejor_monitor
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                        help='Cantidad de registros sintéticos')
+    parser.add_argument('--bloques', type=int, nargs='+', default=[1000, 10_000, 100_000],
+                        help='Tamaños de bloque a medir (además del archivo completo)')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Ejecuciones de cada medición; se toma la mejor')
+    args = parser.parse_args()
+
+    feature_pipeline = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH)
+    feature_pipeline.load_state()
+    prediction_pipeline = MakePredictionPipeline(None, None, model_path=MODEL_PATH)
+    prediction_pipeline.load_model()
+    monitor = DriftMonitor.load(PROFILE_PATH)
+
+    df_raw = generar_bigmart(args.filas, con_target=False)
+
+    print(f"{'bloque':>10} {'scoring [s]':>12} {'monitoreo [s]':>14} {'overhead':>9}")
+    for tamanio in sorted(args.bloques) + [args.filas]:
+        bloques = [df_raw.iloc[inicio:inicio + tamanio]
+                   for inicio in range(0, args.filas, tamanio)]
+        scoring, monitoreo = medir(bloques, feature_pipeline, prediction_pipeline, monitor,
+                                   args.repeticiones)
+        print(f"{tamanio:>10} {scoring:>12.3f} {monitoreo:>14.3f} {monitoreo / scoring:>9.1%}")
+
+    # PSI acumulado con muestreo contra el exacto, sobre el archivo completo
+    df_preds = prediction_pipeline.make_predictions(feature_pipeline.transform(df_raw))
+    exacto = DriftMonitor.load(PROFILE_PATH, muestra=None)
+    exacto.update(df_preds, len(df_raw))
+    monitor.reset()
+    for inicio in range(0, len(df_preds), 100_000):
+        monitor.update(df_preds.iloc[inicio:inicio + 100_000])
+    diferencias = [abs(monitor.summary()['variables'][nombre]['psi'] - variable['psi'])
+                   for nombre, variable in exacto.summary()['variables'].items()]
+    print(f"Máxima diferencia de PSI entre muestreo y exacto: {max(diferencias):.4f}")
+    print(f"Registros descartados por la transformación: {exacto.summary()['descartadas']}")
+
+    # Deriva simulada: precios 30 % más altos y visibilidad desplazada
+    df_deriva = df_raw.head(100_000).copy()
+    df_deriva['Item_MRP'] *= 1.3
+    df_deriva['Item_Visibility'] += df_deriva['Item_Visibility'].std()
+    monitor.reset()
+    monitor.update(prediction_pipeline.make_predictions(feature_pipeline.transform(df_deriva)),
+                   len(df_deriva))
+    print(f"Alertas con deriva simulada: {monitor.alerts()}")
+    assert {'Item_MRP', 'Item_Visibility'} <= set(monitor.alerts()), monitor.report()
+    assert np.isfinite(monitor.summary()['variables']['prediccion']['psi'])
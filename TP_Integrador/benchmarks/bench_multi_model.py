@@ -0,0 +1,147 @@
+"""
+bench_multi_model.py
+
+DESCRIPCIÓN: Compara la evaluación de varios modelos candidatos sobre un
+archivo sintético de BigMart ejecutando MakePredictionPipeline una vez
+por modelo (cada ejecución vuelve a leer y a transformar los datos) contra
+una única pasada de MultiModelPredictionPipeline (multi_model.py), con
+uno y con varios hilos. Antes de medir verifica que las predicciones de
+ambas formas coincidan.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import pickle as pkl
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from multi_model import PREFIJO_PREDICCION, MultiModelPredictionPipeline  # pylint: disable=C0413
+from predict import MakePredictionPipeline  # pylint: disable=C0413
+from server import STATE_PATH  # pylint: disable=C0413
+
+# Modelos candidatos que se entrenan sobre los datos sintéticos
+CANDIDATOS = {'lineal': LinearRegression(),
+              'ridge': Ridge(alpha=1.0),
+              'lasso': Lasso(alpha=1.0),
+              'arbol': DecisionTreeRegressor(max_depth=10, random_state=0),
+              'bosque': RandomForestRegressor(n_estimators=20, max_depth=10, n_jobs=1,
+                                              random_state=0)}
+
+
+def feature_pipeline(input_path: str) -> FeatureEngineeringPipeline:
+    """
+    Devuelve un FeatureEngineeringPipeline con ../model/feature_state.json.
+    """
+    pipeline = FeatureEngineeringPipeline(input_path, None, state_path=STATE_PATH)
+    pipeline.load_state()
+
+    return pipeline
+
+
+def entrenar(directorio: str, n_filas: int) -> dict:
+    """
+    Entrena los candidatos sobre datos sintéticos y los guarda como .pkl.
+
+    :return: Diccionario nombre -> ruta de cada modelo.
+    :rtype: dict
+    """
+    df_train = feature_pipeline(None).transform(generar_bigmart(n_filas, semilla=123))
+    x_train = df_train.drop(columns=['Item_Outlet_Sales'])
+    model_paths = {}
+    for nombre, modelo in CANDIDATOS.items():
+        modelo.fit(x_train, df_train['Item_Outlet_Sales'])
+        model_paths[nombre] = os.path.join(directorio, f'{nombre}.pkl')
+        with open(model_paths[nombre], 'wb') as model_file:
+            pkl.dump(modelo, model_file)
+
+    return model_paths
+
+
+def por_separado(entrada: str, directorio: str, model_paths: dict) -> dict:
+    """
+    Evalúa cada modelo con su propia ejecución: lectura, transformación,
+    predicción y escritura.
+
+    :return: Diccionario nombre -> ruta de las predicciones.
+    :rtype: dict
+    """
+    salidas = {}
+    for nombre, model_path in model_paths.items():
+        salidas[nombre] = os.path.join(directorio, f'salida_{nombre}.csv')
+        pipeline = MakePredictionPipeline(None, salidas[nombre], model_path=model_path)
+        pipeline.load_model()
+        features = feature_pipeline(entrada)
+        pipeline.write_predictions(pipeline.make_predictions(
+            features.transform(features.read_data())))
+
+    return salidas
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """
+    Devuelve el menor tiempo, en segundos, de ejecutar la función.
+    """
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    return mejor
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                        help='Cantidad de registros sintéticos a evaluar')
+    parser.add_argument('--filas-entrenamiento', type=int, default=100_000,
+                        help='Registros con los que se entrenan los candidatos')
+    parser.add_argument('--hilos', type=int, default=len(CANDIDATOS),
+                        help='Hilos de la pasada multimodelo en paralelo')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Ejecuciones de cada medición; se toma la mejor')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        model_paths = entrenar(directorio, args.filas_entrenamiento)
+        entrada = os.path.join(directorio, 'bigmart.csv')
+        generar_bigmart(args.filas, semilla=7).to_csv(entrada, index=False)
+        salida = os.path.join(directorio, 'salida_modelos.csv')
+
+        def multimodelo(hilos: int):
+            pipeline = MultiModelPredictionPipeline(None, salida, model_paths, n_threads=hilos)
+            pipeline.run(feature_pipeline(entrada))
+            return pipeline
+
+        # Verificación: mismas predicciones con ambas formas
+        salidas = por_separado(entrada, directorio, model_paths)
+        print(multimodelo(args.hilos).metrics.report())
+        df_multi = pd.read_csv(salida)
+        for nombre, path in salidas.items():
+            np.testing.assert_allclose(pd.read_csv(path)['Item_Outlet_Sales'],
+                                       df_multi[PREFIJO_PREDICCION + nombre], rtol=1e-12)
+
+        separado = medir(lambda: por_separado(entrada, directorio, model_paths),
+                         args.repeticiones)
+        print(f"\n{len(model_paths)} modelos, {args.filas} registros, {os.cpu_count()} CPUs")
+        print(f"{'forma':<32} {'tiempo [s]':>11} {'aceleración':>12}")
+        print(f"{'una ejecución por modelo':<32} {separado:>11.2f} {1:>11.2f}x")
+        for hilos in sorted({1, args.hilos}):
+            tiempo = medir(lambda hilos=hilos: multimodelo(hilos), args.repeticiones)
+            forma = f"multimodelo, {hilos} hilo{'s' if hilos > 1 else ''}"
+            print(f"{forma:<32} {tiempo:>11.2f} {separado / tiempo:>11.2f}x")
@@ -0,0 +1,80 @@
+"""
+bench_parallel_transform.py
+
+DESCRIPCIÓN: Mide ParallelTransformPipeline sobre particiones sintéticas
+(un archivo por tienda y bloque) con distinta cantidad de procesos, y
+verifica que la salida concatenada coincida con transformar todos los
+registros juntos con FeatureEngineeringPipeline.transform().
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from parallel_transform import ParallelTransformPipeline  # pylint: disable=C0413
+
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=2_000_000,
+                        help='Cantidad total de registros sintéticos')
+    parser.add_argument('--bloques', type=int, default=10,
+                        help='Archivos por tienda')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count()}),
+                        help='Cantidad de procesos a medir')
+    args = parser.parse_args()
+
+    df_raw = generar_bigmart(args.filas, con_target=False)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, 'entrada')
+        os.makedirs(entrada)
+        for tienda, df_tienda in df_raw.groupby('Outlet_Identifier'):
+            for bloque in range(args.bloques):
+                df_tienda.iloc[bloque::args.bloques].to_csv(
+                    os.path.join(entrada, f"{tienda}_{bloque:03d}.csv"), index=False)
+        archivos = len(os.listdir(entrada))
+
+        # Referencia: todos los registros juntos, en el orden de los archivos
+        referencia = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH)
+        referencia.load_state()
+        esperado = pd.concat([referencia.transform(pd.read_csv(os.path.join(entrada, nombre)))
+                              for nombre in sorted(os.listdir(entrada))], ignore_index=True)
+
+        print(f"{archivos} archivos, {args.filas} registros")
+        print(f"{'workers':>8} {'particiones [s]':>16} {'concatenado [s]':>16} {'speedup':>8}")
+        base = None
+        for workers in args.workers:
+            inicio = time.perf_counter()
+            ParallelTransformPipeline(entrada, os.path.join(directorio, 'particiones'),
+                                      STATE_PATH, n_workers=workers).run()
+            t_particiones = time.perf_counter() - inicio
+
+            salida = os.path.join(directorio, 'prepared.csv')
+            inicio = time.perf_counter()
+            ParallelTransformPipeline(entrada, salida, STATE_PATH, n_workers=workers,
+                                      partitioned=False).run()
+            t_concatenado = time.perf_counter() - inicio
+
+            pd.testing.assert_frame_equal(pd.read_csv(salida),
+                                          esperado.astype({'Item_MRP': int}),
+                                          check_dtype=False)
+
+            base = base or t_particiones
+            print(f"{workers:>8} {t_particiones:>16.2f} {t_concatenado:>16.2f} "
+                  f"{base / t_particiones:>7.2f}x")
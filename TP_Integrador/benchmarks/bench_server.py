@@ -0,0 +1,67 @@
+"""
+bench_server.py
+
+DESCRIPCIÓN: Mide la latencia del servicio de predicción (server.py)
+dentro del mismo proceso con el TestClient de FastAPI, para pedidos de
+un único registro y por lotes, y reporta los percentiles p50 y p99.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from server import create_app  # pylint: disable=C0413
+
+TEST_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Test_BigMart.csv")
+
+
+def medir_latencias(client: TestClient, payloads: list) -> np.ndarray:
+    """
+    Envía los pedidos de a uno y devuelve la latencia de cada uno en ms.
+    """
+    latencias = []
+    for payload in payloads:
+        inicio = time.perf_counter()
+        respuesta = client.post("/predict", json=payload)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        respuesta.raise_for_status()
+
+    return np.array(latencias)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pedidos', type=int, default=2000, help='Cantidad de pedidos')
+    parser.add_argument('--lote', type=int, default=100, help='Registros por pedido en lote')
+    args = parser.parse_args()
+
+    # Registros crudos en formato json, con None en los faltantes
+    registros = json.loads(pd.read_csv(TEST_PATH).to_json(orient='records'))
+
+    with TestClient(create_app()) as test_client:
+        # Calentamiento
+        medir_latencias(test_client, registros[:50])
+
+        unitarios = [registros[i % len(registros)] for i in range(args.pedidos)]
+        lotes = [registros[i:i + args.lote]
+                 for i in range(0, args.lote * (args.pedidos // 10), args.lote)
+                 if len(registros[i:i + args.lote]) == args.lote]
+
+        print(f"{'pedido':<14} {'p50 [ms]':>10} {'p99 [ms]':>10} {'registros/s':>12}")
+        for nombre, payloads, n_registros in [('unitario', unitarios, 1),
+                                              (f'lote de {args.lote}', lotes, args.lote)]:
+            latencias = medir_latencias(test_client, payloads)
+            print(f"{nombre:<14} {np.percentile(latencias, 50):>10.2f} "
+                  f"{np.percentile(latencias, 99):>10.2f} "
+                  f"{n_registros * len(latencias) / latencias.sum() * 1000:>12.0f}")
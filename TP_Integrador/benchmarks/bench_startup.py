@@ -0,0 +1,98 @@
+"""
+bench_startup.py
+
+DESCRIPCIÓN: Mide el arranque en frío de un proceso de predicción con el
+modelo guardado en pickle (model.pkl) y con el formato .npy + schema.json
+de model_format.py (model_arrays/): importaciones, carga del modelo y
+primera predicción, cada uno en un proceso nuevo. Informa también si el
+proceso terminó importando sklearn.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SRC_DIRECTORY = os.path.join(CURRENT_DIRECTORY, "..", "src")
+MODEL_DIRECTORY = os.path.join(CURRENT_DIRECTORY, "..", "model")
+
+# Cada script mide desde su primera línea y devuelve los tiempos en json
+SCRIPT_PICKLE = """
+import time
+inicio = time.perf_counter()
+import json, pickle, sys, warnings
+import numpy as np
+t_import = time.perf_counter()
+with open({modelo!r}, 'rb') as model_file:
+    model = pickle.load(model_file)
+t_carga = time.perf_counter()
+warnings.filterwarnings('ignore')
+model.predict(np.zeros((1, len(model.coef_))))
+t_prediccion = time.perf_counter()
+print(json.dumps({{'import': t_import - inicio, 'carga': t_carga - t_import,
+                  'prediccion': t_prediccion - t_carga, 'sklearn': 'sklearn' in sys.modules}}))
+"""
+
+SCRIPT_ARRAYS = """
+import time
+inicio = time.perf_counter()
+import json, sys
+sys.path.insert(0, {src!r})
+import numpy as np
+from model_format import LinearModelArtifact
+t_import = time.perf_counter()
+model = LinearModelArtifact.load({modelo!r})
+t_carga = time.perf_counter()
+model.predict(np.zeros((1, len(model.coef_))))
+t_prediccion = time.perf_counter()
+print(json.dumps({{'import': t_import - inicio, 'carga': t_carga - t_import,
+                  'prediccion': t_prediccion - t_carga, 'sklearn': 'sklearn' in sys.modules}}))
+"""
+
+
+def medir(script: str, repeticiones: int) -> dict:
+    """
+    Ejecuta el script en procesos nuevos y devuelve la mediana de cada tiempo,
+    incluido el tiempo total del proceso (arranque del intérprete).
+    """
+    corridas = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        salida = subprocess.run([sys.executable, '-c', script], check=True,
+                                capture_output=True, text=True).stdout
+        corrida = json.loads(salida)
+        corrida['proceso'] = time.perf_counter() - inicio
+        corridas.append(corrida)
+
+    resultado = {clave: statistics.median(corrida[clave] for corrida in corridas) * 1e3
+                 for clave in ('import', 'carga', 'prediccion', 'proceso')}
+    resultado['sklearn'] = corridas[0]['sklearn']
+
+    return resultado
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeticiones', type=int, default=10,
+                        help='Cantidad de procesos por formato')
+    args = parser.parse_args()
+
+    formatos = {
+        'pickle': SCRIPT_PICKLE.format(modelo=os.path.join(MODEL_DIRECTORY, "model.pkl")),
+        'arrays': SCRIPT_ARRAYS.format(src=SRC_DIRECTORY,
+                                       modelo=os.path.join(MODEL_DIRECTORY, "model_arrays"))}
+
+    print(f"{'formato':<8} {'import [ms]':>12} {'carga [ms]':>11} {'1ra pred [ms]':>14} "
+          f"{'proceso [ms]':>13} {'sklearn':>8}")
+    for nombre, script in formatos.items():
+        r = medir(script, args.repeticiones)
+        print(f"{nombre:<8} {r['import']:>12.1f} {r['carga']:>11.2f} {r['prediccion']:>14.3f} "
+              f"{r['proceso']:>13.1f} {str(r['sklearn']):>8}")
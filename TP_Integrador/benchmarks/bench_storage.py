@@ -0,0 +1,56 @@
+"""
+bench_storage.py
+
+DESCRIPCIÓN: Compara los formatos de almacenamiento de storage.py (csv,
+Parquet y Arrow IPC) para los datos transformados: tiempo de escritura,
+tiempo de lectura, tamaño del archivo y si se conservan los tipos de
+datos.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from datos_sinteticos import generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from storage import FORMATOS, read_frame, write_frame  # pylint: disable=C0413
+
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000,
+                        help='Cantidad de registros sintéticos')
+    args = parser.parse_args()
+
+    pipeline = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH)
+    pipeline.load_state()
+    df_prepared = pipeline.transform(generar_bigmart(args.filas))
+
+    print(f"{'formato':<9} {'escritura [s]':>14} {'lectura [s]':>12} "
+          f"{'tamaño [MB]':>12} {'tipos':>8}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for formato in FORMATOS:
+            path = os.path.join(directorio, f"prepared.{formato}")
+
+            inicio = time.perf_counter()
+            write_frame(df_prepared, path)
+            t_escritura = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            df_leido = read_frame(path)
+            t_lectura = time.perf_counter() - inicio
+
+            tipos = 'iguales' if df_leido.dtypes.equals(df_prepared.dtypes) else 'cambian'
+            print(f"{formato:<9} {t_escritura:>14.3f} {t_lectura:>12.3f} "
+                  f"{os.path.getsize(path) / 2**20:>12.1f} {tipos:>8}")
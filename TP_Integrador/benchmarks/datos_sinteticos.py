@@ -0,0 +1,147 @@
+"""
+datos_sinteticos.py
+
+DESCRIPCIÓN: Generador de datos sintéticos con la forma de BigMart para
+medir el rendimiento de los pipelines a escala. Toma de Train_BigMart.csv
+el catálogo de productos y de tiendas, y genera registros combinándolos
+según las frecuencias observadas, respetando los faltantes de
+'Item_Weight' y 'Outlet_Size' por tienda.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TRAIN_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Train_BigMart.csv")
+
+
+def generar_bigmart(n_filas: int, semilla: int = 0, con_target: bool = True,
+                    ruta_base: str = TRAIN_PATH) -> pd.DataFrame:
+    """
+    Genera un DataFrame sintético con el esquema de Train_BigMart.csv.
+
+    :param n_filas: Cantidad de registros a generar.
+    :param semilla: Semilla del generador aleatorio.
+    :param con_target: Si es True se incluye la columna 'Item_Outlet_Sales'.
+    :param ruta_base: Archivo del que se toman los catálogos y distribuciones.
+
+    :return df_sintetico: DataFrame de pandas con los datos generados.
+    :rtype: pd.DataFrame
+    """
+    rng = np.random.default_rng(semilla)
+    df_base = pd.read_csv(ruta_base)
+
+    # Catálogo de productos: atributos propios de cada producto
+    productos = df_base.groupby('Item_Identifier').agg(
+        Item_Weight=('Item_Weight', 'first'),
+        Item_Type=('Item_Type', 'first'),
+        Item_MRP=('Item_MRP', 'mean'),
+        frecuencia=('Item_Identifier', 'size'))
+
+    # Catálogo de tiendas: atributos propios de cada tienda y sus faltantes
+    tiendas = df_base.groupby('Outlet_Identifier').agg(
+        Outlet_Establishment_Year=('Outlet_Establishment_Year', 'first'),
+        Outlet_Size=('Outlet_Size', 'first'),
+        Outlet_Location_Type=('Outlet_Location_Type', 'first'),
+        Outlet_Type=('Outlet_Type', 'first'),
+        faltante_peso=('Item_Weight', lambda s: s.isnull().mean()),
+        frecuencia=('Outlet_Identifier', 'size'))
+
+    idx_producto = rng.choice(len(productos), size=n_filas,
+                              p=productos['frecuencia'] / productos['frecuencia'].sum())
+    idx_tienda = rng.choice(len(tiendas), size=n_filas,
+                            p=tiendas['frecuencia'] / tiendas['frecuencia'].sum())
+
+    pesos = productos['Item_Weight'].to_numpy()[idx_producto]
+    pesos[rng.random(n_filas) < tiendas['faltante_peso'].to_numpy()[idx_tienda]] = np.nan
+
+    # Los precios de un mismo producto varían levemente entre registros
+    precios = productos['Item_MRP'].to_numpy()[idx_producto] \
+        + rng.normal(0, 1.15, size=n_filas)
+
+    df_sintetico = pd.DataFrame({
+        'Item_Identifier': productos.index.to_numpy()[idx_producto],
+        'Item_Weight': pesos,
+        'Item_Fat_Content': rng.choice(df_base['Item_Fat_Content'].to_numpy(),
+                                       size=n_filas),
+        'Item_Visibility': rng.choice(df_base['Item_Visibility'].to_numpy(),
+                                      size=n_filas),
+        'Item_Type': productos['Item_Type'].to_numpy()[idx_producto],
+        'Item_MRP': np.round(precios, 4),
+        'Outlet_Identifier': tiendas.index.to_numpy()[idx_tienda],
+        'Outlet_Establishment_Year':
+            tiendas['Outlet_Establishment_Year'].to_numpy()[idx_tienda],
+        'Outlet_Size': tiendas['Outlet_Size'].to_numpy()[idx_tienda],
+        'Outlet_Location_Type': tiendas['Outlet_Location_Type'].to_numpy()[idx_tienda],
+        'Outlet_Type': tiendas['Outlet_Type'].to_numpy()[idx_tienda]})
+
+    if con_target:
+        # Las ventas se generan a partir del cociente ventas/precio observado
+        # en cada tienda
+        cocientes = (df_base['Item_Outlet_Sales'] / df_base['Item_MRP']) \
+            .groupby(df_base['Outlet_Identifier'])
+        ventas = np.empty(n_filas)
+        for i, outlet in enumerate(tiendas.index):
+            filas = idx_tienda == i
+            ventas[filas] = df_sintetico['Item_MRP'].to_numpy()[filas] * rng.choice(
+                cocientes.get_group(outlet).to_numpy(), size=filas.sum())
+        df_sintetico['Item_Outlet_Sales'] = np.round(ventas, 4)
+
+    return df_sintetico
+
+
+def comparar_distribuciones(df_sintetico: pd.DataFrame,
+                            ruta_base: str = TRAIN_PATH) -> pd.DataFrame:
+    """
+    Compara los datos sintéticos con los originales: para cada variable
+    categórica la distancia de variación total entre las frecuencias de
+    sus categorías (incluidos los faltantes), y para cada columna la
+    proporción de faltantes.
+
+    :param df_sintetico: DataFrame generado por generar_bigmart.
+    :param ruta_base: Archivo con los datos originales.
+
+    :return: DataFrame con una fila por columna.
+    :rtype: pd.DataFrame
+    """
+    df_base = pd.read_csv(ruta_base)
+
+    filas = []
+    for columna in df_sintetico.columns:
+        distancia = np.nan
+        if df_base[columna].dtype == object and columna != 'Item_Identifier':
+            frecuencias = df_base[columna].value_counts(normalize=True, dropna=False)
+            distancia = 0.5 * frecuencias.subtract(
+                df_sintetico[columna].value_counts(normalize=True, dropna=False),
+                fill_value=0).abs().sum()
+        filas.append({'columna': columna,
+                      'variacion_total': distancia,
+                      'faltantes_original': df_base[columna].isnull().mean(),
+                      'faltantes_sintetico': df_sintetico[columna].isnull().mean()})
+
+    return pd.DataFrame(filas).set_index('columna')
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filas', type=int, help='Cantidad de registros a generar')
+    parser.add_argument('salida', type=str, help='Ruta del csv de salida')
+    parser.add_argument('--semilla', type=int, default=0, help='Semilla aleatoria')
+    parser.add_argument('--sin-target', action='store_true',
+                        help='No generar la columna Item_Outlet_Sales')
+    parser.add_argument('--comparar', action='store_true',
+                        help='Mostrar la comparación de distribuciones con Train_BigMart.csv')
+    args = parser.parse_args()
+
+    df_generado = generar_bigmart(args.filas, semilla=args.semilla,
+                                  con_target=not args.sin_target)
+    df_generado.to_csv(args.salida, index=False)
+
+    if args.comparar:
+        print(comparar_distribuciones(df_generado).round(4))
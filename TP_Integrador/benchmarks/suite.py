@@ -0,0 +1,215 @@
+"""
+suite.py
+
+DESCRIPCIÓN: Suite de benchmarks de los pipelines sobre datos sintéticos
+de BigMart (datos_sinteticos.py): ingeniería de features (fit y
+transform), entrenamiento, predicción por lotes y latencia de un único
+registro en el servicio de predicción. Los resultados se guardan en
+json y se comparan contra una línea base: toda medición que empeore más
+que el umbral se marca como regresión y el script termina con código 1.
+
+Para crear la línea base y luego compararla:
+
+    TP_Integrador\\benchmarks> python suite.py --guardar-baseline
+    TP_Integrador\\benchmarks> python suite.py
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+import pandas as pd
+import sklearn
+
+from datos_sinteticos import comparar_distribuciones, generar_bigmart
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CURRENT_DIRECTORY, "..", "src"))
+from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0413
+from predict import MakePredictionPipeline  # pylint: disable=C0413
+from server import MODEL_PATH, STATE_PATH, ScoringService  # pylint: disable=C0413
+from train import ModelTrainingPipeline  # pylint: disable=C0413
+
+BASELINE_PATH = os.path.join(CURRENT_DIRECTORY, "baselines", "baseline.json")
+
+# Medidas que se comparan contra la línea base; el resto (p99) es informativo
+# porque varía demasiado entre corridas
+MEDIDAS_CONTROLADAS = ('segundos', 'p50_us')
+
+
+def mejor_tiempo(funcion, repeticiones: int) -> float:
+    """
+    Devuelve el menor tiempo de varias ejecuciones de la función, en segundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    return min(tiempos)
+
+
+def latencias(funcion, registros: list, llamadas: int) -> dict:
+    """
+    Devuelve los percentiles 50 y 99 de la latencia de predecir un
+    registro por llamada, en microsegundos.
+    """
+    for registro in registros[:10]:
+        funcion([registro])
+
+    tiempos = np.empty(llamadas)
+    for i in range(llamadas):
+        registro = [registros[i % len(registros)]]
+        inicio = time.perf_counter()
+        funcion(registro)
+        tiempos[i] = time.perf_counter() - inicio
+
+    return {'p50_us': float(np.percentile(tiempos, 50) * 1e6),
+            'p99_us': float(np.percentile(tiempos, 99) * 1e6)}
+
+
+def run_suite(n_filas: int, repeticiones: int, llamadas: int) -> dict:
+    """
+    Ejecuta todos los benchmarks.
+
+    :param n_filas: Cantidad de registros sintéticos.
+    :param repeticiones: Ejecuciones de cada benchmark; se toma la mejor.
+    :param llamadas: Predicciones de un registro para medir la latencia.
+
+    :return: Diccionario {benchmark: {medida: valor}} y, en 'datos', la
+             máxima distancia de variación total entre las categorías
+             sintéticas y las originales.
+    :rtype: dict
+    """
+    df_raw = generar_bigmart(n_filas)
+    fidelidad = comparar_distribuciones(df_raw)
+    df_test = df_raw.drop(columns=['Item_Outlet_Sales'])
+
+    feature_pipeline = FeatureEngineeringPipeline(None, None, state_path=STATE_PATH)
+    feature_pipeline.load_state()
+    df_prepared = feature_pipeline.transform(df_raw)
+
+    training_pipeline = ModelTrainingPipeline(None, None)
+    prediction_pipeline = MakePredictionPipeline(None, None, model_path=MODEL_PATH)
+    prediction_pipeline.load_model()
+
+    def fit_transform():
+        pipeline = FeatureEngineeringPipeline(None, None)
+        pipeline.fit(df_raw)
+        pipeline.transform(df_raw)
+
+    def batch_prediction():
+        prediction_pipeline.make_predictions(feature_pipeline.transform(df_test))
+
+    resultados = {'datos': {'variacion_total_max': float(fidelidad['variacion_total'].max())}}
+    for nombre, funcion in (('feature_engineering_fit_transform', fit_transform),
+                            ('feature_engineering_transform',
+                             lambda: feature_pipeline.transform(df_raw)),
+                            ('model_training',
+                             lambda: training_pipeline.model_training(df_prepared)),
+                            ('batch_prediction', batch_prediction)):
+        segundos = mejor_tiempo(funcion, repeticiones)
+        resultados[nombre] = {'segundos': segundos, 'filas_por_segundo': n_filas / segundos}
+
+    registros = json.loads(df_test.head(1000).to_json(orient='records'))
+    for nombre, compiled in (('single_record', False), ('single_record_compiled', True)):
+        service = ScoringService(MODEL_PATH, STATE_PATH, compiled=compiled)
+        service.load()
+        resultados[nombre] = latencias(service.predict_records, registros, llamadas)
+
+    return resultados
+
+
+def compare(resultados: dict, baseline: dict, umbral: float) -> list:
+    """
+    Compara contra la línea base las medidas de MEDIDAS_CONTROLADAS, que
+    son mejores cuanto más bajas.
+
+    :param resultados: Resultados de run_suite.
+    :param baseline: Resultados de la línea base.
+    :param umbral: Empeoramiento relativo tolerado (0.2 = 20 %).
+
+    :return: Lista de tuplas (benchmark, medida, base, actual, cociente, regresión).
+    :rtype: list
+    """
+    filas = []
+    for nombre, medidas in resultados.items():
+        for medida, valor in medidas.items():
+            base = baseline.get(nombre, {}).get(medida)
+            if medida not in MEDIDAS_CONTROLADAS or base is None:
+                continue
+            cociente = valor / base
+            filas.append((nombre, medida, base, valor, cociente, cociente > 1 + umbral))
+
+    return filas
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=100_000,
+                        help='Cantidad de registros sintéticos')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Ejecuciones de cada benchmark; se toma la mejor')
+    parser.add_argument('--llamadas', type=int, default=2000,
+                        help='Predicciones de un registro para medir la latencia')
+    parser.add_argument('--baseline', type=str, default=BASELINE_PATH,
+                        help='Archivo json de la línea base')
+    parser.add_argument('--guardar-baseline', action='store_true',
+                        help='Guardar los resultados como nueva línea base')
+    parser.add_argument('--umbral', type=float, default=0.2,
+                        help='Empeoramiento relativo que se considera regresión')
+    parser.add_argument('--salida', type=str, default=None,
+                        help='Guardar los resultados en este archivo json')
+    args = parser.parse_args()
+
+    reporte = {'meta': {'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+                        'filas': args.filas,
+                        'repeticiones': args.repeticiones,
+                        'python': platform.python_version(),
+                        'plataforma': platform.platform(),
+                        'numpy': np.__version__,
+                        'pandas': pd.__version__,
+                        'sklearn': sklearn.__version__},
+               'resultados': run_suite(args.filas, args.repeticiones, args.llamadas)}
+
+    if args.salida is not None:
+        with open(args.salida, 'w', encoding='utf-8') as f_json:
+            json.dump(reporte, f_json, indent=2)
+
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f_json:
+            json.dump(reporte, f_json, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.isfile(args.baseline):
+        for nombre, medidas in reporte['resultados'].items():
+            print(f"{nombre:<36} " + " ".join(f"{m}={v:.4f}" for m, v in medidas.items()))
+        print("Sin línea base: ejecutar con --guardar-baseline para crearla")
+        sys.exit(0)
+
+    with open(args.baseline, 'r', encoding='utf-8') as f_json:
+        baseline = json.load(f_json)
+
+    if baseline['meta']['filas'] != args.filas:
+        print(f"Aviso: la línea base se midió con {baseline['meta']['filas']} filas")
+
+    comparacion = compare(reporte['resultados'], baseline['resultados'], args.umbral)
+    print(f"{'benchmark':<36} {'medida':<12} {'base':>12} {'actual':>12} {'cociente':>9}")
+    for nombre, medida, base, valor, cociente, regresion in comparacion:
+        marca = '  REGRESIÓN' if regresion else ''
+        print(f"{nombre:<36} {medida:<12} {base:>12.4f} {valor:>12.4f} {cociente:>8.2f}x{marca}")
+
+    regresiones = sum(fila[-1] for fila in comparacion)
+    print(f"{regresiones} regresiones con un umbral de {args.umbral:.0%}")
+    sys.exit(1 if regresiones else 0)
@@ -0,0 +1,255 @@
+"""
+compiled_model.py
+
+DESCRIPCIÓN: Contiene la clase CompiledLinearModel, que compila el estado
+de la ingeniería de features (feature_state.json) y los coeficientes de
+un modelo lineal entrenado en una representación plana de NumPy: tablas
+de búsqueda para las variables categóricas, límites de los cuartiles de
+'Item_MRP' y un vector de pesos. Con ella se predice sobre registros
+crudos sin pasar por pandas ni por la validación de sklearn. La
+representación puede guardarse en json (save) para que score.py prediga
+sin importar NumPy.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import math
+import os
+import numpy as np
+
+# Formato y versión del json generado por CompiledLinearModel.save()
+FORMATO_COMPILADO = 'bigmart-compiled-linear'
+VERSION_COMPILADO = 1
+
+# Codificación de las variables ordinales (igual que en feature_engineering.py)
+CODIGOS_OUTLET_SIZE = {'High': 2.0, 'Medium': 1.0, 'Small': 0.0}
+CODIGOS_OUTLET_LOCATION = {'Tier 1': 2.0, 'Tier 2': 1.0, 'Tier 3': 0.0}
+
+
+def es_faltante(valor) -> bool:
+    """
+    Indica si un valor crudo es faltante (None o NaN).
+    """
+    return valor is None or (isinstance(valor, float) and math.isnan(valor))
+
+
+class CompiledLinearModel:
+    """
+    Clase que predice con un modelo lineal a partir de registros crudos,
+    aplicando el estado de la ingeniería de features con tablas de
+    búsqueda de NumPy.
+
+    Los registros que FeatureEngineeringPipeline.transform() descartaría
+    (producto sin peso conocido) devuelven NaN en lugar de eliminarse, de
+    modo que la salida conserva el orden y el largo de la entrada.
+    """
+
+    def __init__(self, feature_names: list, coef: np.ndarray, intercept: float,
+                 anio_referencia: int, limites_mrp: np.ndarray,
+                 items: list, pesos_item: np.ndarray, tipos_outlet: list,
+                 tamanios_outlet: dict = None, outlets_sin_tamanio: list = None):
+        """
+        :param feature_names: Nombres de las features, en el orden de coef.
+        :param coef: Vector de pesos del modelo.
+        :param intercept: Término independiente del modelo.
+        :param anio_referencia: Año de referencia para la edad de las tiendas.
+        :param limites_mrp: Límites internos de los cuartiles de 'Item_MRP'.
+        :param items: Identificadores de producto con peso conocido.
+        :param pesos_item: Moda del peso de cada producto de items.
+        :param tipos_outlet: Categorías de 'Outlet_Type' vistas en el entrenamiento.
+        :param tamanios_outlet: Código de tamaño de cada tienda del índice de
+                                productos y tiendas (LookupIndex.tamanios()).
+                                Si es None, un tamaño faltante se asume 'Small'.
+        :param outlets_sin_tamanio: Tiendas del índice con algún registro sin
+                                    tamaño (LookupIndex.sin_tamanio()).
+        """
+        self.feature_names = list(feature_names)
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = float(intercept)
+        self.anio_referencia = anio_referencia
+        self.limites_mrp = np.asarray(limites_mrp, dtype=float)
+        self.items = list(items)
+        self.pesos_item = np.asarray(pesos_item, dtype=float)
+        self.tipos_outlet = list(tipos_outlet)
+        self.tamanios_outlet = None if tamanios_outlet is None else dict(tamanios_outlet)
+        self.outlets_sin_tamanio = set(outlets_sin_tamanio or [])
+
+        # Tablas de búsqueda: clave cruda -> fila de pesos_item / columna de la matriz
+        self.indice_item = {item: i for i, item in enumerate(self.items)}
+        # La última posición (NaN) corresponde a los productos desconocidos
+        self.tabla_pesos = np.append(self.pesos_item, np.nan)
+        columna = {nombre: i for i, nombre in enumerate(self.feature_names)}
+        self.columna_tipo = {tipo: columna[f'Outlet_Type_{tipo}'] for tipo in self.tipos_outlet}
+        self.columnas = [columna[nombre] for nombre in
+                         ['Item_Weight', 'Item_Visibility', 'Item_MRP',
+                          'Outlet_Establishment_Year', 'Outlet_Size', 'Outlet_Location_Type']]
+
+    @classmethod
+    def from_state(cls, state: dict, model, index=None) -> 'CompiledLinearModel':
+        """
+        Compila el estado de FeatureEngineeringPipeline y un modelo lineal
+        de sklearn ya entrenado.
+
+        :param state: Estado generado por FeatureEngineeringPipeline.fit().
+        :param model: Modelo con los atributos coef_ e intercept_.
+        :param index: LookupIndex (lookup_index.py). Si se indica, la moda
+                      del peso y el tamaño de las tiendas se toman del
+                      índice, como en FeatureEngineeringPipeline.transform().
+
+        :return: Modelo compilado.
+        :rtype: CompiledLinearModel
+        """
+        feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is None:
+            feature_names = [col for col in state['columnas'] if col != 'Item_Outlet_Sales']
+
+        modas_peso = state['modas_peso'] if index is None else index.pesos().to_dict()
+
+        return cls(feature_names = [str(nombre) for nombre in feature_names],
+                   coef = np.ravel(model.coef_),
+                   intercept = float(np.ravel(model.intercept_)[0]),
+                   anio_referencia = state['anio_referencia'],
+                   limites_mrp = state['limites_mrp'][1:-1],
+                   items = list(modas_peso),
+                   pesos_item = list(modas_peso.values()),
+                   tipos_outlet = state['tipos_outlet'],
+                   tamanios_outlet = None if index is None else index.tamanios().to_dict(),
+                   outlets_sin_tamanio = None if index is None else index.sin_tamanio())
+
+    def to_dict(self) -> dict:
+        """
+        Devuelve el modelo compilado como diccionario serializable en json.
+        Incluye las codificaciones de las variables ordinales, de modo que
+        la representación alcanza para predecir sin este módulo.
+        """
+        return {'formato': FORMATO_COMPILADO,
+                'version': VERSION_COMPILADO,
+                'feature_names': self.feature_names,
+                'coef': self.coef.tolist(),
+                'intercept': self.intercept,
+                'anio_referencia': self.anio_referencia,
+                'limites_mrp': self.limites_mrp.tolist(),
+                'modas_peso': dict(zip(self.items, self.pesos_item.tolist())),
+                'tipos_outlet': self.tipos_outlet,
+                'codigos_outlet_size': CODIGOS_OUTLET_SIZE,
+                'codigos_outlet_location': CODIGOS_OUTLET_LOCATION,
+                'tamanios_outlet': self.tamanios_outlet,
+                'outlets_sin_tamanio': sorted(self.outlets_sin_tamanio)}
+
+    @classmethod
+    def from_dict(cls, datos: dict) -> 'CompiledLinearModel':
+        """
+        Reconstruye el modelo generado por to_dict().
+        """
+        if datos.get('formato') != FORMATO_COMPILADO or datos.get('version') != VERSION_COMPILADO:
+            raise ValueError(f"Modelo compilado no soportado: {datos.get('formato')} "
+                             f"versión {datos.get('version')}")
+
+        return cls(feature_names = datos['feature_names'],
+                   coef = datos['coef'],
+                   intercept = datos['intercept'],
+                   anio_referencia = datos['anio_referencia'],
+                   limites_mrp = datos['limites_mrp'],
+                   items = list(datos['modas_peso']),
+                   pesos_item = list(datos['modas_peso'].values()),
+                   tipos_outlet = datos['tipos_outlet'],
+                   tamanios_outlet = datos.get('tamanios_outlet'),
+                   outlets_sin_tamanio = datos.get('outlets_sin_tamanio'))
+
+    def save(self, path: str, **extra) -> None:
+        """
+        Escribe el modelo en formato json. Se escribe en un archivo temporal
+        que luego reemplaza al anterior, para no dejar un archivo incompleto.
+
+        :param path: Ruta del archivo.
+        :param extra: Campos adicionales que se guardan junto al modelo.
+        """
+        with open(path + '.tmp', 'w', encoding='utf-8') as f_json:
+            json.dump({**self.to_dict(), **extra}, f_json)
+        os.replace(path + '.tmp', path)
+
+    def features(self, records: list) -> np.ndarray:
+        """
+        Construye la matriz de features de los registros crudos, con las
+        mismas columnas que FeatureEngineeringPipeline.transform().
+
+        :param records: Lista de registros crudos (diccionarios).
+
+        :return: Matriz de features de n_registros x n_features.
+        :rtype: np.ndarray
+        """
+        n_registros = len(records)
+        matriz = np.zeros((n_registros, len(self.feature_names)))
+        col_peso, col_visibilidad, col_mrp, col_anio, col_size, col_location = self.columnas
+        sin_peso = len(self.pesos_item)
+
+        # LIMPIEZA: peso faltante con la moda del producto; NaN si no se conoce
+        pesos = np.array([np.nan if es_faltante(r.get('Item_Weight')) else r['Item_Weight']
+                          for r in records], dtype=float)
+        faltantes = np.isnan(pesos)
+        if faltantes.any():
+            indices = np.array([self.indice_item.get(r['Item_Identifier'], sin_peso)
+                                for r in records])
+            pesos[faltantes] = self.tabla_pesos[indices[faltantes]]
+        matriz[:, col_peso] = pesos
+
+        matriz[:, col_visibilidad] = np.array([r.get('Item_Visibility') for r in records],
+                                              dtype=float)
+
+        # FEATURES ENGINEERING: nivel de precio según los cuartiles de entrenamiento
+        precios = np.array([r.get('Item_MRP') for r in records], dtype=float)
+        niveles = np.searchsorted(self.limites_mrp, precios, side='left') + 1.0
+        niveles[np.isnan(precios)] = np.nan
+        matriz[:, col_mrp] = niveles
+
+        # Los faltantes (None) pasan a NaN al convertir a float
+        anios = np.array([r.get('Outlet_Establishment_Year') for r in records], dtype=float)
+        matriz[:, col_anio] = self.anio_referencia - anios
+
+        # CODIFICACIÓN: variables ordinales; el tamaño faltante se asume 'Small' o,
+        # con índice, se usa el de la tienda (ver codigo_tamanio)
+        matriz[:, col_size] = [self.codigo_tamanio(r) for r in records]
+        matriz[:, col_location] = [CODIGOS_OUTLET_LOCATION.get(r['Outlet_Location_Type'], np.nan)
+                                   for r in records]
+
+        # CODIFICACIÓN: variables dummies; un tipo desconocido queda con todas en 0
+        for fila, registro in enumerate(records):
+            columna = self.columna_tipo.get(registro['Outlet_Type'])
+            if columna is not None:
+                matriz[fila, columna] = 1.0
+
+        return matriz
+
+    def codigo_tamanio(self, registro: dict) -> float:
+        """
+        Codifica el tamaño de la tienda de un registro. Sin índice, un
+        tamaño faltante es 'Small'. Con índice, los tamaños faltantes y
+        todos los de las tiendas sin_tamanio se reemplazan por el de la
+        tienda en el índice ('Small' si no se conoce).
+        """
+        tamanio = registro.get('Outlet_Size')
+        if self.tamanios_outlet is not None and (
+                es_faltante(tamanio) or registro.get('Outlet_Identifier')
+                in self.outlets_sin_tamanio):
+            return float(self.tamanios_outlet.get(registro.get('Outlet_Identifier'),
+                                                  CODIGOS_OUTLET_SIZE['Small']))
+        if es_faltante(tamanio):
+            return CODIGOS_OUTLET_SIZE['Small']
+
+        return CODIGOS_OUTLET_SIZE.get(tamanio, np.nan)
+
+    def predict_records(self, records: list) -> np.ndarray:
+        """
+        Predice sobre registros crudos.
+
+        :param records: Lista de registros crudos (diccionarios).
+
+        :return: Predicciones, con NaN en los registros sin peso conocido.
+        :rtype: np.ndarray
+        """
+        if not records:
+            return np.empty(0)
+
+        return self.features(records) @ self.coef + self.intercept
@@ -0,0 +1,418 @@
+"""
+cross_validation.py
+
+DESCRIPCIÓN: Contiene la clase CrossValidator, que estima el error de
+generalización de un estimador sobre los datos de entrenamiento
+transformados con validación cruzada: k-fold (registros mezclados) o
+temporal (cada fold entrena con los registros anteriores y valida con
+los siguientes, como TimeSeriesSplit). La matriz de features se arma una
+única vez y los registros se dividen en bloques disjuntos; cada fold
+entrena con la unión de algunos bloques y valida con otro.
+
+Para LinearRegression y Ridge se calculan una sola vez las estadísticas
+suficientes de cada bloque (medias y matrices centradas XᵀX y Xᵀy, ver
+incremental_training.py) y las de entrenamiento de cada fold se combinan
+en O(n_features²), sin volver a recorrer los datos, por lo que agregar
+folds casi no cuesta. El resto de los estimadores se entrenan fold por
+fold en un pool de procesos: la matriz y los bloques de índices se
+guardan como .npy que cada proceso abre como memory map, en lugar de
+copiarse a cada uno.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import KFold, TimeSeriesSplit
+
+from incremental_training import batch_statistics, merge_statistics
+from profiling import ARTIFACT_LOCATION, TRACKING_URI
+
+MODOS_CV = ('kfold', 'temporal')
+METRICAS = ('rmse', 'mae', 'r2', 'sesgo')
+SEMILLA = 42
+TARGET = 'Item_Outlet_Sales'
+
+# Matriz y bloques de índices de cada proceso del pool, abiertos como memory map
+_COMPARTIDO = {}
+
+
+def fold_blocks(n_filas: int, folds: int, modo: str = 'kfold', orden=None,
+                semilla: int = SEMILLA) -> tuple:
+    """
+    Divide los registros en bloques disjuntos y arma el esquema de folds.
+
+    En k-fold hay un bloque por fold (los mismos de KFold con shuffle) y
+    cada fold entrena con el resto. En el modo temporal los registros se
+    ordenan por `orden` (o se usa el orden del archivo); el primer bloque
+    es el entrenamiento inicial de TimeSeriesSplit y el fold k entrena con
+    los bloques 0..k y valida con el bloque k + 1.
+
+    :param n_filas: Cantidad de registros.
+    :param folds: Cantidad de folds.
+    :param modo: 'kfold' o 'temporal'.
+    :param orden: Valores por los que se ordenan los registros en el modo
+                  temporal. Si es None se usa el orden de los registros.
+    :param semilla: Semilla de la mezcla de k-fold.
+
+    :return: Tupla (bloques, esquema): los bloques son arrays ordenados de
+             posiciones y el esquema una lista de tuplas (bloques de
+             entrenamiento, bloque de validación).
+    :rtype: tuple
+    """
+    if modo not in MODOS_CV:
+        raise ValueError(f"Modo de validación no soportado: {modo}. Opciones: {MODOS_CV}")
+    if folds < 2:
+        raise ValueError("La validación cruzada necesita al menos 2 folds")
+
+    posiciones = np.arange(n_filas)
+    if modo == 'kfold':
+        bloques = [valid for _, valid in
+                   KFold(folds, shuffle=True, random_state=semilla).split(posiciones)]
+        esquema = [([j for j in range(folds) if j != k], k) for k in range(folds)]
+        return bloques, esquema
+
+    if orden is not None:
+        posiciones = np.argsort(np.asarray(orden), kind='stable')
+    divisiones = list(TimeSeriesSplit(folds).split(posiciones))
+    bloques = [np.sort(posiciones[divisiones[0][0]])] + \
+        [np.sort(posiciones[valid]) for _, valid in divisiones]
+    esquema = [(list(range(k + 1)), k + 1) for k in range(folds)]
+
+    return bloques, esquema
+
+
+def fold_metrics(y_real: np.ndarray, prediccion: np.ndarray) -> dict:
+    """
+    Calcula las métricas de error de un fold.
+
+    :rtype: dict
+    """
+    error = prediccion - y_real
+    total = np.sum((y_real - y_real.mean()) ** 2)
+
+    return {'rmse': float(np.sqrt(np.mean(error ** 2))),
+            'mae': float(np.mean(np.abs(error))),
+            'r2': float(1 - np.dot(error, error) / total) if total > 0 else float('nan'),
+            'sesgo': float(np.mean(error))}
+
+
+def is_linear(estimator) -> bool:
+    """
+    Indica si el estimador se puede resolver con las estadísticas
+    suficientes: LinearRegression o Ridge con término independiente,
+    sin restricción de signo y con un único alpha.
+    """
+    if type(estimator) not in (LinearRegression, Ridge) or not estimator.fit_intercept:
+        return False
+
+    return not getattr(estimator, 'positive', False) and np.ndim(getattr(estimator, 'alpha', 0)) == 0
+
+
+def solve_linear(estimator, estadisticas: dict) -> tuple:
+    """
+    Resuelve los coeficientes con las estadísticas de entrenamiento de un
+    fold. LinearRegression usa la solución de mínima norma (lstsq), igual
+    que sklearn con features colineales; Ridge suma alpha a la diagonal de
+    XᵀX centrada, sin penalizar el término independiente, igual que sklearn.
+
+    :return: Tupla (coeficientes, término independiente).
+    :rtype: tuple
+    """
+    cxx = estadisticas['cxx']
+    if isinstance(estimator, Ridge):
+        coef = np.linalg.solve(cxx + estimator.alpha * np.eye(len(cxx)), estadisticas['cxy'])
+    else:
+        coef = np.linalg.lstsq(cxx, estadisticas['cxy'], rcond=None)[0]
+
+    return coef, float(estadisticas['media_y'] - estadisticas['media_x'] @ coef)
+
+
+def init_worker(x_path: str, y_path: str, bloques_paths: list) -> None:
+    """
+    Abre la matriz y los bloques de índices compartidos en cada proceso del pool.
+    """
+    _COMPARTIDO['x'] = np.load(x_path, mmap_mode='r')
+    _COMPARTIDO['y'] = np.load(y_path, mmap_mode='r')
+    _COMPARTIDO['bloques'] = [np.load(path, mmap_mode='r') for path in bloques_paths]
+
+
+def evaluate_fold(estimator, fold: int, entrenamiento: list, validacion: int) -> dict:
+    """
+    Entrena una copia del estimador con los bloques de entrenamiento de un
+    fold y lo evalúa sobre el bloque de validación.
+
+    :param estimator: Estimador de sklearn sin entrenar.
+    :param fold: Número de fold.
+    :param entrenamiento: Bloques de entrenamiento.
+    :param validacion: Bloque de validación.
+
+    :return: Registros, métricas y tiempo del fold.
+    :rtype: dict
+    """
+    x_train, y_train, bloques = _COMPARTIDO['x'], _COMPARTIDO['y'], _COMPARTIDO['bloques']
+    inicio = time.perf_counter()
+
+    # Los bloques son disjuntos y están ordenados, por lo que el orden de los
+    # registros de entrenamiento es el mismo que el del archivo
+    train_idx = np.sort(np.concatenate([bloques[j] for j in entrenamiento]))
+    valid_idx = np.asarray(bloques[validacion])
+    model = clone(estimator).fit(x_train[train_idx], y_train[train_idx])
+    metricas = fold_metrics(y_train[valid_idx], model.predict(x_train[valid_idx]))
+
+    return {'fold': fold, 'filas_train': len(train_idx), 'filas_valid': len(valid_idx),
+            **metricas, 'segundos': time.perf_counter() - inicio}
+
+
+class CrossValidator:
+    """
+    Clase que evalúa un estimador con validación cruzada sobre los datos
+    de entrenamiento transformados y registra las métricas de cada fold y
+    su promedio.
+    """
+
+    def __init__(self, folds: int = 5, modo: str = 'kfold', n_workers: int = None,
+                 columna_orden: str = None, semilla: int = SEMILLA,
+                 tracking_uri: str = None, experiment_name: str = 'BigMart_cross_validation'):
+        """
+        :param folds: Cantidad de folds.
+        :param modo: 'kfold' o 'temporal'.
+        :param n_workers: Procesos en los que se entrenan los folds de los
+                          estimadores no lineales. Si es None, uno por CPU
+                          hasta la cantidad de folds; con 1 se entrenan en
+                          el proceso actual.
+        :param columna_orden: Columna por la que se ordenan los registros en
+                              el modo temporal. Si es None se usa el orden
+                              de los registros.
+        :param semilla: Semilla de la mezcla de k-fold.
+        :param tracking_uri: URI del backend de MLflow donde se registran las
+                             métricas. Si es None no se usa MLflow.
+        :param experiment_name: Nombre del experimento de MLflow.
+        """
+        if modo not in MODOS_CV:
+            raise ValueError(f"Modo de validación no soportado: {modo}. Opciones: {MODOS_CV}")
+
+        self.folds = folds
+        self.modo = modo
+        self.n_workers = n_workers if n_workers is not None \
+            else min(folds, os.cpu_count() or 1)
+        self.columna_orden = columna_orden
+        self.semilla = semilla
+        self.tracking_uri = tracking_uri
+        self.experiment_name = experiment_name
+        self.results = None
+
+    def linear_folds(self, estimator, x_train: np.ndarray, y_train: np.ndarray,
+                     bloques: list, esquema: list) -> list:
+        """
+        Evalúa los folds de un modelo lineal con las estadísticas
+        suficientes de cada bloque, calculadas una única vez.
+        """
+        estadisticas = [batch_statistics(x_train[bloque], y_train[bloque])
+                        for bloque in bloques]
+
+        resultados = []
+        for fold, (entrenamiento, validacion) in enumerate(esquema):
+            inicio = time.perf_counter()
+            total = None
+            for j in entrenamiento:
+                total = merge_statistics(total, estadisticas[j])
+            coef, intercept = solve_linear(estimator, total)
+            valid_idx = bloques[validacion]
+            metricas = fold_metrics(y_train[valid_idx], x_train[valid_idx] @ coef + intercept)
+            resultados.append({'fold': fold, 'filas_train': int(total['peso']),
+                               'filas_valid': len(valid_idx), **metricas,
+                               'segundos': time.perf_counter() - inicio})
+
+        return resultados
+
+    def refit_folds(self, estimator, x_train: np.ndarray, y_train: np.ndarray,
+                    bloques: list, esquema: list) -> list:
+        """
+        Entrena el estimador en cada fold, en paralelo si n_workers > 1.
+        """
+        tareas = [(fold, entrenamiento, validacion)
+                  for fold, (entrenamiento, validacion) in enumerate(esquema)]
+
+        if self.n_workers <= 1:
+            _COMPARTIDO.update(x=x_train, y=y_train, bloques=bloques)
+            try:
+                return [evaluate_fold(estimator, *tarea) for tarea in tareas]
+            finally:
+                _COMPARTIDO.clear()
+
+        with tempfile.TemporaryDirectory() as directorio:
+            x_path = os.path.join(directorio, 'x_train.npy')
+            y_path = os.path.join(directorio, 'y_train.npy')
+            np.save(x_path, x_train)
+            np.save(y_path, y_train)
+            bloques_paths = []
+            for j, bloque in enumerate(bloques):
+                bloques_paths.append(os.path.join(directorio, f'bloque_{j}.npy'))
+                np.save(bloques_paths[-1], bloque)
+
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=init_worker,
+                                     initargs=(x_path, y_path, bloques_paths)) as executor:
+                futures = [executor.submit(evaluate_fold, estimator, *tarea) for tarea in tareas]
+                return [future.result() for future in futures]
+
+    def run(self, df_bigmart: pd.DataFrame, estimator=None) -> dict:
+        """
+        Evalúa el estimador con validación cruzada.
+
+        :param df_bigmart: Datos de entrenamiento transformados.
+        :param estimator: Estimador de sklearn sin entrenar. Si es None se
+                          usa LinearRegression.
+
+        :return: Métricas de cada fold y su media y desvío.
+        :rtype: dict
+        """
+        estimator = estimator if estimator is not None else LinearRegression()
+        inicio = time.perf_counter()
+
+        # La matriz de features se arma una única vez para todos los folds
+        x_train = df_bigmart.drop(columns=[TARGET]).to_numpy(dtype=np.float64)
+        y_train = df_bigmart[TARGET].to_numpy(dtype=np.float64)
+        orden = None if self.columna_orden is None else df_bigmart[self.columna_orden].to_numpy()
+        bloques, esquema = fold_blocks(len(df_bigmart), self.folds, self.modo, orden,
+                                       self.semilla)
+
+        lineal = is_linear(estimator)
+        metodo = self.linear_folds if lineal else self.refit_folds
+        por_fold = metodo(estimator, x_train, y_train, bloques, esquema)
+
+        self.results = {
+            'estimador': type(estimator).__name__,
+            'parametros': {nombre: valor for nombre, valor in estimator.get_params().items()
+                           if isinstance(valor, (int, float, str, bool, type(None)))},
+            'modo': self.modo,
+            'folds': self.folds,
+            'metodo': 'estadisticas' if lineal else 'reentrenamiento',
+            'por_fold': por_fold,
+            'resumen': {metrica: {'media': float(np.mean([fold[metrica] for fold in por_fold])),
+                                  'desvio': float(np.std([fold[metrica] for fold in por_fold]))}
+                        for metrica in METRICAS},
+            'segundos': time.perf_counter() - inicio}
+
+        if self.tracking_uri is not None:
+            self.log_mlflow()
+
+        return self.results
+
+    def log_mlflow(self) -> None:
+        """
+        Registra en MLflow las métricas de cada fold (con el número de fold
+        como step) y su media y desvío (cv_<métrica>_media, cv_<métrica>_desvio).
+        Si hay un run activo se usa; si no, se crea uno.
+        """
+        import mlflow  # pylint: disable=C0415
+
+        resultados = self.results
+        if mlflow.active_run() is None:
+            mlflow.set_tracking_uri(self.tracking_uri)
+            if mlflow.get_experiment_by_name(self.experiment_name) is None:
+                mlflow.create_experiment(self.experiment_name,
+                                         artifact_location=ARTIFACT_LOCATION)
+            mlflow.set_experiment(self.experiment_name)
+            run = mlflow.start_run(run_name=f"cv_{resultados['estimador']}")
+        else:
+            run = None
+
+        try:
+            mlflow.log_params({'estimador': resultados['estimador'], 'cv_modo': self.modo,
+                               'cv_folds': self.folds, **resultados['parametros']})
+            for fold in resultados['por_fold']:
+                mlflow.log_metrics({f'cv_{metrica}': fold[metrica] for metrica in METRICAS},
+                                   step=fold['fold'])
+            mlflow.log_metrics({f'cv_{metrica}_{medida}': valor
+                                for metrica, resumen in resultados['resumen'].items()
+                                for medida, valor in resumen.items()})
+        finally:
+            if run is not None:
+                mlflow.end_run()
+
+    def save(self, path: str) -> None:
+        """
+        Escribe los resultados en formato json.
+        """
+        with open(path, 'w', encoding='utf-8') as f_json:
+            json.dump(self.results, f_json, indent=2)
+
+    def report(self) -> str:
+        """
+        Devuelve una tabla de texto con las métricas de cada fold y su media.
+
+        :return: Tabla con rmse, mae, r2 y sesgo por fold.
+        :rtype: str
+        """
+        resultados = self.results
+        lineas = [f"Validación cruzada {resultados['modo']} de {resultados['estimador']}: "
+                  f"{resultados['folds']} folds ({resultados['metodo']}), "
+                  f"{resultados['segundos']:.3f} s",
+                  f"{'fold':>6} {'train':>9} {'valid':>9} {'RMSE':>10} {'MAE':>10} "
+                  f"{'R2':>8} {'sesgo':>9}"]
+        for fold in resultados['por_fold']:
+            lineas.append(f"{fold['fold']:>6} {fold['filas_train']:>9} {fold['filas_valid']:>9} "
+                          f"{fold['rmse']:>10.2f} {fold['mae']:>10.2f} {fold['r2']:>8.4f} "
+                          f"{fold['sesgo']:>9.2f}")
+        resumen = resultados['resumen']
+        for medida in ('media', 'desvio'):
+            lineas.append(f"{medida:>6} {'':>9} {'':>9} {resumen['rmse'][medida]:>10.2f} "
+                          f"{resumen['mae'][medida]:>10.2f} {resumen['r2'][medida]:>8.4f} "
+                          f"{resumen['sesgo'][medida]:>9.2f}")
+
+        return "\n".join(lineas)
+
+
+def add_cv_arguments(parser) -> None:
+    """
+    Agrega a un ArgumentParser las opciones de la validación cruzada.
+    """
+    parser.add_argument('--cv', type=int, default=None,
+                        help='Evaluar el modelo con validación cruzada de esta cantidad '
+                        'de folds antes de entrenarlo con todos los datos')
+    parser.add_argument('--cv-modo', type=str, default='kfold', choices=MODOS_CV,
+                        help='k-fold con registros mezclados o temporal (entrena con los '
+                        'registros anteriores y valida con los siguientes)')
+    parser.add_argument('--cv-orden', type=str, default=None,
+                        help='Columna por la que se ordenan los registros en el modo temporal')
+    parser.add_argument('--cv-workers', type=int, default=None,
+                        help='Procesos en los que se entrenan los folds (por defecto uno '
+                        'por CPU); los modelos lineales no los usan')
+    parser.add_argument('--cv-salida', type=str, default=None,
+                        help='Guardar las métricas de la validación cruzada en json')
+    parser.add_argument('--cv-mlflow', action='store_true',
+                        help='Registrar las métricas de la validación cruzada en MLflow')
+
+
+def cv_from_args(args):
+    """
+    Crea un CrossValidator con las opciones de add_cv_arguments, o None
+    si no se pidió validación cruzada.
+    """
+    if args.cv is None:
+        return None
+
+    return CrossValidator(folds=args.cv, modo=args.cv_modo, n_workers=args.cv_workers,
+                          columna_orden=args.cv_orden,
+                          tracking_uri=TRACKING_URI if args.cv_mlflow else None)
+
+
+def export_cv(cv, args) -> None:
+    """
+    Muestra y guarda los resultados según las opciones de add_cv_arguments.
+    """
+    if cv is None or cv.results is None:
+        return
+
+    print(cv.report())
+    if args.cv_salida is not None:
+        cv.save(args.cv_salida)
@@ -0,0 +1,440 @@
+"""
+duckdb_engine.py
+
+DESCRIPCIÓN: Contiene la clase DuckDBEngine, un motor alternativo de
+FeatureEngineeringPipeline que expresa fit(), transform() y
+data_transformation() como consultas SQL de DuckDB sobre el archivo csv,
+Parquet o Arrow de entrada. Cada consulta lee el archivo directamente
+(sin pasar por pandas) y DuckDB ejecuta en una única pasada, y en varios
+hilos, la imputación, la codificación y la escritura del resultado. Las
+agregaciones (modas y cuartiles) usan archivos temporales si no entran
+en el límite de memoria, y la transformación puede escribirse en disco
+sin materializar el resultado en memoria.
+
+El resultado coincide con el del motor pandas salvo por el índice, que
+es consecutivo, y por el último bit de algunos valores leídos del csv.
+Requiere duckdb.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from feature_engineering import ANIO_REFERENCIA, CODIGOS_OUTLET_LOCATION, \
+    CODIGOS_OUTLET_SIZE, VERSION_ESTADO
+from storage import CLAVE_CATEGORIAS, import_pyarrow, resolve_format
+
+# Tipos con los que se leen las columnas de los datos crudos del csv
+TIPOS_CRUDOS = {'Item_Identifier': 'VARCHAR',
+                'Item_Weight': 'DOUBLE',
+                'Item_Fat_Content': 'VARCHAR',
+                'Item_Visibility': 'DOUBLE',
+                'Item_Type': 'VARCHAR',
+                'Item_MRP': 'DOUBLE',
+                'Outlet_Identifier': 'VARCHAR',
+                'Outlet_Establishment_Year': 'BIGINT',
+                'Outlet_Size': 'VARCHAR',
+                'Outlet_Location_Type': 'VARCHAR',
+                'Outlet_Type': 'VARCHAR',
+                'Item_Outlet_Sales': 'DOUBLE'}
+
+# Niveles de precio de 'Item_MRP', que el motor pandas guarda como categórica ordenada
+CATEGORIAS_MRP = [1, 2, 3, 4]
+
+# Directorio por defecto de los archivos temporales de DuckDB
+TEMP_DIRECTORY = os.path.join(tempfile.gettempdir(), 'bigmart_duckdb')
+
+
+def import_duckdb():
+    """
+    Importa duckdb, que solo es necesario para el motor DuckDB.
+    """
+    try:
+        import duckdb  # pylint: disable=C0415
+    except ImportError as error:
+        raise ImportError("El motor duckdb requiere duckdb: pip install duckdb") from error
+
+    return duckdb
+
+
+def texto(valor: str) -> str:
+    """
+    Devuelve un literal de texto de SQL.
+    """
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def real(valor: float) -> str:
+    """
+    Devuelve un literal DOUBLE de SQL que representa exactamente el valor.
+    """
+    return f"{texto(repr(float(valor)))}::DOUBLE"
+
+
+def codificar(columna: str, codigos: dict, faltante: str = 'NULL') -> str:
+    """
+    Devuelve la expresión que codifica una columna ordinal. Los valores
+    desconocidos quedan como NULL y los faltantes toman el valor indicado.
+    """
+    casos = ' '.join(f"WHEN {columna} = {texto(valor)} THEN {codigo}"
+                     for valor, codigo in codigos.items())
+
+    return f"(CASE WHEN {columna} IS NULL THEN {faltante} {casos} END)::BIGINT"
+
+
+class DuckDBEngine:
+    """
+    Clase que ejecuta la ingeniería de features como consultas de DuckDB.
+
+    Las búsquedas por producto (moda del peso) no usan un join, que no
+    conserva el orden de los registros: los productos se codifican con un
+    tipo ENUM y la moda se toma de una lista por posición, de modo que la
+    transformación es una única proyección que conserva el orden del
+    archivo de entrada.
+    """
+
+    def __init__(self, threads: int = None, memory_limit: str = None,
+                 temp_directory: str = TEMP_DIRECTORY):
+        """
+        :param threads: Cantidad de hilos. Si es None se usan todos los núcleos.
+        :param memory_limit: Límite de memoria de DuckDB (por ejemplo '4GB').
+                             Si es None se usa el 80 % de la memoria.
+        :param temp_directory: Directorio de los archivos temporales que
+                               DuckDB usa cuando se supera el límite de memoria.
+        """
+        duckdb = import_duckdb()
+        config = {'preserve_insertion_order': True, 'temp_directory': temp_directory}
+        if threads is not None:
+            config['threads'] = threads
+        if memory_limit is not None:
+            config['memory_limit'] = memory_limit
+        self.connection = duckdb.connect(config=config)
+        self.fuentes = 0
+
+    def close(self) -> None:
+        """
+        Cierra la conexión de DuckDB.
+        """
+        self.connection.close()
+
+    def fuente(self, datos, storage_format: str = None) -> str:
+        """
+        Devuelve la expresión SQL que lee los datos crudos.
+
+        :param datos: Ruta de un archivo csv, Parquet o Arrow, o DataFrame de pandas.
+        :param storage_format: Formato del archivo. Si es None se infiere de la extensión.
+
+        :return: Expresión para usar en FROM.
+        :rtype: str
+        """
+        if isinstance(datos, pd.DataFrame):
+            nombre = self.registrar(datos)
+            return nombre
+
+        storage_format = resolve_format(datos, storage_format)
+        if storage_format == 'parquet':
+            return f"read_parquet({texto(datos)})"
+
+        if storage_format == 'arrow':
+            # Un dataset de Arrow se lee por bloques desde el archivo
+            import_pyarrow()
+            import pyarrow.dataset  # pylint: disable=C0415
+            return self.registrar(pyarrow.dataset.dataset(str(datos), format='ipc'))
+
+        # Se fijan los tipos de las columnas presentes, para que no dependan
+        # de la muestra con la que DuckDB infiere el esquema
+        columnas = [columna[0] for columna in self.connection.execute(
+            f"DESCRIBE SELECT * FROM read_csv({texto(datos)}, header = true)").fetchall()]
+        tipos = ', '.join(f"{texto(columna)}: {texto(TIPOS_CRUDOS[columna])}"
+                          for columna in columnas if columna in TIPOS_CRUDOS)
+
+        return f"read_csv({texto(datos)}, header = true, types = {{{tipos}}})"
+
+    def registrar(self, datos) -> str:
+        """
+        Registra un DataFrame o un dataset de Arrow como vista y devuelve su nombre.
+        """
+        self.fuentes += 1
+        nombre = f"crudos_{self.fuentes}"
+        self.connection.register(nombre, datos)
+
+        return nombre
+
+    def columnas(self, fuente: str) -> list:
+        """
+        Devuelve los nombres de las columnas de una fuente.
+        """
+        return [columna[0] for columna in
+                self.connection.execute(f"DESCRIBE SELECT * FROM {fuente}").fetchall()]
+
+    def tabla_modas(self, nombre: str, consulta: str) -> str:
+        """
+        Crea el tipo ENUM de los productos de una consulta (Item_Identifier,
+        moda) y la variable con sus modas en el mismo orden.
+
+        :param nombre: Nombre del tipo y de la variable.
+        :param consulta: Consulta con las columnas Item_Identifier y moda.
+
+        :return: Expresión con la moda de cada registro, NULL si el producto
+                 no está en la consulta.
+        :rtype: str
+        """
+        self.connection.execute(f"CREATE OR REPLACE TEMP TABLE {nombre} AS {consulta}")
+        if self.connection.execute(f"SELECT count(*) FROM {nombre}").fetchone()[0] == 0:
+            return "NULL::DOUBLE"
+
+        self.connection.execute(f"CREATE OR REPLACE TYPE {nombre}_enum AS ENUM "
+                                f"(SELECT Item_Identifier FROM {nombre})")
+        self.connection.execute(f"SET VARIABLE {nombre} = (SELECT list(moda ORDER BY "
+                                f"Item_Identifier::{nombre}_enum) FROM {nombre})")
+
+        return (f"getvariable('{nombre}')"
+                f"[enum_code(TRY_CAST(Item_Identifier AS {nombre}_enum)) + 1]")
+
+    @staticmethod
+    def consulta_modas(fuente: str, filtro: str = 'TRUE') -> str:
+        """
+        Consulta con la moda del peso de cada producto, ignorando los
+        faltantes. Ante empates se conserva el menor peso, igual que
+        FeatureEngineeringPipeline.moda_por_clave.
+        """
+        return (f"SELECT Item_Identifier, Item_Weight AS moda FROM ("
+                f"SELECT Item_Identifier, Item_Weight, count(*) AS conteo FROM {fuente} "
+                f"WHERE Item_Weight IS NOT NULL AND Item_Identifier IS NOT NULL AND {filtro} "
+                f"GROUP BY Item_Identifier, Item_Weight) "
+                f"QUALIFY row_number() OVER (PARTITION BY Item_Identifier "
+                f"ORDER BY conteo DESC, Item_Weight) = 1 ORDER BY Item_Identifier")
+
+    def estadisticas(self, fuente: str, peso: str) -> tuple:
+        """
+        Calcula sobre los registros con peso conocido los límites de los
+        cuartiles de 'Item_MRP' (interpolación lineal, igual que pd.qcut)
+        y los valores presentes de 'Outlet_Type'.
+
+        :return: Tupla (límites, tipos de tienda).
+        :rtype: tuple
+        """
+        limites, tipos = self.connection.execute(
+            f"SELECT quantile_cont(Item_MRP, [0, 0.25, 0.5, 0.75, 1]), "
+            f"list(DISTINCT Outlet_Type ORDER BY Outlet_Type) "
+            f"FROM {fuente} WHERE {peso} IS NOT NULL").fetchone()
+
+        return limites, [tipo for tipo in tipos if tipo is not None]
+
+    def fit(self, datos, storage_format: str = None) -> dict:
+        """
+        Aprende el mismo estado que FeatureEngineeringPipeline.fit().
+
+        :param datos: Ruta de los datos crudos de entrenamiento o DataFrame.
+        :param storage_format: Formato del archivo.
+
+        :return state: Diccionario serializable con el estado aprendido.
+        :rtype: dict
+        """
+        fuente = self.fuente(datos, storage_format)
+        moda = self.tabla_modas('modas_fit', self.consulta_modas(fuente))
+        limites, tipos_outlet = self.estadisticas(fuente, f"coalesce(Item_Weight, {moda})")
+        modas = self.connection.execute("SELECT Item_Identifier, moda FROM modas_fit "
+                                        "ORDER BY Item_Identifier").fetchall()
+
+        columnas = ['Item_Weight', 'Item_Visibility', 'Item_MRP',
+                    'Outlet_Establishment_Year', 'Outlet_Size', 'Outlet_Location_Type'] \
+            + [f'Outlet_Type_{tipo}' for tipo in tipos_outlet] + ['Item_Outlet_Sales']
+
+        return {'version': VERSION_ESTADO,
+                'anio_referencia': ANIO_REFERENCIA,
+                'limites_mrp': [float(limite) for limite in limites],
+                'modas_peso': {str(producto): float(valor) for producto, valor in modas},
+                'tipos_outlet': [str(tipo) for tipo in tipos_outlet],
+                'columnas': columnas}
+
+    @staticmethod
+    def proyeccion(fuente: str, peso: str, limites: list, anio_referencia: int,
+                   tamanio: str, tipos_outlet: list, columnas_crudas: list,
+                   columnas: list = None) -> str:
+        """
+        Arma la proyección que transforma cada registro.
+
+        :param fuente: Expresión de los datos crudos.
+        :param peso: Expresión del peso imputado; se descartan los NULL.
+        :param limites: Límites internos de los cuartiles de 'Item_MRP'.
+        :param anio_referencia: Año de referencia de los años de vida.
+        :param tamanio: Expresión del código de 'Outlet_Size'.
+        :param tipos_outlet: Categorías de las dummies de 'Outlet_Type'.
+        :param columnas_crudas: Columnas de la fuente.
+        :param columnas: Orden de las columnas de salida. Si es None se usa
+                         el orden de data_transformation.
+
+        :return: Consulta SQL.
+        :rtype: str
+        """
+        nivel = ' + '.join(f"(Item_MRP > {real(limite)})::INTEGER" for limite in limites)
+        expresiones = {
+            'Item_Weight': peso,
+            'Item_Visibility': 'Item_Visibility',
+            'Item_MRP': f"CASE WHEN Item_MRP IS NOT NULL THEN 1 + {nivel} END",
+            'Outlet_Establishment_Year': f"{int(anio_referencia)} - Outlet_Establishment_Year",
+            'Outlet_Size': tamanio,
+            'Outlet_Location_Type': codificar('Outlet_Location_Type', CODIGOS_OUTLET_LOCATION)}
+        for tipo in tipos_outlet:
+            expresiones[f'Outlet_Type_{tipo}'] = \
+                f"coalesce(Outlet_Type = {texto(tipo)}, FALSE)::BIGINT"
+        expresiones['Item_Outlet_Sales'] = 'Item_Outlet_Sales' \
+            if 'Item_Outlet_Sales' in columnas_crudas else 'NULL::DOUBLE'
+
+        if columnas is None:
+            columnas = list(expresiones)
+        seleccion = ', '.join(f'{expresiones[columna]} AS "{columna}"' for columna in columnas)
+
+        return f"SELECT {seleccion} FROM {fuente} WHERE {peso} IS NOT NULL"
+
+    def consulta_transform(self, datos, state: dict, storage_format: str = None) -> str:
+        """
+        Devuelve la consulta que aplica el estado de fit() a los datos, igual
+        que FeatureEngineeringPipeline.transform() sin índice.
+
+        :param datos: Ruta de los datos crudos o DataFrame.
+        :param state: Estado generado por fit().
+        :param storage_format: Formato del archivo.
+
+        :return: Consulta SQL.
+        :rtype: str
+        """
+        if state.get('version') != VERSION_ESTADO:
+            raise ValueError(f"Versión de estado no soportada: {state.get('version')}")
+
+        fuente = self.fuente(datos, storage_format)
+        self.connection.register('modas_estado', pd.DataFrame(
+            {'Item_Identifier': list(state['modas_peso']),
+             'moda': list(state['modas_peso'].values())}))
+        moda = self.tabla_modas('modas_transform', "SELECT * FROM modas_estado")
+
+        return self.proyeccion(fuente, peso = f"coalesce(Item_Weight, {moda})",
+                               limites = state['limites_mrp'][1:-1],
+                               anio_referencia = state['anio_referencia'],
+                               tamanio = codificar('Outlet_Size', CODIGOS_OUTLET_SIZE,
+                                                   faltante=str(CODIGOS_OUTLET_SIZE['Small'])),
+                               tipos_outlet = state['tipos_outlet'],
+                               columnas_crudas = self.columnas(fuente),
+                               columnas = state['columnas'])
+
+    def consulta_data_transformation(self, datos, storage_format: str = None) -> str:
+        """
+        Devuelve la consulta equivalente a data_transformation(): las
+        modas, los cuartiles, las tiendas sin tamaño y las categorías se
+        calculan sobre los mismos datos que se transforman.
+
+        :param datos: Ruta de los datos crudos o DataFrame.
+        :param storage_format: Formato del archivo.
+
+        :return: Consulta SQL.
+        :rtype: str
+        """
+        fuente = self.fuente(datos, storage_format)
+
+        # Solo se imputan, en todos sus registros, los productos con algún peso faltante
+        filtro = (f"Item_Identifier IN (SELECT Item_Identifier FROM {fuente} "
+                  f"WHERE Item_Weight IS NULL)")
+        moda = self.tabla_modas('modas_dt', self.consulta_modas(fuente, filtro))
+        peso = f"coalesce({moda}, Item_Weight)"
+
+        limites, tipos_outlet = self.estadisticas(fuente, peso)
+        outlets = [outlet for (outlet,) in self.connection.execute(
+            f"SELECT DISTINCT Outlet_Identifier FROM {fuente} "
+            f"WHERE Outlet_Size IS NULL AND {peso} IS NOT NULL").fetchall()]
+
+        tamanio = codificar('Outlet_Size', CODIGOS_OUTLET_SIZE)
+        if outlets:
+            tamanio = (f"CASE WHEN Outlet_Identifier IN ({', '.join(map(texto, outlets))}) "
+                       f"THEN {CODIGOS_OUTLET_SIZE['Small']} ELSE {tamanio} END")
+
+        return self.proyeccion(fuente, peso = peso, limites = limites[1:-1],
+                               anio_referencia = ANIO_REFERENCIA, tamanio = tamanio,
+                               tipos_outlet = tipos_outlet,
+                               columnas_crudas = self.columnas(fuente))
+
+    @staticmethod
+    def a_pandas(df_transformed: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convierte los tipos al resultado del motor pandas: 'Item_MRP' como
+        categórica ordenada y las columnas de códigos con faltantes como
+        float (DuckDB las devuelve como enteros con máscara).
+        """
+        for columna, serie in df_transformed.items():
+            if isinstance(serie.dtype, pd.Int64Dtype) and columna != 'Item_MRP':
+                df_transformed[columna] = serie.astype(float)
+        df_transformed['Item_MRP'] = pd.Categorical(df_transformed['Item_MRP'],
+                                                    categories=CATEGORIAS_MRP, ordered=True)
+
+        return df_transformed
+
+    def fetch(self, consulta: str) -> pd.DataFrame:
+        """
+        Ejecuta una consulta y devuelve el resultado como DataFrame.
+        """
+        return self.a_pandas(self.connection.execute(consulta).df())
+
+    def transform(self, datos, state: dict, storage_format: str = None) -> pd.DataFrame:
+        """
+        Aplica el estado de fit() y devuelve el resultado como DataFrame.
+        """
+        return self.fetch(self.consulta_transform(datos, state, storage_format))
+
+    def data_transformation(self, datos, storage_format: str = None) -> pd.DataFrame:
+        """
+        Transforma los datos con sus propios parámetros y devuelve el
+        resultado como DataFrame.
+        """
+        return self.fetch(self.consulta_data_transformation(datos, storage_format))
+
+    def write(self, consulta: str, path: str, storage_format: str = None) -> int:
+        """
+        Escribe el resultado de una consulta sin materializarlo en memoria:
+        csv y Parquet con COPY, que escribe en paralelo, y Arrow por lotes.
+        Como en storage.FrameWriter, 'Item_MRP' se guarda en Parquet con los
+        metadatos de las categóricas y en Arrow como diccionario ordenado,
+        para que read_frame() la lea como categórica.
+
+        :param consulta: Consulta SQL.
+        :param path: Archivo de salida.
+        :param storage_format: Formato del archivo. Si es None se infiere de la extensión.
+
+        :return: Cantidad de registros escritos.
+        :rtype: int
+        """
+        storage_format = resolve_format(path, storage_format)
+        if storage_format == 'csv':
+            return self.connection.execute(
+                f"COPY ({consulta}) TO {texto(path)} (FORMAT csv, HEADER)").fetchone()[0]
+        if storage_format == 'parquet':
+            categorias = json.dumps({'Item_MRP': {'categorias': CATEGORIAS_MRP,
+                                                  'ordenada': True}})
+            return self.connection.execute(
+                f"COPY ({consulta}) TO {texto(path)} (FORMAT parquet, KV_METADATA "
+                f"{{{CLAVE_CATEGORIAS.decode()}: {texto(categorias)}}})").fetchone()[0]
+
+        pyarrow = import_pyarrow()
+        import pyarrow.compute  # pylint: disable=C0415,W0621
+
+        lector = self.connection.execute(consulta).to_arrow_reader()
+        posicion = lector.schema.get_field_index('Item_MRP')
+        niveles = pyarrow.array(CATEGORIAS_MRP, pyarrow.int64())
+        schema = lector.schema.set(posicion, pyarrow.field(
+            'Item_MRP', pyarrow.dictionary(pyarrow.int8(), pyarrow.int64(), ordered=True)))
+        filas = 0
+        with pyarrow.ipc.new_file(path, schema) as writer:
+            for batch in lector:
+                columnas = batch.columns
+                # Los niveles 1 a 4 son las posiciones 0 a 3 del diccionario
+                codigos = pyarrow.compute.subtract(columnas[posicion], 1).cast(pyarrow.int8())
+                columnas[posicion] = pyarrow.DictionaryArray.from_arrays(codigos, niveles,
+                                                                         ordered=True)
+                writer.write_batch(pyarrow.RecordBatch.from_arrays(columnas, schema=schema))
+                filas += batch.num_rows
+
+        return filas
@@ -0,0 +1,196 @@
+"""
+feature_cache.py
+
+DESCRIPCIÓN: Contiene la clase FeatureCache, un cache en disco de los
+datos transformados por FeatureEngineeringPipeline. La clave de cada
+entrada combina el hash del archivo de entrada, una huella de la lógica
+de transformación (el código de feature_engineering.py) y, al aplicar un
+estado ya aprendido, el hash de ese estado. Las entradas se guardan en
+formato binario (pickle) y se descartan las menos usadas cuando el cache
+supera su tamaño máximo.
+El cache no se usa cuando la transformación aplica un índice de
+productos y tiendas (lookup_index.py), cuyo contenido no forma parte de
+la clave.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+import duckdb_engine
+import feature_engineering
+
+# Incrementar para invalidar todas las entradas ante cambios de formato del cache
+VERSION_CACHE = 1
+
+BLOQUE_HASH = 1 << 20
+
+
+def file_hash(path: str) -> str:
+    """
+    Calcula el hash sha256 del contenido de un archivo, leyéndolo por bloques.
+
+    :param path: Ruta del archivo.
+
+    :return: Hash en hexadecimal.
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(BLOQUE_HASH), b''):
+            sha.update(bloque)
+
+    return sha.hexdigest()
+
+
+def transformation_fingerprint() -> str:
+    """
+    Devuelve la huella de la lógica de transformación: el hash del código
+    de feature_engineering.py junto con las versiones del estado y del cache.
+
+    :return: Huella en hexadecimal.
+    :rtype: str
+    """
+    sha = hashlib.sha256(f"{VERSION_CACHE}:{feature_engineering.VERSION_ESTADO}:".encode())
+    sha.update(file_hash(feature_engineering.__file__).encode())
+
+    return sha.hexdigest()
+
+
+class FeatureCache:
+    """
+    Clase que guarda y recupera datos transformados, junto con el estado
+    de la ingeniería de features con el que se generaron.
+
+    Cada entrada es un directorio <cache_dir>/<clave>/ con data.pkl y
+    state.json. La fecha de modificación del directorio registra el
+    último uso, y se usa para descartar primero las entradas menos usadas.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1 << 30):
+        """
+        :param cache_dir: Directorio del cache.
+        :param max_bytes: Tamaño máximo del cache en bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fingerprint = transformation_fingerprint()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, input_path: str, modo: str, state_path: str = None,
+            dtypes: dict = None, motor: str = 'pandas') -> str:
+        """
+        Calcula la clave de una transformación.
+
+        :param input_path: Ruta de los datos crudos.
+        :param modo: 'data_transformation' (sin estado), 'fit' (se aprende el
+                     estado de los datos de entrada) o 'transform' (se aplica
+                     el estado guardado en state_path).
+        :param state_path: Ruta del estado aplicado en el modo 'transform'.
+        :param dtypes: Esquema de tipos con el que se leen los datos crudos,
+                       que cambia los tipos de los datos transformados.
+        :param motor: Motor de la transformación. Los resultados de DuckDB
+                      se guardan aparte, con la huella de duckdb_engine.py.
+
+        :return: Clave de la entrada.
+        :rtype: str
+        """
+        partes = [self.fingerprint, file_hash(input_path), modo]
+        if modo == 'transform':
+            partes.append(file_hash(state_path))
+        if dtypes:
+            partes.append(json.dumps(dtypes, sort_keys=True))
+        if motor != 'pandas':
+            partes.append(f"{motor}:{file_hash(duckdb_engine.__file__)}")
+
+        return hashlib.sha256(":".join(partes).encode()).hexdigest()
+
+    def get(self, key: str):
+        """
+        Recupera una entrada y la marca como usada.
+
+        :param key: Clave de la entrada.
+
+        :return: Tupla (datos transformados, estado), o None si no existe.
+                 El estado es None en el modo 'data_transformation'.
+        :rtype: tuple
+        """
+        directorio = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(directorio):
+            return None
+
+        df_transformed = pd.read_pickle(os.path.join(directorio, 'data.pkl'))
+        with open(os.path.join(directorio, 'state.json'), 'r', encoding='utf-8') as f_json:
+            state = json.load(f_json)
+        os.utime(directorio)
+
+        return df_transformed, state
+
+    def put(self, key: str, df_transformed: pd.DataFrame, state: dict) -> None:
+        """
+        Guarda una entrada. Se escribe en un directorio temporal que luego
+        se renombra, de modo que nunca queda una entrada a medio escribir.
+
+        :param key: Clave de la entrada.
+        :param df_transformed: Datos transformados.
+        :param state: Estado de la ingeniería de features.
+        """
+        temporal = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            df_transformed.to_pickle(os.path.join(temporal, 'data.pkl'), protocol=5)
+            with open(os.path.join(temporal, 'state.json'), 'w', encoding='utf-8') as f_json:
+                json.dump(state, f_json)
+            os.replace(temporal, os.path.join(self.cache_dir, key))
+        except OSError:
+            # Otra ejecución ya guardó la misma entrada
+            shutil.rmtree(temporal, ignore_errors=True)
+
+        self.evict()
+
+    def entries(self) -> list:
+        """
+        Devuelve las entradas del cache ordenadas de la menos a la más
+        recientemente usada.
+
+        :return: Lista de tuplas (clave, último uso, tamaño en bytes).
+        :rtype: list
+        """
+        entradas = []
+        for clave in os.listdir(self.cache_dir):
+            directorio = os.path.join(self.cache_dir, clave)
+            if clave.startswith('.') or not os.path.isdir(directorio):
+                continue
+            tamanio = sum(entrada.stat().st_size for entrada in os.scandir(directorio))
+            entradas.append((clave, os.path.getmtime(directorio), tamanio))
+
+        return sorted(entradas, key=lambda entrada: entrada[1])
+
+    def evict(self) -> None:
+        """
+        Descarta las entradas menos usadas hasta que el cache no supere
+        max_bytes.
+        """
+        entradas = self.entries()
+        total = sum(tamanio for _, _, tamanio in entradas)
+
+        for clave, _, tamanio in entradas:
+            if total <= self.max_bytes:
+                break
+            self.invalidate(clave)
+            total -= tamanio
+
+    def invalidate(self, key: str = None) -> None:
+        """
+        Elimina una entrada del cache o, si no se indica la clave, todas.
+
+        :param key: Clave de la entrada a eliminar.
+        """
+        claves = [key] if key is not None else os.listdir(self.cache_dir)
+        for clave in claves:
+            shutil.rmtree(os.path.join(self.cache_dir, clave), ignore_errors=True)
@@ -11,17 +11,98 @@ FECHA: 17/07/2023
 """
 
 import argparse
+import json
+import os
 import pandas as pd
 import numpy as np
 
+from profiling import StageProfiler, add_profiling_arguments, export_profile, \
+    profiler_from_args
+from storage import ESQUEMA_BIGMART, FrameWriter, read_frame, read_frame_chunks, write_frame
+
+# Año de referencia para calcular los años de vida de las tiendas
+ANIO_REFERENCIA = 2020
+
+# Codificación de las variables ordinales
+CODIGOS_OUTLET_SIZE = {'High': 2, 'Medium': 1, 'Small': 0}
+CODIGOS_OUTLET_LOCATION = {'Tier 1': 2, 'Tier 2': 1, 'Tier 3': 0}
+
+# Versión del formato del archivo de estado aprendido en fit()
+VERSION_ESTADO = 1
+
+# Motores de ejecución de la transformación de archivos
+MOTORES = ('pandas', 'duckdb')
+
 class FeatureEngineeringPipeline:
     """
     Clase para manejar el pipeline de feature engineering.
+
+    Además de la transformación original (data_transformation), que aprende
+    sus parámetros del mismo lote que transforma, expone fit() y transform():
+    fit() aprende una única vez el estado (límites de los cuartiles de
+    'Item_MRP', modas de 'Item_Weight' por producto y categorías de
+    'Outlet_Type') y transform() lo aplica a lotes de cualquier tamaño.
     """
 
-    def __init__(self, input_path, output_path):
+    def __init__(self, input_path, output_path, state_path: str = None,
+                 storage_format: str = None, cache=None, profiler: StageProfiler = None,
+                 compacto: bool = False, index=None, actualizar_indice: bool = False,
+                 motor: str = 'pandas'):
+        """
+        :param input_path: Ruta de los datos crudos.
+        :param output_path: Ruta de los datos transformados.
+        :param state_path: Ruta del estado aprendido en fit().
+        :param storage_format: Formato de los datos transformados (csv,
+                               parquet o arrow). Si es None se infiere de
+                               la extensión de output_path.
+        :param cache: FeatureCache donde buscar y guardar los datos
+                      transformados. Si es None, o si se indica un
+                      índice, no se usa cache.
+        :param profiler: StageProfiler donde run(), prepare_data() y
+                         run_streaming() registran sus etapas.
+        :param compacto: Si es True los datos crudos se leen con los tipos
+                         compactos de ESQUEMA_BIGMART (categóricas, enteros
+                         chicos y float32) y las columnas codificadas y las
+                         dummies se generan como int8. Reduce la memoria a
+                         cambio de la precisión de float32 en las columnas
+                         numéricas.
+        :param index: LookupIndex (lookup_index.py) con la moda del peso de
+                      cada producto y el tamaño de cada tienda. Si se
+                      indica, transform() lo usa en lugar de las modas de
+                      feature_state.json.
+        :param actualizar_indice: Si es True, transform() absorbe cada lote
+                                  en el índice antes de transformarlo, de
+                                  modo que los productos nuevos con peso
+                                  sirven para imputar a los demás.
+        :param motor: Motor con el que prepare_data(), run() y
+                      run_streaming() leen y transforman el archivo de
+                      entrada: 'pandas' o 'duckdb' (consultas SQL de
+                      DuckDB, ver duckdb_engine.py). transform() y
+                      data_transformation() sobre DataFrames usan siempre
+                      pandas.
+        """
+        if motor not in MOTORES:
+            raise ValueError(f"Motor no soportado: {motor}. Opciones: {MOTORES}")
+        if motor != 'pandas' and (compacto or index is not None):
+            raise ValueError("Los tipos compactos y el índice requieren el motor pandas")
+
         self.input_path = input_path
         self.output_path = output_path
+        self.state_path = state_path
+        self.storage_format = storage_format
+        self.cache = cache
+        self.cache_hit = False
+        self.profiler = profiler if profiler is not None else StageProfiler()
+        self.dtypes = ESQUEMA_BIGMART if compacto else None
+        # Tipo de las columnas codificadas y de las dummies
+        self.tipo_entero = np.int8 if compacto else int
+        self.index = index
+        self.actualizar_indice = actualizar_indice
+        self.motor = motor
+        self.engine = None
+        self.state = None
+        self.modas_peso = None
+        self.limites_mrp = None
 
     def read_data(self) -> pd.DataFrame:
         """
@@ -31,10 +112,183 @@ class FeatureEngineeringPipeline:
         :return pandas_df: DataFrame de pandas con los datos de entrada.
         :rtype: pd.DataFrame
         """
-        pandas_df = pd.read_csv(self.input_path)
+        pandas_df = read_frame(self.input_path, dtypes=self.dtypes)
 
         return pandas_df
 
+    def duckdb_engine(self):
+        """
+        Devuelve el DuckDBEngine del pipeline, creándolo en el primer uso.
+        """
+        if self.engine is None:
+            # Se importa aquí porque duckdb_engine importa este módulo
+            from duckdb_engine import DuckDBEngine  # pylint: disable=C0415
+            self.engine = DuckDBEngine()
+
+        return self.engine
+
+    def consulta_duckdb(self, modo: str) -> str:
+        """
+        Devuelve la consulta de DuckDB que transforma el archivo de entrada.
+        En el modo 'fit' aprende antes el estado con DuckDB y lo guarda; en
+        el modo 'transform' lee el estado guardado.
+
+        :param modo: 'data_transformation', 'fit' o 'transform'.
+
+        :return: Consulta SQL.
+        :rtype: str
+        """
+        engine = self.duckdb_engine()
+        if modo == 'data_transformation':
+            return engine.consulta_data_transformation(self.input_path)
+
+        if modo == 'fit':
+            with self.profiler.stage('fit (duckdb)'):
+                self.set_state(engine.fit(self.input_path))
+                self.save_state()
+        else:
+            self.load_state()
+
+        return engine.consulta_transform(self.input_path, self.state)
+
+    def read_data_chunks(self, chunksize: int):
+        """
+        Lee los datos de entrada en bloques de tamaño fijo, sin cargar
+        el archivo completo en memoria.
+
+        :param chunksize: Cantidad de registros por bloque.
+
+        :return chunks: Iterador de DataFrames de pandas.
+        :rtype: Iterator[pd.DataFrame]
+        """
+        return read_frame_chunks(self.input_path, chunksize, dtypes=self.dtypes)
+
+    @staticmethod
+    def mapear(serie: pd.Series, mapeo) -> pd.Series:
+        """
+        Aplica un diccionario o una Serie a los valores de una columna; los
+        valores sin correspondencia quedan como faltantes. En las columnas
+        categóricas se mapean solo las categorías y el resultado se propaga
+        por sus códigos, sin materializar los valores como texto.
+
+        :param serie: Columna a mapear.
+        :param mapeo: Diccionario o Serie con los valores numéricos.
+
+        :return resultado: Columna mapeada.
+        :rtype: pd.Series
+        """
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            return serie.map(mapeo)
+
+        # El código -1 (faltante) toma el último valor de la tabla
+        tabla = np.append(pd.Series(serie.cat.categories).map(mapeo).to_numpy(dtype=float),
+                          np.nan)
+
+        return pd.Series(tabla[serie.cat.codes.to_numpy()], index=serie.index, name=serie.name)
+
+    def dummies(self, serie: pd.Series, categorias: list = None) -> dict:
+        """
+        Genera las variables dummies (0/1) de una columna comparando códigos
+        enteros: los de las categorías si la columna es categórica, o los de
+        pd.factorize en caso contrario.
+
+        :param serie: Columna nominal.
+        :param categorias: Categorías para las que se genera una dummy. Si
+                           es None se usan las presentes, ordenadas.
+
+        :return dummies: Diccionario {categoría: array de enteros}.
+        :rtype: dict
+        """
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos, valores = serie.cat.codes.to_numpy(), serie.cat.categories
+            presentes = valores[np.unique(codigos[codigos >= 0])]
+        else:
+            codigos, valores = pd.factorize(serie, sort=True)
+            presentes = valores
+
+        if categorias is None:
+            categorias = sorted(presentes)
+
+        posiciones = valores.get_indexer(categorias)
+
+        return {categoria: (codigos == posicion).astype(self.tipo_entero) if posicion >= 0
+                else np.zeros(len(serie), dtype=self.tipo_entero)
+                for categoria, posicion in zip(categorias, posiciones)}
+
+    @staticmethod
+    def filtro(validos: pd.Series):
+        """
+        Devuelve la función que filtra una columna con la máscara de
+        registros válidos. Las columnas filtradas comparten un único índice,
+        en lugar de crear uno por columna; si no hay registros descartados
+        no se copia nada.
+
+        :param validos: Máscara booleana de los registros que se conservan.
+
+        :return filtrar: Función de pd.Series en pd.Series.
+        :rtype: Callable
+        """
+        if validos.all():
+            return lambda serie: serie
+
+        mascara = validos.to_numpy()
+        indice = validos.index[mascara]
+
+        return lambda serie: pd.Series(serie.array[mascara], index=indice, name=serie.name)
+
+    def entero(self, serie: pd.Series) -> pd.Series:
+        """
+        Convierte a enteros una columna de códigos si no tiene faltantes.
+        """
+        return serie.astype(self.tipo_entero) if serie.notnull().all() else serie
+
+    @staticmethod
+    def moda_por_clave(df: pd.DataFrame, columna: str, clave: str) -> pd.Series:
+        """
+        Calcula en una sola pasada la moda de una columna para cada valor
+        de la clave, ignorando los faltantes. Ante empates se conserva el
+        menor valor, igual que Series.mode().iloc[0].
+
+        :param df: DataFrame de pandas con los datos de entrada.
+        :param columna: Columna sobre la que se calcula la moda.
+        :param clave: Columna por la que se agrupa.
+
+        :return modas: Serie indexada por la clave con la moda de cada grupo.
+        :rtype: pd.Series
+        """
+        conteos = df.loc[df[columna].notnull(), [clave, columna]] \
+            .groupby([clave, columna], sort=False, observed=True).size() \
+            .reset_index(name='conteo')
+
+        conteos = conteos.sort_values([clave, 'conteo', columna],
+                                      ascending=[True, False, True])
+
+        return conteos.drop_duplicates(subset=clave).set_index(clave)[columna]
+
+    def imputar_moda_por_clave(self, df: pd.DataFrame, columna: str, clave: str,
+                               claves=None) -> pd.Series:
+        """
+        Reemplaza los valores de una columna por la moda de su grupo. Las
+        modas se calculan una única vez y se propagan a cada registro
+        según su clave, sin recorrer el DataFrame por cada grupo.
+
+        :param df: DataFrame de pandas con los datos de entrada.
+        :param columna: Columna a imputar.
+        :param clave: Columna que define los grupos.
+        :param claves: Grupos a imputar. Si es None se imputan todos.
+
+        :return imputada: Columna con los valores imputados.
+        :rtype: pd.Series
+        """
+        modas = self.moda_por_clave(df, columna, clave)
+        if claves is not None:
+            modas = modas[modas.index.isin(claves)]
+
+        imputada = self.mapear(df[clave], modas).rename(columna)
+
+        return imputada.where(imputada.notnull(), df[columna]) \
+            .astype(df[columna].dtype, copy=False)
+
     def data_transformation(self, df_raw: pd.DataFrame) -> pd.DataFrame:
         """
         Este método se encarga de realizar la ingeniería de features
@@ -46,158 +300,419 @@ class FeatureEngineeringPipeline:
         :rtype: pd.DataFrame
         """
 
-        df_transformed = df_raw.copy()
+        # Las columnas de salida se arman por separado y el DataFrame se
+        # construye una única vez: no se copia el DataFrame de entrada ni se
+        # generan copias intermedias con replace/drop/get_dummies. Las
+        # columnas 'Item_Type' y 'Item_Fat_Content' no forman parte de la
+        # salida, por lo que no se transforman
 
-        # print(df_transformed.head())
-
-        # FEATURES ENGINEERING: para los años del establecimiento
-        # Cálculo de años de vida de la tienda en base al año de establecimiento
-        # y el año actual (se asume que es data del actual año 2020)
-        df_transformed['Outlet_Establishment_Year'] = 2020 - \
-            df_transformed['Outlet_Establishment_Year']
-
-        # LIMPIEZA: Unificando etiquetas para 'Item_Fat_Content'
-        df_transformed['Item_Fat_Content'] = df_transformed['Item_Fat_Content'].replace(
-            {'low fat':  'Low Fat', 'LF': 'Low Fat', 'reg': 'Regular'})
-
-        # LIMPIEZA: de faltantes en el peso de los productos
-        productos = list(df_transformed[
-            df_transformed['Item_Weight'].isnull()
-            ]['Item_Identifier'].unique())
-
-        for producto in productos:
-            # Revisar si existe un registro con el mismo identificador de producto
-            # y que tenga el peso cargado
-            if len(df_transformed[(df_transformed['Item_Identifier'] == producto)
-                                  & (~df_transformed['Item_Weight'].isnull())]) > 0:
-                moda = (df_transformed[
-                    df_transformed['Item_Identifier'] == producto
-                    ][['Item_Weight']]).mode().iloc[0,0]
-                df_transformed.loc[
-                    df_transformed['Item_Identifier'] == producto, 'Item_Weight'
-                    ] = moda
+        # LIMPIEZA: de faltantes en el peso de los productos.
+        # Solo se imputan los productos que tienen algún peso faltante; a todos
+        # sus registros se les asigna la moda del peso del producto
+        productos = df_raw.loc[df_raw['Item_Weight'].isnull(), 'Item_Identifier'].unique()
+        pesos = self.imputar_moda_por_clave(df_raw, columna='Item_Weight',
+                                            clave='Item_Identifier', claves=productos)
 
         # Eliminar registros con valores perdidos en 'Item_Weight'
-        df_transformed = df_transformed[~df_transformed['Item_Weight'].isnull()]
-
-        outlets = list(df_transformed[
-            df_transformed['Outlet_Size'].isnull()
-            ]['Outlet_Identifier'].unique())
-
-        # LIMPIEZA: de faltantes en el tamaño de las tiendas
-        for outlet in outlets:
-            df_transformed.loc[
-                df_transformed['Outlet_Identifier'] == outlet, 'Outlet_Size'
-                ] =  'Small'
-
-        # FEATURES ENGINEERING: asignación de nueva categorías para 'Item_Fat_Content'
-        df_transformed.loc[
-            df_transformed['Item_Type'] == 'Household', 'Item_Fat_Content'
-            ] = 'NA'
-        df_transformed.loc[
-            df_transformed['Item_Type'] == 'Health and Hygiene', 'Item_Fat_Content'
-            ] = 'NA'
-        df_transformed.loc[
-            df_transformed['Item_Type'] == 'Hard Drinks', 'Item_Fat_Content'
-            ] = 'NA'
-        df_transformed.loc[
-            df_transformed['Item_Type'] == 'Soft Drinks', 'Item_Fat_Content'
-            ] = 'NA'
-        df_transformed.loc[
-            df_transformed['Item_Type'] == 'Fruits and Vegetables', 'Item_Fat_Content'
-            ] = 'NA'
-
-        # FEATURES ENGINEERING: creando categorías para 'Item_Type'
-        df_transformed['Item_Type'] = df_transformed['Item_Type'].replace(
-            {'Others': 'Non perishable',
-            'Health and Hygiene': 'Non perishable',
-            'Household': 'Non perishable',
-            'Seafood': 'Meats',
-            'Meat': 'Meats',
-            'Baking Goods': 'Processed Foods',
-            'Frozen Foods': 'Processed Foods',
-            'Canned': 'Processed Foods',
-            'Snack Foods': 'Processed Foods',
-            'Breads': 'Starchy Foods',
-            'Breakfast': 'Starchy Foods',
-            'Soft Drinks': 'Drinks',
-            'Hard Drinks': 'Drinks',
-            'Dairy': 'Drinks'})
-
-        # FEATURES ENGINEERING: asignación de nueva categorías para 'Item_Fat_Content'
-        df_transformed.loc[
-            df_transformed['Item_Type'] == 'Non perishable', 'Item_Fat_Content'
-            ] = 'NA'
+        validos = pesos.notnull()
+        filtrar = self.filtro(validos)
+
+        columnas = {'Item_Weight': filtrar(pesos),
+                    'Item_Visibility': filtrar(df_raw['Item_Visibility'])}
 
         # FEATURES ENGINEERING: Codificando los niveles de precios de los productos
-        df_transformed['Item_MRP'] = pd.qcut(
-            df_transformed['Item_MRP'], 4, labels = [1, 2, 3, 4]
-            )
+        columnas['Item_MRP'] = pd.qcut(filtrar(df_raw['Item_MRP']), 4, labels = [1, 2, 3, 4])
 
-        # FEATURES ENGINEERING: Se eliminan las columnas que no se utilizarán
-        df_transformed = df_transformed.drop(columns=['Item_Type', 'Item_Fat_Content'])
+        # FEATURES ENGINEERING: para los años del establecimiento
+        # Cálculo de años de vida de la tienda en base al año de establecimiento
+        # y el año actual (se asume que es data del actual año 2020)
+        columnas['Outlet_Establishment_Year'] = ANIO_REFERENCIA - \
+            filtrar(df_raw['Outlet_Establishment_Year'])
 
+        # LIMPIEZA: de faltantes en el tamaño de las tiendas. Todos los registros
+        # de una tienda con algún tamaño faltante se asignan a 'Small'.
         # FEATURES ENGINEERING: Codificación de variables ordinales
-        df_transformed['Outlet_Size'] = df_transformed['Outlet_Size'] \
-            .replace({'High': 2, 'Medium': 1, 'Small': 0})
+        tiendas = filtrar(df_raw['Outlet_Identifier'])
+        tamanios = filtrar(df_raw['Outlet_Size'])
+        outlets = tiendas[tamanios.isnull()].unique()
+        columnas['Outlet_Size'] = self.entero(
+            self.mapear(tamanios, CODIGOS_OUTLET_SIZE)
+            .mask(tiendas.isin(outlets), CODIGOS_OUTLET_SIZE['Small']))
 
-        df_transformed['Outlet_Location_Type'] = df_transformed['Outlet_Location_Type'] \
-            .replace({'Tier 1': 2, 'Tier 2': 1, 'Tier 3': 0})
+        columnas['Outlet_Location_Type'] = self.entero(
+            self.mapear(filtrar(df_raw['Outlet_Location_Type']), CODIGOS_OUTLET_LOCATION))
 
         # FEATURES ENGINEERING: Codificación de variables nominales
-        df_transformed = pd.get_dummies(df_transformed, columns=['Outlet_Type'], dtype=int)
+        for tipo, dummy in self.dummies(filtrar(df_raw['Outlet_Type'])).items():
+            columnas[f'Outlet_Type_{tipo}'] = dummy
 
-        # FEATURES ENGINEERING: Eliminacion de columnas
-        df_transformed = df_transformed.drop(columns=['Item_Identifier', 'Outlet_Identifier'])
+        # Columna de Item_Outlet_Sales al final, o vacía si no existe
+        if 'Item_Outlet_Sales' in df_raw.columns:
+            columnas['Item_Outlet_Sales'] = filtrar(df_raw['Item_Outlet_Sales'])
+        else:
+            columnas['Item_Outlet_Sales'] = np.nan
 
-        # Mover al final la columna de Item_Outlet_Sales
-        if 'Item_Outlet_Sales' in df_transformed.columns:
-            # Mover columna al final
-            cols = list(df_transformed.columns)
-            cols.remove('Item_Outlet_Sales')
-            cols.append('Item_Outlet_Sales')
-            df_transformed = df_transformed[cols]
+        return pd.DataFrame(columnas, index=columnas['Item_Weight'].index)
 
-        # Agregar columna de Item_Outlet_Sales si no existe
-        if 'Item_Outlet_Sales' not in df_transformed.columns:
-            df_transformed['Item_Outlet_Sales'] = np.nan
+    def fit(self, df_raw: pd.DataFrame) -> dict:
+        """
+        Aprende sobre los datos de entrenamiento el estado que necesita
+        transform(): los límites de los cuartiles de 'Item_MRP', la moda
+        de 'Item_Weight' de cada producto, las categorías de 'Outlet_Type'
+        y el orden de las columnas de salida.
 
-        return df_transformed
+        :param df_raw: DataFrame de pandas con los datos de entrenamiento.
+
+        :return state: Diccionario serializable con el estado aprendido.
+        :rtype: dict
+        """
+
+        modas = self.moda_por_clave(df_raw, 'Item_Weight', 'Item_Identifier')
+        if df_raw['Item_Weight'].dtype == np.float32:
+            # Se guarda el decimal más corto que representa cada valor en
+            # float32 (9.3 y no 9.300000190734863)
+            modas = modas.astype(np.float32).astype(str).astype(float)
+
+        # Los cuartiles y las categorías se calculan sobre los registros que
+        # sobreviven a la imputación, igual que en data_transformation
+        pesos = df_raw['Item_Weight'].fillna(self.mapear(df_raw['Item_Identifier'], modas))
+        validos = pesos.notnull()
+
+        _, limites_mrp = pd.qcut(df_raw.loc[validos, 'Item_MRP'], 4, retbins=True)
+        tipos_outlet = sorted(df_raw.loc[validos, 'Outlet_Type'].dropna().unique())
+
+        columnas = ['Item_Weight', 'Item_Visibility', 'Item_MRP',
+                    'Outlet_Establishment_Year', 'Outlet_Size', 'Outlet_Location_Type'] \
+            + [f'Outlet_Type_{tipo}' for tipo in tipos_outlet] + ['Item_Outlet_Sales']
+
+        self.set_state({
+            'version': VERSION_ESTADO,
+            'anio_referencia': ANIO_REFERENCIA,
+            'limites_mrp': [float(limite) for limite in limites_mrp],
+            'modas_peso': {str(producto): float(moda) for producto, moda in modas.items()},
+            'tipos_outlet': [str(tipo) for tipo in tipos_outlet],
+            'columnas': columnas})
+
+        return self.state
+
+    def set_state(self, state: dict) -> None:
+        """
+        Asigna el estado aprendido y prepara las estructuras de búsqueda
+        que usa transform().
+
+        :param state: Diccionario con el estado generado por fit().
+        """
+
+        if state.get('version') != VERSION_ESTADO:
+            raise ValueError(f"Versión de estado no soportada: {state.get('version')}")
+
+        self.state = state
+        self.modas_peso = pd.Series(state['modas_peso'], dtype=float)
+        # Límites internos de los cuartiles: los extremos quedan abiertos
+        self.limites_mrp = np.array(state['limites_mrp'][1:-1])
+
+    def save_state(self) -> None:
+        """
+        Escribe el estado aprendido en formato json en state_path.
+        """
+
+        with open(self.state_path, 'w', encoding='utf-8') as f_json:
+            json.dump(self.state, f_json)
+
+    def load_state(self) -> None:
+        """
+        Lee el estado aprendido desde state_path.
+        """
+
+        with open(self.state_path, 'r', encoding='utf-8') as f_json:
+            self.set_state(json.load(f_json))
+
+    def transform(self, df_raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplica el estado aprendido en fit() sobre un lote de datos. Cada
+        registro se transforma de manera independiente del resto del lote,
+        por lo que el resultado no depende del tamaño del lote y puede
+        aplicarse incluso a un único registro.
+
+        :param df_raw: DataFrame de pandas con los datos de entrada.
+
+        :return df_transformed: DataFrame de pandas transformado.
+        :rtype: pd.DataFrame
+        """
+
+        if self.state is None:
+            raise RuntimeError("El pipeline no tiene estado: llamar a fit() o load_state()")
+
+        if self.index is not None and self.actualizar_indice:
+            self.index.absorb(df_raw)
+        modas_peso = self.modas_peso if self.index is None else self.index.pesos()
+
+        # LIMPIEZA: faltantes en el peso, con la moda del producto aprendida en fit()
+        # o guardada en el índice. Se descartan los registros de productos sin peso conocido
+        pesos = df_raw['Item_Weight'].fillna(self.mapear(df_raw['Item_Identifier'], modas_peso))
+        validos = pesos.notnull()
+
+        # Se filtran solo las columnas que se usan, y únicamente si hay
+        # registros descartados, en lugar de copiar el DataFrame completo
+        filtrar = self.filtro(validos)
+
+        # Las columnas se arman por separado y el DataFrame se construye una
+        # única vez, para no pagar una inserción por columna
+        columnas = {'Item_Weight': filtrar(pesos),
+                    'Item_Visibility': filtrar(df_raw['Item_Visibility'])}
+
+        # FEATURES ENGINEERING: niveles de precios con los cuartiles de entrenamiento.
+        # Los precios fuera del rango de entrenamiento caen en el primer o último nivel
+        precios = filtrar(df_raw['Item_MRP']).to_numpy(dtype=float)
+        niveles = np.searchsorted(self.limites_mrp, precios, side='left')
+        niveles[np.isnan(precios)] = -1
+        columnas['Item_MRP'] = pd.Categorical.from_codes(
+            niveles, categories=[1, 2, 3, 4], ordered=True)
+
+        # FEATURES ENGINEERING: años de vida de la tienda
+        columnas['Outlet_Establishment_Year'] = self.state['anio_referencia'] \
+            - filtrar(df_raw['Outlet_Establishment_Year'])
+
+        # LIMPIEZA Y CODIFICACIÓN: tamaño de las tiendas y tipo de ubicación. Sin
+        # índice, un tamaño faltante se asume 'Small'; con índice se usa el de la
+        # tienda, y las tiendas con algún tamaño faltante son 'Small' en todos
+        # sus registros, como en data_transformation
+        tamanios = filtrar(df_raw['Outlet_Size'])
+        codigos = self.mapear(tamanios, CODIGOS_OUTLET_SIZE)
+        if self.index is None:
+            codigos = codigos.mask(tamanios.isnull(), CODIGOS_OUTLET_SIZE['Small'])
+        else:
+            tiendas = filtrar(df_raw['Outlet_Identifier'])
+            reemplazar = tamanios.isnull() | tiendas.isin(self.index.sin_tamanio())
+            codigos = codigos.mask(reemplazar, self.mapear(tiendas, self.index.tamanios())
+                                   .fillna(CODIGOS_OUTLET_SIZE['Small']))
+        columnas['Outlet_Size'] = self.entero(codigos)
+        columnas['Outlet_Location_Type'] = self.entero(
+            self.mapear(filtrar(df_raw['Outlet_Location_Type']), CODIGOS_OUTLET_LOCATION))
+
+        # FEATURES ENGINEERING: variables dummies con las categorías de entrenamiento
+        for tipo, dummy in self.dummies(filtrar(df_raw['Outlet_Type']),
+                                        self.state['tipos_outlet']).items():
+            columnas[f'Outlet_Type_{tipo}'] = dummy
+
+        if 'Item_Outlet_Sales' in df_raw.columns:
+            columnas['Item_Outlet_Sales'] = filtrar(df_raw['Item_Outlet_Sales'])
+        else:
+            columnas['Item_Outlet_Sales'] = np.nan
+
+        # Se construye directamente en el orden de entrenamiento, sin una
+        # copia adicional al reordenar las columnas
+        return pd.DataFrame({columna: columnas[columna] for columna in self.state['columnas']},
+                            index=columnas['Item_Weight'].index)
 
     def write_prepared_data(self, transformed_dataframe: pd.DataFrame) -> None:
         """
         Este método se encarga de escribir los datos de salida
-        en un archivo csv.
+        en el formato de almacenamiento configurado (csv por defecto).
         
         :param transformed_dataframe: DataFrame de pandas transformado.
         """
 
-        transformed_dataframe.to_csv(self.output_path, index=False, sep=',')
+        write_frame(transformed_dataframe, self.output_path, self.storage_format)
+
+    def prepare_data(self, fit: bool = False) -> pd.DataFrame:
+        """
+        Lee y transforma los datos de entrada.
+
+        Si no se indicó state_path se usa data_transformation. En caso
+        contrario, con fit=True se aprende el estado sobre los datos de
+        entrada y se guarda en state_path; con fit=False se lee el estado
+        guardado y se aplica con transform().
+
+        Si hay un cache y ya contiene el resultado para el mismo archivo de
+        entrada, el mismo código de transformación y el mismo estado, se
+        devuelve el resultado guardado sin leer ni transformar los datos.
+        Con un índice no se usa el cache: el resultado depende del
+        contenido del índice, que además absorbe cada lote transformado.
+
+        :param fit: Si es True se aprende y guarda el estado.
+
+        :return: DataFrame transformado.
+        :rtype: pd.DataFrame
+        """
+        if self.state_path is None:
+            modo = 'data_transformation'
+        else:
+            modo = 'fit' if fit else 'transform'
+
+        self.cache_hit = False
+        clave = None
+        cache = self.cache if self.index is None else None
+        if cache is not None:
+            with self.profiler.stage('cache_get') as registro:
+                clave = cache.key(self.input_path, modo, self.state_path, self.dtypes,
+                                  self.motor)
+                guardado = cache.get(clave)
+                if guardado is not None:
+                    self.cache_hit = True
+                    df_transformed, state = guardado
+                    registro['filas_salida'] = len(df_transformed)
+                    if modo == 'fit':
+                        self.set_state(state)
+                        self.save_state()
+                    elif modo == 'transform':
+                        self.load_state()
+            if self.cache_hit:
+                return df_transformed
+
+        if self.motor == 'duckdb':
+            # Con DuckDB la lectura y la transformación son una única consulta
+            consulta = self.consulta_duckdb(modo)
+            with self.profiler.stage(f"{'transform' if modo == 'fit' else modo} (duckdb)") as registro:
+                df_transformed = self.duckdb_engine().fetch(consulta)
+                registro['filas_salida'] = len(df_transformed)
+            if cache is not None:
+                with self.profiler.stage('cache_put', len(df_transformed)):
+                    cache.put(clave, df_transformed, self.state)
+            return df_transformed
+
+        with self.profiler.stage('read_data') as registro:
+            df_raw = self.read_data()
+            registro['filas_salida'] = len(df_raw)
+
+        if modo == 'data_transformation':
+            with self.profiler.stage('data_transformation', len(df_raw)) as registro:
+                df_transformed = self.data_transformation(df_raw)
+                registro['filas_salida'] = len(df_transformed)
+        else:
+            if fit:
+                with self.profiler.stage('fit', len(df_raw)):
+                    self.fit(df_raw)
+                    self.save_state()
+            else:
+                self.load_state()
+            with self.profiler.stage('transform', len(df_raw)) as registro:
+                df_transformed = self.transform(df_raw)
+                registro['filas_salida'] = len(df_transformed)
+
+        if cache is not None:
+            with self.profiler.stage('cache_put', len(df_transformed)):
+                cache.put(clave, df_transformed, self.state)
+
+        return df_transformed
 
-    def run(self):
+    def run(self, fit: bool = False):
         """
         Este metodo ejecuta los pasos para transformar los datos de entrada
-        y escribirlos en un archivo de salida.
+        y escribirlos en un archivo de salida (ver prepare_data).
+
+        :param fit: Si es True se aprende y guarda el estado.
+        """
+
+        if self.motor == 'duckdb' and self.cache is None:
+            # DuckDB escribe el resultado sin materializarlo en memoria
+            modo = 'data_transformation' if self.state_path is None else \
+                'fit' if fit else 'transform'
+            consulta = self.consulta_duckdb(modo)
+            with self.profiler.stage(f"{'transform' if modo == 'fit' else modo} (duckdb)") as registro:
+                registro['filas_salida'] = self.duckdb_engine().write(
+                    consulta, self.output_path, self.storage_format)
+            return
+
+        df_transformed = self.prepare_data(fit)
+
+        with self.profiler.stage('write_prepared_data', len(df_transformed)):
+            self.write_prepared_data(df_transformed)
+
+    def run_streaming(self, chunksize: int):
+        """
+        Transforma los datos de entrada por bloques con el estado guardado
+        en state_path y agrega cada bloque transformado al archivo de
+        salida. La memoria utilizada depende del tamaño del bloque y no
+        del tamaño del archivo, y el resultado es igual al de run().
+
+        :param chunksize: Cantidad de registros por bloque. Con el motor
+                          duckdb no se usa: DuckDB ya lee y escribe por bloques.
         """
 
-        df_raw = self.read_data()
-        df_transformed = self.data_transformation(df_raw)
-        self.write_prepared_data(df_transformed)
+        if self.motor == 'duckdb':
+            consulta = self.consulta_duckdb('transform')
+            with self.profiler.stage('streaming (duckdb)') as registro:
+                registro['filas_salida'] = self.duckdb_engine().write(
+                    consulta, self.output_path, self.storage_format)
+            return
+
+        self.load_state()
+
+        with self.profiler.stage('streaming') as registro, \
+                FrameWriter(self.output_path, self.storage_format) as writer:
+            registro['filas_entrada'] = registro['filas_salida'] = 0
+            for chunk in self.read_data_chunks(chunksize):
+                df_transformed = self.transform(chunk)
+                writer.write(df_transformed)
+                registro['filas_entrada'] += len(chunk)
+                registro['filas_salida'] += len(df_transformed)
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument('modo', type=str, help='Modo de ejecución: train o test')
+    parser.add_argument('--sin-estado', action='store_true',
+                        help='Transformar cada archivo con sus propios parámetros, '
+                        'sin usar el estado aprendido en train')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Procesar el archivo por bloques de esta cantidad de registros '
+                        '(solo en modo test, con el estado aprendido en train)')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='No usar el cache de los datos transformados')
+    parser.add_argument('--limpiar-cache', action='store_true',
+                        help='Vaciar el cache de los datos transformados')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Leer los datos crudos con tipos compactos (categóricas, '
+                        'enteros chicos y float32)')
+    parser.add_argument('--motor', type=str, default='pandas', choices=MOTORES,
+                        help='Motor que lee y transforma el archivo (duckdb requiere duckdb)')
+    add_profiling_arguments(parser)
     args = parser.parse_args()
 
+    if args.chunksize is not None and (args.modo == 'train' or args.sin_estado):
+        parser.error('--chunksize requiere el modo test con el estado aprendido en train')
+    if args.motor != 'pandas' and args.compacto:
+        parser.error('--compacto requiere el motor pandas')
+
     modo = args.modo
 
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+
     if modo == 'train':
-        IN_PATH = r"..\data\Train_BigMart.csv"
-        OUT_PATH = r"..\data\Transformed\Train_BigMart_Prepared.csv"
+        IN_PATH = os.path.join(current_directory, "..", "data", "Train_BigMart.csv")
+        OUT_PATH = os.path.join(current_directory, "..", "data", "Transformed",
+                                "Train_BigMart_Prepared.csv")
+    else:
+        IN_PATH = os.path.join(current_directory, "..", "data", "Test_BigMart.csv")
+        OUT_PATH = os.path.join(current_directory, "..", "data", "Transformed",
+                                "Test_BigMart_Prepared.csv")
+
+    STATE_PATH = None if args.sin_estado else \
+        os.path.join(current_directory, "..", "model", "feature_state.json")
+
+    CACHE = None
+    if args.chunksize is None and (not args.sin_cache or args.limpiar_cache):
+        # Se importa aquí porque feature_cache importa este módulo
+        from feature_cache import FeatureCache  # pylint: disable=C0415
+        CACHE = FeatureCache(os.path.join(current_directory, "..", "data", "cache"))
+        if args.limpiar_cache:
+            CACHE.invalidate()
+        if args.sin_cache:
+            CACHE = None
+
+    pipeline = FeatureEngineeringPipeline(input_path = IN_PATH,
+                                          output_path = OUT_PATH,
+                                          state_path = STATE_PATH,
+                                          cache = CACHE,
+                                          profiler = profiler_from_args(args),
+                                          compacto = args.compacto,
+                                          motor = args.motor)
+
+    if args.chunksize is not None:
+        pipeline.run_streaming(args.chunksize)
     else:
-        IN_PATH = r"..\data\Test_BigMart.csv"
-        OUT_PATH = r"..\data\Transformed\Test_BigMart_Prepared.csv"
+        pipeline.run(fit = modo == 'train')
 
-    FeatureEngineeringPipeline(input_path = IN_PATH,
-                                output_path = OUT_PATH).run()
+    print(pipeline.profiler.report())
+    export_profile(pipeline.profiler, args, f"feature_engineering_{modo}")
@@ -0,0 +1,447 @@
+"""
+hyperparameter_search.py
+
+DESCRIPCIÓN: Búsqueda de estimadores e hiperparámetros sobre los datos
+de entrenamiento transformados, en paralelo con un pool de procesos.
+Soporta una grilla o un estudio de Optuna (interfaz ask/tell). La matriz
+de entrenamiento se guarda una única vez en archivos .npy que los
+procesos abren como memory map, de modo que no se copia a cada uno.
+Solo el proceso principal escribe en MLflow: cada prueba se registra
+como un run anidado a medida que termina.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+import numpy as np
+from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.tree import DecisionTreeRegressor
+
+from train import ModelTrainingPipeline
+
+ESTIMADORES = {'LinearRegression': LinearRegression,
+               'Ridge': Ridge,
+               'Lasso': Lasso,
+               'ElasticNet': ElasticNet,
+               'DecisionTreeRegressor': DecisionTreeRegressor}
+
+# Estimadores lineales (con coef_ e intercept_), los únicos que pueden
+# reemplazar a model.pkl: score.py, compiled_model.py y model_arrays los requieren
+LINEALES = ('LinearRegression', 'Ridge', 'Lasso', 'ElasticNet')
+
+GRILLA = {'LinearRegression': {},
+          'Ridge': {'alpha': [0.01, 0.1, 1.0, 10.0, 100.0]},
+          'Lasso': {'alpha': [0.01, 0.1, 1.0, 10.0]},
+          'ElasticNet': {'alpha': [0.01, 0.1, 1.0], 'l1_ratio': [0.2, 0.5, 0.8]},
+          'DecisionTreeRegressor': {'max_depth': [4, 6, 8, 12],
+                                    'min_samples_leaf': [1, 10, 50]}}
+
+SEMILLA = 42
+
+# Matriz de entrenamiento de cada proceso del pool, abierta como memory map
+_MATRIZ = {}
+
+
+def grid_trials(grilla: dict = None) -> list:
+    """
+    Devuelve todas las combinaciones de estimador e hiperparámetros de la grilla.
+
+    :param grilla: Diccionario {estimador: {hiperparámetro: valores}}.
+
+    :return: Lista de tuplas (estimador, hiperparámetros).
+    :rtype: list
+    """
+    grilla = GRILLA if grilla is None else grilla
+    pruebas = []
+    for estimador, espacio in grilla.items():
+        nombres = list(espacio)
+        for valores in itertools.product(*(espacio[nombre] for nombre in nombres)):
+            pruebas.append((estimador, dict(zip(nombres, valores))))
+
+    return pruebas
+
+
+def suggest_trial(trial) -> tuple:
+    """
+    Sugiere un estimador y sus hiperparámetros en una prueba de Optuna.
+
+    :param trial: Prueba obtenida con study.ask().
+
+    :return: Tupla (estimador, hiperparámetros).
+    :rtype: tuple
+    """
+    estimador = trial.suggest_categorical('estimador', list(ESTIMADORES))
+    if estimador in ('Ridge', 'Lasso', 'ElasticNet'):
+        trial.suggest_float('alpha', 1e-3, 100.0, log=True)
+    if estimador == 'ElasticNet':
+        trial.suggest_float('l1_ratio', 0.0, 1.0)
+    if estimador == 'DecisionTreeRegressor':
+        trial.suggest_int('max_depth', 2, 16)
+        trial.suggest_int('min_samples_leaf', 1, 100, log=True)
+
+    parametros = {nombre: valor for nombre, valor in trial.params.items() if nombre != 'estimador'}
+
+    return estimador, parametros
+
+
+def build_estimator(estimador: str, parametros: dict):
+    """
+    Crea un estimador de sklearn con los hiperparámetros indicados.
+
+    :param estimador: Nombre del estimador (clave de ESTIMADORES).
+    :param parametros: Hiperparámetros.
+
+    :return: Estimador sin entrenar.
+    """
+    clase = ESTIMADORES[estimador]
+    if 'random_state' in clase().get_params():
+        parametros = {'random_state': SEMILLA, **parametros}
+
+    return clase(**parametros)
+
+
+def init_worker(x_path: str, y_path: str) -> None:
+    """
+    Abre la matriz de entrenamiento compartida en cada proceso del pool.
+
+    :param x_path: Ruta del .npy con las features.
+    :param y_path: Ruta del .npy con la variable objetivo.
+    """
+    _MATRIZ['x'] = np.load(x_path, mmap_mode='r')
+    _MATRIZ['y'] = np.load(y_path, mmap_mode='r')
+
+
+def evaluate_trial(estimador: str, parametros: dict, folds: int) -> dict:
+    """
+    Evalúa una combinación con validación cruzada sobre la matriz compartida.
+
+    :param estimador: Nombre del estimador.
+    :param parametros: Hiperparámetros.
+    :param folds: Cantidad de folds.
+
+    :return: Promedio de rmse, mae y r2 entre folds, y el tiempo total.
+    :rtype: dict
+    """
+    x_train, y_train = _MATRIZ['x'], _MATRIZ['y']
+    inicio = time.perf_counter()
+
+    metricas = []
+    for train_idx, valid_idx in KFold(folds, shuffle=True, random_state=SEMILLA).split(x_train):
+        model = build_estimator(estimador, parametros)
+        model.fit(x_train[train_idx], y_train[train_idx])
+        pred = model.predict(x_train[valid_idx])
+        metricas.append((np.sqrt(mean_squared_error(y_train[valid_idx], pred)),
+                         mean_absolute_error(y_train[valid_idx], pred),
+                         r2_score(y_train[valid_idx], pred)))
+
+    rmse, mae, r2 = np.mean(metricas, axis=0)
+
+    return {'rmse': float(rmse), 'mae': float(mae), 'r2': float(r2),
+            'fit_time': time.perf_counter() - inicio}
+
+
+class HyperparameterSearch:
+    """
+    Clase que evalúa combinaciones de estimadores e hiperparámetros en
+    paralelo y registra cada prueba en MLflow desde el proceso principal.
+    """
+
+    def __init__(self, input_path: str, n_workers: int = None, folds: int = 5,
+                 tracking_uri: str = None, artifact_location: str = None,
+                 experiment_name: str = 'BigMart_hyperparameter_search',
+                 storage_format: str = None, progreso=None):
+        """
+        :param input_path: Ruta de los datos de entrenamiento transformados.
+        :param n_workers: Cantidad de procesos. Si es None, uno por CPU.
+        :param folds: Cantidad de folds de la validación cruzada.
+        :param tracking_uri: URI del backend de MLflow (por ejemplo
+                             sqlite:///mydb.sqlite). Si es None no se usa MLflow.
+        :param artifact_location: Directorio de artefactos del experimento.
+        :param experiment_name: Nombre del experimento de MLflow.
+        :param storage_format: Formato de los datos de entrada.
+        :param progreso: Función que recibe (estimador, parametros, metricas)
+                         al terminar cada prueba. Si es None no se informa
+                         el progreso.
+        """
+        self.training_pipeline = ModelTrainingPipeline(input_path = input_path,
+                                                       model_path = None,
+                                                       storage_format = storage_format)
+        self.n_workers = n_workers or os.cpu_count()
+        self.folds = folds
+        self.tracking_uri = tracking_uri
+        self.artifact_location = artifact_location
+        self.experiment_name = experiment_name
+        self.mlflow = None
+        self.results = []
+        self.progreso = progreso
+
+    def setup_mlflow(self) -> None:
+        """
+        Configura el backend y el experimento de MLflow.
+        """
+        if self.tracking_uri is None:
+            return
+
+        import mlflow  # pylint: disable=C0415
+
+        mlflow.set_tracking_uri(self.tracking_uri)
+        if mlflow.get_experiment_by_name(self.experiment_name) is None:
+            mlflow.create_experiment(self.experiment_name,
+                                     artifact_location=self.artifact_location)
+        mlflow.set_experiment(self.experiment_name)
+        self.mlflow = mlflow
+
+    def log_trial(self, estimador: str, parametros: dict, metricas: dict) -> None:
+        """
+        Guarda el resultado de una prueba y lo registra en MLflow como run anidado.
+
+        :param estimador: Nombre del estimador.
+        :param parametros: Hiperparámetros.
+        :param metricas: Métricas devueltas por evaluate_trial.
+        """
+        self.results.append({'estimador': estimador, 'parametros': parametros, **metricas})
+        if self.progreso is not None:
+            self.progreso(estimador, parametros, metricas)
+
+        if self.mlflow is None:
+            return
+
+        with self.mlflow.start_run(run_name=estimador, nested=True):
+            self.mlflow.log_params({'estimador': estimador, 'folds': self.folds, **parametros})
+            self.mlflow.log_metrics(metricas)
+
+    def share_matrix(self, directorio: str) -> tuple:
+        """
+        Lee los datos transformados y guarda features y variable objetivo
+        como .npy en el directorio indicado.
+
+        :param directorio: Directorio temporal.
+
+        :return: Rutas de los archivos (features, variable objetivo).
+        :rtype: tuple
+        """
+        df_bigmart = self.training_pipeline.read_data()
+        x_path = os.path.join(directorio, 'x_train.npy')
+        y_path = os.path.join(directorio, 'y_train.npy')
+        np.save(x_path, df_bigmart.drop(columns=['Item_Outlet_Sales']).to_numpy(dtype=np.float64))
+        np.save(y_path, df_bigmart['Item_Outlet_Sales'].to_numpy(dtype=np.float64))
+
+        return x_path, y_path
+
+    def run_grid(self, grilla: dict = None) -> dict:
+        """
+        Evalúa todas las combinaciones de la grilla.
+
+        :param grilla: Diccionario {estimador: {hiperparámetro: valores}}.
+                       Si es None se usa GRILLA.
+
+        :return: Mejor resultado (menor rmse).
+        :rtype: dict
+        """
+        with tempfile.TemporaryDirectory() as directorio, self.parent_run('grid'):
+            with self.pool(directorio) as executor:
+                futures = {executor.submit(evaluate_trial, estimador, parametros, self.folds):
+                           (estimador, parametros) for estimador, parametros in grid_trials(grilla)}
+                for future in as_completed(futures):
+                    self.log_trial(*futures[future], future.result())
+
+        return self.best()
+
+    def run_optuna(self, n_trials: int) -> dict:
+        """
+        Ejecuta un estudio de Optuna con la interfaz ask/tell, manteniendo
+        n_workers pruebas en ejecución a la vez.
+
+        :param n_trials: Cantidad de pruebas.
+
+        :return: Mejor resultado (menor rmse).
+        :rtype: dict
+        """
+        import optuna  # pylint: disable=C0415
+
+        study = optuna.create_study(direction='minimize',
+                                    sampler=optuna.samplers.TPESampler(seed=SEMILLA))
+        pedidas = 0
+
+        with tempfile.TemporaryDirectory() as directorio, self.parent_run('optuna'):
+            with self.pool(directorio) as executor:
+                pendientes = {}
+                while pedidas < n_trials or pendientes:
+                    while pedidas < n_trials and len(pendientes) < self.n_workers:
+                        trial = study.ask()
+                        estimador, parametros = suggest_trial(trial)
+                        future = executor.submit(evaluate_trial, estimador, parametros, self.folds)
+                        pendientes[future] = (trial, estimador, parametros)
+                        pedidas += 1
+
+                    terminadas, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    for future in terminadas:
+                        trial, estimador, parametros = pendientes.pop(future)
+                        metricas = future.result()
+                        study.tell(trial, metricas['rmse'])
+                        self.log_trial(estimador, parametros, metricas)
+
+        return self.best()
+
+    def pool(self, directorio: str) -> ProcessPoolExecutor:
+        """
+        Crea el pool de procesos con la matriz de entrenamiento compartida.
+
+        :param directorio: Directorio donde se guardan los .npy.
+
+        :return: Pool de procesos.
+        :rtype: ProcessPoolExecutor
+        """
+        return ProcessPoolExecutor(max_workers=self.n_workers, initializer=init_worker,
+                                   initargs=self.share_matrix(directorio))
+
+    def parent_run(self, modo: str):
+        """
+        Abre el run de MLflow que agrupa las pruebas de la búsqueda.
+
+        :param modo: Modo de búsqueda (grid u optuna).
+        """
+        self.setup_mlflow()
+        if self.mlflow is None:
+            return _SinRun()
+
+        run = self.mlflow.start_run(run_name=f'busqueda_{modo}')
+        self.mlflow.log_params({'modo': modo, 'folds': self.folds, 'n_workers': self.n_workers})
+
+        return run
+
+    def best(self, lineal: bool = False) -> dict:
+        """
+        Devuelve el resultado con menor rmse.
+
+        :param lineal: Si es True, solo entre los estimadores de LINEALES.
+
+        :return: Mejor resultado, o None si ninguno cumple.
+        :rtype: dict
+        """
+        resultados = [resultado for resultado in self.results
+                      if not lineal or resultado['estimador'] in LINEALES]
+
+        return min(resultados, key=lambda resultado: resultado['rmse'], default=None)
+
+    def best_estimator(self, lineal: bool = False):
+        """
+        Devuelve el mejor estimador, sin entrenar.
+
+        :param lineal: Si es True, solo entre los estimadores de LINEALES.
+        """
+        mejor = self.best(lineal)
+
+        return build_estimator(mejor['estimador'], mejor['parametros'])
+
+    def save_best(self, model_path: str, arrays_path: str = None,
+                  no_lineal_path: str = None) -> dict:
+        """
+        Entrena con todos los datos el mejor estimador lineal y lo guarda en
+        model_path y, como .npy + schema.json, en arrays_path, de modo que
+        ambos formatos queden sincronizados. Si el mejor estimador no es
+        lineal, no reemplaza a model.pkl: se entrena y se guarda aparte, en
+        no_lineal_path (por ejemplo, para compararlo con multi_model.py).
+
+        :param model_path: Ruta del modelo .pkl.
+        :param arrays_path: Directorio del modelo .npy + schema.json.
+        :param no_lineal_path: Ruta del mejor estimador si no es lineal. Si
+                               es None no se guarda.
+
+        :return: Diccionario {ruta: resultado} de los modelos guardados.
+        :rtype: dict
+        """
+        guardados = {}
+        mejor, mejor_lineal = self.best(), self.best(lineal=True)
+
+        if mejor_lineal is not None:
+            ModelTrainingPipeline(input_path = self.training_pipeline.input_path,
+                                  model_path = model_path,
+                                  storage_format = self.training_pipeline.storage_format,
+                                  arrays_path = arrays_path,
+                                  estimator = self.best_estimator(lineal=True)).run()
+            guardados[model_path] = mejor_lineal
+
+        if mejor is not mejor_lineal and no_lineal_path is not None:
+            ModelTrainingPipeline(input_path = self.training_pipeline.input_path,
+                                  model_path = no_lineal_path,
+                                  storage_format = self.training_pipeline.storage_format,
+                                  estimator = self.best_estimator()).run()
+            guardados[no_lineal_path] = mejor
+
+        return guardados
+
+
+class _SinRun:
+    """
+    Contexto vacío que reemplaza al run de MLflow cuando no se usa MLflow.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def print_trial(estimador: str, parametros: dict, metricas: dict) -> None:
+    """
+    Imprime una línea con el resultado de una prueba.
+    """
+    print(f"{estimador:<22} {str(parametros):<46} rmse={metricas['rmse']:.2f} "
+          f"r2={metricas['r2']:.4f}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('modo', type=str, choices=['grid', 'optuna'],
+                        help='Grilla de GRILLA o estudio de Optuna')
+    parser.add_argument('--trials', type=int, default=50,
+                        help='Cantidad de pruebas del estudio de Optuna')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Cantidad de procesos (por defecto uno por CPU)')
+    parser.add_argument('--folds', type=int, default=5,
+                        help='Cantidad de folds de la validación cruzada')
+    parser.add_argument('--sin-mlflow', action='store_true',
+                        help='No registrar las pruebas en MLflow')
+    parser.add_argument('--guardar-mejor', action='store_true',
+                        help='Entrenar el mejor estimador lineal con todos los datos y '
+                        'guardarlo en ../model/model.pkl y ../model/model_arrays; si el '
+                        'mejor no es lineal, se guarda en ../model/model_no_lineal.pkl')
+    args = parser.parse_args()
+
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+    root_directory = os.path.abspath(os.path.join(current_directory, "..", ".."))
+
+    search = HyperparameterSearch(
+        input_path = os.path.join(current_directory, "..", "data", "Transformed",
+                                  "Train_BigMart_Prepared.csv"),
+        n_workers = args.workers,
+        folds = args.folds,
+        tracking_uri = None if args.sin_mlflow else
+        "sqlite:///" + os.path.join(root_directory, "mydb.sqlite"),
+        artifact_location = os.path.join(root_directory, "mlartifacts"),
+        progreso = print_trial)
+
+    resultado = search.run_grid() if args.modo == 'grid' else search.run_optuna(args.trials)
+    print(f"Mejor: {resultado['estimador']} {resultado['parametros']} "
+          f"rmse={resultado['rmse']:.2f} r2={resultado['r2']:.4f}")
+
+    if args.guardar_mejor:
+        model_directory = os.path.join(current_directory, "..", "model")
+        guardados = search.save_best(
+            model_path = os.path.join(model_directory, "model.pkl"),
+            arrays_path = os.path.join(model_directory, "model_arrays"),
+            no_lineal_path = os.path.join(model_directory, "model_no_lineal.pkl"))
+        for ruta, guardado in guardados.items():
+            print(f"Guardado en {os.path.normpath(ruta)}: {guardado['estimador']} "
+                  f"{guardado['parametros']} rmse={guardado['rmse']:.2f}")
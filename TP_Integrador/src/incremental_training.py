@@ -0,0 +1,505 @@
+"""
+incremental_training.py
+
+DESCRIPCIÓN: Entrenamiento incremental del modelo lineal. En lugar de
+reentrenar LinearRegression sobre todo el histórico, se guardan las
+estadísticas suficientes de cada lote de datos transformados (peso,
+medias y las matrices centradas XᵀX, Xᵀy e yᵀy) y cada lote nuevo se
+incorpora en O(filas nuevas). Con todos los lotes y sin decaimiento, el
+modelo resultante es el mismo que el de un reentrenamiento completo
+(solución de mínima norma de mínimos cuadrados, igual que sklearn).
+
+Admite una ventana de los últimos N lotes y un decaimiento exponencial
+del peso de los lotes anteriores. El modelo se publica antes que el
+checkpoint: model.pkl se reemplaza con os.replace y model_arrays es un
+enlace simbólico que se reemplaza de la misma forma (ver
+model_format.publish_linear_model). Luego cada checkpoint se escribe en
+un directorio nuevo y se publica reemplazando el archivo CURRENT. Si el
+proceso se interrumpe entre ambos pasos, el checkpoint queda detrás del
+modelo y la próxima ejecución vuelve a incorporar los mismos lotes, con
+el mismo resultado; el checkpoint nunca queda adelantado al modelo.
+
+Sin checkpoint, las estadísticas se empiezan desde cero solo si se pide
+explícitamente (desde_cero), para no reemplazar el modelo entrenado por
+uno ajustado únicamente con los lotes nuevos.
+
+El estado de la ingeniería de features no se vuelve a aprender: los
+lotes nuevos se transforman con el feature_state.json de train.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import pickle as pkl
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from feature_cache import file_hash
+from feature_engineering import FeatureEngineeringPipeline
+from model_format import publish_linear_model
+from profiling import StageProfiler, add_profiling_arguments, export_profile, profiler_from_args
+from storage import read_frame
+
+VERSION_CHECKPOINT = 1
+ARCHIVO_ACTUAL = 'CURRENT'
+ARCHIVO_ESTADISTICAS = 'estadisticas.json'
+TARGET = 'Item_Outlet_Sales'
+
+# Arrays de las estadísticas, apilados con un lote por fila
+ARRAYS = ('peso', 'media_x', 'media_y', 'cxx', 'cxy', 'cyy')
+
+
+def batch_statistics(x_batch: np.ndarray, y_batch: np.ndarray) -> dict:
+    """
+    Calcula las estadísticas suficientes de un lote.
+
+    :param x_batch: Matriz de n_registros x n_features.
+    :param y_batch: Vector del target.
+
+    :return: Diccionario con peso, media_x, media_y y las sumas centradas
+             cxx = Σ(x-x̄)(x-x̄)ᵀ, cxy = Σ(x-x̄)(y-ȳ) y cyy = Σ(y-ȳ)².
+    :rtype: dict
+    """
+    media_x = x_batch.mean(axis=0)
+    media_y = y_batch.mean()
+    x_centrado = x_batch - media_x
+    y_centrado = y_batch - media_y
+
+    return {'peso': float(len(x_batch)),
+            'media_x': media_x,
+            'media_y': float(media_y),
+            'cxx': x_centrado.T @ x_centrado,
+            'cxy': x_centrado.T @ y_centrado,
+            'cyy': float(y_centrado @ y_centrado)}
+
+
+def merge_statistics(total: dict, lote: dict) -> dict:
+    """
+    Combina las estadísticas de dos conjuntos de datos (fórmula de Chan),
+    sin pérdida de precisión por restar sumas grandes.
+
+    :param total: Estadísticas acumuladas, o None.
+    :param lote: Estadísticas a agregar.
+
+    :return: Estadísticas del conjunto combinado.
+    :rtype: dict
+    """
+    if total is None or total['peso'] == 0:
+        return dict(lote)
+
+    peso = total['peso'] + lote['peso']
+    delta_x = lote['media_x'] - total['media_x']
+    delta_y = lote['media_y'] - total['media_y']
+    factor = total['peso'] * lote['peso'] / peso
+
+    return {'peso': peso,
+            'media_x': total['media_x'] + delta_x * lote['peso'] / peso,
+            'media_y': total['media_y'] + delta_y * lote['peso'] / peso,
+            'cxx': total['cxx'] + lote['cxx'] + factor * np.outer(delta_x, delta_x),
+            'cxy': total['cxy'] + lote['cxy'] + factor * delta_x * delta_y,
+            'cyy': total['cyy'] + lote['cyy'] + factor * delta_y * delta_y}
+
+
+class SufficientStatistics:
+    """
+    Clase que acumula las estadísticas suficientes de la regresión lineal
+    por lote. Sin ventana se guarda un único acumulado; con ventana se
+    guarda cada lote para poder descartar el más antiguo.
+    """
+
+    def __init__(self, feature_names: list, ventana: int = None, decaimiento: float = 1.0):
+        """
+        :param feature_names: Nombres de las features, en orden.
+        :param ventana: Cantidad de lotes a conservar. Si es None se usan todos.
+        :param decaimiento: Factor entre 0 y 1 por el que se multiplica el
+                            peso de los lotes anteriores en cada actualización.
+        """
+        if ventana is not None and ventana < 1:
+            raise ValueError("La ventana debe ser de al menos un lote")
+        if not 0 < decaimiento <= 1:
+            raise ValueError("El decaimiento debe estar entre 0 (excluido) y 1")
+
+        self.feature_names = list(feature_names)
+        self.ventana = ventana
+        self.decaimiento = decaimiento
+        self.lotes = []
+        self.ids = []
+
+    def update(self, x_batch: np.ndarray, y_batch: np.ndarray, lote_id: str = None) -> None:
+        """
+        Incorpora un lote.
+
+        :param x_batch: Matriz de n_registros x n_features, en el orden de feature_names.
+        :param y_batch: Vector del target.
+        :param lote_id: Identificador del lote (por ejemplo, el hash del archivo).
+        """
+        if self.decaimiento < 1:
+            for lote in self.lotes:
+                for nombre in ('peso', 'cxx', 'cxy', 'cyy'):
+                    lote[nombre] = lote[nombre] * self.decaimiento
+
+        nuevo = batch_statistics(np.asarray(x_batch, dtype=np.float64),
+                                 np.asarray(y_batch, dtype=np.float64))
+        if self.ventana is None and self.lotes:
+            self.lotes = [merge_statistics(self.lotes[0], nuevo)]
+        else:
+            self.lotes.append(nuevo)
+        self.ids.append(lote_id)
+
+        if self.ventana is not None:
+            self.lotes = self.lotes[-self.ventana:]
+            self.ids = self.ids[-self.ventana:]
+
+    def total(self) -> dict:
+        """
+        Devuelve las estadísticas combinadas de todos los lotes conservados.
+
+        :rtype: dict
+        """
+        total = None
+        for lote in self.lotes:
+            total = merge_statistics(total, lote)
+
+        if total is None:
+            raise ValueError("No hay lotes incorporados")
+
+        return total
+
+    def solve(self) -> tuple:
+        """
+        Resuelve las ecuaciones normales centradas. Con lstsq se obtiene la
+        solución de mínima norma, la misma que LinearRegression cuando hay
+        features colineales.
+
+        :return: Tupla (coeficientes, término independiente).
+        :rtype: tuple
+        """
+        total = self.total()
+        coef = np.linalg.lstsq(total['cxx'], total['cxy'], rcond=None)[0]
+        intercept = total['media_y'] - total['media_x'] @ coef
+
+        return coef, float(intercept)
+
+    def to_model(self) -> LinearRegression:
+        """
+        Devuelve un LinearRegression con los coeficientes resueltos, que se
+        puede usar y guardar igual que uno entrenado con fit().
+
+        :rtype: LinearRegression
+        """
+        coef, intercept = self.solve()
+        model = LinearRegression()
+        model.coef_ = coef
+        model.intercept_ = intercept
+        model.n_features_in_ = len(self.feature_names)
+        model.feature_names_in_ = np.array(self.feature_names, dtype=object)
+        model.rank_ = int(np.linalg.matrix_rank(self.total()['cxx']))
+
+        return model
+
+    def save(self, path: str) -> None:
+        """
+        Escribe las estadísticas en un directorio nuevo (un .npy por array
+        y estadisticas.json).
+
+        :param path: Directorio de salida. No debe existir.
+        """
+        os.makedirs(path)
+        for nombre in ARRAYS:
+            np.save(os.path.join(path, f"{nombre}.npy"),
+                    np.array([lote[nombre] for lote in self.lotes], dtype=np.float64))
+
+        with open(os.path.join(path, ARCHIVO_ESTADISTICAS), 'w', encoding='utf-8') as f_json:
+            json.dump({'version': VERSION_CHECKPOINT,
+                       'feature_names': self.feature_names,
+                       'ventana': self.ventana,
+                       'decaimiento': self.decaimiento,
+                       'ids': self.ids}, f_json, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'SufficientStatistics':
+        """
+        Carga las estadísticas guardadas con save.
+
+        :param path: Directorio de las estadísticas.
+
+        :rtype: SufficientStatistics
+        """
+        with open(os.path.join(path, ARCHIVO_ESTADISTICAS), 'r', encoding='utf-8') as f_json:
+            info = json.load(f_json)
+
+        if info.get('version') != VERSION_CHECKPOINT:
+            raise ValueError(f"Versión de checkpoint no soportada: {info.get('version')}")
+
+        estadisticas = cls(info['feature_names'], info['ventana'], info['decaimiento'])
+        arrays = {nombre: np.load(os.path.join(path, f"{nombre}.npy")) for nombre in ARRAYS}
+        estadisticas.lotes = [{nombre: arrays[nombre][i] if arrays[nombre].ndim > 1
+                               else float(arrays[nombre][i]) for nombre in ARRAYS}
+                              for i in range(len(arrays['peso']))]
+        estadisticas.ids = info['ids']
+
+        return estadisticas
+
+
+class IncrementalTrainingPipeline:
+    """
+    Clase que incorpora lotes nuevos de datos a las estadísticas guardadas
+    en un directorio de checkpoints y exporta el modelo actualizado.
+    """
+
+    def __init__(self, checkpoint_dir: str, model_path: str, arrays_path: str = None,
+                 ventana: int = None, decaimiento: float = None, state_path: str = None,
+                 profiler: StageProfiler = None, conservar: int = 2,
+                 desde_cero: bool = False):
+        """
+        :param checkpoint_dir: Directorio de los checkpoints.
+        :param model_path: Ruta del modelo .pkl que se actualiza.
+        :param arrays_path: Directorio donde además se guarda el modelo como
+                            .npy + schema.json (ver model_format.py).
+        :param ventana: Cantidad de lotes a conservar. Si es None se mantiene
+                        la del checkpoint (todos los lotes si no hay checkpoint).
+        :param decaimiento: Factor de decaimiento por actualización. Si es
+                            None se mantiene el del checkpoint (1, sin decaimiento).
+        :param state_path: Estado de la ingeniería de features, para
+                           transformar lotes sin procesar. Si es None los
+                           lotes deben estar ya transformados.
+        :param profiler: StageProfiler donde run() registra sus etapas.
+        :param conservar: Cantidad de checkpoints anteriores que se conservan,
+                          además del publicado.
+        :param desde_cero: Si es True y no hay checkpoint, las estadísticas
+                           empiezan con los lotes indicados (por ejemplo,
+                           todo el conjunto de entrenamiento). Si es False
+                           y no hay checkpoint, run() y partial_fit() fallan.
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.model_path = model_path
+        self.arrays_path = arrays_path
+        self.ventana = ventana
+        self.decaimiento = decaimiento
+        self.conservar = conservar
+        self.desde_cero = desde_cero
+        self.profiler = profiler if profiler is not None else StageProfiler()
+        self.statistics = None
+
+        self.feature_pipeline = None
+        if state_path is not None:
+            self.feature_pipeline = FeatureEngineeringPipeline(input_path = None,
+                                                               output_path = None,
+                                                               state_path = state_path)
+            self.feature_pipeline.load_state()
+
+    def current_checkpoint(self) -> str:
+        """
+        Devuelve el directorio del checkpoint publicado, o None si no hay.
+
+        :rtype: str
+        """
+        actual = os.path.join(self.checkpoint_dir, ARCHIVO_ACTUAL)
+        if not os.path.isfile(actual):
+            return None
+
+        with open(actual, 'r', encoding='utf-8') as f_actual:
+            return os.path.join(self.checkpoint_dir, f_actual.read().strip())
+
+    def require_checkpoint(self) -> str:
+        """
+        Devuelve el directorio del checkpoint publicado, o None si no hay y
+        se pidió empezar desde cero.
+
+        :raises FileNotFoundError: Si no hay checkpoint y desde_cero es False.
+        :rtype: str
+        """
+        checkpoint = self.current_checkpoint()
+        if checkpoint is None and not self.desde_cero:
+            raise FileNotFoundError(
+                f"No hay un checkpoint en {self.checkpoint_dir}: el modelo se ajustaría "
+                "solo con los lotes nuevos. Para empezar las estadísticas con estos lotes "
+                "(por ejemplo, con el conjunto de entrenamiento) usar desde_cero (--desde-cero)")
+
+        return checkpoint
+
+    def load_checkpoint(self, feature_names: list) -> SufficientStatistics:
+        """
+        Carga el checkpoint publicado, o crea estadísticas vacías si no hay
+        y se pidió empezar desde cero. La ventana y el decaimiento indicados
+        reemplazan a los guardados.
+
+        :param feature_names: Nombres de las features de los lotes nuevos.
+
+        :raises FileNotFoundError: Si no hay checkpoint y desde_cero es False.
+        :rtype: SufficientStatistics
+        """
+        checkpoint = self.require_checkpoint()
+        if checkpoint is None:
+            self.statistics = SufficientStatistics(feature_names, self.ventana,
+                                                   self.decaimiento or 1.0)
+            return self.statistics
+
+        self.statistics = SufficientStatistics.load(checkpoint)
+        if self.statistics.feature_names != list(feature_names):
+            raise ValueError("Las features del lote no coinciden con las del checkpoint")
+        if self.decaimiento is not None:
+            self.statistics.decaimiento = self.decaimiento
+        if self.ventana is not None:
+            if self.statistics.ventana is None and self.statistics.lotes:
+                raise ValueError("El checkpoint acumula todos los lotes y no se puede "
+                                 "pasar a una ventana")
+            self.statistics.ventana = self.ventana
+
+        return self.statistics
+
+    def save_checkpoint(self) -> str:
+        """
+        Escribe las estadísticas en un directorio temporal, lo renombra como
+        checkpoint nuevo y lo publica reemplazando CURRENT. Luego descarta
+        los checkpoints más antiguos.
+
+        :return: Directorio del checkpoint publicado.
+        :rtype: str
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        versiones = sorted(nombre for nombre in os.listdir(self.checkpoint_dir)
+                           if nombre.startswith('v'))
+        numero = int(versiones[-1][1:]) + 1 if versiones else 1
+        nombre = f"v{numero:06d}"
+
+        temporal = tempfile.mkdtemp(dir=self.checkpoint_dir, prefix='.tmp-')
+        try:
+            self.statistics.save(os.path.join(temporal, 'checkpoint'))
+            os.replace(os.path.join(temporal, 'checkpoint'),
+                       os.path.join(self.checkpoint_dir, nombre))
+        finally:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+        actual = os.path.join(self.checkpoint_dir, ARCHIVO_ACTUAL)
+        with open(actual + '.tmp', 'w', encoding='utf-8') as f_actual:
+            f_actual.write(nombre)
+            f_actual.flush()
+            os.fsync(f_actual.fileno())
+        os.replace(actual + '.tmp', actual)
+
+        for anterior in versiones[:max(len(versiones) - self.conservar, 0)]:
+            shutil.rmtree(os.path.join(self.checkpoint_dir, anterior), ignore_errors=True)
+
+        return os.path.join(self.checkpoint_dir, nombre)
+
+    def model_dump(self, model) -> None:
+        """
+        Guarda el modelo reemplazando el archivo anterior con os.replace y
+        publica los arrays con publish_linear_model.
+
+        :param model: Modelo generado por SufficientStatistics.to_model().
+        """
+        with open(self.model_path + '.tmp', 'wb') as f_pkl:
+            pkl.dump(model, f_pkl)
+            f_pkl.flush()
+            os.fsync(f_pkl.fileno())
+        os.replace(self.model_path + '.tmp', self.model_path)
+
+        if self.arrays_path is not None:
+            publish_linear_model(model, self.arrays_path)
+
+    def partial_fit(self, df_batch: pd.DataFrame, lote_id: str = None) -> bool:
+        """
+        Incorpora un lote de datos. Los lotes sin procesar se transforman
+        con el estado de la ingeniería de features.
+
+        :param df_batch: Lote con el target Item_Outlet_Sales.
+        :param lote_id: Identificador del lote. Un lote ya incorporado se omite.
+
+        :return: True si el lote se incorporó.
+        :rtype: bool
+        """
+        if self.feature_pipeline is not None:
+            df_batch = self.feature_pipeline.transform(df_batch)
+
+        x_batch = df_batch.drop(columns=[TARGET])
+        if self.statistics is None:
+            self.load_checkpoint(list(x_batch.columns))
+        if lote_id is not None and lote_id in self.statistics.ids:
+            return False
+
+        self.statistics.update(x_batch[self.statistics.feature_names].to_numpy(),
+                               df_batch[TARGET].to_numpy(), lote_id)
+
+        return True
+
+    def run(self, input_paths: list, storage_format: str = None) -> int:
+        """
+        Incorpora los lotes de los archivos indicados, en orden, y publica
+        el modelo y luego el checkpoint actualizados.
+
+        :param input_paths: Archivos de los lotes.
+        :param storage_format: Formato de los archivos. Si es None se infiere
+                               de la extensión.
+
+        :return: Cantidad de lotes incorporados.
+        :rtype: int
+        """
+        # Se verifica antes de leer los lotes
+        self.require_checkpoint()
+
+        incorporados = 0
+        for ruta in input_paths:
+            with self.profiler.stage('partial_fit') as registro:
+                df_batch = read_frame(ruta, storage_format)
+                registro['filas_entrada'] = len(df_batch)
+                if self.partial_fit(df_batch, lote_id=file_hash(ruta)):
+                    incorporados += 1
+                    registro['filas_salida'] = len(df_batch)
+
+        if not incorporados:
+            return 0
+
+        with self.profiler.stage('model_dump'):
+            self.model_dump(self.statistics.to_model())
+
+        with self.profiler.stage('save_checkpoint'):
+            self.save_checkpoint()
+
+        return incorporados
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('lotes', type=str, nargs='+',
+                        help='Archivos con los lotes nuevos, en orden cronológico')
+    parser.add_argument('--sin-procesar', action='store_true',
+                        help='Los lotes tienen el formato de Train_BigMart.csv y se '
+                        'transforman con feature_state.json')
+    parser.add_argument('--ventana', type=int, default=None,
+                        help='Cantidad de lotes a conservar')
+    parser.add_argument('--decaimiento', type=float, default=None,
+                        help='Factor por el que se multiplica el peso de los lotes '
+                        'anteriores en cada actualización')
+    parser.add_argument('--desde-cero', action='store_true',
+                        help='Si no hay checkpoint, empezar las estadísticas con estos lotes '
+                        '(por ejemplo, con el conjunto de entrenamiento)')
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+    model_directory = os.path.join(current_directory, "..", "model")
+
+    pipeline = IncrementalTrainingPipeline(
+        checkpoint_dir = os.path.join(model_directory, "incremental"),
+        model_path = os.path.join(model_directory, "model.pkl"),
+        arrays_path = os.path.join(model_directory, "model_arrays"),
+        ventana = args.ventana,
+        decaimiento = args.decaimiento,
+        state_path = os.path.join(model_directory, "feature_state.json")
+                     if args.sin_procesar else None,
+        profiler = profiler_from_args(args),
+        desde_cero = args.desde_cero)
+
+    lotes = pipeline.run(args.lotes)
+    print(f"{lotes} lotes incorporados")
+    print(pipeline.profiler.report())
+    export_profile(pipeline.profiler, args, "incremental_training")
@@ -1,15 +1,96 @@
 """
 inference_pipeline.py
 
-DESCRIPCIÓN: Corre los scripts de feature engineering y predict para
-realizar predicciones sobre un conjunto de datos de entrada.
+DESCRIPCIÓN: Corre los pasos de feature engineering y predict para
+realizar predicciones sobre un conjunto de datos de entrada. Las etapas
+se ejecutan en el mismo proceso y se comparten los datos en memoria.
 
 AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
 FECHA: 10/08/2023
 """
 
-import subprocess
+import argparse
+import os
 
-subprocess.run(['Python', 'feature_engineering.py', 'test'], check=False)
+from monitoring import DriftMonitor
+from feature_engineering import MOTORES
+from lookup_index import add_index_arguments
+from orchestrator import PipelineOrchestrator
+from profiling import add_profiling_arguments, export_profile, profiler_from_args
 
-subprocess.run(['Python', 'predict.py'], check=False)
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sin-intermedio', action='store_true',
+                        help='No escribir Test_BigMart_Prepared.csv')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Procesar los datos por bloques de esta cantidad de registros')
+    parser.add_argument('--formato', type=str, default='csv',
+                        choices=['csv', 'parquet', 'arrow'],
+                        help='Formato de los datos transformados y de las predicciones')
+    parser.add_argument('--modelo-arrays', action='store_true',
+                        help='Cargar el modelo desde ../model/model_arrays/ en lugar de model.pkl')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Leer los datos crudos con tipos compactos (categóricas, '
+                        'enteros chicos y float32)')
+    parser.add_argument('--sin-monitoreo', action='store_true',
+                        help='No comparar las features y las predicciones con el perfil '
+                        'de entrenamiento')
+    parser.add_argument('--monitoreo', type=str, default=None,
+                        help='Guardar en este archivo json el resumen del monitoreo '
+                        'de deriva y de cada lote')
+    parser.add_argument('--actualizar-indice', action='store_true',
+                        help='Incorporar los datos de entrada al índice de productos y '
+                        'tiendas (../model/lookup_index.json) y guardarlo')
+    parser.add_argument('--motor', type=str, default='pandas', choices=MOTORES,
+                        help='Motor de la ingeniería de features (duckdb requiere duckdb)')
+    add_index_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    if args.motor != 'pandas' and args.compacto:
+        parser.error('--compacto requiere el motor pandas')
+    if args.motor != 'pandas' and (args.chunksize is not None or args.actualizar_indice):
+        parser.error('--chunksize y --actualizar-indice requieren el motor pandas')
+
+    extension = '.' + args.formato
+
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+
+    profile_path = os.path.join(current_directory, "..", "model", "training_profile.json")
+    monitor = None
+    if not args.sin_monitoreo:
+        if os.path.isfile(profile_path):
+            monitor = DriftMonitor.load(profile_path)
+        else:
+            print(f"Sin perfil de entrenamiento en {profile_path}: no se monitorea la deriva")
+
+    orchestrator = PipelineOrchestrator(
+        model_path = os.path.join(current_directory, "..", "model",
+                                  "model_arrays" if args.modelo_arrays else "model.pkl"),
+        state_path = os.path.join(current_directory, "..", "model", "feature_state.json"),
+        write_intermediate = not args.sin_intermedio,
+        storage_format = args.formato,
+        profiler = profiler_from_args(args),
+        compacto = args.compacto,
+        motor = args.motor,
+        monitor = monitor,
+        index_path = os.path.join(current_directory, "..", "model", "lookup_index.json"),
+        actualizar_indice = args.actualizar_indice,
+        index_max_items = args.indice_max_items,
+        index_ttl = args.indice_ttl)
+
+    orchestrator.run_inference(
+        input_path = os.path.join(current_directory, "..", "data", "Test_BigMart.csv"),
+        output_path = os.path.join(current_directory, "..", "data",
+                                   "Test_BigMart_Predictions" + extension),
+        prepared_path = os.path.join(current_directory, "..", "data", "Transformed",
+                                     "Test_BigMart_Prepared" + extension),
+        chunksize = args.chunksize)
+
+    print(orchestrator.report())
+    if monitor is not None:
+        print(monitor.report())
+        if args.monitoreo is not None:
+            monitor.save(args.monitoreo)
+    export_profile(orchestrator.profiler, args, "inference_pipeline")
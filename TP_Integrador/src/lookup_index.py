@@ -0,0 +1,315 @@
+"""
+lookup_index.py
+
+DESCRIPCIÓN: Contiene la clase LookupIndex, un índice persistente de los
+atributos que la transformación necesita de otros registros con la misma
+clave: la moda del peso de cada producto (Item_Identifier) y el tamaño,
+la ubicación, el tipo y el año de apertura de cada tienda
+(Outlet_Identifier). Con el índice, FeatureEngineeringPipeline.transform()
+resuelve cada registro con búsquedas O(1) por clave, incluso si llega
+solo. El índice se construye con Train_BigMart.csv y puede absorber lotes
+nuevos: incorpora productos y tiendas nuevos, actualiza las modas y
+descarta los productos que dejaron de aparecer.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import CODIGOS_OUTLET_SIZE
+
+# Versión del formato del archivo del índice
+VERSION_INDICE = 1
+
+# Límites por defecto: productos en el índice y lotes sin aparecer tras los
+# que se descarta un producto. Train_BigMart.csv tiene 1559 productos
+MAX_ITEMS = 100_000
+TTL = 1000
+
+# Atributos de las tiendas que se guardan en el índice
+ATRIBUTOS_OUTLET = ('Outlet_Size', 'Outlet_Location_Type', 'Outlet_Type',
+                    'Outlet_Establishment_Year')
+
+
+class LookupIndex:
+    """
+    Clase que mantiene los índices clave -> atributos de productos y
+    tiendas.
+
+    De cada producto se guardan los conteos de sus pesos, con a lo sumo
+    `max_pesos` valores distintos (algoritmo space-saving: un peso nuevo
+    reemplaza al menos frecuente), y el número del último lote en que
+    apareció. Los productos se ordenan del menos al más recientemente
+    visto; se descartan los que no aparecen en los últimos `ttl` lotes y,
+    si se supera `max_items`, los menos recientes. La memoria queda
+    acotada por max_items * max_pesos. Las tiendas son pocas y no se
+    descartan.
+
+    Una tienda con algún registro sin tamaño se marca 'sin_tamanio' y todos
+    sus registros se codifican como 'Small', igual que en
+    FeatureEngineeringPipeline.data_transformation().
+    """
+
+    def __init__(self, max_items: int = MAX_ITEMS, ttl: int = TTL, max_pesos: int = 4):
+        """
+        :param max_items: Cantidad máxima de productos. Si es None no hay
+                          límite y la memoria crece con cada producto nuevo.
+        :param ttl: Lotes sin aparecer tras los que se descarta un producto.
+                    Si es None no se descartan por antigüedad.
+        :param max_pesos: Cantidad máxima de pesos distintos por producto.
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self.max_pesos = max_pesos
+        self.lote = 0
+        # Item_Identifier -> {'pesos': {peso: conteo}, 'visto': lote}
+        self.items = OrderedDict()
+        # Outlet_Identifier -> atributos, 'sin_tamanio' y 'visto'
+        self.outlets = {}
+        self.descartados = 0
+        self._tablas = {}
+
+    @classmethod
+    def from_frame(cls, df_raw: pd.DataFrame, **kwargs) -> 'LookupIndex':
+        """
+        Construye el índice con los datos crudos de entrenamiento.
+
+        :param df_raw: DataFrame con el formato de Train_BigMart.csv.
+        :param kwargs: Parámetros de LookupIndex.
+
+        :rtype: LookupIndex
+        """
+        index = cls(**kwargs)
+        index.absorb(df_raw)
+
+        return index
+
+    @staticmethod
+    def moda(pesos: dict) -> float:
+        """
+        Devuelve el peso más frecuente; ante empates, el menor (igual que
+        FeatureEngineeringPipeline.moda_por_clave).
+        """
+        return min(pesos.items(), key=lambda peso: (-peso[1], peso[0]))[0]
+
+    def _sumar_peso(self, pesos: dict, peso: float, conteo: int) -> None:
+        """
+        Suma el conteo de un peso. Si el producto ya tiene max_pesos valores
+        distintos, el peso nuevo reemplaza al menos frecuente y hereda su
+        conteo, de modo que los pesos frecuentes no se pierden.
+        """
+        if peso in pesos or len(pesos) < self.max_pesos:
+            pesos[peso] = pesos.get(peso, 0) + conteo
+            return
+
+        menor = min(pesos, key=pesos.get)
+        pesos[peso] = pesos.pop(menor) + conteo
+
+    def absorb(self, df_raw: pd.DataFrame) -> dict:
+        """
+        Incorpora un lote de datos crudos como un lote nuevo: suma los pesos
+        de cada producto, actualiza los atributos de cada tienda y marca
+        como vistos los productos del lote. Luego descarta los productos
+        según ttl y max_items.
+
+        :param df_raw: DataFrame con el formato de Train_BigMart.csv o de
+                       Test_BigMart.csv.
+
+        :return: Cantidad de productos y tiendas nuevos y de productos descartados.
+        :rtype: dict
+        """
+        self.lote += 1
+        nuevos_items = len(self.items)
+        nuevos_outlets = len(self.outlets)
+        descartados = self.descartados
+
+        pesos = df_raw.loc[df_raw['Item_Weight'].notnull(), ['Item_Identifier', 'Item_Weight']]
+        conteos = pesos.groupby(['Item_Identifier', 'Item_Weight'], sort=False,
+                                observed=True).size()
+        if df_raw['Item_Weight'].dtype == np.float32:
+            # Mismo decimal que guarda FeatureEngineeringPipeline.fit()
+            valores = conteos.index.get_level_values(1).to_numpy(np.float32).astype(str)
+        else:
+            valores = conteos.index.get_level_values(1)
+        for item, peso, conteo in zip(conteos.index.get_level_values(0), valores.astype(float),
+                                      conteos.to_numpy()):
+            entrada = self.items.get(item)
+            if entrada is None:
+                entrada = self.items[item] = {'pesos': {}, 'visto': self.lote}
+            self._sumar_peso(entrada['pesos'], float(peso), int(conteo))
+
+        # Productos del lote, con o sin peso, pasan a ser los más recientes
+        for item in pd.unique(df_raw['Item_Identifier'].dropna()):
+            entrada = self.items.get(item)
+            if entrada is not None:
+                entrada['visto'] = self.lote
+                self.items.move_to_end(item)
+
+        sin_tamanio = df_raw['Outlet_Size'].isnull() \
+            .groupby(df_raw['Outlet_Identifier'], sort=False, observed=True).any()
+        atributos = df_raw.groupby('Outlet_Identifier', sort=False, observed=True)[
+            list(ATRIBUTOS_OUTLET)].first()
+        for outlet, fila in atributos.iterrows():
+            entrada = self.outlets.setdefault(outlet, {'sin_tamanio': False})
+            for atributo in ATRIBUTOS_OUTLET:
+                valor = fila[atributo]
+                if not pd.isnull(valor):
+                    entrada[atributo] = valor.item() if hasattr(valor, 'item') else valor
+            entrada['sin_tamanio'] = entrada['sin_tamanio'] or bool(sin_tamanio[outlet])
+            entrada['visto'] = self.lote
+
+        self.evict()
+        self._tablas = {}
+
+        return {'items_nuevos': len(self.items) - nuevos_items + self.descartados - descartados,
+                'outlets_nuevos': len(self.outlets) - nuevos_outlets,
+                'items_descartados': self.descartados - descartados}
+
+    def set_limits(self, max_items: int = None, ttl: int = None) -> None:
+        """
+        Cambia los límites indicados (los None se mantienen) y descarta los
+        productos que quedan fuera de ellos.
+        """
+        if max_items is not None:
+            self.max_items = max_items
+        if ttl is not None:
+            self.ttl = ttl
+        self.evict()
+        self._tablas = {}
+
+    def evict(self) -> None:
+        """
+        Descarta los productos no vistos en los últimos ttl lotes y, si se
+        supera max_items, los menos recientes. Los productos están
+        ordenados por último lote visto, por lo que solo se recorren los
+        que se descartan.
+        """
+        if self.ttl is not None:
+            while self.items and \
+                    next(iter(self.items.values()))['visto'] <= self.lote - self.ttl:
+                self.items.popitem(last=False)
+                self.descartados += 1
+
+        if self.max_items is not None:
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+                self.descartados += 1
+
+    def peso(self, item: str) -> float:
+        """
+        Devuelve la moda del peso de un producto, o NaN si no se conoce.
+        """
+        entrada = self.items.get(item)
+
+        return np.nan if entrada is None else self.moda(entrada['pesos'])
+
+    def outlet(self, outlet: str) -> dict:
+        """
+        Devuelve los atributos de una tienda, o None si no se conoce.
+        """
+        return self.outlets.get(outlet)
+
+    def pesos(self) -> pd.Series:
+        """
+        Devuelve la moda del peso de cada producto como una Serie indexada
+        por Item_Identifier, para mapear columnas completas. Se calcula una
+        única vez por cada lote absorbido.
+        """
+        if 'pesos' not in self._tablas:
+            self._tablas['pesos'] = pd.Series(
+                {item: self.moda(entrada['pesos']) for item, entrada in self.items.items()},
+                dtype=float)
+
+        return self._tablas['pesos']
+
+    def tamanios(self) -> pd.Series:
+        """
+        Devuelve el código de tamaño de cada tienda conocida, indexado por
+        Outlet_Identifier: 'Small' para las tiendas sin_tamanio y el tamaño
+        registrado para el resto.
+        """
+        if 'tamanios' not in self._tablas:
+            codigos = {}
+            for outlet, entrada in self.outlets.items():
+                tamanio = 'Small' if entrada['sin_tamanio'] else entrada.get('Outlet_Size')
+                if tamanio in CODIGOS_OUTLET_SIZE:
+                    codigos[outlet] = CODIGOS_OUTLET_SIZE[tamanio]
+            self._tablas['tamanios'] = pd.Series(codigos, dtype=float)
+
+        return self._tablas['tamanios']
+
+    def sin_tamanio(self) -> list:
+        """
+        Devuelve las tiendas con algún registro sin tamaño.
+        """
+        return [outlet for outlet, entrada in self.outlets.items() if entrada['sin_tamanio']]
+
+    def to_dict(self) -> dict:
+        """
+        Devuelve el índice como diccionario serializable en json. Los
+        productos se guardan del menos al más recientemente visto.
+        """
+        return {'version': VERSION_INDICE,
+                'lote': self.lote,
+                'max_items': self.max_items,
+                'ttl': self.ttl,
+                'max_pesos': self.max_pesos,
+                'descartados': self.descartados,
+                'items': {item: [entrada['visto'], list(entrada['pesos'].items())]
+                          for item, entrada in self.items.items()},
+                'outlets': self.outlets}
+
+    @classmethod
+    def from_dict(cls, datos: dict) -> 'LookupIndex':
+        """
+        Reconstruye el índice generado por to_dict().
+        """
+        if datos.get('version') != VERSION_INDICE:
+            raise ValueError(f"Versión de índice no soportada: {datos.get('version')}")
+
+        index = cls(datos.get('max_items', MAX_ITEMS), datos.get('ttl', TTL),
+                    datos['max_pesos'])
+        index.lote = datos['lote']
+        index.descartados = datos['descartados']
+        for item, (visto, pesos) in datos['items'].items():
+            index.items[item] = {'pesos': {float(peso): conteo for peso, conteo in pesos},
+                                 'visto': visto}
+        index.outlets = datos['outlets']
+
+        return index
+
+    def save(self, path: str) -> None:
+        """
+        Escribe el índice en formato json. Se escribe en un archivo temporal
+        que luego reemplaza al anterior, para no dejar un índice incompleto.
+        """
+        with open(path + '.tmp', 'w', encoding='utf-8') as f_json:
+            json.dump(self.to_dict(), f_json)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path: str) -> 'LookupIndex':
+        """
+        Lee el índice guardado con save().
+        """
+        with open(path, 'r', encoding='utf-8') as f_json:
+            return cls.from_dict(json.load(f_json))
+
+
+def add_index_arguments(parser) -> None:
+    """
+    Agrega a un ArgumentParser las opciones de los límites del índice.
+    """
+    parser.add_argument('--indice-max-items', type=int, default=None,
+                        help='Cantidad máxima de productos del índice; al superarla se '
+                        f'descartan los menos recientes (por defecto {MAX_ITEMS}, o el '
+                        'guardado en el índice)')
+    parser.add_argument('--indice-ttl', type=int, default=None,
+                        help='Lotes sin aparecer tras los que se descarta un producto del '
+                        f'índice (por defecto {TTL}, o el guardado en el índice)')
@@ -0,0 +1,236 @@
+"""
+micro_batching.py
+
+DESCRIPCIÓN: Contiene la clase MicroBatcher, un planificador asyncio que
+agrupa los pedidos de predicción concurrentes en un único lote, hasta un
+tamaño máximo o un tiempo máximo de espera, ejecuta una sola predicción
+vectorizada y devuelve a cada pedido sus resultados.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import asyncio
+import collections
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+
+
+class MicroBatcher:
+    """
+    Clase que agrupa pedidos concurrentes antes de llamar a la función de
+    predicción por lotes.
+
+    La función de predicción recibe la lista con los registros de todos
+    los pedidos del lote y devuelve una lista de resultados del mismo
+    largo. Se ejecuta en un hilo dedicado, de modo que mientras se predice
+    un lote el event loop sigue recibiendo los pedidos del siguiente.
+
+    Si la predicción del lote falla (por ejemplo, por un registro
+    inválido), se vuelve a predecir cada pedido por separado y la
+    excepción se devuelve solo a los pedidos que fallan.
+    """
+
+    def __init__(self, predict_batch, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        """
+        :param predict_batch: Función que recibe una lista de registros y
+                              devuelve la lista de predicciones.
+        :param max_batch_size: Cantidad máxima de registros por lote.
+        :param max_wait_ms: Tiempo máximo, en milisegundos, que espera el
+                            pedido más antiguo antes de cerrar el lote.
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        # Pedidos pendientes: (registros, future, instante de llegada)
+        self.pendientes = collections.deque()
+        # Pedidos del lote que se está prediciendo
+        self.en_curso = []
+        self.queue_depth = 0
+        self.hay_pedidos = None
+        self.lote_completo = None
+        self.worker = None
+        self.executor = None
+
+        # Métricas
+        self.batches = 0
+        self.records = 0
+        self.failed_batches = 0
+        self.failed_requests = 0
+        self.max_batch_seen = 0
+        self.batch_size_histogram = collections.Counter()
+
+    async def start(self) -> None:
+        """
+        Inicia la tarea que arma y ejecuta los lotes.
+        """
+        self.hay_pedidos = asyncio.Event()
+        self.lote_completo = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.worker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Detiene la tarea de los lotes y libera el hilo de predicción. Los
+        pedidos del lote en curso y los que siguen en la cola terminan con
+        RuntimeError.
+        """
+        self.worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.worker
+
+        for _, future, _ in self.en_curso + list(self.pendientes):
+            if not future.done():
+                future.set_exception(RuntimeError("servicio detenido"))
+        self.en_curso = []
+        self.pendientes.clear()
+        self.queue_depth = 0
+        self.executor.shutdown()
+
+    async def submit(self, records: list) -> list:
+        """
+        Encola los registros de un pedido y espera sus predicciones.
+
+        :param records: Lista de registros del pedido.
+
+        :return: Lista de predicciones, en el orden de los registros.
+        :rtype: list
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pendientes.append((records, future, time.monotonic()))
+        self.queue_depth += len(records)
+
+        self.hay_pedidos.set()
+        if self.queue_depth >= self.max_batch_size:
+            self.lote_completo.set()
+
+        return await future
+
+    def next_batch(self) -> list:
+        """
+        Saca de la cola los pedidos del próximo lote, sin superar
+        max_batch_size salvo que un único pedido ya lo supere.
+
+        :return: Lista de pedidos (registros, future, instante de llegada).
+        :rtype: list
+        """
+        pedidos = [self.pendientes.popleft()]
+        cantidad = len(pedidos[0][0])
+
+        while self.pendientes \
+                and cantidad + len(self.pendientes[0][0]) <= self.max_batch_size:
+            pedidos.append(self.pendientes.popleft())
+            cantidad += len(pedidos[-1][0])
+
+        self.queue_depth -= cantidad
+        if not self.pendientes:
+            self.hay_pedidos.clear()
+        if self.queue_depth < self.max_batch_size:
+            self.lote_completo.clear()
+
+        return pedidos
+
+    async def run(self) -> None:
+        """
+        Arma los lotes y los ejecuta mientras la tarea esté activa.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self.hay_pedidos.wait()
+
+            # Se espera a completar el lote hasta que venza el plazo del
+            # pedido más antiguo
+            espera = self.pendientes[0][2] + self.max_wait - time.monotonic()
+            if self.queue_depth < self.max_batch_size and espera > 0:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.lote_completo.wait(), espera)
+
+            pedidos = self.en_curso = self.next_batch()
+            registros = [registro for pedido in pedidos for registro in pedido[0]]
+            self.record_batch(len(registros))
+
+            try:
+                resultados = await loop.run_in_executor(self.executor,
+                                                        self.predict_batch, registros)
+            except Exception as error:  # pylint: disable=W0703
+                self.failed_batches += 1
+                if len(pedidos) == 1:
+                    self.resolve(pedidos[0][1], error=error)
+                    continue
+                # Se aísla el pedido que hizo fallar el lote para no
+                # devolver el error a los demás
+                for (_, future, _), (resultado, error) in zip(
+                        pedidos, await loop.run_in_executor(self.executor,
+                                                            self.predict_each, pedidos)):
+                    self.resolve(future, resultado, error)
+                continue
+
+            inicio = 0
+            for records, future, _ in pedidos:
+                self.resolve(future, resultados[inicio:inicio + len(records)])
+                inicio += len(records)
+
+    def predict_each(self, pedidos: list) -> list:
+        """
+        Predice cada pedido por separado.
+
+        :param pedidos: Lista de pedidos (registros, future, instante de llegada).
+
+        :return: Lista de tuplas (predicciones, None) o (None, excepción),
+                 una por pedido.
+        :rtype: list
+        """
+        resultados = []
+        for records, _, _ in pedidos:
+            try:
+                resultados.append((self.predict_batch(records), None))
+            except Exception as error:  # pylint: disable=W0703
+                resultados.append((None, error))
+
+        return resultados
+
+    def resolve(self, future, resultado: list = None, error: Exception = None) -> None:
+        """
+        Devuelve a un pedido sus predicciones o la excepción, si el pedido
+        sigue esperando.
+        """
+        if future.done():
+            return
+        if error is not None:
+            self.failed_requests += 1
+            future.set_exception(error)
+        else:
+            future.set_result(resultado)
+
+    def record_batch(self, tamanio: int) -> None:
+        """
+        Registra el tamaño de un lote en las métricas. El histograma agrupa
+        los tamaños en potencias de 2.
+
+        :param tamanio: Cantidad de registros del lote.
+        """
+        self.batches += 1
+        self.records += tamanio
+        self.max_batch_seen = max(self.max_batch_seen, tamanio)
+        self.batch_size_histogram[1 << (tamanio - 1).bit_length()] += 1
+
+    def metrics(self) -> dict:
+        """
+        Devuelve las métricas de la cola y de los lotes.
+
+        :return: Diccionario con las métricas.
+        :rtype: dict
+        """
+        return {'queue_depth': self.queue_depth,
+                'pending_requests': len(self.pendientes),
+                'batches': self.batches,
+                'records': self.records,
+                'failed_batches': self.failed_batches,
+                'failed_requests': self.failed_requests,
+                'mean_batch_size': self.records / self.batches if self.batches else 0.0,
+                'max_batch_size': self.max_batch_seen,
+                'batch_size_histogram': {f'<={limite}': cantidad for limite, cantidad
+                                         in sorted(self.batch_size_histogram.items())}}
@@ -0,0 +1,175 @@
+"""
+model_format.py
+
+DESCRIPCIÓN: Formato de almacenamiento de modelos lineales sin pickle.
+Los coeficientes se guardan como archivos .npy y los nombres de las
+features, el término independiente y los tipos de datos en un
+schema.json, todo dentro de un directorio. Al cargar, los .npy se abren
+como memory map (np.load solo puede mapear archivos .npy, no .npz), de
+modo que un proceso de predicción no necesita importar sklearn.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import glob
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+FORMATO_MODELO = 'bigmart-linear'
+VERSION_MODELO = 1
+ARCHIVO_ESQUEMA = 'schema.json'
+
+# Sufijo de los directorios de cada versión publicada con publish_linear_model
+SUFIJO_VERSION = '.v-'
+
+
+def is_array_model(path: str) -> bool:
+    """
+    Indica si una ruta corresponde a un modelo guardado con save_linear_model.
+
+    :param path: Ruta del modelo.
+
+    :return: True si la ruta es un directorio con schema.json.
+    :rtype: bool
+    """
+    return os.path.isfile(os.path.join(path, ARCHIVO_ESQUEMA))
+
+
+def save_linear_model(model, path: str) -> None:
+    """
+    Guarda un modelo lineal de sklearn ya entrenado como .npy + schema.json.
+
+    :param model: Modelo con los atributos coef_ e intercept_.
+    :param path: Directorio de salida. Se crea si no existe.
+    """
+    coef = np.ascontiguousarray(np.ravel(model.coef_), dtype=np.float64)
+    feature_names = getattr(model, 'feature_names_in_', None)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'coef.npy'), coef)
+
+    schema = {'formato': FORMATO_MODELO,
+              'version': VERSION_MODELO,
+              'estimador': type(model).__name__,
+              'feature_names': None if feature_names is None
+                               else [str(nombre) for nombre in feature_names],
+              'intercept': float(np.ravel(model.intercept_)[0]),
+              'arrays': {'coef': {'archivo': 'coef.npy', 'dtype': str(coef.dtype),
+                                  'shape': list(coef.shape)}}}
+
+    with open(os.path.join(path, ARCHIVO_ESQUEMA), 'w', encoding='utf-8') as f_json:
+        json.dump(schema, f_json, indent=2)
+
+
+def publish_linear_model(model, path: str) -> None:
+    """
+    Guarda un modelo lineal en un directorio nuevo (<path>.v-<sufijo>) y lo
+    publica reemplazando con un único os.replace el enlace simbólico path,
+    de modo que quien lo lea ve el modelo anterior o el nuevo, completos.
+    Se conserva la versión anterior, por si un lector la resolvió justo
+    antes del reemplazo, y se borran las demás.
+
+    La primera vez, si path es un directorio, se renombra antes de crear el
+    enlace. Si el sistema no permite crear enlaces simbólicos (Windows sin
+    modo desarrollador), el directorio se reemplaza con dos os.replace.
+
+    :param model: Modelo con los atributos coef_ e intercept_.
+    :param path: Ruta del enlace (o directorio) del modelo publicado.
+    """
+    path = os.path.abspath(path.rstrip(os.sep))
+    directorio, nombre = os.path.split(path)
+    nuevo = tempfile.mkdtemp(dir=directorio, prefix=nombre + SUFIJO_VERSION)
+    os.chmod(nuevo, 0o755)
+    save_linear_model(model, nuevo)
+
+    anterior = os.path.realpath(path) if os.path.islink(path) else None
+    enlace = nuevo + '.lnk'
+    try:
+        os.symlink(os.path.basename(nuevo), enlace, target_is_directory=True)
+    except OSError:
+        enlace = None
+
+    if os.path.isdir(path) and not os.path.islink(path):
+        anterior = path + '.old'
+        shutil.rmtree(anterior, ignore_errors=True)
+        os.replace(path, anterior)
+
+    if enlace is None:
+        os.replace(nuevo, path)
+        if anterior is not None:
+            shutil.rmtree(anterior, ignore_errors=True)
+        return
+
+    os.replace(enlace, path)
+    for version in glob.glob(glob.escape(path + SUFIJO_VERSION) + '*') + [path + '.old']:
+        if version not in (nuevo, anterior) and os.path.isdir(version):
+            shutil.rmtree(version, ignore_errors=True)
+
+
+class LinearModelArtifact:
+    """
+    Clase que representa un modelo lineal cargado desde .npy + schema.json.
+
+    Expone los mismos atributos que usa el resto del proyecto de un
+    LinearRegression de sklearn (coef_, intercept_, feature_names_in_ y
+    predict), por lo que puede reemplazarlo en MakePredictionPipeline y en
+    CompiledLinearModel.from_state.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: float, feature_names: list = None):
+        """
+        :param coef: Vector de pesos del modelo.
+        :param intercept: Término independiente.
+        :param feature_names: Nombres de las features, en el orden de coef.
+        """
+        self.coef_ = coef
+        self.intercept_ = float(intercept)
+        self.feature_names_in_ = None if feature_names is None \
+            else np.array(feature_names, dtype=object)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'LinearModelArtifact':
+        """
+        Carga un modelo guardado con save_linear_model.
+
+        :param path: Directorio del modelo.
+        :param mmap: Si es True los .npy se abren como memory map de solo lectura.
+
+        :return: Modelo cargado.
+        :rtype: LinearModelArtifact
+        """
+        # Se resuelve el enlace de publish_linear_model una única vez, para
+        # leer el esquema y los arrays de la misma versión
+        path = os.path.realpath(path)
+        with open(os.path.join(path, ARCHIVO_ESQUEMA), 'r', encoding='utf-8') as f_json:
+            schema = json.load(f_json)
+
+        if schema.get('formato') != FORMATO_MODELO or schema.get('version') != VERSION_MODELO:
+            raise ValueError(f"Formato de modelo no soportado: {schema.get('formato')} "
+                             f"versión {schema.get('version')}")
+
+        info = schema['arrays']['coef']
+        coef = np.load(os.path.join(path, info['archivo']), mmap_mode='r' if mmap else None)
+        if str(coef.dtype) != info['dtype'] or list(coef.shape) != info['shape']:
+            raise ValueError(f"coef.npy no coincide con {ARCHIVO_ESQUEMA}")
+
+        return cls(coef, schema['intercept'], schema['feature_names'])
+
+    def predict(self, data) -> np.ndarray:
+        """
+        Predice sobre una matriz de features o un DataFrame. Las columnas de
+        un DataFrame se ordenan según feature_names_in_.
+
+        :param data: Matriz de n_registros x n_features o DataFrame.
+
+        :return: Predicciones.
+        :rtype: np.ndarray
+        """
+        if hasattr(data, 'columns') and self.feature_names_in_ is not None:
+            data = data[list(self.feature_names_in_)]
+
+        return np.asarray(data, dtype=np.float64) @ self.coef_ + self.intercept_
@@ -0,0 +1,466 @@
+"""
+monitoring.py
+
+DESCRIPCIÓN: Monitoreo de deriva y de calidad de datos en inferencia.
+perfil_entrenamiento() captura, al entrenar, la distribución de cada
+feature del modelo y de sus predicciones como un histograma sobre los
+deciles de entrenamiento. DriftMonitor acumula lote a lote los mismos
+histogramas con memoria constante por variable y calcula para cada lote
+y para el total el PSI (population stability index) y el estadístico KS
+aproximado sobre los bins, junto con los registros descartados por la
+transformación y los faltantes de cada variable.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Versión del formato del perfil de entrenamiento
+VERSION_PERFIL = 1
+
+# Cantidad de bins de los histogramas (deciles de entrenamiento)
+BINS = 10
+
+# Proporción mínima de un bin, para que el PSI sea finito con bins vacíos
+EPSILON = 1e-4
+
+# Umbrales habituales del PSI: < 0.1 estable, 0.1 - 0.2 moderado, > 0.2 alto
+UMBRAL_PSI_MODERADO = 0.1
+UMBRAL_PSI_ALTO = 0.2
+
+# Nombre de la variable de las predicciones en el perfil
+PREDICCION = 'prediccion'
+
+
+def variables(df: pd.DataFrame, predicciones=None):
+    """
+    Recorre las variables monitoreadas como arrays de float: las features
+    del modelo y las predicciones, que son la columna 'Item_Outlet_Sales'
+    de la salida de MakePredictionPipeline si no se indican aparte.
+
+    :param df: Datos transformados o predicciones.
+    :param predicciones: Predicciones del modelo sobre df.
+
+    :return: Iterador de tuplas (nombre, valores).
+    :rtype: Iterator[tuple]
+    """
+    for columna in df.columns:
+        if columna != 'Item_Outlet_Sales':
+            yield columna, df[columna].to_numpy(dtype=float, na_value=np.nan)
+
+    if predicciones is None:
+        predicciones = df['Item_Outlet_Sales']
+    yield PREDICCION, np.asarray(predicciones, dtype=float)
+
+
+def momentos(serie: pd.Series) -> tuple:
+    """
+    Calcula la cantidad de valores presentes, su suma y su suma de
+    cuadrados, sin convertir toda la columna a float: los enteros se suman
+    como enteros y las categóricas a partir de sus códigos.
+
+    :param serie: Columna de las features transformadas o de las predicciones.
+
+    :return: Tupla (presentes, suma, suma de cuadrados).
+    :rtype: tuple
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        if len(codigos) and codigos.min() < 0:
+            codigos = codigos[codigos >= 0]
+        valores = np.asarray(serie.cat.categories, dtype=float).take(codigos)
+    else:
+        valores = np.asarray(serie)
+        if valores.dtype.kind in 'iub':
+            valores = valores.astype(np.int64, copy=False)
+            return len(valores), float(valores.sum()), float(np.dot(valores, valores))
+        valores = valores.astype(float, copy=False)
+        # La suma es NaN solo si hay faltantes: recién entonces se filtran
+        if np.isnan(valores.sum()):
+            valores = valores[~np.isnan(valores)]
+
+    return len(valores), float(valores.sum()), float(np.dot(valores, valores))
+
+
+def perfil_entrenamiento(df_prepared: pd.DataFrame, predicciones, bins: int = BINS) -> dict:
+    """
+    Captura la distribución de entrenamiento de cada feature y de las
+    predicciones. Los límites de los bins son los cuantiles de
+    entrenamiento sin repetir, por lo que las variables discretas (dummies,
+    códigos) quedan con un bin por valor.
+
+    :param df_prepared: Datos de entrenamiento transformados.
+    :param predicciones: Predicciones del modelo sobre df_prepared.
+    :param bins: Cantidad de bins de las variables continuas.
+
+    :return perfil: Diccionario serializable en json.
+    :rtype: dict
+    """
+    perfil = {'version': VERSION_PERFIL, 'filas': len(df_prepared), 'variables': {}}
+    for nombre, valores in variables(df_prepared, predicciones):
+        presentes = valores[~np.isnan(valores)]
+        limites = np.unique(np.quantile(presentes, np.linspace(0, 1, bins + 1)[1:-1]))
+        conteos = np.bincount(np.searchsorted(limites, presentes, side='right'),
+                              minlength=len(limites) + 1)
+        perfil['variables'][nombre] = {'limites': limites.tolist(),
+                                       'conteos': conteos.tolist(),
+                                       'faltantes': int(len(valores) - len(presentes)),
+                                       'media': float(presentes.mean()),
+                                       'desvio': float(presentes.std())}
+
+    return perfil
+
+
+def save_profile(perfil: dict, path: str) -> None:
+    """
+    Escribe el perfil de entrenamiento en formato json.
+    """
+    with open(path, 'w', encoding='utf-8') as f_json:
+        json.dump(perfil, f_json)
+
+
+class DriftMonitor:
+    """
+    Clase que acumula en inferencia los histogramas de las features y de
+    las predicciones sobre los bins del perfil de entrenamiento. La memoria
+    es constante por variable: un contador por bin, los faltantes y la
+    suma y suma de cuadrados para la media y el desvío. De cada lote se
+    conserva solo el resumen (PSI, KS y registros descartados) de los
+    últimos `historial` lotes.
+
+    Para que el costo sea una fracción chica del de predecir, de los lotes
+    grandes se histograma una muestra uniforme de max(muestra, fraccion *
+    filas) registros, y sus conteos se escalan al tamaño del lote: el PSI
+    y el KS son estimaciones. Los lotes de menos de `muestra` registros se
+    acumulan hasta reunir `muestra` registros y se histograman juntos:
+    comparten el PSI y el KS de esa ventana. Los
+    faltantes, la media, el desvío y los registros descartados se calculan
+    siempre de manera exacta sobre todos los registros de cada lote.
+    """
+
+    def __init__(self, perfil: dict, historial: int = 1000, muestra: int = 2048,
+                 fraccion: float = 0.01, semilla: int = 0):
+        """
+        :param perfil: Perfil generado por perfil_entrenamiento().
+        :param historial: Cantidad de resúmenes de lotes que se conservan.
+        :param muestra: Mínima cantidad de registros que se histograman
+                        juntos. Si es None cada lote se histograma
+                        completo al recibirlo.
+        :param fraccion: Fracción de los registros de los lotes grandes
+                         que se histograman.
+        :param semilla: Semilla del muestreo.
+        """
+        if perfil.get('version') != VERSION_PERFIL:
+            raise ValueError(f"Versión de perfil no soportada: {perfil.get('version')}")
+
+        self.perfil = perfil
+        self.nombres = list(perfil['variables'])
+        self.muestra = muestra
+        self.fraccion = fraccion
+        self.rng = np.random.default_rng(semilla)
+
+        # Todas las variables se histograman juntas: los límites se completan
+        # con infinito hasta el máximo de bins y los faltantes van a un bin
+        # extra al final
+        limites = [np.array(perfil['variables'][nombre]['limites']) for nombre in self.nombres]
+        self.n_bins = max(len(limite) for limite in limites) + 2
+        self.limites = np.full((len(self.nombres), self.n_bins - 2), np.inf)
+        conteos = np.zeros((len(self.nombres), self.n_bins))
+        for j, limite in enumerate(limites):
+            self.limites[j, :len(limite)] = limite
+            conteos[j, :len(limite) + 1] = perfil['variables'][self.nombres[j]]['conteos']
+        # Los bins de relleno valen EPSILON en la referencia y en cada lote,
+        # por lo que no aportan al PSI ni al KS
+        self.referencia = conteos[:, :-1] / conteos.sum(axis=1, keepdims=True)
+        self.referencia_psi = np.maximum(self.referencia, EPSILON)
+        # Posición de cada variable en las columnas del último lote
+        self.columnas = None
+        self.posiciones = None
+
+        self.lotes = deque(maxlen=historial)
+        self.reset()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "DriftMonitor":
+        """
+        Crea el monitor a partir del perfil guardado en path.
+        """
+        with open(path, 'r', encoding='utf-8') as f_json:
+            return cls(json.load(f_json), **kwargs)
+
+    def reset(self) -> None:
+        """
+        Descarta lo acumulado.
+        """
+        self.conteos = np.zeros((len(self.nombres), self.n_bins))
+        # Momentos exactos: valores presentes, faltantes, suma y suma de cuadrados
+        self.presentes = np.zeros(len(self.nombres))
+        self.faltantes = np.zeros(len(self.nombres))
+        self.sumas = np.zeros((2, len(self.nombres)))
+        self.filas_entrada = 0
+        self.filas_salida = 0
+        self.n_lotes = 0
+        self.lotes.clear()
+        # Lotes chicos que todavía no se histogramaron
+        self.pendientes = []
+        self.registros_pendientes = []
+        self.filas_pendientes = 0
+
+    def series(self, df_preds: pd.DataFrame) -> list:
+        """
+        Devuelve las columnas de las variables monitoreadas, en el orden del
+        perfil, sin copiar el DataFrame.
+        """
+        columnas = tuple(df_preds.columns)
+        if columnas != self.columnas:
+            nombres = [PREDICCION if columna == 'Item_Outlet_Sales' else columna
+                       for columna in columnas]
+            self.posiciones = [nombres.index(nombre) for nombre in self.nombres]
+            self.columnas = columnas
+
+        series = [serie for _, serie in df_preds.items()]
+        return [series[i] for i in self.posiciones]
+
+    def matriz(self, df_preds: pd.DataFrame, indices: np.ndarray = None) -> np.ndarray:
+        """
+        Devuelve las variables monitoreadas (o los registros de indices)
+        como una matriz de float de variables x registros, en el orden del
+        perfil. Con una fila por variable las operaciones de histogramar()
+        recorren memoria contigua.
+        """
+        return np.array([np.asarray(serie) if indices is None else np.asarray(serie)[indices]
+                         for serie in self.series(df_preds)], dtype=float)
+
+    def muestra_indices(self, filas: int) -> np.ndarray:
+        """
+        Devuelve los índices de una muestra uniforme de max(muestra,
+        fraccion * filas) registros, o None si el lote no es más grande
+        que la muestra.
+        """
+        if self.muestra is None:
+            return None
+
+        muestra = max(self.muestra, int(self.fraccion * filas))
+        if filas <= muestra:
+            return None
+
+        return self.rng.integers(0, filas, muestra)
+
+    def acumular_momentos(self, df_preds: pd.DataFrame, valores: np.ndarray = None) -> None:
+        """
+        Suma a lo acumulado los faltantes, la suma y la suma de cuadrados
+        de todos los registros del lote, sin muestrear.
+
+        :param df_preds: Lote de predicciones.
+        :param valores: Matriz completa del lote (ver matriz()), si ya se
+                        armó. Si es None se recorre cada columna por
+                        separado, sin armar la matriz.
+        """
+        if valores is None:
+            for j, serie in enumerate(self.series(df_preds)):
+                presentes, suma, suma_cuadrados = momentos(serie)
+                self.faltantes[j] += len(serie) - presentes
+                self.presentes[j] += presentes
+                self.sumas[0, j] += suma
+                self.sumas[1, j] += suma_cuadrados
+            return
+
+        faltantes = np.isnan(valores)
+        n_faltantes = faltantes.sum(axis=1)
+        self.faltantes += n_faltantes
+        self.presentes += valores.shape[1] - n_faltantes
+        if n_faltantes.any():
+            valores = np.where(faltantes, 0.0, valores)
+        self.sumas[0] += valores.sum(axis=1)
+        self.sumas[1] += np.einsum('ij,ij->i', valores, valores)
+
+    def deriva(self, conteos: np.ndarray) -> tuple:
+        """
+        Calcula el PSI y el KS de cada variable para una matriz de conteos
+        (variables x bins, sin el bin de faltantes).
+        """
+        totales = conteos.sum(axis=1, keepdims=True)
+        actual = conteos / np.maximum(totales, 1)
+        actual_psi = np.maximum(actual, EPSILON)
+
+        psi_valores = np.sum((actual_psi - self.referencia_psi)
+                             * np.log(actual_psi / self.referencia_psi), axis=1)
+        ks_valores = np.max(np.abs(np.cumsum(self.referencia, axis=1)
+                                   - np.cumsum(actual, axis=1)), axis=1)
+        vacias = totales[:, 0] == 0
+
+        return np.where(vacias, 0.0, psi_valores), np.where(vacias, 0.0, ks_valores)
+
+    def histogramar(self, valores: np.ndarray, filas: int, registros: list) -> None:
+        """
+        Suma a lo acumulado los histogramas de una matriz de valores y
+        completa el PSI y el KS de los lotes a los que corresponde.
+
+        :param valores: Matriz de variables x registros (ver matriz()),
+                        completa o muestreada.
+        :param filas: Registros que representa la matriz, para escalar los
+                      conteos de una muestra.
+        :param registros: Resúmenes de los lotes incluidos en la matriz.
+        """
+        faltantes = np.isnan(valores)
+        n_faltantes = faltantes.sum(axis=1)
+
+        # Con cada variable ordenada, la cantidad de valores menores que cada
+        # límite sale de una búsqueda binaria, y el conteo de cada bin es la
+        # diferencia entre límites sucesivos (los faltantes quedan al final)
+        ordenados = np.sort(valores, axis=1)
+        menores = np.empty((len(self.nombres), self.n_bins))
+        menores[:, 0] = 0
+        for j, (fila, limites) in enumerate(zip(ordenados, self.limites)):
+            menores[j, 1:-1] = np.searchsorted(fila, limites)
+        menores[:, -1] = valores.shape[1] - n_faltantes
+        conteos = np.empty(self.conteos.shape)
+        conteos[:, :-1] = np.diff(menores, axis=1)
+        conteos[:, -1] = n_faltantes
+
+        self.conteos += conteos * (filas / valores.shape[1])
+
+        psi_valores, ks_valores = self.deriva(conteos[:, :-1])
+        psi_lote = dict(zip(self.nombres, psi_valores.tolist()))
+        ks_lote = dict(zip(self.nombres, ks_valores.tolist()))
+        for registro in registros:
+            registro['psi'], registro['ks'] = psi_lote, ks_lote
+
+    def flush(self) -> None:
+        """
+        Histograma los lotes chicos pendientes.
+        """
+        if self.pendientes:
+            self.histogramar(np.hstack(self.pendientes), self.filas_pendientes,
+                             self.registros_pendientes)
+            self.pendientes = []
+            self.registros_pendientes = []
+            self.filas_pendientes = 0
+
+    def update(self, df_preds: pd.DataFrame, filas_entrada: int = None) -> dict:
+        """
+        Incorpora un lote de predicciones.
+
+        :param df_preds: Salida de MakePredictionPipeline.make_predictions:
+                         features transformadas y predicción en
+                         'Item_Outlet_Sales'.
+        :param filas_entrada: Registros crudos del lote antes de la
+                              transformación. Si es None no se cuentan
+                              descartados.
+
+        :return registro: Resumen del lote: registros de entrada, de salida
+                          y descartados, y PSI y KS de cada variable (vacíos
+                          hasta que se histograme la ventana de un lote chico).
+        :rtype: dict
+        """
+        registro = {'lote': self.n_lotes, 'filas_entrada': filas_entrada,
+                    'filas_salida': len(df_preds),
+                    'descartadas': None if filas_entrada is None
+                    else filas_entrada - len(df_preds),
+                    'psi': {}, 'ks': {}}
+
+        self.n_lotes += 1
+        self.filas_salida += len(df_preds)
+        if filas_entrada is not None:
+            self.filas_entrada += filas_entrada
+        self.lotes.append(registro)
+        if df_preds.empty:
+            return registro
+
+        indices = self.muestra_indices(len(df_preds))
+        valores = self.matriz(df_preds, indices)
+        # Con muestra, los momentos se calculan aparte sobre todo el lote
+        self.acumular_momentos(df_preds, None if indices is not None else valores)
+        if self.muestra is None or len(df_preds) >= self.muestra:
+            self.flush()
+            self.histogramar(valores, len(df_preds), [registro])
+        else:
+            self.pendientes.append(valores)
+            self.registros_pendientes.append(registro)
+            self.filas_pendientes += len(df_preds)
+            if self.filas_pendientes >= self.muestra:
+                self.flush()
+
+        return registro
+
+    def summary(self) -> dict:
+        """
+        Resume lo acumulado desde el último reset().
+
+        :return resumen: Registros de entrada, de salida y descartados, y
+                         para cada variable PSI y KS (estimados con la
+                         muestra de los lotes grandes), proporción de
+                         faltantes, media y desvío acumulados (exactos),
+                         junto con los de entrenamiento.
+        :rtype: dict
+        """
+        resumen = {'lotes': self.n_lotes,
+                   'filas_entrada': self.filas_entrada,
+                   'filas_salida': self.filas_salida,
+                   'descartadas': self.filas_entrada - self.filas_salida
+                   if self.filas_entrada else None,
+                   'variables': {}}
+
+        self.flush()
+        psi_valores, ks_valores = self.deriva(self.conteos[:, :-1])
+        totales = self.presentes + self.faltantes
+        with np.errstate(invalid='ignore', divide='ignore'):
+            medias = self.sumas[0] / self.presentes
+            desvios = np.sqrt(np.maximum(self.sumas[1] / self.presentes - medias ** 2, 0.0))
+
+        for j, nombre in enumerate(self.nombres):
+            entrenamiento = self.perfil['variables'][nombre]
+            resumen['variables'][nombre] = {
+                'psi': float(psi_valores[j]),
+                'ks': float(ks_valores[j]),
+                'faltantes': float(self.faltantes[j] / totales[j]) if totales[j] else 0.0,
+                'media': float(medias[j]),
+                'desvio': float(desvios[j]),
+                'media_entrenamiento': entrenamiento['media'],
+                'desvio_entrenamiento': entrenamiento['desvio']}
+
+        return resumen
+
+    def alerts(self) -> dict:
+        """
+        Devuelve las variables cuyo PSI acumulado supera UMBRAL_PSI_MODERADO,
+        con el nivel 'moderado' o 'alto'.
+        """
+        return {nombre: 'alto' if variable['psi'] > UMBRAL_PSI_ALTO else 'moderado'
+                for nombre, variable in self.summary()['variables'].items()
+                if variable['psi'] > UMBRAL_PSI_MODERADO}
+
+    def save(self, path: str) -> None:
+        """
+        Escribe en formato json el resumen acumulado y el de cada lote.
+        """
+        with open(path, 'w', encoding='utf-8') as f_json:
+            json.dump({'resumen': self.summary(), 'lotes': list(self.lotes)}, f_json, indent=2)
+
+    def report(self) -> str:
+        """
+        Devuelve una tabla de texto con el resumen acumulado.
+
+        :return: Tabla con PSI, KS, faltantes y medias por variable.
+        :rtype: str
+        """
+        resumen = self.summary()
+        alertas = self.alerts()
+        descartados = '' if resumen['descartadas'] is None \
+            else f", {resumen['descartadas']} descartados"
+        lineas = [f"Monitoreo: {resumen['lotes']} lotes, {resumen['filas_salida']} registros "
+                  f"predichos{descartados}",
+                  f"{'variable':<32} {'PSI':>8} {'KS':>7} {'faltantes':>10} "
+                  f"{'media':>11} {'media train':>12}"]
+        for nombre, variable in resumen['variables'].items():
+            marca = f"  deriva {alertas[nombre]}" if nombre in alertas else ''
+            lineas.append(f"{nombre:<32} {variable['psi']:>8.4f} {variable['ks']:>7.4f} "
+                          f"{variable['faltantes']:>10.2%} {variable['media']:>11.4f} "
+                          f"{variable['media_entrenamiento']:>12.4f}{marca}")
+
+        return "\n".join(lineas)
@@ -0,0 +1,403 @@
+"""
+multi_model.py
+
+DESCRIPCIÓN: Contiene la clase MultiModelPredictionPipeline, que evalúa
+varios modelos sobre los mismos datos en una única pasada, para comparar
+candidatos (A/B) o ejecutar un modelo en sombra junto al de producción.
+Cada lote se lee y se transforma una sola vez, la matriz de features se
+arma una sola vez en float64 y todos los modelos predicen sobre ella, en
+hilos en paralelo (el producto matricial de NumPy y la predicción de los
+árboles de sklearn liberan el GIL). La salida tiene las features, el
+valor real y una columna de predicciones por modelo, y en la misma
+pasada se acumulan las métricas de error de cada modelo.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from predict import MakePredictionPipeline, load_model_file
+from profiling import StageProfiler, add_profiling_arguments, export_profile, profiler_from_args
+
+# Prefijo de las columnas de predicciones de cada modelo
+PREFIJO_PREDICCION = 'prediccion_'
+
+
+class MultiModelMetrics:
+    """
+    Clase que acumula lote a lote las métricas de error de varios modelos
+    con memoria constante: por modelo guarda sumas de los errores, de sus
+    cuadrados y de sus valores absolutos, y de la diferencia con el modelo
+    de referencia (el primero), que se calcula sobre todos los registros,
+    tengan o no valor real.
+    """
+
+    def __init__(self, nombres: list):
+        """
+        :param nombres: Nombres de los modelos; el primero es la referencia.
+        """
+        self.nombres = list(nombres)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Descarta lo acumulado.
+        """
+        ceros = np.zeros(len(self.nombres))
+        self.lotes = 0
+        self.filas = 0
+        self.filas_con_real = 0
+        self.suma_real = 0.0
+        self.suma_real2 = 0.0
+        self.sumas = {clave: ceros.copy() for clave in
+                      ('prediccion', 'error', 'error2', 'error_abs',
+                       'diferencia', 'diferencia_abs', 'segundos')}
+
+    def update(self, predicciones: np.ndarray, real: np.ndarray = None,
+               segundos: np.ndarray = None) -> None:
+        """
+        Incorpora un lote.
+
+        :param predicciones: Matriz (registros, modelos) de predicciones.
+        :param real: Valores reales del lote; los faltantes se excluyen de
+                     las métricas de error. Si es None solo se acumulan las
+                     diferencias con la referencia.
+        :param segundos: Tiempo de predicción de cada modelo en el lote.
+        """
+        self.lotes += 1
+        self.filas += len(predicciones)
+        sumas = self.sumas
+        sumas['prediccion'] += predicciones.sum(axis=0)
+        diferencia = predicciones - predicciones[:, :1]
+        sumas['diferencia'] += diferencia.sum(axis=0)
+        sumas['diferencia_abs'] += np.abs(diferencia).sum(axis=0)
+        if segundos is not None:
+            sumas['segundos'] += segundos
+
+        if real is None:
+            return
+        presentes = ~np.isnan(real)
+        real = real[presentes]
+        error = predicciones[presentes] - real[:, None]
+        self.filas_con_real += len(real)
+        self.suma_real += real.sum()
+        self.suma_real2 += np.dot(real, real)
+        sumas['error'] += error.sum(axis=0)
+        sumas['error2'] += np.einsum('ij,ij->j', error, error)
+        sumas['error_abs'] += np.abs(error).sum(axis=0)
+
+    def summary(self) -> dict:
+        """
+        Devuelve las métricas acumuladas de cada modelo. RMSE, MAE, R² y
+        sesgo (media de predicción - real) son None si ningún registro
+        tuvo valor real.
+
+        :rtype: dict
+        """
+        filas, con_real = max(self.filas, 1), self.filas_con_real
+        # Suma de cuadrados total, para el R²
+        total = self.suma_real2 - self.suma_real ** 2 / con_real if con_real else 0.0
+        modelos = {}
+        for i, nombre in enumerate(self.nombres):
+            metricas = {'media_prediccion': self.sumas['prediccion'][i] / filas,
+                        'diferencia_media': self.sumas['diferencia'][i] / filas,
+                        'diferencia_absoluta_media': self.sumas['diferencia_abs'][i] / filas,
+                        'segundos': self.sumas['segundos'][i],
+                        'rmse': None, 'mae': None, 'r2': None, 'sesgo': None}
+            if con_real:
+                metricas.update(
+                    rmse=float(np.sqrt(self.sumas['error2'][i] / con_real)),
+                    mae=self.sumas['error_abs'][i] / con_real,
+                    r2=1 - self.sumas['error2'][i] / total if total > 0 else None,
+                    sesgo=self.sumas['error'][i] / con_real)
+            modelos[nombre] = {clave: float(valor) if valor is not None else None
+                               for clave, valor in metricas.items()}
+
+        return {'lotes': self.lotes, 'filas': self.filas, 'filas_con_real': con_real,
+                'referencia': self.nombres[0], 'modelos': modelos}
+
+    def save(self, path: str) -> None:
+        """
+        Escribe el resumen en formato json.
+        """
+        with open(path, 'w', encoding='utf-8') as f_json:
+            json.dump(self.summary(), f_json, indent=2)
+
+    def report(self) -> str:
+        """
+        Devuelve una tabla de texto con el resumen acumulado.
+
+        :return: Tabla con las métricas de cada modelo.
+        :rtype: str
+        """
+        resumen = self.summary()
+
+        def celda(valor, ancho: int, decimales: int) -> str:
+            return f"{'-':>{ancho}}" if valor is None else f"{valor:>{ancho}.{decimales}f}"
+
+        lineas = [f"Modelos: {resumen['lotes']} lotes, {resumen['filas']} registros "
+                  f"({resumen['filas_con_real']} con valor real), "
+                  f"referencia {resumen['referencia']}",
+                  f"{'modelo':<20} {'RMSE':>10} {'MAE':>10} {'R2':>7} {'sesgo':>9} "
+                  f"{'dif. media':>11} {'dif. abs.':>10} {'tiempo [s]':>11}"]
+        for nombre, metricas in resumen['modelos'].items():
+            lineas.append(f"{nombre:<20} {celda(metricas['rmse'], 10, 2)} "
+                          f"{celda(metricas['mae'], 10, 2)} {celda(metricas['r2'], 7, 4)} "
+                          f"{celda(metricas['sesgo'], 9, 2)} "
+                          f"{metricas['diferencia_media']:>11.2f} "
+                          f"{metricas['diferencia_absoluta_media']:>10.2f} "
+                          f"{metricas['segundos']:>11.3f}")
+
+        return "\n".join(lineas)
+
+
+class MultiModelPredictionPipeline(MakePredictionPipeline):
+    """
+    Clase que carga varios modelos entrenados y los evalúa sobre el mismo
+    conjunto de datos en una única pasada. Hereda la lectura, la escritura
+    y run_streaming() de MakePredictionPipeline; en lugar de la columna
+    'Item_Outlet_Sales' con la predicción, la salida conserva el valor
+    real y agrega una columna 'prediccion_<nombre>' por modelo.
+    """
+
+    def __init__(self, input_path, output_path, model_paths: dict,
+                 storage_format: str = None, profiler: StageProfiler = None,
+                 n_threads: int = None):
+        """
+        :param input_path: Ruta de los datos transformados.
+        :param output_path: Ruta del archivo de predicciones.
+        :param model_paths: Diccionario nombre -> ruta de cada modelo (ver
+                            predict.load_model_file). El primero es la
+                            referencia contra la que se comparan los demás.
+        :param storage_format: Formato de los datos de entrada y de salida
+                               (csv, parquet o arrow). Si es None se infiere
+                               de la extensión de cada ruta.
+        :param profiler: StageProfiler donde run() y run_streaming()
+                         registran sus etapas.
+        :param n_threads: Cantidad de hilos en los que predicen los modelos.
+                          Si es None, uno por modelo hasta la cantidad de
+                          CPUs; con 1 los modelos predicen en secuencia.
+        """
+        if not model_paths:
+            raise ValueError("Se necesita al menos un modelo")
+
+        super().__init__(input_path, output_path, storage_format=storage_format,
+                         profiler=profiler)
+        self.model_paths = dict(model_paths)
+        self.models = {}
+        self.n_threads = n_threads if n_threads is not None \
+            else min(len(self.model_paths), os.cpu_count() or 1)
+        self.executor = None
+        self.metrics = MultiModelMetrics(list(self.model_paths))
+
+    def load_model(self) -> None:
+        """
+        Carga todos los modelos y crea el pool de hilos.
+        """
+
+        self.models = {nombre: load_model_file(path)
+                       for nombre, path in self.model_paths.items()}
+        if self.n_threads > 1 and self.executor is None:
+            self.executor = ThreadPoolExecutor(self.n_threads)
+
+    def close(self) -> None:
+        """
+        Cierra el pool de hilos.
+        """
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    @staticmethod
+    def feature_matrix(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Arma la matriz de features una única vez por lote: un DataFrame de
+        un solo bloque float64, de modo que la validación de sklearn de cada
+        modelo lo convierte en array sin copiarlo.
+
+        :param data: Datos transformados, con o sin 'Item_Outlet_Sales'.
+
+        :rtype: pd.DataFrame
+        """
+
+        features = data.drop(columns=['Item_Outlet_Sales'], errors='ignore')
+
+        return pd.DataFrame(features.to_numpy(dtype=np.float64), index=features.index,
+                            columns=features.columns)
+
+    @staticmethod
+    def predict_model(model, features: pd.DataFrame) -> tuple:
+        """
+        Predice con un modelo y devuelve las predicciones y el tiempo.
+        """
+
+        inicio = time.perf_counter()
+        predicciones = np.asarray(model.predict(features), dtype=np.float64).ravel()
+
+        return predicciones, time.perf_counter() - inicio
+
+    def make_predictions(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predice con todos los modelos sobre la misma matriz de features y
+        acumula sus métricas.
+
+        :return: Los datos de entrada con una columna de predicciones por modelo.
+        :rtype: pd.DataFrame
+        """
+
+        features = self.feature_matrix(data)
+        modelos = list(self.models.values())
+        if self.executor is None:
+            resultados = [self.predict_model(model, features) for model in modelos]
+        else:
+            resultados = list(self.executor.map(self.predict_model, modelos,
+                                                [features] * len(modelos)))
+
+        predicciones = np.column_stack([prediccion for prediccion, _ in resultados])
+        real = data['Item_Outlet_Sales'].to_numpy(dtype=np.float64, na_value=np.nan) \
+            if 'Item_Outlet_Sales' in data.columns else None
+        self.metrics.update(predicciones, real,
+                            np.array([segundos for _, segundos in resultados]))
+
+        columnas = [PREFIJO_PREDICCION + nombre for nombre in self.models]
+        return pd.concat([data, pd.DataFrame(predicciones, index=data.index, columns=columnas)],
+                         axis=1)
+
+    def run(self, feature_pipeline=None):
+        """
+        Llama a los metodos.
+
+        :param feature_pipeline: FeatureEngineeringPipeline con el estado ya
+                                 cargado. Si se indica, se leen los datos
+                                 crudos de su input_path y se transforman
+                                 una única vez para todos los modelos.
+        """
+
+        self.metrics.reset()
+        if feature_pipeline is None:
+            try:
+                super().run()
+            finally:
+                self.close()
+            return
+
+        with self.profiler.stage('load_data') as registro:
+            data = feature_pipeline.read_data()
+            registro['filas_salida'] = len(data)
+
+        with self.profiler.stage('transform', len(data)) as registro:
+            data = feature_pipeline.transform(data)
+            registro['filas_salida'] = len(data)
+
+        try:
+            with self.profiler.stage('load_model'):
+                self.load_model()
+
+            with self.profiler.stage('make_predictions', len(data)) as registro:
+                df_preds = self.make_predictions(data)
+                registro['filas_salida'] = len(df_preds)
+        finally:
+            self.close()
+
+        with self.profiler.stage('write_predictions', len(df_preds)):
+            self.write_predictions(df_preds)
+
+    def run_streaming(self, chunksize: int, feature_pipeline=None):
+        """
+        Igual que MakePredictionPipeline.run_streaming(): cada bloque se lee
+        y se transforma una única vez y lo evalúan todos los modelos.
+        """
+
+        self.metrics.reset()
+        try:
+            super().run_streaming(chunksize, feature_pipeline)
+        finally:
+            self.close()
+
+
+def parse_modelos(valores: list) -> dict:
+    """
+    Convierte los argumentos 'nombre=ruta' en un diccionario ordenado.
+    """
+
+    modelos = {}
+    for valor in valores:
+        nombre, separador, path = valor.partition('=')
+        if not separador or not nombre or not path:
+            raise argparse.ArgumentTypeError(f"Modelo inválido: {valor} (se espera nombre=ruta)")
+        if nombre in modelos:
+            raise argparse.ArgumentTypeError(f"Modelo repetido: {nombre}")
+        modelos[nombre] = path
+
+    return modelos
+
+
+if __name__ == "__main__":
+
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modelos', type=str, nargs='+',
+                        default=['lineal=' + os.path.join(current_directory, "..", "model",
+                                                          "model.pkl")],
+                        help='Modelos a evaluar como nombre=ruta (.pkl, directorio de '
+                        'model_arrays o modelo de MLflow); el primero es la referencia')
+    parser.add_argument('--entrada', type=str,
+                        default=os.path.join(current_directory, "..", "data", "Transformed",
+                                             "Train_BigMart_Prepared.csv"),
+                        help='Datos transformados (o crudos, con --crudos)')
+    parser.add_argument('--salida', type=str,
+                        default=os.path.join(current_directory, "..", "data",
+                                             "BigMart_Predictions_Modelos.csv"),
+                        help='Archivo con las predicciones de todos los modelos')
+    parser.add_argument('--crudos', action='store_true',
+                        help='La entrada tiene el formato de Train_BigMart.csv y se '
+                        'transforma con ../model/feature_state.json')
+    parser.add_argument('--metricas', type=str, default=None,
+                        help='Guardar las métricas de cada modelo en json')
+    parser.add_argument('--hilos', type=int, default=None,
+                        help='Hilos en los que predicen los modelos')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Predecir por bloques de esta cantidad de registros')
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        model_paths = parse_modelos(args.modelos)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+    feature_pipeline = None
+    if args.crudos:
+        # Se importa aquí porque solo es necesario para los datos crudos
+        from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0415
+        feature_pipeline = FeatureEngineeringPipeline(
+            input_path=args.entrada, output_path=None,
+            state_path=os.path.join(current_directory, "..", "model", "feature_state.json"))
+        feature_pipeline.load_state()
+
+    pipeline = MultiModelPredictionPipeline(input_path=args.entrada,
+                                            output_path=args.salida,
+                                            model_paths=model_paths,
+                                            profiler=profiler_from_args(args),
+                                            n_threads=args.hilos)
+
+    if args.chunksize is not None:
+        pipeline.run_streaming(args.chunksize, feature_pipeline)
+    else:
+        pipeline.run(feature_pipeline)
+
+    print(pipeline.metrics.report())
+    print(pipeline.profiler.report())
+    if args.metricas is not None:
+        pipeline.metrics.save(args.metricas)
+    export_profile(pipeline.profiler, args, "multi_model")
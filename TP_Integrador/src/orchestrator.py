@@ -0,0 +1,296 @@
+"""
+orchestrator.py
+
+DESCRIPCIÓN: Contiene la clase PipelineOrchestrator, que compone
+FeatureEngineeringPipeline, ModelTrainingPipeline y MakePredictionPipeline
+dentro del mismo proceso. Los datos pasan de una etapa a la siguiente
+en memoria; escribir los archivos intermedios es opcional. Se registra
+el tiempo de cada etapa.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import os
+
+from feature_engineering import FeatureEngineeringPipeline
+from lookup_index import LookupIndex
+from train import ModelTrainingPipeline
+from predict import MakePredictionPipeline
+from monitoring import perfil_entrenamiento, save_profile
+from profiling import StageProfiler
+
+
+class PipelineOrchestrator:
+    """
+    Clase que ejecuta los pipelines de entrenamiento e inferencia en un
+    único proceso y registra cada etapa (tiempo, registros y memoria) en
+    un StageProfiler.
+    """
+
+    def __init__(self, model_path: str, state_path: str, write_intermediate: bool = True,
+                 storage_format: str = None, cache=None, arrays_path: str = None,
+                 profiler: StageProfiler = None, compacto: bool = False,
+                 profile_path: str = None, monitor=None, index_path: str = None,
+                 actualizar_indice: bool = False, motor: str = 'pandas', cv=None,
+                 index_max_items: int = None, index_ttl: int = None):
+        """
+        :param model_path: Ruta del modelo entrenado (.pkl, o directorio
+                           .npy + schema.json en inferencia).
+        :param state_path: Ruta del estado de la ingeniería de features.
+        :param write_intermediate: Si es True se escriben los datos
+                                   transformados en prepared_path.
+        :param storage_format: Formato de los datos transformados y de las
+                               predicciones (csv, parquet o arrow). Si es
+                               None se infiere de la extensión de cada ruta.
+        :param cache: FeatureCache con los datos transformados de
+                      entrenamiento. Si es None no se usa cache.
+        :param arrays_path: Directorio donde el entrenamiento guarda además
+                            el modelo como .npy + schema.json.
+        :param profiler: StageProfiler donde se registran las etapas.
+        :param compacto: Si es True los datos crudos se leen con los tipos
+                         compactos de ESQUEMA_BIGMART (ver storage.py).
+        :param profile_path: Ruta donde el entrenamiento guarda el perfil de
+                             las features y de las predicciones que usa el
+                             monitoreo (ver monitoring.py). Si es None no
+                             se guarda.
+        :param monitor: DriftMonitor que recibe en inferencia cada lote de
+                        predicciones. Si es None no se monitorea.
+        :param index_path: Ruta del índice de productos y tiendas (ver
+                           lookup_index.py). El entrenamiento lo construye
+                           y la inferencia lo usa si existe.
+        :param actualizar_indice: Si es True, la inferencia incorpora los
+                                  datos de cada lote al índice y lo guarda
+                                  al finalizar.
+        :param motor: Motor de la ingeniería de features: 'pandas' o
+                      'duckdb' (ver duckdb_engine.py). Con duckdb no se usa
+                      el índice y la inferencia no admite chunksize.
+        :param cv: CrossValidator (cross_validation.py) con el que el
+                   entrenamiento evalúa el modelo antes de entrenarlo con
+                   todos los datos. Si es None no se valida.
+        :param index_max_items: Cantidad máxima de productos del índice. Si
+                                es None, el entrenamiento usa MAX_ITEMS de
+                                lookup_index.py y la inferencia la guardada.
+        :param index_ttl: Lotes sin aparecer tras los que se descarta un
+                          producto del índice. Si es None, el entrenamiento
+                          usa TTL de lookup_index.py y la inferencia el guardado.
+        """
+        self.model_path = model_path
+        self.state_path = state_path
+        self.write_intermediate = write_intermediate
+        self.storage_format = storage_format
+        self.cache = cache
+        self.arrays_path = arrays_path
+        self.profiler = profiler if profiler is not None else StageProfiler()
+        self.compacto = compacto
+        self.profile_path = profile_path
+        self.monitor = monitor
+        self.index_path = index_path
+        self.actualizar_indice = actualizar_indice
+        self.motor = motor
+        self.cv = cv
+        self.index_max_items = index_max_items
+        self.index_ttl = index_ttl
+
+    def stage(self, nombre: str, filas_entrada: int = None):
+        """
+        Mide una etapa con el StageProfiler.
+
+        :param nombre: Nombre de la etapa.
+        :param filas_entrada: Cantidad de registros de entrada.
+        """
+        return self.profiler.stage(nombre, filas_entrada)
+
+    @property
+    def timings(self) -> dict:
+        """
+        Devuelve el tiempo de cada etapa en segundos.
+        """
+        return self.profiler.timings
+
+    def run_training(self, input_path: str, prepared_path: str = None):
+        """
+        Aprende el estado de la ingeniería de features sobre los datos de
+        entrenamiento, transforma los datos y entrena el modelo.
+
+        :param input_path: Ruta de los datos crudos de entrenamiento.
+        :param prepared_path: Ruta de los datos transformados. Solo se
+                              escribe si write_intermediate es True.
+
+        :return: Modelo entrenado.
+        """
+        self.profiler.reset()
+        feature_pipeline = FeatureEngineeringPipeline(input_path = input_path,
+                                                      output_path = prepared_path,
+                                                      state_path = self.state_path,
+                                                      storage_format = self.storage_format,
+                                                      cache = self.cache,
+                                                      compacto = self.compacto,
+                                                      motor = self.motor)
+        training_pipeline = ModelTrainingPipeline(input_path = prepared_path,
+                                                  model_path = self.model_path,
+                                                  storage_format = self.storage_format,
+                                                  arrays_path = self.arrays_path,
+                                                  cv = self.cv)
+
+        df_raw = None
+        if self.cache is not None or self.motor != 'pandas':
+            # Con cache la lectura solo ocurre si no se encuentra el resultado;
+            # con DuckDB la lectura es parte de la consulta
+            with self.stage('feature_engineering') as registro:
+                df_prepared = feature_pipeline.prepare_data(fit=True)
+                registro['filas_salida'] = len(df_prepared)
+                if feature_pipeline.cache_hit:
+                    registro['etapa'] = 'feature_engineering (cache)'
+                elif self.motor != 'pandas':
+                    registro['etapa'] = f'feature_engineering ({self.motor})'
+        else:
+            with self.stage('read_data') as registro:
+                df_raw = feature_pipeline.read_data()
+                registro['filas_salida'] = len(df_raw)
+
+            with self.stage('feature_engineering', len(df_raw)) as registro:
+                feature_pipeline.fit(df_raw)
+                feature_pipeline.save_state()
+                df_prepared = feature_pipeline.transform(df_raw)
+                registro['filas_salida'] = len(df_prepared)
+
+        if self.write_intermediate and prepared_path is not None:
+            with self.stage('write_prepared_data', len(df_prepared)):
+                feature_pipeline.write_prepared_data(df_prepared)
+
+        # Si se encontró el resultado en el cache, los datos crudos no
+        # cambiaron y el índice solo se construye si no existe o si se
+        # indicaron sus límites
+        limites = {clave: valor for clave, valor in (('max_items', self.index_max_items),
+                                                     ('ttl', self.index_ttl))
+                   if valor is not None}
+        if self.index_path is not None and not (feature_pipeline.cache_hit and not limites
+                                                and os.path.isfile(self.index_path)):
+            if df_raw is None:
+                with self.stage('read_data') as registro:
+                    df_raw = feature_pipeline.read_data()
+                    registro['filas_salida'] = len(df_raw)
+            with self.stage('lookup_index', len(df_raw)):
+                LookupIndex.from_frame(df_raw, **limites).save(self.index_path)
+
+        if self.cv is not None:
+            with self.stage('cross_validation', len(df_prepared)):
+                training_pipeline.cross_validation(df_prepared)
+
+        with self.stage('model_training', len(df_prepared)):
+            model_trained = training_pipeline.model_training(df_prepared)
+
+        with self.stage('model_dump'):
+            training_pipeline.model_dump(model_trained)
+
+        if self.profile_path is not None:
+            with self.stage('training_profile', len(df_prepared)):
+                x_train = df_prepared.drop(columns=['Item_Outlet_Sales'])
+                save_profile(perfil_entrenamiento(x_train, model_trained.predict(x_train)),
+                             self.profile_path)
+
+        return model_trained
+
+    def run_inference(self, input_path: str, output_path: str, prepared_path: str = None,
+                      chunksize: int = None):
+        """
+        Transforma los datos crudos con el estado aprendido en el
+        entrenamiento y escribe las predicciones del modelo.
+
+        :param input_path: Ruta de los datos crudos.
+        :param output_path: Ruta del archivo de predicciones.
+        :param prepared_path: Ruta de los datos transformados. Solo se
+                              escribe si write_intermediate es True.
+        :param chunksize: Si se indica, se procesan los datos por bloques
+                          y no se escriben los datos transformados.
+        """
+        if chunksize is not None and self.motor != 'pandas':
+            raise ValueError("La inferencia por bloques requiere el motor pandas")
+
+        self.profiler.reset()
+        index = None
+        if self.index_path is not None and self.motor == 'pandas' \
+                and os.path.isfile(self.index_path):
+            with self.stage('load_index'):
+                index = LookupIndex.load(self.index_path)
+                index.set_limits(self.index_max_items, self.index_ttl)
+
+        feature_pipeline = FeatureEngineeringPipeline(input_path = input_path,
+                                                      output_path = prepared_path,
+                                                      state_path = self.state_path,
+                                                      storage_format = self.storage_format,
+                                                      compacto = self.compacto,
+                                                      index = index,
+                                                      actualizar_indice = self.actualizar_indice,
+                                                      motor = self.motor)
+        prediction_pipeline = MakePredictionPipeline(input_path = prepared_path,
+                                                     output_path = output_path,
+                                                     model_path = self.model_path,
+                                                     storage_format = self.storage_format,
+                                                     monitor = self.monitor)
+
+        with self.stage('load_state'):
+            feature_pipeline.load_state()
+
+        if chunksize is not None:
+            with self.stage('streaming') as registro:
+                prediction_pipeline.run_streaming(chunksize, feature_pipeline=feature_pipeline)
+                streaming = prediction_pipeline.profiler.records[-1]
+                registro['filas_entrada'] = streaming['filas_entrada']
+                registro['filas_salida'] = streaming['filas_salida']
+            self.save_index(index)
+            return
+
+        filas_entrada = None
+        if self.motor != 'pandas':
+            with self.stage(f'feature_engineering ({self.motor})') as registro:
+                df_prepared = feature_pipeline.prepare_data()
+                registro['filas_salida'] = len(df_prepared)
+        else:
+            with self.stage('read_data') as registro:
+                df_raw = feature_pipeline.read_data()
+                registro['filas_salida'] = filas_entrada = len(df_raw)
+
+            with self.stage('feature_engineering', len(df_raw)) as registro:
+                df_prepared = feature_pipeline.transform(df_raw)
+                registro['filas_salida'] = len(df_prepared)
+
+        if self.write_intermediate and prepared_path is not None:
+            with self.stage('write_prepared_data', len(df_prepared)):
+                feature_pipeline.write_prepared_data(df_prepared)
+
+        with self.stage('load_model'):
+            prediction_pipeline.load_model()
+
+        with self.stage('make_predictions', len(df_prepared)) as registro:
+            df_preds = prediction_pipeline.make_predictions(df_prepared)
+            registro['filas_salida'] = len(df_preds)
+
+        if self.monitor is not None:
+            with self.stage('monitor', len(df_preds)):
+                self.monitor.update(df_preds, filas_entrada)
+
+        with self.stage('write_predictions', len(df_preds)):
+            prediction_pipeline.write_predictions(df_preds)
+
+        self.save_index(index)
+
+    def save_index(self, index) -> None:
+        """
+        Guarda el índice actualizado en inferencia, si corresponde.
+
+        :param index: LookupIndex usado por la transformación, o None.
+        """
+        if index is not None and self.actualizar_indice:
+            with self.stage('save_index', len(index.items)):
+                index.save(self.index_path)
+
+    def report(self) -> str:
+        """
+        Devuelve una tabla de texto con las mediciones de cada etapa.
+
+        :return: Tabla con los tiempos en segundos.
+        :rtype: str
+        """
+        return self.profiler.report()
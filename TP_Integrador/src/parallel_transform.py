@@ -0,0 +1,273 @@
+"""
+parallel_transform.py
+
+DESCRIPCIÓN: Contiene la clase ParallelTransformPipeline, que aplica
+FeatureEngineeringPipeline.transform() a muchos archivos de entrada (un
+directorio o un patrón glob, por ejemplo un archivo por tienda) en un
+pool de procesos. El estado se carga o se aprende una única vez en el
+proceso principal y se envía a cada proceso al iniciarlo. La salida
+puede ser un archivo transformado por archivo de entrada o un único
+archivo con todos los registros, en el orden de los archivos de entrada.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from feature_engineering import FeatureEngineeringPipeline
+from storage import EXTENSIONES, FrameWriter, read_frame, resolve_format, write_frame
+
+# Pipeline de cada proceso del pool, con el estado ya asignado
+_PIPELINE = {}
+
+
+def expand_inputs(entrada: str) -> list:
+    """
+    Devuelve los archivos de entrada, ordenados por nombre.
+
+    :param entrada: Directorio (se toman sus archivos csv, Parquet y Arrow)
+                    o patrón glob.
+
+    :return: Lista de rutas.
+    :rtype: list
+    """
+    if os.path.isdir(entrada):
+        rutas = [os.path.join(entrada, nombre) for nombre in os.listdir(entrada)
+                 if os.path.splitext(nombre)[1].lower() in EXTENSIONES]
+    else:
+        rutas = glob.glob(entrada)
+
+    if not rutas:
+        raise FileNotFoundError(f"No se encontraron archivos de entrada en {entrada}")
+
+    return sorted(rutas)
+
+
+def partition_path(input_path: str, output_dir: str, storage_format: str,
+                   root: str = None) -> str:
+    """
+    Devuelve la ruta del archivo transformado de un archivo de entrada.
+
+    :param input_path: Ruta del archivo de entrada.
+    :param output_dir: Directorio de salida.
+    :param storage_format: Formato de salida.
+    :param root: Directorio común de las entradas. El nombre se arma con la
+                 ruta relativa a root, con '__' en lugar de los separadores,
+                 para que particiones con el mismo nombre en distintos
+                 directorios (in/a/part.csv, in/b/part.csv) no se pisen. Si
+                 es None, solo con el nombre del archivo.
+
+    :return: <output_dir>/<nombre>_Prepared.<formato>
+    :rtype: str
+    """
+    relativa = os.path.relpath(input_path, root) if root else os.path.basename(input_path)
+    nombre = os.path.splitext(relativa)[0].replace(os.sep, '__')
+
+    return os.path.join(output_dir, f"{nombre}_Prepared.{storage_format}")
+
+
+def partition_paths(input_paths: list, output_dir: str, storage_format: str) -> list:
+    """
+    Devuelve la ruta del archivo transformado de cada archivo de entrada,
+    relativa al directorio común de todas las entradas.
+
+    :raises ValueError: Si dos entradas se escribirían en el mismo archivo.
+    :rtype: list
+    """
+    rutas = [os.path.abspath(ruta) for ruta in input_paths]
+    root = os.path.commonpath([os.path.dirname(ruta) for ruta in rutas])
+    salidas = [partition_path(ruta, output_dir, storage_format, root) for ruta in rutas]
+
+    vistas = {}
+    for ruta, salida in zip(input_paths, salidas):
+        if salida in vistas:
+            raise ValueError(f"{vistas[salida]} y {ruta} se escribirían en el mismo "
+                             f"archivo {salida}")
+        vistas[salida] = ruta
+
+    return salidas
+
+
+def concat_csv(partes: list, output_path: str) -> None:
+    """
+    Concatena archivos csv con el mismo encabezado copiando sus bytes, sin
+    volver a interpretarlos.
+
+    :param partes: Rutas de los archivos, en orden.
+    :param output_path: Ruta del archivo de salida.
+    """
+    with open(output_path, 'wb') as salida:
+        for i, parte in enumerate(partes):
+            with open(parte, 'rb') as archivo:
+                encabezado = archivo.readline()
+                if i == 0:
+                    salida.write(encabezado)
+                shutil.copyfileobj(archivo, salida)
+
+
+def init_worker(state: dict) -> None:
+    """
+    Crea el FeatureEngineeringPipeline de cada proceso con el estado compartido.
+
+    :param state: Estado generado por FeatureEngineeringPipeline.fit().
+    """
+    pipeline = FeatureEngineeringPipeline(input_path = None, output_path = None)
+    pipeline.set_state(state)
+    _PIPELINE['pipeline'] = pipeline
+
+
+def transform_file(input_path: str, output_path: str, storage_format: str) -> int:
+    """
+    Lee, transforma y escribe un archivo de entrada.
+
+    :param input_path: Ruta del archivo de entrada.
+    :param output_path: Ruta del archivo transformado.
+    :param storage_format: Formato del archivo transformado.
+
+    :return: Cantidad de registros transformados.
+    :rtype: int
+    """
+    df_transformed = _PIPELINE['pipeline'].transform(read_frame(input_path))
+    write_frame(df_transformed, output_path, storage_format)
+
+    return len(df_transformed)
+
+
+class ParallelTransformPipeline:
+    """
+    Clase que transforma muchos archivos de entrada en paralelo con el
+    estado de FeatureEngineeringPipeline.
+    """
+
+    def __init__(self, entrada: str, output_path: str, state_path: str,
+                 n_workers: int = None, partitioned: bool = True, storage_format: str = None):
+        """
+        :param entrada: Directorio o patrón glob de los archivos de entrada.
+        :param output_path: Directorio de salida si partitioned es True, o
+                            archivo de salida en caso contrario.
+        :param state_path: Ruta del estado de la ingeniería de features.
+        :param n_workers: Cantidad de procesos. Si es None, uno por CPU.
+        :param partitioned: Si es True se escribe un archivo transformado por
+                            archivo de entrada; si no, un único archivo.
+        :param storage_format: Formato de salida (csv, parquet o arrow). Si es
+                               None se infiere de output_path (csv para un
+                               directorio).
+        """
+        self.input_paths = expand_inputs(entrada)
+        self.output_path = output_path
+        self.n_workers = n_workers or os.cpu_count()
+        self.partitioned = partitioned
+        if storage_format is None:
+            storage_format = 'csv' if partitioned else resolve_format(output_path)
+        self.storage_format = storage_format
+        self.feature_pipeline = FeatureEngineeringPipeline(input_path = None,
+                                                           output_path = None,
+                                                           state_path = state_path)
+
+    def fit(self) -> dict:
+        """
+        Aprende el estado sobre todos los archivos de entrada y lo guarda en
+        state_path.
+
+        :return: Estado aprendido.
+        :rtype: dict
+        """
+        df_raw = pd.concat([read_frame(ruta) for ruta in self.input_paths], ignore_index=True)
+        self.feature_pipeline.fit(df_raw)
+        self.feature_pipeline.save_state()
+
+        return self.feature_pipeline.state
+
+    def run(self, fit: bool = False) -> int:
+        """
+        Transforma todos los archivos de entrada.
+
+        :param fit: Si es True se aprende el estado sobre todos los archivos
+                    de entrada; si no, se lee de state_path.
+
+        :return: Cantidad total de registros transformados.
+        :rtype: int
+        """
+        if fit:
+            self.fit()
+        else:
+            self.feature_pipeline.load_state()
+
+        if self.partitioned:
+            os.makedirs(self.output_path, exist_ok=True)
+            return self.transform_partitions(self.output_path)
+
+        # Cada proceso escribe su partición en un directorio temporal y luego
+        # se concatenan en el orden de los archivos de entrada
+        directorio = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(self.output_path)))
+        try:
+            registros = self.transform_partitions(directorio)
+            partes = partition_paths(self.input_paths, directorio, self.storage_format)
+            if self.storage_format == 'csv':
+                concat_csv(partes, self.output_path)
+            else:
+                with FrameWriter(self.output_path, self.storage_format) as writer:
+                    for parte in partes:
+                        writer.write(read_frame(parte, self.storage_format))
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+        return registros
+
+    def transform_partitions(self, output_dir: str) -> int:
+        """
+        Transforma cada archivo de entrada en un proceso del pool.
+
+        :param output_dir: Directorio donde se escriben las particiones.
+
+        :return: Cantidad total de registros transformados.
+        :rtype: int
+        """
+        with ProcessPoolExecutor(max_workers=self.n_workers, initializer=init_worker,
+                                 initargs=(self.feature_pipeline.state,)) as executor:
+            registros = executor.map(
+                transform_file, self.input_paths,
+                partition_paths(self.input_paths, output_dir, self.storage_format),
+                [self.storage_format] * len(self.input_paths))
+
+            return sum(registros)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('entrada', type=str,
+                        help='Directorio o patrón glob de los archivos de entrada')
+    parser.add_argument('salida', type=str,
+                        help='Directorio de salida, o archivo de salida con --concatenar')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Cantidad de procesos (por defecto uno por CPU)')
+    parser.add_argument('--concatenar', action='store_true',
+                        help='Escribir un único archivo con todos los registros')
+    parser.add_argument('--fit', action='store_true',
+                        help='Aprender el estado sobre los archivos de entrada en lugar de '
+                        'usar el aprendido en train')
+    parser.add_argument('--formato', type=str, default=None,
+                        choices=['csv', 'parquet', 'arrow'],
+                        help='Formato de salida')
+    args = parser.parse_args()
+
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+
+    pipeline = ParallelTransformPipeline(
+        entrada = args.entrada,
+        output_path = args.salida,
+        state_path = os.path.join(current_directory, "..", "model", "feature_state.json"),
+        n_workers = args.workers,
+        partitioned = not args.concatenar,
+        storage_format = args.formato)
+
+    total = pipeline.run(fit = args.fit)
+    print(f"{len(pipeline.input_paths)} archivos, {total} registros transformados")
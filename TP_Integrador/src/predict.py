@@ -7,21 +7,73 @@ AUTOR: Ezquiel Scordamaglia - Santiago Gonzalez Achaval
 FECHA: 10/8/2023
 """
 
+import argparse
 import pickle as pkl
 import os
 import pandas as pd
 
+from model_format import LinearModelArtifact, is_array_model
+from profiling import StageProfiler, add_profiling_arguments, export_profile, profiler_from_args
+from storage import FrameWriter, read_frame, read_frame_chunks, write_frame
+
+
+def load_model_file(model_path: str):
+    """
+    Carga un modelo entrenado: un .pkl, un directorio guardado con
+    model_format.save_linear_model (se abre como memory map, sin importar
+    sklearn) o el directorio de un modelo de MLflow con el sabor sklearn
+    (el que contiene el archivo MLmodel).
+
+    :param model_path: Ruta del modelo.
+
+    :return: Modelo con el método predict.
+    """
+
+    if is_array_model(model_path):
+        return LinearModelArtifact.load(model_path)
+
+    if os.path.isfile(os.path.join(model_path, 'MLmodel')):
+        # Se importa aquí porque solo es necesario para los modelos de MLflow
+        import yaml  # pylint: disable=C0415
+        with open(os.path.join(model_path, 'MLmodel'), 'r', encoding='utf-8') as f_yaml:
+            sabores = yaml.safe_load(f_yaml)['flavors']
+        if 'sklearn' not in sabores:
+            raise ValueError(f"El modelo de MLflow {model_path} no tiene el sabor sklearn")
+        model_path = os.path.join(model_path, sabores['sklearn']['pickled_model'])
+
+    with open(model_path, 'rb') as model_file:
+        return pkl.load(model_file)
+
+
 class MakePredictionPipeline():
     """
     Clase que carga un modelo entrenado y realiza predicciones sobre 
     un conjunto de datos de entrada.
     """
 
-    def __init__(self, input_path, output_path, model_path: str = None):
+    def __init__(self, input_path, output_path, model_path: str = None,
+                 storage_format: str = None, profiler: StageProfiler = None, monitor=None):
+        """
+        :param input_path: Ruta de los datos transformados.
+        :param output_path: Ruta del archivo de predicciones.
+        :param model_path: Ruta del modelo entrenado: un .pkl, un directorio
+                           guardado con model_format.save_linear_model o un
+                           modelo de MLflow (ver load_model_file).
+        :param storage_format: Formato de los datos de entrada y de salida
+                               (csv, parquet o arrow). Si es None se infiere
+                               de la extensión de cada ruta.
+        :param profiler: StageProfiler donde run() y run_streaming()
+                         registran sus etapas.
+        :param monitor: DriftMonitor (monitoring.py) que recibe cada lote
+                        de predicciones. Si es None no se monitorea.
+        """
+        self.storage_format = storage_format
+        self.profiler = profiler if profiler is not None else StageProfiler()
         self.input_path = input_path
         self.output_path = output_path
         self.model_path = model_path
         self.model = None
+        self.monitor = monitor
 
     def load_data(self) -> pd.DataFrame:
         """
@@ -30,17 +82,28 @@ class MakePredictionPipeline():
         :return: El DataFrame con los datos de entrada.
         """
 
-        data = pd.read_csv(self.input_path,sep=",")
+        data = read_frame(self.input_path, self.storage_format)
 
         return data
 
+    def load_data_chunks(self, chunksize: int):
+        """
+        Lee los datos de entrada en bloques de tamaño fijo, sin cargar
+        el archivo completo en memoria.
+
+        :param chunksize: Cantidad de registros por bloque.
+        :return: Iterador de DataFrames.
+        """
+
+        return read_frame_chunks(self.input_path, chunksize, self.storage_format)
+
     def load_model(self) -> None:
         """
-        Carga el modelo entrenado.
+        Carga el modelo entrenado. Un modelo guardado como .npy + schema.json
+        se abre como memory map, sin importar sklearn.
         """
 
-        with open(self.model_path, 'rb') as model_file:
-            self.model = pkl.load(model_file)
+        self.model = load_model_file(self.model_path)
 
     def make_predictions(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -57,20 +120,83 @@ class MakePredictionPipeline():
         Escribe las predicciones en el directorio de salida.
         """
 
-        predicted_data.to_csv(self.output_path, index=False)
+        write_frame(predicted_data, self.output_path, self.storage_format)
 
     def run(self):
         """
         Llama a los metodos.
         """
 
-        data = self.load_data()
-        self.load_model()
-        df_preds = self.make_predictions(data)
-        self.write_predictions(df_preds)
+        with self.profiler.stage('load_data') as registro:
+            data = self.load_data()
+            registro['filas_salida'] = len(data)
+
+        with self.profiler.stage('load_model'):
+            self.load_model()
+
+        with self.profiler.stage('make_predictions', len(data)) as registro:
+            df_preds = self.make_predictions(data)
+            registro['filas_salida'] = len(df_preds)
+
+        if self.monitor is not None:
+            with self.profiler.stage('monitor', len(df_preds)):
+                self.monitor.update(df_preds)
+
+        with self.profiler.stage('write_predictions', len(df_preds)):
+            self.write_predictions(df_preds)
+
+    def run_streaming(self, chunksize: int, feature_pipeline=None):
+        """
+        Realiza las predicciones por bloques y agrega cada bloque al archivo
+        de salida, de modo que la memoria utilizada depende del tamaño del
+        bloque y no del tamaño del archivo. Las predicciones coinciden con
+        las de run() salvo por el redondeo del producto matricial, que
+        puede variar en el último bit según la posición del registro en
+        el bloque.
+
+        :param chunksize: Cantidad de registros por bloque.
+        :param feature_pipeline: FeatureEngineeringPipeline con el estado ya
+                                 cargado. Si se indica, se leen por bloques
+                                 los datos crudos de su input_path y cada
+                                 bloque se transforma antes de predecir.
+        """
+
+        with self.profiler.stage('load_model'):
+            self.load_model()
+
+        chunks = self.load_data_chunks(chunksize) if feature_pipeline is None \
+            else feature_pipeline.read_data_chunks(chunksize)
+
+        with self.profiler.stage('streaming') as registro, \
+                FrameWriter(self.output_path, self.storage_format) as writer:
+            registro['filas_entrada'] = registro['filas_salida'] = 0
+            for chunk in chunks:
+                filas_entrada = len(chunk)
+                registro['filas_entrada'] += filas_entrada
+                if feature_pipeline is not None:
+                    chunk = feature_pipeline.transform(chunk)
+
+                # Un bloque vacío (por ejemplo, si la transformación descartó todos
+                # sus registros) solo aporta el encabezado
+                df_preds = chunk if chunk.empty else self.make_predictions(chunk)
+                writer.write(df_preds)
+                registro['filas_salida'] += len(chunk)
+
+                if self.monitor is not None:
+                    # Los descartados solo se conocen si el bloque llega crudo
+                    self.monitor.update(df_preds, filas_entrada
+                                        if feature_pipeline is not None else None)
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Predecir por bloques de esta cantidad de registros')
+    parser.add_argument('--modelo-arrays', action='store_true',
+                        help='Cargar el modelo desde ../model/model_arrays/ en lugar de model.pkl')
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
     current_directory = os.path.dirname(os.path.abspath(__file__))
 
     in_path = os.path.join(current_directory,
@@ -83,9 +209,19 @@ if __name__ == "__main__":
                            "data",
                            "Test_BigMart_Predictions.csv")
 
-    mod_path = os.path.join(current_directory, "..", "model", "model.pkl")
+    mod_path = os.path.join(current_directory, "..", "model",
+                            "model_arrays" if args.modelo_arrays else "model.pkl")
+
+    pipeline = MakePredictionPipeline(input_path = in_path,
+                                      output_path = out_path,
+                                      model_path = mod_path,
+                                      profiler = profiler_from_args(args))
+
+    if args.chunksize is not None:
+        pipeline.run_streaming(args.chunksize)
+    else:
+        pipeline.run()
 
-    MakePredictionPipeline(input_path = in_path,
-                            output_path = out_path,
-                            model_path = mod_path).run()
+    print(pipeline.profiler.report())
+    export_profile(pipeline.profiler, args, "predict")
   
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+profiling.py
+
+DESCRIPCIÓN: Contiene la clase StageProfiler, que registra para cada
+etapa de un pipeline el tiempo de ejecución, los registros de entrada y
+de salida y, opcionalmente, el pico de memoria (tracemalloc) y un perfil
+de cProfile. Los registros se exportan como json y pueden enviarse como
+métricas a MLflow.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import cProfile
+import json
+import os
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TRACKING_URI = "sqlite:///" + os.path.abspath(
+    os.path.join(CURRENT_DIRECTORY, "..", "..", "mydb.sqlite"))
+ARTIFACT_LOCATION = os.path.abspath(os.path.join(CURRENT_DIRECTORY, "..", "..", "mlartifacts"))
+
+# Caracteres que MLflow no admite en los nombres de las métricas
+CARACTERES_INVALIDOS = re.compile(r'[^A-Za-z0-9_\-./]+')
+
+
+def metric_name(etapa: str, medida: str) -> str:
+    """
+    Devuelve el nombre de la métrica de MLflow de una medida de una etapa:
+    los espacios, paréntesis y demás caracteres que MLflow no admite se
+    reemplazan por '_' ("feature_engineering (cache)", "segundos" ->
+    "feature_engineering_cache_segundos").
+    """
+    return f"{CARACTERES_INVALIDOS.sub('_', etapa).strip('_')}_{medida}"
+
+
+def current_rss_mb():
+    """
+    Devuelve la memoria residente del proceso en MB, o None sin psutil.
+    """
+    try:
+        import psutil  # pylint: disable=C0415
+    except ImportError:
+        return None
+
+    return psutil.Process().memory_info().rss / 2**20
+
+
+class StageProfiler:
+    """
+    Clase que registra las etapas de un pipeline. Cada etapa es un
+    diccionario con las claves etapa, segundos, filas_entrada,
+    filas_salida, memoria_pico_mb y rss_mb.
+    """
+
+    def __init__(self, memory: bool = False, cprofile_dir: str = None):
+        """
+        :param memory: Si es True se mide el pico de memoria de cada etapa
+                       con tracemalloc (agrega overhead).
+        :param cprofile_dir: Si se indica, se guarda en este directorio un
+                             perfil <etapa>.prof de cada etapa.
+        """
+        self.memory = memory
+        self.cprofile_dir = cprofile_dir
+        self.records = []
+
+    @contextmanager
+    def stage(self, nombre: str, filas_entrada: int = None):
+        """
+        Mide una etapa. Devuelve su registro, en el que se puede completar
+        filas_salida dentro del bloque with.
+
+        :param nombre: Nombre de la etapa.
+        :param filas_entrada: Cantidad de registros de entrada.
+        """
+        registro = {'etapa': nombre, 'segundos': None, 'filas_entrada': filas_entrada,
+                    'filas_salida': None, 'memoria_pico_mb': None, 'rss_mb': None}
+
+        iniciar_memoria = self.memory and not tracemalloc.is_tracing()
+        if iniciar_memoria:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+
+        perfil = cProfile.Profile() if self.cprofile_dir is not None else None
+        if perfil is not None:
+            perfil.enable()
+
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+
+            if perfil is not None:
+                perfil.disable()
+                os.makedirs(self.cprofile_dir, exist_ok=True)
+                perfil.dump_stats(os.path.join(self.cprofile_dir, f"{registro['etapa']}.prof"))
+
+            if self.memory:
+                pico = tracemalloc.get_traced_memory()[1]
+                registro['memoria_pico_mb'] = (pico - memoria_inicial) / 2**20
+                if iniciar_memoria:
+                    tracemalloc.stop()
+
+            registro['rss_mb'] = current_rss_mb()
+            self.records.append(registro)
+
+    @property
+    def timings(self) -> dict:
+        """
+        Devuelve el tiempo de cada etapa en segundos.
+
+        :return: Diccionario {etapa: segundos}.
+        :rtype: dict
+        """
+        return {registro['etapa']: registro['segundos'] for registro in self.records}
+
+    def reset(self) -> None:
+        """
+        Descarta los registros anteriores.
+        """
+        self.records = []
+
+    def to_dict(self) -> dict:
+        """
+        Devuelve los registros y el tiempo total.
+
+        :rtype: dict
+        """
+        return {'etapas': self.records,
+                'segundos_total': sum(registro['segundos'] for registro in self.records)}
+
+    def write_json(self, path: str) -> None:
+        """
+        Escribe los registros en formato json.
+
+        :param path: Ruta del archivo de salida.
+        """
+        with open(path, 'w', encoding='utf-8') as f_json:
+            json.dump(self.to_dict(), f_json, indent=2)
+
+    def log_mlflow(self, run_name: str, tracking_uri: str = TRACKING_URI,
+                   experiment_name: str = 'BigMart_pipelines') -> None:
+        """
+        Registra cada medición como métrica <etapa>_<medida> en MLflow (ver
+        metric_name). Si hay un run activo se usa; si no, se crea uno con
+        run_name.
+
+        :param run_name: Nombre del run.
+        :param tracking_uri: URI del backend de MLflow.
+        :param experiment_name: Nombre del experimento.
+        """
+        import mlflow  # pylint: disable=C0415
+
+        metricas = {metric_name(registro['etapa'], medida): registro[medida]
+                    for registro in self.records
+                    for medida in ('segundos', 'filas_entrada', 'filas_salida',
+                                   'memoria_pico_mb', 'rss_mb')
+                    if registro[medida] is not None}
+        metricas['segundos_total'] = self.to_dict()['segundos_total']
+
+        if mlflow.active_run() is not None:
+            mlflow.log_metrics(metricas)
+            return
+
+        mlflow.set_tracking_uri(tracking_uri)
+        if mlflow.get_experiment_by_name(experiment_name) is None:
+            mlflow.create_experiment(experiment_name, artifact_location=ARTIFACT_LOCATION)
+        mlflow.set_experiment(experiment_name)
+        with mlflow.start_run(run_name=run_name):
+            mlflow.log_metrics(metricas)
+
+    def report(self) -> str:
+        """
+        Devuelve una tabla de texto con las mediciones de cada etapa.
+
+        :return: Tabla con los tiempos en segundos.
+        :rtype: str
+        """
+        def celda(valor, formato):
+            return format(valor, formato) if valor is not None else '-'
+
+        lineas = [f"{'etapa':<28} {'segundos':>10} {'filas in':>10} {'filas out':>10} "
+                  f"{'pico [MB]':>10}"]
+        lineas += [f"{r['etapa']:<28} {r['segundos']:>10.4f} "
+                   f"{celda(r['filas_entrada'], '>10d'):>10} {celda(r['filas_salida'], '>10d'):>10} "
+                   f"{celda(r['memoria_pico_mb'], '>10.1f'):>10}" for r in self.records]
+        lineas.append(f"{'total':<28} {self.to_dict()['segundos_total']:>10.4f}")
+
+        return "\n".join(lineas)
+
+
+def add_profiling_arguments(parser) -> None:
+    """
+    Agrega a un ArgumentParser las opciones de perfilado.
+    """
+    parser.add_argument('--perfil', type=str, default=None,
+                        help='Escribir las mediciones de cada etapa en este archivo json')
+    parser.add_argument('--memoria', action='store_true',
+                        help='Medir el pico de memoria de cada etapa con tracemalloc')
+    parser.add_argument('--cprofile', type=str, default=None,
+                        help='Guardar un perfil de cProfile por etapa en este directorio')
+    parser.add_argument('--mlflow', action='store_true',
+                        help='Registrar las mediciones como métricas en MLflow')
+
+
+def profiler_from_args(args) -> StageProfiler:
+    """
+    Crea un StageProfiler con las opciones de add_profiling_arguments.
+    """
+    return StageProfiler(memory=args.memoria, cprofile_dir=args.cprofile)
+
+
+def export_profile(profiler: StageProfiler, args, run_name: str) -> None:
+    """
+    Escribe el json y registra las métricas según las opciones de
+    add_profiling_arguments.
+    """
+    if args.perfil is not None:
+        profiler.write_json(args.perfil)
+    if args.mlflow:
+        profiler.log_mlflow(run_name)
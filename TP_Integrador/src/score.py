@@ -0,0 +1,289 @@
+"""
+score.py
+
+DESCRIPCIÓN: Predicción de arranque rápido para lotes chicos de registros
+crudos (csv, json o json lines, con la forma de ../Notebook/example.json).
+Al cargar el módulo solo se importan módulos de la biblioteca estándar:
+los registros se leen con csv/json y se predicen en Python puro con el
+modelo compilado (compiled_model.py) guardado en json, sin pandas, NumPy
+ni sklearn. NumPy se importa solo si el lote supera --umbral-numpy
+registros, y pickle, sklearn y pandas solo para compilar el modelo, lo
+que ocurre la primera vez o cuando cambian model.pkl o feature_state.json.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import zlib
+from bisect import bisect_left
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl")
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+COMPILED_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "compiled_model.json")
+
+# Columnas numéricas de los registros crudos; en csv llegan como texto
+COLUMNAS_NUMERICAS = ('Item_Weight', 'Item_Visibility', 'Item_MRP', 'Outlet_Establishment_Year')
+
+# Columnas de la salida además de la predicción
+COLUMNAS_CLAVE = ('Item_Identifier', 'Outlet_Identifier')
+
+# Por encima de esta cantidad de registros se predice con NumPy
+UMBRAL_NUMPY = 5000
+
+
+def fingerprint(path: str) -> str:
+    """
+    Devuelve una huella (crc32) del contenido de un archivo o, para un
+    directorio como model_arrays/, de sus archivos. Solo se usa para
+    detectar cambios, por lo que alcanza con zlib, que se importa mucho
+    más rápido que hashlib.
+    """
+    archivos = [path] if os.path.isfile(path) else \
+        [os.path.join(path, nombre) for nombre in sorted(os.listdir(path))]
+    crc = 0
+    for archivo in archivos:
+        with open(archivo, 'rb') as contenido:
+            crc = zlib.crc32(contenido.read(), crc)
+
+    return f"{crc:08x}"
+
+
+def compile_model(model_path: str, state_path: str, compiled_path: str) -> dict:
+    """
+    Compila el modelo y el estado de la ingeniería de features y guarda el
+    resultado en compiled_path, junto con las huellas de ambos archivos.
+
+    :return: Modelo compilado como diccionario.
+    :rtype: dict
+    """
+    # Se importan aquí porque solo son necesarios para compilar
+    from compiled_model import CompiledLinearModel  # pylint: disable=C0415
+    from predict import load_model_file  # pylint: disable=C0415
+
+    with open(state_path, 'r', encoding='utf-8') as f_json:
+        state = json.load(f_json)
+    compilado = CompiledLinearModel.from_state(state, load_model_file(model_path))
+    origen = {'modelo': fingerprint(model_path), 'estado': fingerprint(state_path)}
+    compilado.save(compiled_path, origen=origen)
+
+    return {**compilado.to_dict(), 'origen': origen}
+
+
+def load_compiled(model_path: str = MODEL_PATH, state_path: str = STATE_PATH,
+                  compiled_path: str = COMPILED_PATH, recompilar: bool = False) -> dict:
+    """
+    Lee el modelo compilado. Si no existe, si se pide recompilar o si el
+    modelo o el estado cambiaron desde que se compiló, lo compila de nuevo.
+
+    :return: Modelo compilado como diccionario.
+    :rtype: dict
+    """
+    if not recompilar and os.path.isfile(compiled_path):
+        with open(compiled_path, 'r', encoding='utf-8') as f_json:
+            compilado = json.load(f_json)
+        if compilado.get('origen') == {'modelo': fingerprint(model_path),
+                                       'estado': fingerprint(state_path)}:
+            return compilado
+
+    return compile_model(model_path, state_path, compiled_path)
+
+
+class LightLinearModel:
+    """
+    Clase que predice con el modelo compilado en Python puro. Aplica la
+    misma transformación que CompiledLinearModel.features(), registro por
+    registro; los registros de productos sin peso conocido devuelven NaN.
+    """
+
+    def __init__(self, compilado: dict):
+        """
+        :param compilado: Diccionario generado por CompiledLinearModel.to_dict().
+        """
+        self.coef = dict(zip(compilado['feature_names'], compilado['coef']))
+        self.intercept = compilado['intercept']
+        self.anio_referencia = compilado['anio_referencia']
+        self.limites_mrp = compilado['limites_mrp']
+        self.modas_peso = compilado['modas_peso']
+        self.codigos_size = compilado['codigos_outlet_size']
+        self.codigos_location = compilado['codigos_outlet_location']
+        self.coef_tipo = {tipo: self.coef[f'Outlet_Type_{tipo}']
+                          for tipo in compilado['tipos_outlet']}
+        # Tamaño de las tiendas del índice de productos y tiendas, si se compiló con él
+        self.tamanios_outlet = compilado.get('tamanios_outlet')
+        self.outlets_sin_tamanio = set(compilado.get('outlets_sin_tamanio') or [])
+
+    @staticmethod
+    def faltante(valor) -> bool:
+        """
+        Indica si un valor crudo es faltante (None o NaN).
+        """
+        return valor is None or (isinstance(valor, float) and math.isnan(valor))
+
+    def predict_record(self, registro: dict) -> float:
+        """
+        Predice un registro crudo.
+
+        :param registro: Registro crudo (diccionario).
+
+        :return: Predicción, o NaN si el producto no tiene peso conocido o
+                 si falta otro valor numérico.
+        :rtype: float
+        """
+        peso = registro.get('Item_Weight')
+        if self.faltante(peso):
+            peso = self.modas_peso.get(registro.get('Item_Identifier'), math.nan)
+
+        # Los demás numéricos faltantes (campos vacíos del csv) pasan a NaN,
+        # como en CompiledLinearModel.features()
+        visibilidad, precio, anio = (
+            math.nan if self.faltante(registro.get(columna)) else float(registro[columna])
+            for columna in ('Item_Visibility', 'Item_MRP', 'Outlet_Establishment_Year'))
+        nivel = math.nan if math.isnan(precio) else bisect_left(self.limites_mrp, precio) + 1
+
+        tamanio = registro.get('Outlet_Size')
+        if self.tamanios_outlet is not None and (
+                self.faltante(tamanio)
+                or registro.get('Outlet_Identifier') in self.outlets_sin_tamanio):
+            tamanio = self.tamanios_outlet.get(registro.get('Outlet_Identifier'), 0.0)
+        else:
+            tamanio = 0.0 if self.faltante(tamanio) else self.codigos_size.get(tamanio, math.nan)
+
+        coef = self.coef
+        return (self.intercept
+                + coef['Item_Weight'] * peso
+                + coef['Item_Visibility'] * visibilidad
+                + coef['Item_MRP'] * nivel
+                + coef['Outlet_Establishment_Year'] * (self.anio_referencia - anio)
+                + coef['Outlet_Size'] * tamanio
+                + coef['Outlet_Location_Type']
+                * self.codigos_location.get(registro['Outlet_Location_Type'], math.nan)
+                + self.coef_tipo.get(registro['Outlet_Type'], 0.0))
+
+    def predict_records(self, records: list) -> list:
+        """
+        Predice una lista de registros crudos.
+        """
+        return [self.predict_record(registro) for registro in records]
+
+
+def predict(compilado: dict, records: list, umbral_numpy: int = UMBRAL_NUMPY) -> list:
+    """
+    Predice los registros en Python puro o, si son más de umbral_numpy,
+    con CompiledLinearModel (NumPy).
+
+    :return: Predicciones, con NaN en los registros sin peso conocido.
+    :rtype: list
+    """
+    if len(records) <= umbral_numpy:
+        return LightLinearModel(compilado).predict_records(records)
+
+    # Se importa aquí para que los lotes chicos no importen NumPy
+    from compiled_model import CompiledLinearModel  # pylint: disable=C0415
+
+    return CompiledLinearModel.from_dict(compilado).predict_records(records).tolist()
+
+
+def parse_csv_record(fila: dict) -> dict:
+    """
+    Convierte los campos de un registro leído con csv.DictReader: vacío a
+    None y las columnas numéricas a float.
+    """
+    registro = {}
+    for columna, valor in fila.items():
+        if valor == '':
+            registro[columna] = None
+        elif columna in COLUMNAS_NUMERICAS:
+            registro[columna] = float(valor)
+        else:
+            registro[columna] = valor
+
+    return registro
+
+
+def read_records(path: str) -> list:
+    """
+    Lee los registros crudos de un csv, de un json (un registro o una
+    lista de registros) o de un json lines (.jsonl, un registro por
+    línea). Con '-' se lee json de la entrada estándar.
+
+    :rtype: list
+    """
+    if path == '-':
+        datos = json.load(sys.stdin)
+        return datos if isinstance(datos, list) else [datos]
+
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8', newline='') as archivo:
+        if extension == '.csv':
+            return [parse_csv_record(fila) for fila in csv.DictReader(archivo)]
+        if extension == '.jsonl':
+            return [json.loads(linea) for linea in archivo if linea.strip()]
+        datos = json.load(archivo)
+
+    return datos if isinstance(datos, list) else [datos]
+
+
+def write_predictions(records: list, predicciones: list, path: str = None) -> None:
+    """
+    Escribe Item_Identifier, Outlet_Identifier y la predicción de cada
+    registro en csv, o en json si path termina en .json (null para los
+    registros sin predicción). Si path es None se escribe csv en la salida
+    estándar.
+    """
+    if path is not None and path.lower().endswith('.json'):
+        with open(path, 'w', encoding='utf-8') as f_json:
+            json.dump({'predictions': [None if math.isnan(prediccion) else prediccion
+                                       for prediccion in predicciones]}, f_json)
+        return
+
+    archivo = sys.stdout if path is None else open(path, 'w', encoding='utf-8', newline='')
+    try:
+        writer = csv.writer(archivo)
+        writer.writerow(COLUMNAS_CLAVE + ('Item_Outlet_Sales',))
+        for registro, prediccion in zip(records, predicciones):
+            writer.writerow([registro.get(columna) for columna in COLUMNAS_CLAVE]
+                            + ['' if math.isnan(prediccion) else repr(prediccion)])
+    finally:
+        if path is not None:
+            archivo.close()
+
+
+def main(argv: list = None) -> None:
+    """
+    Punto de entrada de la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(
+        description='Predicción rápida sobre registros crudos con el modelo compilado')
+    parser.add_argument('entrada', type=str,
+                        help='Registros crudos en csv, json o jsonl; con - se lee json '
+                        'de la entrada estándar')
+    parser.add_argument('--salida', type=str, default=None,
+                        help='Archivo de predicciones (csv o json); por defecto, csv en '
+                        'la salida estándar')
+    parser.add_argument('--modelo', type=str, default=MODEL_PATH,
+                        help='Modelo lineal entrenado (.pkl o directorio de model_arrays)')
+    parser.add_argument('--estado', type=str, default=STATE_PATH,
+                        help='Estado de la ingeniería de features')
+    parser.add_argument('--compilado', type=str, default=COMPILED_PATH,
+                        help='Modelo compilado; se genera si no existe o si cambiaron '
+                        'el modelo o el estado')
+    parser.add_argument('--recompilar', action='store_true',
+                        help='Compilar el modelo aunque el compilado esté al día')
+    parser.add_argument('--umbral-numpy', type=int, default=UMBRAL_NUMPY,
+                        help='Predecir con NumPy por encima de esta cantidad de registros')
+    args = parser.parse_args(argv)
+
+    compilado = load_compiled(args.modelo, args.estado, args.compilado, args.recompilar)
+    records = read_records(args.entrada)
+    write_predictions(records, predict(compilado, records, args.umbral_numpy), args.salida)
+
+
+if __name__ == "__main__":
+    main()
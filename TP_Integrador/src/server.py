@@ -0,0 +1,192 @@
+"""
+server.py
+
+DESCRIPCIÓN: Servicio HTTP de predicción. Carga una única vez, al
+iniciar, el modelo entrenado y el estado de la ingeniería de features,
+y responde predicciones para registros crudos con la forma de
+Notebook/example.json, de a uno o en lotes. Los pedidos concurrentes se
+agrupan con un MicroBatcher para hacer una única predicción por lote.
+
+Para levantar el servicio:
+
+    TP_Integrador\\src> uvicorn server:app --port 8000
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import os
+from typing import List, Literal, Optional, Union
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from compiled_model import CompiledLinearModel
+from feature_engineering import FeatureEngineeringPipeline
+from lookup_index import LookupIndex
+from micro_batching import MicroBatcher
+from predict import MakePredictionPipeline
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+MODEL_PATH = os.environ.get(
+    "BIGMART_MODEL_PATH", os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl"))
+STATE_PATH = os.environ.get(
+    "BIGMART_STATE_PATH", os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json"))
+INDEX_PATH = os.environ.get(
+    "BIGMART_INDEX_PATH", os.path.join(CURRENT_DIRECTORY, "..", "model", "lookup_index.json"))
+MAX_BATCH_SIZE = int(os.environ.get("BIGMART_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.environ.get("BIGMART_MAX_WAIT_MS", "2"))
+COMPILED_MODEL = os.environ.get("BIGMART_COMPILED_MODEL", "0") == "1"
+
+
+# Valores admitidos de las columnas categóricas, los de Train_BigMart.csv
+FAT_CONTENT = Literal['Low Fat', 'Regular', 'LF', 'low fat', 'reg']
+OUTLET_SIZE = Literal['High', 'Medium', 'Small']
+OUTLET_LOCATION_TYPE = Literal['Tier 1', 'Tier 2', 'Tier 3']
+OUTLET_TYPE = Literal['Grocery Store', 'Supermarket Type1', 'Supermarket Type2',
+                      'Supermarket Type3']
+
+
+class BigMartRecord(BaseModel):
+    """
+    Registro crudo de entrada, con las columnas de Test_BigMart.csv. Las
+    columnas categóricas que usa la transformación solo admiten los
+    valores de entrenamiento, de modo que un valor desconocido se rechaza
+    con 422 en la validación en lugar de fallar al predecir.
+    """
+    Item_Identifier: str
+    Item_Weight: Optional[float] = None
+    Item_Fat_Content: FAT_CONTENT
+    Item_Visibility: float
+    Item_Type: str
+    Item_MRP: float
+    Outlet_Identifier: str
+    Outlet_Establishment_Year: int
+    Outlet_Size: Optional[OUTLET_SIZE] = None
+    Outlet_Location_Type: OUTLET_LOCATION_TYPE
+    Outlet_Type: OUTLET_TYPE
+
+
+class ScoringService:
+    """
+    Clase que mantiene en memoria el estado de la ingeniería de features
+    y el modelo entrenado, y predice sobre registros crudos.
+
+    Con compiled=True el estado y los coeficientes del modelo lineal se
+    compilan en un CompiledLinearModel y se predice sin pasar por pandas.
+    Si existe el índice de productos y tiendas de index_path
+    (lookup_index.py), se usa para imputar cada registro en ambos modos:
+    la transformación lo consulta y el modelo compilado incorpora sus
+    tablas de pesos y de tamaños de las tiendas.
+    """
+
+    def __init__(self, model_path: str, state_path: str, compiled: bool = False,
+                 index_path: str = None):
+        self.compiled = compiled
+        self.index_path = index_path
+        self.compiled_model = None
+        self.feature_pipeline = FeatureEngineeringPipeline(input_path = None,
+                                                           output_path = None,
+                                                           state_path = state_path)
+        self.prediction_pipeline = MakePredictionPipeline(input_path = None,
+                                                          output_path = None,
+                                                          model_path = model_path)
+
+    def load(self) -> None:
+        """
+        Carga el estado de la ingeniería de features y el modelo.
+        """
+        self.feature_pipeline.load_state()
+        self.prediction_pipeline.load_model()
+        if self.index_path is not None and os.path.isfile(self.index_path):
+            self.feature_pipeline.index = LookupIndex.load(self.index_path)
+
+        if self.compiled:
+            self.compiled_model = CompiledLinearModel.from_state(
+                self.feature_pipeline.state, self.prediction_pipeline.model,
+                index=self.feature_pipeline.index)
+
+    def predict_records(self, records: List[dict]) -> List[Optional[float]]:
+        """
+        Transforma los registros con el estado aprendido y devuelve una
+        predicción por registro, en el mismo orden. Los registros que la
+        transformación descarta (producto sin peso conocido) devuelven None.
+
+        :param records: Lista de registros crudos.
+
+        :return: Lista de predicciones.
+        :rtype: List[Optional[float]]
+        """
+        if self.compiled_model is not None:
+            return [None if np.isnan(prediccion) else float(prediccion)
+                    for prediccion in self.compiled_model.predict_records(records)]
+
+        df_raw = pd.DataFrame.from_records(records, columns=list(BigMartRecord.__fields__))
+        df_raw['Item_Weight'] = df_raw['Item_Weight'].astype(float)
+
+        df_prepared = self.feature_pipeline.transform(df_raw)
+
+        predicciones = np.full(len(df_raw), np.nan)
+        if not df_prepared.empty:
+            predicciones[df_prepared.index] = self.prediction_pipeline \
+                .make_predictions(df_prepared)['Item_Outlet_Sales'].to_numpy()
+
+        return [None if np.isnan(prediccion) else float(prediccion)
+                for prediccion in predicciones]
+
+
+def create_app(model_path: str = MODEL_PATH, state_path: str = STATE_PATH,
+               max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS,
+               compiled: bool = COMPILED_MODEL, index_path: str = INDEX_PATH) -> FastAPI:
+    """
+    Crea la aplicación FastAPI con un ScoringService que se carga al iniciar.
+
+    :param model_path: Ruta del modelo entrenado.
+    :param state_path: Ruta del estado de la ingeniería de features.
+    :param max_batch_size: Cantidad máxima de registros por lote.
+    :param max_wait_ms: Tiempo máximo de espera para completar un lote.
+    :param compiled: Si es True se predice con el modelo compilado.
+    :param index_path: Ruta del índice de productos y tiendas.
+
+    :return: Aplicación FastAPI.
+    :rtype: FastAPI
+    """
+    application = FastAPI(title="BigMart - Predicción de ventas")
+    service = ScoringService(model_path, state_path, compiled=compiled, index_path=index_path)
+    batcher = MicroBatcher(service.predict_records, max_batch_size=max_batch_size,
+                           max_wait_ms=max_wait_ms)
+
+    @application.on_event("startup")
+    async def load_service() -> None:
+        service.load()
+        await batcher.start()
+
+    @application.on_event("shutdown")
+    async def stop_service() -> None:
+        await batcher.stop()
+
+    @application.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    @application.get("/metrics")
+    async def metrics() -> dict:
+        return batcher.metrics()
+
+    @application.post("/predict")
+    async def predict(payload: Union[BigMartRecord, List[BigMartRecord]]) -> dict:
+        if isinstance(payload, BigMartRecord):
+            return {"prediction": (await batcher.submit([payload.dict()]))[0]}
+
+        if not payload:
+            return {"predictions": []}
+
+        return {"predictions": await batcher.submit([record.dict() for record in payload])}
+
+    return application
+
+
+app = create_app()
@@ -0,0 +1,314 @@
+"""
+storage.py
+
+DESCRIPCIÓN: Lectura y escritura de DataFrames en los formatos de
+almacenamiento soportados por los pipelines: csv (por defecto), Parquet
+y Arrow IPC. Parquet y Arrow conservan los tipos de datos, incluidas
+las columnas categóricas, y Arrow se lee a través de un memory map.
+Parquet y Arrow requieren pyarrow.
+
+Opcionalmente los datos se leen con un esquema de tipos compactos
+(ESQUEMA_BIGMART): categóricas para las columnas de texto, enteros
+chicos y float32, que reducen la memoria de los datos crudos.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+FORMATOS = ('csv', 'parquet', 'arrow')
+
+# Clave de los metadatos de Parquet donde se guardan las categorías de las
+# columnas categóricas: Parquet solo conserva como diccionario las de texto
+CLAVE_CATEGORIAS = b'bigmart_categorias'
+
+# Tipos compactos de las columnas de los datos crudos. Las categorías se
+# infieren de los datos, para no perder valores desconocidos. Item_MRP se
+# mantiene en float64 porque se compara contra los límites de los cuartiles
+# y un redondeo a float32 puede cambiar el nivel de precios de un registro
+ESQUEMA_BIGMART = {'Item_Identifier': 'category',
+                   'Item_Weight': 'float32',
+                   'Item_Fat_Content': 'category',
+                   'Item_Visibility': 'float32',
+                   'Item_Type': 'category',
+                   'Item_MRP': 'float64',
+                   'Outlet_Identifier': 'category',
+                   'Outlet_Establishment_Year': 'int16',
+                   'Outlet_Size': 'category',
+                   'Outlet_Location_Type': 'category',
+                   'Outlet_Type': 'category',
+                   'Item_Outlet_Sales': 'float32'}
+
+# Registros por bloque al leer un csv con columnas categóricas
+BLOQUE_LECTURA = 500_000
+
+EXTENSIONES = {'.csv': 'csv',
+               '.parquet': 'parquet', '.pq': 'parquet',
+               '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'}
+
+
+def import_pyarrow():
+    """
+    Importa pyarrow, que solo es necesario para Parquet y Arrow.
+    """
+    try:
+        import pyarrow  # pylint: disable=C0415
+        import pyarrow.ipc  # pylint: disable=C0415,W0611
+        import pyarrow.parquet  # pylint: disable=C0415,W0611
+    except ImportError as error:
+        raise ImportError("Los formatos parquet y arrow requieren pyarrow: "
+                          "pip install pyarrow") from error
+
+    return pyarrow
+
+
+def resolve_format(path: str, storage_format: str = None) -> str:
+    """
+    Devuelve el formato de un archivo: el indicado, o el que corresponde
+    a su extensión. Si la extensión no es conocida se asume csv.
+
+    :param path: Ruta del archivo.
+    :param storage_format: Formato explícito (csv, parquet o arrow).
+
+    :return: Formato del archivo.
+    :rtype: str
+    """
+    if storage_format is None:
+        return EXTENSIONES.get(os.path.splitext(str(path))[1].lower(), 'csv')
+
+    if storage_format not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {storage_format}. Opciones: {FORMATOS}")
+
+    return storage_format
+
+
+def categorical_metadata(dataframe: pd.DataFrame) -> bytes:
+    """
+    Serializa las categorías y el orden de las columnas categóricas.
+
+    :param dataframe: DataFrame a escribir.
+
+    :return: Metadatos en formato json.
+    :rtype: bytes
+    """
+    categorias = {columna: {'categorias': serie.cat.categories.tolist(),
+                            'ordenada': bool(serie.cat.ordered)}
+                  for columna, serie in dataframe.items()
+                  if isinstance(serie.dtype, pd.CategoricalDtype)}
+
+    return json.dumps(categorias).encode('utf-8')
+
+
+def restore_categoricals(dataframe: pd.DataFrame, metadata: dict) -> pd.DataFrame:
+    """
+    Vuelve a convertir en categóricas las columnas guardadas como tales.
+
+    :param dataframe: DataFrame leído de un archivo Parquet.
+    :param metadata: Metadatos del esquema del archivo.
+
+    :return: DataFrame con las columnas categóricas restauradas.
+    :rtype: pd.DataFrame
+    """
+    if not metadata or CLAVE_CATEGORIAS not in metadata:
+        return dataframe
+
+    for columna, info in json.loads(metadata[CLAVE_CATEGORIAS]).items():
+        if not isinstance(dataframe[columna].dtype, pd.CategoricalDtype):
+            dataframe[columna] = pd.Categorical(dataframe[columna],
+                                                categories=info['categorias'],
+                                                ordered=info['ordenada'])
+
+    return dataframe
+
+
+def apply_schema(dataframe: pd.DataFrame, dtypes: dict = None) -> pd.DataFrame:
+    """
+    Convierte las columnas presentes en el esquema a sus tipos. Las
+    columnas que ya tienen el tipo indicado no se copian.
+
+    :param dataframe: DataFrame leído.
+    :param dtypes: Diccionario {columna: tipo}. Si es None no se convierte nada.
+
+    :return: DataFrame con los tipos del esquema.
+    :rtype: pd.DataFrame
+    """
+    if not dtypes:
+        return dataframe
+
+    conversiones = {columna: tipo for columna, tipo in dtypes.items()
+                    if columna in dataframe.columns and dataframe[columna].dtype != tipo}
+
+    return dataframe.astype(conversiones, copy=False) if conversiones else dataframe
+
+
+def concat_frames(partes: list) -> pd.DataFrame:
+    """
+    Concatena bloques con las mismas columnas. Las columnas categóricas se
+    unen con union_categoricals, porque las categorías de cada bloque
+    pueden ser distintas y pd.concat las convertiría a texto.
+
+    La lista se vacía antes de construir el resultado, para liberar los
+    bloques sin mantener dos copias de los datos.
+
+    :param partes: Lista de DataFrames.
+
+    :return: DataFrame con todos los registros.
+    :rtype: pd.DataFrame
+    """
+    columnas = {}
+    for columna, serie in partes[0].items():
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            columnas[columna] = union_categoricals([parte[columna] for parte in partes],
+                                                   sort_categories=True)
+        else:
+            columnas[columna] = np.concatenate([parte[columna].to_numpy() for parte in partes])
+    partes.clear()
+
+    return pd.DataFrame(columnas, copy=False)
+
+
+def read_frame(path: str, storage_format: str = None, dtypes: dict = None) -> pd.DataFrame:
+    """
+    Lee un DataFrame en el formato indicado.
+
+    :param path: Ruta del archivo.
+    :param storage_format: Formato del archivo. Si es None se infiere de la extensión.
+    :param dtypes: Tipos de las columnas (por ejemplo ESQUEMA_BIGMART). En
+                   csv se aplican al interpretar el archivo, sin crear antes
+                   las columnas con los tipos por defecto. Si hay columnas
+                   categóricas el csv se lee por bloques, para que el pico
+                   de memoria del parser dependa del bloque y no del archivo.
+
+    :return: DataFrame leído.
+    :rtype: pd.DataFrame
+    """
+    storage_format = resolve_format(path, storage_format)
+
+    if storage_format == 'csv':
+        if not dtypes or 'category' not in dtypes.values():
+            return pd.read_csv(path, sep=",", dtype=dtypes)
+        partes = list(pd.read_csv(path, sep=",", dtype=dtypes, chunksize=BLOQUE_LECTURA))
+        if len(partes) == 1:
+            return partes[0]
+        return concat_frames(partes) if partes else pd.read_csv(path, sep=",", dtype=dtypes)
+
+    pyarrow = import_pyarrow()
+    if storage_format == 'parquet':
+        table = pyarrow.parquet.read_table(path, memory_map=True)
+        return apply_schema(restore_categoricals(table.to_pandas(), table.schema.metadata),
+                            dtypes)
+
+    with pyarrow.memory_map(str(path), 'r') as source:
+        return apply_schema(pyarrow.ipc.open_file(source).read_all().to_pandas(split_blocks=True),
+                            dtypes)
+
+
+def read_frame_chunks(path: str, chunksize: int, storage_format: str = None,
+                      dtypes: dict = None):
+    """
+    Lee un DataFrame por bloques de a lo sumo chunksize registros.
+
+    :param path: Ruta del archivo.
+    :param chunksize: Cantidad de registros por bloque.
+    :param storage_format: Formato del archivo. Si es None se infiere de la extensión.
+    :param dtypes: Tipos de las columnas. Las categorías de cada bloque se
+                   infieren del propio bloque.
+
+    :return: Iterador de DataFrames.
+    :rtype: Iterator[pd.DataFrame]
+    """
+    storage_format = resolve_format(path, storage_format)
+
+    if storage_format == 'csv':
+        yield from pd.read_csv(path, sep=",", chunksize=chunksize, dtype=dtypes)
+        return
+
+    pyarrow = import_pyarrow()
+    if storage_format == 'parquet':
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        metadata = parquet_file.schema_arrow.metadata
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield apply_schema(restore_categoricals(batch.to_pandas(), metadata), dtypes)
+        return
+
+    with pyarrow.memory_map(str(path), 'r') as source:
+        reader = pyarrow.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for inicio in range(0, batch.num_rows, chunksize):
+                yield apply_schema(batch.slice(inicio, chunksize).to_pandas(), dtypes)
+
+
+def write_frame(dataframe: pd.DataFrame, path: str, storage_format: str = None) -> None:
+    """
+    Escribe un DataFrame en el formato indicado, sin el índice.
+
+    :param dataframe: DataFrame a escribir.
+    :param path: Ruta del archivo.
+    :param storage_format: Formato del archivo. Si es None se infiere de la extensión.
+    """
+    with FrameWriter(path, storage_format) as writer:
+        writer.write(dataframe)
+
+
+class FrameWriter:
+    """
+    Clase que escribe un DataFrame por bloques en un único archivo. En csv
+    los bloques se agregan al final del archivo; en Parquet y Arrow se
+    mantiene el archivo abierto hasta close().
+    """
+
+    def __init__(self, path: str, storage_format: str = None):
+        self.path = path
+        self.storage_format = resolve_format(path, storage_format)
+        self.writer = None
+        self.schema = None
+        self.bloques = 0
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        """
+        Escribe un bloque. El primer bloque define las columnas y sus tipos.
+
+        :param dataframe: Bloque a escribir.
+        """
+        if self.storage_format == 'csv':
+            dataframe.to_csv(self.path, index=False, sep=',',
+                             mode='w' if self.bloques == 0 else 'a', header=self.bloques == 0)
+            self.bloques += 1
+            return
+
+        pyarrow = import_pyarrow()
+        table = pyarrow.Table.from_pandas(dataframe, schema=self.schema, preserve_index=False)
+
+        if self.writer is None:
+            self.schema = table.schema
+            if self.storage_format == 'parquet':
+                self.schema = self.schema.with_metadata(
+                    {**(self.schema.metadata or {}),
+                     CLAVE_CATEGORIAS: categorical_metadata(dataframe)})
+                table = table.replace_schema_metadata(self.schema.metadata)
+                self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+            else:
+                self.writer = pyarrow.ipc.new_file(self.path, self.schema)
+
+        self.writer.write_table(table)
+        self.bloques += 1
+
+    def close(self) -> None:
+        """
+        Cierra el archivo.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -7,26 +7,49 @@ FECHA: 17/7/2023
 """
 
 # Imports
+import argparse
 import pickle as pkl
 import os
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 
+from cross_validation import add_cv_arguments, cv_from_args, export_cv
+from model_format import save_linear_model
+from profiling import StageProfiler, add_profiling_arguments, export_profile, profiler_from_args
+from storage import read_frame
+
 
 class ModelTrainingPipeline:
     """
     Clase que toma el dataframe de la ruta seleccionada y entrena un modelo
     utilizando el modelo linear regression.
     """
-    def __init__(self, input_path, model_path):
+    def __init__(self, input_path, model_path, storage_format: str = None, estimator=None,
+                 arrays_path: str = None, profiler: StageProfiler = None, cv=None):
         """
         Toma las ubicaciones de entrada y salida.
 
+        :param storage_format: Formato de los datos de entrada (csv, parquet
+                               o arrow). Si es None se infiere de la extensión.
+        :param estimator: Estimador de sklearn a entrenar. Si es None se usa
+                          LinearRegression.
+        :param arrays_path: Directorio donde además se guarda el modelo como
+                            .npy + schema.json (ver model_format.py). Solo
+                            aplica a modelos lineales.
+        :param profiler: StageProfiler donde run() registra sus etapas.
+        :param cv: CrossValidator (cross_validation.py) con el que run()
+                   evalúa el estimador antes de entrenarlo con todos los
+                   datos. Si es None no se valida.
         :return: Los paths de entrada y salida.
         :rtype: pd.dataframe
         """
         self.input_path = input_path
         self.model_path = model_path
+        self.storage_format = storage_format
+        self.estimator = estimator
+        self.arrays_path = arrays_path
+        self.profiler = profiler if profiler is not None else StageProfiler()
+        self.cv = cv
 
     def read_data(self) -> pd.DataFrame:
         """
@@ -35,7 +58,7 @@ class ModelTrainingPipeline:
         :return: El DataFrame con los datos del DataLake.
         :rtype: pd.DataFrame
         """
-        df_bigmart = pd.read_csv(self.input_path,sep=",")
+        df_bigmart = read_frame(self.input_path, self.storage_format)
 
         return df_bigmart
 
@@ -48,7 +71,7 @@ class ModelTrainingPipeline:
         :rtype: pandas.LinearRegression
         """
 
-        model = LinearRegression()
+        model = self.estimator if self.estimator is not None else LinearRegression()
 
         # División de dataset de entrenaimento y validación
         x_train = df_bigmart.drop(columns=['Item_Outlet_Sales'])
@@ -59,6 +82,18 @@ class ModelTrainingPipeline:
 
         return model_trained
 
+    def cross_validation(self, df_bigmart: pd.DataFrame) -> dict:
+        """
+        Evalúa el estimador con la validación cruzada de self.cv.
+
+        :return: Métricas de cada fold y su media y desvío.
+        :rtype: dict
+        """
+
+        model = self.estimator if self.estimator is not None else LinearRegression()
+
+        return self.cv.run(df_bigmart, model)
+
     def model_dump(self, model_trained) -> None:
         """
         Guarda el modelo entrenado en un archivo o ubicación específica.
@@ -70,18 +105,36 @@ class ModelTrainingPipeline:
         with open(file_path, 'wb') as f_pkl:
             pkl.dump(model_trained, f_pkl)
 
+        if self.arrays_path is not None and hasattr(model_trained, 'coef_'):
+            save_linear_model(model_trained, self.arrays_path)
+
     def run(self):
         """
         Llama a los metodos.
  
         """
 
-        df_bigmart = self.read_data()
-        model_trained = self.model_training(df_bigmart)
-        self.model_dump(model_trained)
+        with self.profiler.stage('read_data') as registro:
+            df_bigmart = self.read_data()
+            registro['filas_salida'] = len(df_bigmart)
+
+        if self.cv is not None:
+            with self.profiler.stage('cross_validation', len(df_bigmart)):
+                self.cross_validation(df_bigmart)
+
+        with self.profiler.stage('model_training', len(df_bigmart)):
+            model_trained = self.model_training(df_bigmart)
+
+        with self.profiler.stage('model_dump'):
+            self.model_dump(model_trained)
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser()
+    add_cv_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
     current_directory = os.path.dirname(os.path.abspath(__file__))
 
     in_path = os.path.join(current_directory,
@@ -90,6 +143,15 @@ if __name__ == "__main__":
                            "Train_BigMart_Prepared.csv")
     mod_path = os.path.join(current_directory, "..", "model", "model.pkl")
 
-    ModelTrainingPipeline(input_path = in_path,
-                           model_path = mod_path).run()
+    pipeline = ModelTrainingPipeline(input_path = in_path,
+                                     model_path = mod_path,
+                                     arrays_path = os.path.join(current_directory, "..",
+                                                                "model", "model_arrays"),
+                                     profiler = profiler_from_args(args),
+                                     cv = cv_from_args(args))
+    pipeline.run()
+
+    export_cv(pipeline.cv, args)
+    print(pipeline.profiler.report())
+    export_profile(pipeline.profiler, args, "train")
     
\ No newline at end of file
@@ -1,15 +1,85 @@
 """
 train_pipeline.py
 
-DESCRIPCIÓN: Corre los scripts de feature engineering y train para
-realizar el entrenamiento de un modelo de ML.
+DESCRIPCIÓN: Corre los pasos de feature engineering y train para
+realizar el entrenamiento de un modelo de ML. Las etapas se ejecutan
+en el mismo proceso y se comparten los datos en memoria.
 
 AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
 FECHA: 10/08/2023
 """
 
-import subprocess
+import argparse
+import os
 
-subprocess.run(['Python', 'feature_engineering.py', 'train'], check=False)
+from cross_validation import add_cv_arguments, cv_from_args, export_cv
+from feature_cache import FeatureCache
+from feature_engineering import MOTORES
+from lookup_index import add_index_arguments
+from orchestrator import PipelineOrchestrator
+from profiling import add_profiling_arguments, export_profile, profiler_from_args
 
-subprocess.run(['Python', 'train.py'], check=False)
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sin-intermedio', action='store_true',
+                        help='No escribir Train_BigMart_Prepared.csv')
+    parser.add_argument('--formato', type=str, default='csv',
+                        choices=['csv', 'parquet', 'arrow'],
+                        help='Formato de los datos transformados y de las predicciones')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='No usar el cache de los datos transformados')
+    parser.add_argument('--limpiar-cache', action='store_true',
+                        help='Vaciar el cache de los datos transformados antes de entrenar')
+    parser.add_argument('--cache-max-mb', type=int, default=1024,
+                        help='Tamaño máximo del cache en MB')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Leer los datos crudos con tipos compactos (categóricas, '
+                        'enteros chicos y float32)')
+    parser.add_argument('--motor', type=str, default='pandas', choices=MOTORES,
+                        help='Motor de la ingeniería de features (duckdb requiere duckdb)')
+    add_cv_arguments(parser)
+    add_index_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    if args.motor != 'pandas' and args.compacto:
+        parser.error('--compacto requiere el motor pandas')
+
+    extension = '.' + args.formato
+
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+
+    cache = None
+    if not args.sin_cache or args.limpiar_cache:
+        cache = FeatureCache(os.path.join(current_directory, "..", "data", "cache"),
+                             max_bytes = args.cache_max_mb * 2**20)
+        if args.limpiar_cache:
+            cache.invalidate()
+        if args.sin_cache:
+            cache = None
+
+    orchestrator = PipelineOrchestrator(
+        model_path = os.path.join(current_directory, "..", "model", "model.pkl"),
+        state_path = os.path.join(current_directory, "..", "model", "feature_state.json"),
+        write_intermediate = not args.sin_intermedio,
+        storage_format = args.formato,
+        cache = cache,
+        arrays_path = os.path.join(current_directory, "..", "model", "model_arrays"),
+        profiler = profiler_from_args(args),
+        compacto = args.compacto,
+        motor = args.motor,
+        cv = cv_from_args(args),
+        profile_path = os.path.join(current_directory, "..", "model", "training_profile.json"),
+        index_path = os.path.join(current_directory, "..", "model", "lookup_index.json"),
+        index_max_items = args.indice_max_items,
+        index_ttl = args.indice_ttl)
+
+    orchestrator.run_training(
+        input_path = os.path.join(current_directory, "..", "data", "Train_BigMart.csv"),
+        prepared_path = os.path.join(current_directory, "..", "data", "Transformed",
+                                     "Train_BigMart_Prepared" + extension))
+
+    export_cv(orchestrator.cv, args)
+    print(orchestrator.report())
+    export_profile(orchestrator.profiler, args, "train_pipeline")
@@ -0,0 +1,61 @@
+"""
+conftest.py
+
+DESCRIPCIÓN: Configuración común de las pruebas de pytest: agrega src/ al
+path de importación y define los datos de entrada compartidos.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SRC_DIRECTORY = os.path.join(CURRENT_DIRECTORY, "..", "src")
+TRAIN_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Train_BigMart.csv")
+TEST_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Test_BigMart.csv")
+
+sys.path.insert(0, SRC_DIRECTORY)
+
+
+@pytest.fixture(scope='session')
+def df_train() -> pd.DataFrame:
+    """
+    Datos crudos de entrenamiento (Train_BigMart.csv).
+    """
+    return pd.read_csv(TRAIN_PATH)
+
+
+@pytest.fixture(scope='session')
+def df_test() -> pd.DataFrame:
+    """
+    Datos crudos de prueba (Test_BigMart.csv).
+    """
+    return pd.read_csv(TEST_PATH)
+
+
+@pytest.fixture(scope='session')
+def feature_state(df_train) -> dict:
+    """
+    Estado de la ingeniería de features aprendido sobre df_train.
+    """
+    from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0415
+
+    pipeline = FeatureEngineeringPipeline(input_path=None, output_path=None)
+    return pipeline.fit(df_train)
+
+
+@pytest.fixture(scope='session')
+def df_prepared(df_train, feature_state) -> pd.DataFrame:
+    """
+    df_train transformado con feature_state.
+    """
+    from feature_engineering import FeatureEngineeringPipeline  # pylint: disable=C0415
+
+    pipeline = FeatureEngineeringPipeline(input_path=None, output_path=None)
+    pipeline.set_state(feature_state)
+    return pipeline.transform(df_train)
@@ -0,0 +1,90 @@
+"""
+test_compiled_model.py
+
+DESCRIPCIÓN: Pruebas del modelo compilado (compiled_model.py y score.py):
+las features y las predicciones sobre registros crudos coinciden con las
+de FeatureEngineeringPipeline.transform() y el modelo de sklearn, y los
+registros que la transformación descarta devuelven NaN.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from compiled_model import CompiledLinearModel
+from feature_engineering import FeatureEngineeringPipeline
+from predict import load_model_file
+from score import LightLinearModel
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl")
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+
+
+@pytest.fixture(scope='module')
+def modelo():
+    """
+    Modelo lineal entrenado de model.pkl.
+    """
+    return load_model_file(MODEL_PATH)
+
+
+@pytest.fixture(scope='module')
+def state() -> dict:
+    """
+    Estado con el que se entrenó model.pkl.
+    """
+    with open(STATE_PATH, 'r', encoding='utf-8') as f_json:
+        return json.load(f_json)
+
+
+@pytest.fixture(scope='module')
+def df_raw(df_train, df_test) -> pd.DataFrame:
+    """
+    Registros crudos de entrenamiento y de prueba, sin el target.
+    """
+    return pd.concat([df_train.drop(columns='Item_Outlet_Sales'), df_test], ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def df_features(df_raw, state) -> pd.DataFrame:
+    """
+    Registros transformados con FeatureEngineeringPipeline, sin el target.
+    """
+    pipeline = FeatureEngineeringPipeline(input_path=None, output_path=None)
+    pipeline.set_state(state)
+    return pipeline.transform(df_raw).drop(columns='Item_Outlet_Sales')
+
+
+def test_features_iguales_a_transform(df_raw, df_features, state, modelo):
+    compilado = CompiledLinearModel.from_state(state, modelo)
+
+    matriz = compilado.features(df_raw.to_dict('records'))
+
+    assert compilado.feature_names == list(df_features.columns)
+    np.testing.assert_allclose(matriz[df_features.index], df_features.to_numpy(dtype=float),
+                               rtol=1e-12)
+
+
+@pytest.mark.parametrize('forma', ['numpy', 'python', 'dict'])
+def test_predicciones_iguales_a_sklearn(df_raw, df_features, state, modelo, forma):
+    compilado = CompiledLinearModel.from_state(state, modelo)
+    records = df_raw.to_dict('records')
+    if forma == 'numpy':
+        predicciones = compilado.predict_records(records)
+    elif forma == 'python':
+        predicciones = np.array(LightLinearModel(compilado.to_dict()).predict_records(records))
+    else:
+        predicciones = CompiledLinearModel.from_dict(compilado.to_dict()).predict_records(records)
+
+    np.testing.assert_allclose(predicciones[df_features.index], modelo.predict(df_features),
+                               rtol=1e-9)
+    descartados = np.setdiff1d(np.arange(len(df_raw)), df_features.index)
+    assert len(descartados) > 0
+    assert np.isnan(predicciones[descartados]).all()
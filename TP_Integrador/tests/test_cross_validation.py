@@ -0,0 +1,72 @@
+"""
+test_cross_validation.py
+
+DESCRIPCIÓN: Pruebas de la validación cruzada (cross_validation.py): las
+métricas de cada fold calculadas con las estadísticas suficientes
+coinciden con las de reentrenar el modelo en cada fold, con
+cross_validate de sklearn (KFold y TimeSeriesSplit) y con refit_folds().
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import KFold, TimeSeriesSplit, cross_validate
+
+from cross_validation import METRICAS, SEMILLA, TARGET, CrossValidator, fold_blocks
+
+# Métricas de CrossValidator y su scoring de sklearn (con el signo invertido)
+SCORING = {'rmse': 'neg_root_mean_squared_error', 'mae': 'neg_mean_absolute_error',
+           'r2': 'r2'}
+
+
+def sklearn_cv(df_prepared, cv) -> dict:
+    """
+    Métricas de cada fold reentrenando LinearRegression con cross_validate.
+    """
+    resultado = cross_validate(LinearRegression(), df_prepared.drop(columns=[TARGET]),
+                               df_prepared[TARGET], cv=cv, scoring=SCORING)
+
+    return {metrica: resultado[f'test_{metrica}'] * (1 if metrica == 'r2' else -1)
+            for metrica in SCORING}
+
+
+@pytest.mark.parametrize('folds', [5, 10])
+def test_kfold_igual_a_cross_validate(df_prepared, folds):
+    resultados = CrossValidator(folds).run(df_prepared)
+
+    esperado = sklearn_cv(df_prepared, KFold(folds, shuffle=True, random_state=SEMILLA))
+    assert resultados['metodo'] == 'estadisticas'
+    for metrica, valores in esperado.items():
+        np.testing.assert_allclose([fold[metrica] for fold in resultados['por_fold']],
+                                   valores, rtol=1e-9)
+
+
+def test_temporal_igual_a_time_series_split(df_prepared):
+    resultados = CrossValidator(5, modo='temporal').run(df_prepared)
+
+    esperado = sklearn_cv(df_prepared, TimeSeriesSplit(n_splits=5))
+    for metrica, valores in esperado.items():
+        np.testing.assert_allclose([fold[metrica] for fold in resultados['por_fold']],
+                                   valores, rtol=1e-9)
+
+
+@pytest.mark.parametrize('estimator', [LinearRegression(), Ridge(alpha=10.0)],
+                         ids=['LinearRegression', 'Ridge'])
+@pytest.mark.parametrize('modo', ['kfold', 'temporal'])
+def test_estadisticas_igual_a_reentrenar(df_prepared, estimator, modo):
+    cv = CrossValidator(5, modo=modo, n_workers=1)
+    x_train = df_prepared.drop(columns=[TARGET]).to_numpy(dtype=np.float64)
+    y_train = df_prepared[TARGET].to_numpy(dtype=np.float64)
+    bloques, esquema = fold_blocks(len(df_prepared), 5, modo)
+
+    estadisticas = cv.linear_folds(estimator, x_train, y_train, bloques, esquema)
+    reentrenados = cv.refit_folds(estimator, x_train, y_train, bloques, esquema)
+
+    for metrica in METRICAS:
+        np.testing.assert_allclose([fold[metrica] for fold in estadisticas],
+                                   [fold[metrica] for fold in reentrenados], rtol=1e-9)
+    assert [fold['filas_train'] for fold in estadisticas] == \
+        [fold['filas_train'] for fold in reentrenados]
@@ -0,0 +1,82 @@
+"""
+test_duckdb_engine.py
+
+DESCRIPCIÓN: Pruebas del motor DuckDB (duckdb_engine.py): aprende el mismo
+estado que el motor pandas y genera los mismos datos transformados, salvo
+por el índice, que es consecutivo. Se omiten si duckdb no está instalado.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import TEST_PATH, TRAIN_PATH
+from feature_engineering import FeatureEngineeringPipeline
+from storage import read_frame
+
+pytest.importorskip('duckdb')
+
+from duckdb_engine import DuckDBEngine  # pylint: disable=C0413
+
+
+@pytest.fixture(scope='module')
+def engine():
+    """
+    Motor DuckDB compartido por las pruebas del módulo.
+    """
+    engine = DuckDBEngine(threads=2)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture(scope='module')
+def pipeline(feature_state) -> FeatureEngineeringPipeline:
+    """
+    Pipeline de pandas con el estado aprendido sobre Train_BigMart.csv.
+    """
+    pipeline = FeatureEngineeringPipeline(input_path=None, output_path=None)
+    pipeline.set_state(feature_state)
+    return pipeline
+
+
+def assert_igual_a_pandas(df_duckdb: pd.DataFrame, df_pandas: pd.DataFrame) -> None:
+    """
+    Compara los resultados de ambos motores; el csv puede diferir en el
+    último bit de algunos valores.
+    """
+    pd.testing.assert_frame_equal(df_duckdb, df_pandas.reset_index(drop=True),
+                                  check_exact=False, rtol=1e-12)
+
+
+def test_fit_igual_a_pandas(engine, feature_state):
+    assert engine.fit(TRAIN_PATH) == feature_state
+
+
+@pytest.mark.parametrize('path', [TRAIN_PATH, TEST_PATH], ids=['train', 'test'])
+def test_transform_igual_a_pandas(engine, pipeline, feature_state, path):
+    assert_igual_a_pandas(engine.transform(path, feature_state),
+                          pipeline.transform(pd.read_csv(path)))
+
+
+@pytest.mark.parametrize('path', [TRAIN_PATH, TEST_PATH], ids=['train', 'test'])
+def test_data_transformation_igual_a_pandas(engine, pipeline, path):
+    assert_igual_a_pandas(engine.data_transformation(path),
+                          pipeline.data_transformation(pd.read_csv(path)))
+
+
+@pytest.mark.parametrize('formato', ['csv', 'parquet', 'arrow'])
+def test_run_igual_a_pandas(tmp_path, feature_state, formato):
+    state_path = tmp_path / 'state.json'
+    state_path.write_text(json.dumps(feature_state), encoding='utf-8')
+
+    salidas = {}
+    for motor in ('pandas', 'duckdb'):
+        salidas[motor] = str(tmp_path / f'{motor}.{formato}')
+        FeatureEngineeringPipeline(TEST_PATH, salidas[motor], state_path=str(state_path),
+                                   motor=motor).run()
+
+    assert_igual_a_pandas(read_frame(salidas['duckdb']), read_frame(salidas['pandas']))
@@ -0,0 +1,130 @@
+"""
+test_feature_cache.py
+
+DESCRIPCIÓN: Pruebas del cache de datos transformados (feature_cache.py):
+una segunda ejecución con la misma entrada, el mismo estado y el mismo
+código de transformación encuentra el resultado; un cambio en el estado o
+en feature_engineering.py invalida la entrada; con un índice de
+productos y tiendas no se usa el cache.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+import feature_engineering
+from conftest import TEST_PATH
+from feature_cache import FeatureCache
+from feature_engineering import FeatureEngineeringPipeline
+from lookup_index import LookupIndex
+
+
+@pytest.fixture
+def input_path(tmp_path) -> str:
+    """
+    Copia de Test_BigMart.csv.
+    """
+    path = str(tmp_path / 'Test_BigMart.csv')
+    shutil.copy(TEST_PATH, path)
+    return path
+
+
+@pytest.fixture
+def state_path(tmp_path, feature_state) -> str:
+    """
+    Estado aprendido sobre Train_BigMart.csv, guardado en state.json.
+    """
+    path = tmp_path / 'state.json'
+    path.write_text(json.dumps(feature_state), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path) -> FeatureCache:
+    return FeatureCache(str(tmp_path / 'cache'))
+
+
+def preparar(input_path, state_path, cache, **kwargs) -> tuple:
+    """
+    Transforma input_path con el estado y devuelve los datos y si se
+    encontraron en el cache.
+    """
+    pipeline = FeatureEngineeringPipeline(input_path, None, state_path=state_path,
+                                          cache=cache, **kwargs)
+    return pipeline.prepare_data(), pipeline.cache_hit
+
+
+def test_hit(input_path, state_path, cache, df_test, feature_state):
+    primero, hit_primero = preparar(input_path, state_path, cache)
+    segundo, hit_segundo = preparar(input_path, state_path, cache)
+
+    assert (hit_primero, hit_segundo) == (False, True)
+    assert len(cache.entries()) == 1
+    pd.testing.assert_frame_equal(segundo, primero)
+    pipeline = FeatureEngineeringPipeline(None, None)
+    pipeline.set_state(feature_state)
+    pd.testing.assert_frame_equal(segundo, pipeline.transform(df_test))
+
+
+def test_miss_con_otra_entrada(tmp_path, input_path, state_path, cache, df_test):
+    preparar(input_path, state_path, cache)
+    otra_entrada = str(tmp_path / 'Test_BigMart_mitad.csv')
+    df_test.iloc[:len(df_test) // 2].to_csv(otra_entrada, index=False)
+
+    datos, hit = preparar(otra_entrada, state_path, cache)
+
+    assert not hit
+    assert len(cache.entries()) == 2
+    assert len(datos) < len(preparar(input_path, state_path, cache)[0])
+
+
+def test_invalida_al_cambiar_el_estado(input_path, state_path, cache, df_test):
+    preparar(input_path, state_path, cache)
+    pipeline = FeatureEngineeringPipeline(None, None)
+    nuevo_estado = pipeline.fit(df_test.assign(Item_Outlet_Sales=0.0))
+    with open(state_path, 'w', encoding='utf-8') as f_json:
+        json.dump(nuevo_estado, f_json)
+
+    datos, hit = preparar(input_path, state_path, cache)
+
+    assert not hit
+    pd.testing.assert_frame_equal(datos, pipeline.transform(df_test))
+
+
+def test_invalida_al_cambiar_feature_engineering(tmp_path, monkeypatch, input_path,
+                                                 state_path, cache):
+    preparar(input_path, state_path, cache)
+    codigo = tmp_path / 'feature_engineering.py'
+    shutil.copy(feature_engineering.__file__, codigo)
+    with open(codigo, 'a', encoding='utf-8') as f_py:
+        f_py.write("\n# cambio\n")
+    monkeypatch.setattr(feature_engineering, '__file__', str(codigo))
+
+    _, hit = preparar(input_path, state_path, FeatureCache(cache.cache_dir))
+
+    assert not hit
+    assert len(cache.entries()) == 2
+
+
+def test_indice_no_usa_cache(input_path, state_path, cache, df_train, df_test,
+                             feature_state):
+    preparar(input_path, state_path, cache)
+    index = LookupIndex.from_frame(df_train)
+
+    datos, hit = preparar(input_path, state_path, cache, index=index,
+                          actualizar_indice=True)
+
+    # El resultado es el de transform() con el índice, que absorbió el lote
+    esperado_index = LookupIndex.from_frame(df_train)
+    pipeline = FeatureEngineeringPipeline(None, None, index=esperado_index,
+                                          actualizar_indice=True)
+    pipeline.set_state(feature_state)
+    assert not hit
+    assert len(cache.entries()) == 1
+    pd.testing.assert_frame_equal(datos, pipeline.transform(df_test))
+    assert index.to_dict() == esperado_index.to_dict()
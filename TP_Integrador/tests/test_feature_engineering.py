@@ -0,0 +1,95 @@
+"""
+test_feature_engineering.py
+
+DESCRIPCIÓN: Pruebas de FeatureEngineeringPipeline (feature_engineering.py):
+fit() y transform() sobre los datos de entrenamiento coinciden con
+data_transformation(), y transform() no depende del tamaño del lote ni de
+si el estado se guardó y se volvió a leer. Con los tipos compactos se
+obtienen las mismas columnas y registros, y las mismas predicciones salvo
+por la precisión de float32.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import TEST_PATH, TRAIN_PATH
+from feature_engineering import FeatureEngineeringPipeline
+from predict import MakePredictionPipeline
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl")
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+
+
+def pipeline_con_estado(state: dict, state_path: str = None) -> FeatureEngineeringPipeline:
+    """
+    Devuelve un FeatureEngineeringPipeline con el estado asignado.
+    """
+    pipeline = FeatureEngineeringPipeline(input_path=None, output_path=None,
+                                          state_path=state_path)
+    pipeline.set_state(state)
+
+    return pipeline
+
+
+def test_fit_transform_igual_a_data_transformation(df_train, feature_state):
+    original = FeatureEngineeringPipeline(input_path=None, output_path=None)
+    df_original = original.data_transformation(df_train)
+
+    df_transformado = pipeline_con_estado(feature_state).transform(df_train)
+
+    assert sorted(df_transformado.columns) == sorted(df_original.columns)
+    pd.testing.assert_frame_equal(df_transformado, df_original[df_transformado.columns])
+
+
+def test_transform_no_depende_del_lote(df_test, feature_state):
+    pipeline = pipeline_con_estado(feature_state)
+    df_completo = pipeline.transform(df_test)
+
+    lotes = [pipeline.transform(df_test.iloc[inicio:inicio + 1000])
+             for inicio in range(0, len(df_test), 1000)]
+    registro = pipeline.transform(df_test.iloc[[7]])
+
+    pd.testing.assert_frame_equal(pd.concat(lotes), df_completo)
+    pd.testing.assert_frame_equal(registro, df_completo.loc[[7]])
+
+
+def test_estado_guardado(tmp_path, df_test, feature_state):
+    state_path = str(tmp_path / 'feature_state.json')
+    pipeline_con_estado(feature_state, state_path).save_state()
+
+    leido = FeatureEngineeringPipeline(input_path=None, output_path=None, state_path=state_path)
+    leido.load_state()
+
+    assert leido.state == feature_state
+    pd.testing.assert_frame_equal(leido.transform(df_test),
+                                  pipeline_con_estado(feature_state).transform(df_test))
+
+
+@pytest.mark.parametrize('path', [TRAIN_PATH, TEST_PATH], ids=['train', 'test'])
+def test_compacto_igual_a_completo(path):
+    prediccion = MakePredictionPipeline(input_path=None, output_path=None,
+                                        model_path=MODEL_PATH)
+    prediccion.load_model()
+    salidas = {}
+    for compacto in (False, True):
+        pipeline = FeatureEngineeringPipeline(path, None, state_path=STATE_PATH,
+                                              compacto=compacto)
+        salidas[compacto] = pipeline.prepare_data()
+    completo, compacto = salidas[False], salidas[True]
+
+    assert list(compacto.columns) == list(completo.columns)
+    pd.testing.assert_index_equal(compacto.index, completo.index)
+    assert compacto['Item_Visibility'].dtype == np.float32
+    # Las columnas en float32 tienen unos 7 dígitos
+    # significativos: las predicciones difieren en menos de 1e-6 relativo
+    # (del orden de 5e-6 en ventas de miles)
+    np.testing.assert_allclose(prediccion.make_predictions(compacto)['Item_Outlet_Sales'],
+                               prediccion.make_predictions(completo)['Item_Outlet_Sales'],
+                               rtol=1e-6)
@@ -0,0 +1,81 @@
+"""
+test_hyperparameter_search.py
+
+DESCRIPCIÓN: Pruebas de HyperparameterSearch.save_best()
+(hyperparameter_search.py): model.pkl solo se reemplaza por un estimador
+lineal, model_arrays queda sincronizado con model.pkl y un mejor
+estimador no lineal se guarda aparte. log_trial() no imprime nada salvo
+que se indique una función de progreso.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import pickle as pkl
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from hyperparameter_search import HyperparameterSearch
+from model_format import LinearModelArtifact
+
+
+@pytest.fixture
+def search(tmp_path, df_prepared) -> HyperparameterSearch:
+    """
+    Búsqueda sobre df_prepared en la que el mejor resultado es un árbol.
+    """
+    input_path = str(tmp_path / 'train.csv')
+    df_prepared.to_csv(input_path, index=False)
+
+    busqueda = HyperparameterSearch(input_path, n_workers=1)
+    busqueda.results = [
+        {'estimador': 'Ridge', 'parametros': {'alpha': 1.0}, 'rmse': 1100.0},
+        {'estimador': 'DecisionTreeRegressor', 'parametros': {'max_depth': 6}, 'rmse': 1000.0},
+        {'estimador': 'LinearRegression', 'parametros': {}, 'rmse': 1200.0}]
+
+    return busqueda
+
+
+def leer(ruta):
+    """
+    Lee un modelo .pkl.
+    """
+    with open(ruta, 'rb') as f_pkl:
+        return pkl.load(f_pkl)
+
+
+def test_save_best_guarda_el_mejor_lineal(tmp_path, search):
+    model_path, arrays_path = tmp_path / 'model.pkl', tmp_path / 'model_arrays'
+    no_lineal_path = tmp_path / 'model_no_lineal.pkl'
+
+    guardados = search.save_best(str(model_path), str(arrays_path), str(no_lineal_path))
+
+    modelo = leer(model_path)
+    assert isinstance(modelo, Ridge)
+    assert isinstance(leer(no_lineal_path), DecisionTreeRegressor)
+    assert {resultado['estimador'] for resultado in guardados.values()} == \
+        {'Ridge', 'DecisionTreeRegressor'}
+    np.testing.assert_array_equal(LinearModelArtifact.load(str(arrays_path)).coef_,
+                                  modelo.coef_)
+
+
+def test_save_best_sin_ruta_no_lineal(tmp_path, search):
+    guardados = search.save_best(str(tmp_path / 'model.pkl'))
+
+    assert list(guardados) == [str(tmp_path / 'model.pkl')]
+    assert isinstance(leer(tmp_path / 'model.pkl'), Ridge)
+
+
+def test_log_trial_sin_salida(tmp_path, capsys):
+    pruebas = []
+    busqueda = HyperparameterSearch(str(tmp_path / 'train.csv'), n_workers=1)
+    busqueda.log_trial('Ridge', {'alpha': 1.0}, {'rmse': 1100.0, 'r2': 0.5})
+    busqueda.progreso = lambda *prueba: pruebas.append(prueba)
+    busqueda.log_trial('Ridge', {'alpha': 10.0}, {'rmse': 1000.0, 'r2': 0.6})
+
+    assert capsys.readouterr().out == ''
+    assert pruebas == [('Ridge', {'alpha': 10.0}, {'rmse': 1000.0, 'r2': 0.6})]
+    assert [resultado['rmse'] for resultado in busqueda.results] == [1100.0, 1000.0]
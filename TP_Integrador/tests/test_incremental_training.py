@@ -0,0 +1,121 @@
+"""
+test_incremental_training.py
+
+DESCRIPCIÓN: Pruebas de IncrementalTrainingPipeline (incremental_training.py):
+el modelo incremental coincide con un entrenamiento completo, no se
+reemplaza el modelo sin checkpoint salvo con desde_cero, y una
+interrupción entre el modelo y el checkpoint no deja el checkpoint
+adelantado al modelo.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import os
+import pickle as pkl
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from incremental_training import TARGET, IncrementalTrainingPipeline
+from model_format import LinearModelArtifact
+
+
+@pytest.fixture
+def lotes(tmp_path, df_prepared):
+    """
+    Escribe df_prepared en tres lotes csv.
+    """
+    rutas = []
+    for i, df_lote in enumerate(np.array_split(df_prepared, 3)):
+        ruta = str(tmp_path / f'lote_{i}.csv')
+        df_lote.to_csv(ruta, index=False)
+        rutas.append(ruta)
+
+    return rutas
+
+
+def pipeline_en(directorio, desde_cero: bool = True,
+                conservar: int = 2) -> IncrementalTrainingPipeline:
+    """
+    Devuelve un IncrementalTrainingPipeline que escribe en directorio.
+    """
+    return IncrementalTrainingPipeline(checkpoint_dir=str(directorio / 'incremental'),
+                                       model_path=str(directorio / 'model.pkl'),
+                                       arrays_path=str(directorio / 'model_arrays'),
+                                       desde_cero=desde_cero, conservar=conservar)
+
+
+def leer_modelo(directorio):
+    """
+    Lee model.pkl de directorio.
+    """
+    with open(directorio / 'model.pkl', 'rb') as f_pkl:
+        return pkl.load(f_pkl)
+
+
+def test_igual_a_entrenamiento_completo(tmp_path, lotes, df_prepared):
+    pipeline_en(tmp_path).run(lotes[:2])
+    assert pipeline_en(tmp_path, desde_cero=False).run(lotes[2:]) == 1
+
+    completo = LinearRegression().fit(df_prepared.drop(columns=[TARGET]), df_prepared[TARGET])
+    modelo = leer_modelo(tmp_path)
+    arrays = LinearModelArtifact.load(str(tmp_path / 'model_arrays'))
+
+    np.testing.assert_allclose(modelo.coef_, completo.coef_, rtol=1e-8)
+    np.testing.assert_allclose(modelo.intercept_, completo.intercept_, rtol=1e-8)
+    np.testing.assert_array_equal(arrays.coef_, modelo.coef_)
+
+
+def test_sin_checkpoint_no_reemplaza_el_modelo(tmp_path, lotes):
+    (tmp_path / 'model.pkl').write_bytes(b'modelo entrenado')
+
+    with pytest.raises(FileNotFoundError):
+        pipeline_en(tmp_path, desde_cero=False).run(lotes[:1])
+
+    assert (tmp_path / 'model.pkl').read_bytes() == b'modelo entrenado'
+
+
+def test_interrupcion_antes_del_checkpoint(tmp_path, lotes, monkeypatch):
+    pipeline_en(tmp_path).run(lotes[:1])
+
+    def interrumpir(self):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(IncrementalTrainingPipeline, 'save_checkpoint', interrumpir)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline_en(tmp_path, desde_cero=False).run(lotes[1:])
+    monkeypatch.undo()
+
+    # El checkpoint quedó detrás del modelo: se vuelven a incorporar los mismos lotes
+    interrumpido = leer_modelo(tmp_path)
+    assert pipeline_en(tmp_path, desde_cero=False).run(lotes[1:]) == 2
+    np.testing.assert_allclose(leer_modelo(tmp_path).coef_, interrumpido.coef_, rtol=1e-12)
+
+
+def test_arrays_publicados_con_un_enlace(tmp_path, lotes):
+    # La primera publicación reemplaza el directorio existente por el enlace
+    (tmp_path / 'model_arrays').mkdir()
+    for i, ruta in enumerate(lotes):
+        pipeline_en(tmp_path, desde_cero=(i == 0)).run([ruta])
+
+    enlace = tmp_path / 'model_arrays'
+    assert os.path.islink(enlace)
+    # Solo se conservan la versión publicada y la anterior
+    versiones = [nombre for nombre in os.listdir(tmp_path) if nombre.startswith('model_arrays.')]
+    assert len(versiones) == 2
+    np.testing.assert_array_equal(LinearModelArtifact.load(str(enlace)).coef_,
+                                  leer_modelo(tmp_path).coef_)
+
+
+@pytest.mark.parametrize('conservar', [0, 1, 2])
+def test_checkpoints_conservados(tmp_path, lotes, conservar):
+    for i, ruta in enumerate(lotes):
+        pipeline_en(tmp_path, desde_cero=(i == 0), conservar=conservar).run([ruta])
+
+    directorio = tmp_path / 'incremental'
+    versiones = sorted(nombre for nombre in os.listdir(directorio) if nombre.startswith('v'))
+    # El publicado y los `conservar` anteriores
+    assert versiones == [f"v{numero:06d}" for numero in range(3 - conservar, 4)]
+    assert (directorio / 'CURRENT').read_text(encoding='utf-8') == versiones[-1]
@@ -0,0 +1,72 @@
+"""
+test_lookup_index.py
+
+DESCRIPCIÓN: Pruebas de LookupIndex (lookup_index.py): los límites de
+memoria tienen valores finitos por defecto, se conservan al guardar el
+índice y el orquestador los aplica al índice que actualiza la inferencia.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from lookup_index import MAX_ITEMS, TTL, LookupIndex
+from orchestrator import PipelineOrchestrator
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl")
+
+
+def test_limites_por_defecto(tmp_path, df_train):
+    index = LookupIndex.from_frame(df_train)
+    index.save(str(tmp_path / 'lookup_index.json'))
+    leido = LookupIndex.load(str(tmp_path / 'lookup_index.json'))
+
+    assert (index.max_items, index.ttl) == (MAX_ITEMS, TTL)
+    assert (leido.max_items, leido.ttl) == (MAX_ITEMS, TTL)
+
+
+def test_set_limits_descarta_los_menos_recientes(df_train, df_test):
+    index = LookupIndex.from_frame(df_train)
+    index.absorb(df_test.iloc[:100])
+    recientes = set(df_test.iloc[:100]['Item_Identifier'])
+    productos = len(index.items)
+
+    index.set_limits(max_items=len(recientes))
+
+    assert set(index.items) == recientes
+    assert index.descartados == productos - len(recientes)
+
+
+def test_ttl_descarta_los_no_vistos(df_train, df_test):
+    index = LookupIndex.from_frame(df_train, ttl=2)
+    lote = df_test.iloc[:50]
+    index.absorb(lote)
+    index.absorb(lote)
+
+    assert set(index.items) == set(lote['Item_Identifier'])
+
+
+def test_orquestador_aplica_los_limites(tmp_path, df_train, df_test, feature_state):
+    index_path = str(tmp_path / 'lookup_index.json')
+    state_path = str(tmp_path / 'feature_state.json')
+    input_path = str(tmp_path / 'test.csv')
+    LookupIndex.from_frame(df_train).save(index_path)
+    with open(state_path, 'w', encoding='utf-8') as f_json:
+        json.dump(feature_state, f_json)
+    df_test.to_csv(input_path, index=False)
+
+    orchestrator = PipelineOrchestrator(MODEL_PATH, state_path, write_intermediate=False,
+                                        index_path=index_path, actualizar_indice=True,
+                                        index_max_items=500, index_ttl=5)
+    orchestrator.run_inference(input_path, str(tmp_path / 'predicciones.csv'),
+                               chunksize=1000)
+
+    index = LookupIndex.load(index_path)
+    assert (index.max_items, index.ttl) == (500, 5)
+    assert len(index.items) == 500
+    assert len(pd.read_csv(tmp_path / 'predicciones.csv')) > 0
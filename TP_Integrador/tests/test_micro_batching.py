@@ -0,0 +1,98 @@
+"""
+test_micro_batching.py
+
+DESCRIPCIÓN: Pruebas de MicroBatcher (micro_batching.py): los pedidos
+concurrentes se agrupan en un lote, un registro inválido dentro de un
+lote hace fallar solo a su pedido y stop() no deja pedidos sin respuesta.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from micro_batching import MicroBatcher
+
+
+class Predictor:
+    """
+    Función de predicción que duplica cada registro, falla si alguno no es
+    un número y guarda el tamaño de cada llamada.
+    """
+
+    def __init__(self):
+        self.llamadas = []
+
+    def __call__(self, registros: list) -> list:
+        self.llamadas.append(len(registros))
+        if not all(isinstance(registro, (int, float)) for registro in registros):
+            raise ValueError("Registro inválido")
+        return [2 * registro for registro in registros]
+
+
+def enviar(predictor: Predictor, pedidos: list) -> list:
+    """
+    Envía los pedidos en forma concurrente y devuelve sus resultados o
+    excepciones, en orden.
+    """
+    async def correr():
+        batcher = MicroBatcher(predictor, max_batch_size=64, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(pedido) for pedido in pedidos),
+                                        return_exceptions=True), batcher.metrics()
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(correr())
+
+
+def test_pedidos_concurrentes_en_un_lote():
+    predictor = Predictor()
+
+    resultados, metricas = enviar(predictor, [[1, 2], [3], [4, 5, 6]])
+
+    assert resultados == [[2, 4], [6], [8, 10, 12]]
+    assert predictor.llamadas == [6]
+    assert metricas['batches'] == 1 and metricas['failed_requests'] == 0
+
+
+def test_registro_invalido_solo_falla_su_pedido():
+    predictor = Predictor()
+
+    resultados, metricas = enviar(predictor, [[1, 2], ['malo', 3], [4]])
+
+    assert resultados[0] == [2, 4]
+    assert resultados[2] == [8]
+    with pytest.raises(ValueError):
+        raise resultados[1]
+    assert metricas['failed_batches'] == 1 and metricas['failed_requests'] == 1
+
+
+def test_stop_resuelve_los_pendientes():
+    iniciado, liberar = threading.Event(), threading.Event()
+
+    def lento(registros: list) -> list:
+        iniciado.set()
+        liberar.wait(5)
+        return registros
+
+    async def correr():
+        batcher = MicroBatcher(lento, max_batch_size=1, max_wait_ms=0)
+        await batcher.start()
+        pedidos = [asyncio.ensure_future(batcher.submit([i])) for i in range(3)]
+        while not iniciado.is_set():
+            await asyncio.sleep(0.001)
+        # El primer pedido está en curso y los otros dos en la cola; el hilo
+        # de predicción termina después de stop()
+        threading.Timer(0.05, liberar.set).start()
+        await batcher.stop()
+        return await asyncio.gather(*pedidos, return_exceptions=True), batcher.metrics()
+
+    resultados, metricas = asyncio.run(asyncio.wait_for(correr(), 5))
+
+    assert all(isinstance(resultado, RuntimeError) for resultado in resultados)
+    assert metricas['pending_requests'] == 0 and metricas['queue_depth'] == 0
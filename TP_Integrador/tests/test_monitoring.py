@@ -0,0 +1,55 @@
+"""
+test_monitoring.py
+
+DESCRIPCIÓN: Pruebas del monitoreo de deriva (monitoring.py): en los lotes
+que se muestrean para el histograma, la media, el desvío y la proporción
+de faltantes son los exactos de todos los registros.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from monitoring import PREDICCION, DriftMonitor, perfil_entrenamiento
+
+
+@pytest.fixture(scope='module')
+def df_preds(df_prepared) -> pd.DataFrame:
+    """
+    Datos de entrenamiento transformados con el target como predicción y
+    un 10 % de Item_Weight faltante.
+    """
+    df_preds = df_prepared.copy()
+    df_preds.loc[df_preds.sample(frac=0.1, random_state=0).index, 'Item_Weight'] = np.nan
+    return df_preds
+
+
+@pytest.fixture(scope='module')
+def perfil(df_prepared) -> dict:
+    """
+    Perfil de entrenamiento de los datos transformados.
+    """
+    return perfil_entrenamiento(df_prepared.drop(columns='Item_Outlet_Sales'),
+                                df_prepared['Item_Outlet_Sales'])
+
+
+@pytest.mark.parametrize('tamanio_lote', [None, 100], ids=['lote_grande', 'lotes_chicos'])
+def test_media_y_faltantes_exactos(perfil, df_preds, tamanio_lote):
+    monitor = DriftMonitor(perfil, muestra=2048)
+    tamanio_lote = tamanio_lote or len(df_preds)
+    for inicio in range(0, len(df_preds), tamanio_lote):
+        monitor.update(df_preds.iloc[inicio:inicio + tamanio_lote])
+
+    resumen = monitor.summary()['variables']
+
+    assert len(df_preds) > 2048
+    for columna in df_preds.columns:
+        nombre = PREDICCION if columna == 'Item_Outlet_Sales' else columna
+        esperado = df_preds[columna].astype(float)
+        np.testing.assert_allclose(resumen[nombre]['media'], esperado.mean(), rtol=1e-9)
+        np.testing.assert_allclose(resumen[nombre]['desvio'], esperado.std(ddof=0), rtol=1e-6)
+        np.testing.assert_allclose(resumen[nombre]['faltantes'], esperado.isna().mean())
+
@@ -0,0 +1,113 @@
+"""
+test_multi_model.py
+
+DESCRIPCIÓN: Pruebas de la evaluación de varios modelos (multi_model.py):
+cada columna 'prediccion_<nombre>' coincide con la predicción de
+MakePredictionPipeline con ese modelo solo, las métricas acumuladas
+coinciden con las de sklearn.metrics sobre todos los datos y el modo por
+bloques da el mismo resumen que run().
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.tree import DecisionTreeRegressor
+
+from multi_model import PREFIJO_PREDICCION, MultiModelPredictionPipeline
+from predict import MakePredictionPipeline, load_model_file
+from storage import read_frame, write_frame
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl")
+TARGET = 'Item_Outlet_Sales'
+
+
+@pytest.fixture(scope='module')
+def entrada(tmp_path_factory, df_prepared) -> str:
+    """
+    df_prepared guardado en parquet, con el valor real.
+    """
+    path = str(tmp_path_factory.mktemp('multi_model') / 'prepared.parquet')
+    write_frame(df_prepared, path)
+    return path
+
+
+@pytest.fixture(scope='module')
+def model_paths(tmp_path_factory, df_prepared) -> dict:
+    """
+    model.pkl como referencia y dos candidatos entrenados sobre df_prepared.
+    """
+    directorio = tmp_path_factory.mktemp('modelos')
+    x_train, y_train = df_prepared.drop(columns=[TARGET]), df_prepared[TARGET]
+    paths = {'lineal': MODEL_PATH}
+    for nombre, modelo in (('ridge', Ridge(alpha=10.0)),
+                           ('arbol', DecisionTreeRegressor(max_depth=6, random_state=0))):
+        paths[nombre] = str(directorio / f'{nombre}.pkl')
+        with open(paths[nombre], 'wb') as f_model:
+            pickle.dump(modelo.fit(x_train, y_train), f_model)
+    return paths
+
+
+@pytest.mark.parametrize('n_threads', [1, 3])
+def test_predicciones_iguales_a_un_modelo(tmp_path, entrada, model_paths, n_threads):
+    salida = str(tmp_path / 'modelos.parquet')
+    MultiModelPredictionPipeline(entrada, salida, model_paths, n_threads=n_threads).run()
+    df_modelos = read_frame(salida)
+
+    for nombre, path in model_paths.items():
+        salida_unica = str(tmp_path / f'{nombre}.parquet')
+        MakePredictionPipeline(entrada, salida_unica, model_path=path).run()
+        esperado = read_frame(salida_unica)[TARGET]
+        np.testing.assert_allclose(df_modelos[PREFIJO_PREDICCION + nombre], esperado,
+                                   rtol=1e-12)
+
+
+def test_metricas_iguales_a_sklearn(tmp_path, entrada, df_prepared, model_paths):
+    pipeline = MultiModelPredictionPipeline(entrada, str(tmp_path / 'modelos.parquet'),
+                                            model_paths)
+    pipeline.run()
+    resumen = pipeline.metrics.summary()
+
+    features, real = df_prepared.drop(columns=[TARGET]), df_prepared[TARGET].to_numpy()
+    referencia = load_model_file(model_paths['lineal']).predict(features)
+    assert resumen['filas'] == resumen['filas_con_real'] == len(df_prepared)
+    for nombre, path in model_paths.items():
+        prediccion = load_model_file(path).predict(features)
+        metricas = resumen['modelos'][nombre]
+        assert metricas['rmse'] == pytest.approx(
+            np.sqrt(mean_squared_error(real, prediccion)), rel=1e-9)
+        assert metricas['mae'] == pytest.approx(mean_absolute_error(real, prediccion), rel=1e-9)
+        assert metricas['r2'] == pytest.approx(r2_score(real, prediccion), rel=1e-9)
+        assert metricas['sesgo'] == pytest.approx(np.mean(prediccion - real), rel=1e-9)
+        assert metricas['diferencia_absoluta_media'] == pytest.approx(
+            np.mean(np.abs(prediccion - referencia)), rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('chunksize', [1000, 10000])
+def test_streaming_igual_a_run(tmp_path, entrada, model_paths, chunksize):
+    resumenes = {}
+    for modo in ('memoria', 'bloques'):
+        pipeline = MultiModelPredictionPipeline(entrada, str(tmp_path / f'{modo}.parquet'),
+                                                model_paths)
+        if modo == 'memoria':
+            pipeline.run()
+        else:
+            pipeline.run_streaming(chunksize)
+        resumenes[modo] = pipeline.metrics.summary()
+
+    memoria, bloques = resumenes['memoria'], resumenes['bloques']
+    assert bloques['lotes'] == -(-memoria['filas'] // chunksize)
+    assert (bloques['filas'], bloques['filas_con_real']) == \
+        (memoria['filas'], memoria['filas_con_real'])
+    for nombre, metricas in memoria['modelos'].items():
+        for clave, valor in metricas.items():
+            if clave != 'segundos':
+                assert bloques['modelos'][nombre][clave] == pytest.approx(valor, rel=1e-9,
+                                                                          abs=1e-9), clave
@@ -0,0 +1,77 @@
+"""
+test_parallel_transform.py
+
+DESCRIPCIÓN: Pruebas de ParallelTransformPipeline (parallel_transform.py):
+particiones con el mismo nombre de archivo en distintos directorios y
+equivalencia de la salida concatenada con transform() en un proceso.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from feature_engineering import FeatureEngineeringPipeline
+from parallel_transform import ParallelTransformPipeline, partition_paths
+
+
+@pytest.fixture
+def particiones(tmp_path, df_train, feature_state):
+    """
+    Escribe df_train en dos particiones in/a/part.csv e in/b/part.csv y el
+    estado en state.json.
+    """
+    mitad = len(df_train) // 2
+    for nombre, df_parte in (('a', df_train.iloc[:mitad]), ('b', df_train.iloc[mitad:])):
+        (tmp_path / 'in' / nombre).mkdir(parents=True)
+        df_parte.to_csv(tmp_path / 'in' / nombre / 'part.csv', index=False)
+
+    state_path = tmp_path / 'state.json'
+    state_path.write_text(json.dumps(feature_state), encoding='utf-8')
+
+    return tmp_path, str(state_path)
+
+
+def test_partition_paths_con_el_mismo_nombre(tmp_path):
+    salidas = partition_paths([str(tmp_path / 'a' / 'part.csv'),
+                               str(tmp_path / 'b' / 'part.csv')], 'out', 'csv')
+
+    assert len(set(salidas)) == 2
+
+
+def test_partition_paths_rechaza_colisiones(tmp_path):
+    with pytest.raises(ValueError):
+        partition_paths([str(tmp_path / 'part.csv'), str(tmp_path / 'part.parquet')],
+                        'out', 'csv')
+
+
+def test_concatenar_particiones_con_el_mismo_nombre(particiones, df_train, feature_state):
+    directorio, state_path = particiones
+    salida = directorio / 'out.csv'
+
+    pipeline = ParallelTransformPipeline(str(directorio / 'in' / '*' / 'part.csv'), str(salida),
+                                         state_path, n_workers=2, partitioned=False)
+    total = pipeline.run()
+
+    esperado = FeatureEngineeringPipeline(input_path=None, output_path=None)
+    esperado.set_state(feature_state)
+    esperado.transform(df_train).to_csv(directorio / 'esperado.csv', index=False)
+
+    df_salida = pd.read_csv(salida)
+    df_esperado = pd.read_csv(directorio / 'esperado.csv')
+    assert total == len(df_salida) == len(df_esperado)
+    pd.testing.assert_frame_equal(df_salida, df_esperado)
+
+
+def test_particiones_con_el_mismo_nombre(particiones):
+    directorio, state_path = particiones
+    salida = directorio / 'out'
+
+    ParallelTransformPipeline(str(directorio / 'in' / '*' / 'part.csv'), str(salida),
+                              state_path, n_workers=2).run()
+
+    assert sorted(ruta.name for ruta in salida.iterdir()) == \
+        ['a__part_Prepared.csv', 'b__part_Prepared.csv']
@@ -0,0 +1,39 @@
+"""
+test_profiling.py
+
+DESCRIPCIÓN: Pruebas de StageProfiler (profiling.py): las etapas con
+nombres que MLflow no admite, como "feature_engineering (cache)" o
+"transform (duckdb)", se registran como métricas válidas.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import pytest
+
+from profiling import StageProfiler, metric_name
+
+
+@pytest.mark.parametrize('etapa, esperado', [
+    ('read_data', 'read_data_segundos'),
+    ('feature_engineering (cache)', 'feature_engineering_cache_segundos'),
+    ('transform (duckdb)', 'transform_duckdb_segundos')])
+def test_metric_name(etapa, esperado):
+    assert metric_name(etapa, 'segundos') == esperado
+
+
+def test_log_mlflow_con_etapas_entre_parentesis(tmp_path):
+    mlflow = pytest.importorskip('mlflow')
+
+    profiler = StageProfiler()
+    for etapa in ('feature_engineering (cache)', 'transform (duckdb)', 'train'):
+        with profiler.stage(etapa, 10) as registro:
+            registro['filas_salida'] = 10
+
+    tracking_uri = (tmp_path / 'mlruns').as_uri()
+    profiler.log_mlflow('test', tracking_uri=tracking_uri, experiment_name='test_profiling')
+
+    mlflow.set_tracking_uri(tracking_uri)
+    run = mlflow.search_runs(experiment_names=['test_profiling'], output_format='list')[0]
+    assert {'feature_engineering_cache_segundos', 'transform_duckdb_filas_salida',
+            'train_filas_entrada', 'segundos_total'} <= set(run.data.metrics)
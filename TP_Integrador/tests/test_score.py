@@ -0,0 +1,81 @@
+"""
+test_score.py
+
+DESCRIPCIÓN: Pruebas de la predicción de arranque rápido (score.py): los
+campos numéricos vacíos de un csv dan una predicción NaN sin interrumpir
+el lote, en Python puro y con NumPy, y el resto de los registros se
+predice igual por ambos caminos.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import math
+import os
+
+import numpy as np
+import pytest
+
+from score import load_compiled, main, predict, read_records
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TEST_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Test_BigMart.csv")
+
+# Columnas que se vacían, una por registro, a partir del registro 1
+VACIADAS = ('Item_MRP', 'Item_Visibility', 'Outlet_Establishment_Year')
+
+
+@pytest.fixture(scope='module')
+def compilado(tmp_path_factory) -> dict:
+    """
+    Modelo compilado a partir de model.pkl, guardado fuera de model/.
+    """
+    return load_compiled(compiled_path=str(tmp_path_factory.mktemp('score') / 'compilado.json'),
+                         recompilar=True)
+
+
+@pytest.fixture(scope='module')
+def csv_con_vacios(tmp_path_factory) -> str:
+    """
+    Las primeras filas de Test_BigMart.csv con un campo numérico vacío en
+    las filas 1, 2 y 3.
+    """
+    with open(TEST_PATH, 'r', encoding='utf-8') as archivo:
+        lineas = [archivo.readline() for _ in range(21)]
+    encabezado = lineas[0].strip().split(',')
+    for fila, columna in enumerate(VACIADAS, start=2):
+        campos = lineas[fila].rstrip('\n').split(',')
+        campos[encabezado.index(columna)] = ''
+        lineas[fila] = ','.join(campos) + '\n'
+
+    path = tmp_path_factory.mktemp('score') / 'con_vacios.csv'
+    path.write_text(''.join(lineas), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('umbral_numpy', [5000, 0], ids=['python', 'numpy'])
+def test_numericos_vacios_dan_nan(compilado, csv_con_vacios, umbral_numpy):
+    predicciones = predict(compilado, read_records(csv_con_vacios), umbral_numpy)
+
+    assert len(predicciones) == 20
+    assert all(math.isnan(prediccion) for prediccion in predicciones[1:4])
+    assert not math.isnan(predicciones[0])
+
+
+def test_python_igual_a_numpy(compilado, csv_con_vacios):
+    records = read_records(csv_con_vacios)
+
+    np.testing.assert_allclose(predict(compilado, records, umbral_numpy=5000),
+                               predict(compilado, records, umbral_numpy=0), rtol=1e-12)
+
+
+def test_cli_con_vacios(compilado, csv_con_vacios, tmp_path, capsys):
+    compilado_path = tmp_path / 'compilado.json'
+    salida = tmp_path / 'predicciones.csv'
+
+    main([csv_con_vacios, '--compilado', str(compilado_path), '--salida', str(salida)])
+
+    filas = salida.read_text(encoding='utf-8').splitlines()
+    assert len(filas) == 21
+    assert [fila.rsplit(',', 1)[1] for fila in filas[2:5]] == ['', '', '']
+    assert capsys.readouterr().err == ''
@@ -0,0 +1,88 @@
+"""
+test_server.py
+
+DESCRIPCIÓN: Pruebas del servicio de predicción (server.py): los valores
+categóricos desconocidos se rechazan con 422 en la validación, con y sin
+el modelo compilado, y los registros válidos, con tamaño o peso
+faltante, se predicen igual que con el pipeline de pandas y el índice
+de productos y tiendas.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import create_app
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+EXAMPLE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "Notebook", "example.json")
+
+
+@pytest.fixture(scope='module')
+def registro() -> dict:
+    """
+    Registro crudo de Notebook/example.json.
+    """
+    with open(EXAMPLE_PATH, 'r', encoding='utf-8') as f_json:
+        return json.load(f_json)
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['pandas', 'compilado'])
+def client(request):
+    """
+    Cliente del servicio, sin y con el modelo compilado.
+    """
+    with TestClient(create_app(compiled=request.param)) as test_client:
+        yield test_client
+
+
+@pytest.mark.parametrize('columna', ['Outlet_Size', 'Outlet_Type', 'Outlet_Location_Type',
+                                     'Item_Fat_Content'])
+def test_valor_desconocido_devuelve_422(client, registro, columna):
+    invalido = dict(registro, **{columna: 'Huge'})
+
+    assert client.post('/predict', json=invalido).status_code == 422
+    assert client.post('/predict', json=[registro, invalido]).status_code == 422
+
+
+def test_registro_valido(client, registro):
+    sin_tamanio = dict(registro, Outlet_Size=None)
+
+    respuesta = client.post('/predict', json=[registro, sin_tamanio])
+
+    assert respuesta.status_code == 200
+    assert all(isinstance(prediccion, float) for prediccion in respuesta.json()['predictions'])
+
+
+@pytest.mark.parametrize('faltante', [None, 'Outlet_Size', 'Item_Weight'])
+def test_compilado_igual_a_pandas(registro, faltante):
+    if faltante is not None:
+        registro = dict(registro, **{faltante: None})
+
+    predicciones = []
+    for compiled in (False, True):
+        with TestClient(create_app(compiled=compiled)) as test_client:
+            predicciones.append(test_client.post('/predict', json=registro).json()['prediction'])
+
+    assert predicciones[0] == pytest.approx(predicciones[1], rel=1e-12)
+
+
+def test_compilado_igual_a_pandas_con_indice(df_test):
+    # Los tamaños y pesos faltantes se imputan con el índice en ambos modos
+    registros = json.loads(df_test.iloc[:500].to_json(orient='records'))
+
+    predicciones = []
+    for compiled in (False, True):
+        with TestClient(create_app(compiled=compiled)) as test_client:
+            predicciones.append(test_client.post('/predict', json=registros)
+                                .json()['predictions'])
+
+    assert sum(registro['Outlet_Size'] is None for registro in registros) > 0
+    assert [p is None for p in predicciones[0]] == [p is None for p in predicciones[1]]
+    assert [p for p in predicciones[1] if p is not None] == pytest.approx(
+        [p for p in predicciones[0] if p is not None], rel=1e-12)
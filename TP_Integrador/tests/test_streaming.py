@@ -0,0 +1,64 @@
+"""
+test_streaming.py
+
+DESCRIPCIÓN: Pruebas del modo por bloques: la transformación y la
+inferencia por bloques escriben lo mismo que en memoria, en csv y en
+parquet, con bloques que dividen o no a la cantidad de registros.
+
+AUTOR: Ezequiel Scordamaglia y Santiago González Achaval
+FECHA: 17/10/2026
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from feature_engineering import FeatureEngineeringPipeline
+from orchestrator import PipelineOrchestrator
+from storage import read_frame
+
+CURRENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TEST_PATH = os.path.join(CURRENT_DIRECTORY, "..", "data", "Test_BigMart.csv")
+MODEL_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "model.pkl")
+STATE_PATH = os.path.join(CURRENT_DIRECTORY, "..", "model", "feature_state.json")
+
+
+@pytest.fixture
+def state_path(tmp_path, feature_state) -> str:
+    """
+    Estado aprendido sobre Train_BigMart.csv, guardado en state.json.
+    """
+    path = tmp_path / 'state.json'
+    path.write_text(json.dumps(feature_state), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('formato', ['csv', 'parquet'])
+@pytest.mark.parametrize('chunksize', [1000, 5681, 10000])
+def test_transformacion_por_bloques(tmp_path, state_path, formato, chunksize):
+    salidas = {}
+    for modo in ('memoria', 'bloques'):
+        salidas[modo] = str(tmp_path / f'{modo}.{formato}')
+        pipeline = FeatureEngineeringPipeline(TEST_PATH, salidas[modo], state_path=state_path)
+        if modo == 'memoria':
+            pipeline.run()
+        else:
+            pipeline.run_streaming(chunksize)
+
+    pd.testing.assert_frame_equal(read_frame(salidas['bloques']), read_frame(salidas['memoria']))
+
+
+@pytest.mark.parametrize('chunksize', [777, 10000])
+def test_inferencia_por_bloques(tmp_path, chunksize):
+    salidas = {}
+    for modo, bloques in (('memoria', None), ('bloques', chunksize)):
+        salidas[modo] = str(tmp_path / f'{modo}.csv')
+        PipelineOrchestrator(MODEL_PATH, STATE_PATH, write_intermediate=False).run_inference(
+            TEST_PATH, salidas[modo], chunksize=bloques)
+
+    # El producto matricial puede variar en el último bit según la
+    # posición del registro en el bloque
+    pd.testing.assert_frame_equal(pd.read_csv(salidas['bloques']),
+                                  pd.read_csv(salidas['memoria']), check_exact=False, rtol=1e-12)